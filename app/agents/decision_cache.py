@@ -0,0 +1,224 @@
+import asyncio
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+import time
+
+from app.config import settings
+from app.database.crud.actions import insert_action
+from app.schemas.market_snapshot import DecisionCacheStats, MarketSnapshot
+
+RSI_BANDS = (30, 45, 55, 70)
+CHANGE_BUCKET_PCT = 1.0
+IMBALANCE_BUCKET = 0.1
+
+
+def rsi_band(value: float) -> str:
+    for edge, label in zip(RSI_BANDS, ("oversold", "weak", "neutral", "strong")):
+        if value < edge:
+            return label
+    return "overbought"
+
+
+def snapshot_key(snapshot: MarketSnapshot) -> tuple[str, dict]:
+    """
+    Quantise a snapshot into its cache bucket.
+    Returns (sha256 key, canonical bucket) so the bucket can be stored for auditing.
+    """
+    bucket = {
+        "symbol": snapshot.symbol,
+        "change_24h_bucket": math.floor(snapshot.change_24h_pct / CHANGE_BUCKET_PCT),
+        "rsi_band": rsi_band(snapshot.rsi_14),
+        "imbalance_band": math.floor(snapshot.order_book_imbalance / IMBALANCE_BUCKET),
+        "candle_trend": snapshot.candle_trend.value,
+        "news_sentiment": snapshot.news_sentiment.value,
+        # A SELL only makes sense with something to sell
+        "has_position": snapshot.holdings_value_usd > 0,
+    }
+    canonical = json.dumps(bucket, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest(), bucket
+
+
+class DecisionCache:
+    """
+    Persistent cache of LLM HOLD decisions keyed by a quantised market snapshot.
+
+    Only HOLDs are cached: replaying a BUY or SELL would open another position
+    on every hit, so those always go back to the LLM (the same rule the
+    DecisionGate applies). Entries live in a local SQLite file with a TTL;
+    when the table grows past `max_entries` the least recently hit entries
+    are evicted. SQLite calls run in a worker thread so lookups never block
+    the event loop.
+    """
+
+    def __init__(
+        self,
+        db_path: str = settings.DECISION_CACHE_DB_PATH,
+        ttl_seconds: float = settings.DECISION_CACHE_TTL_SECONDS,
+        max_entries: int = settings.DECISION_CACHE_MAX_ENTRIES,
+        enabled: bool = settings.DECISION_CACHE_ENABLED,
+    ):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.avg_llm_seconds = 0.0
+        self.latency_saved_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # SQLite (runs in a worker thread)
+    # ------------------------------------------------------------------
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS decision_cache (
+                    key TEXT PRIMARY KEY,
+                    bucket TEXT NOT NULL,
+                    side TEXT NOT NULL,
+                    reason TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_hit_at REAL NOT NULL,
+                    hits INTEGER DEFAULT 0
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_decision_cache_lru ON decision_cache (last_hit_at)")
+            self._conn.commit()
+        return self._conn
+
+    def _get_sync(self, key: str, now: float) -> tuple[str, str] | None:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT side, reason FROM decision_cache WHERE key = ? AND side = 'hold' AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE decision_cache SET last_hit_at = ?, hits = hits + 1 WHERE key = ?",
+                    (now, key),
+                )
+                conn.commit()
+            return row
+
+    def _put_sync(self, key: str, bucket: dict, side: str, reason: str, now: float) -> int:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                """
+                INSERT INTO decision_cache (key, bucket, side, reason, created_at, expires_at, last_hit_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    side = excluded.side,
+                    reason = excluded.reason,
+                    created_at = excluded.created_at,
+                    expires_at = excluded.expires_at,
+                    last_hit_at = excluded.last_hit_at
+                """,
+                (key, json.dumps(bucket, sort_keys=True), side, reason, now, now + self.ttl_seconds, now),
+            )
+
+            evicted = conn.execute("DELETE FROM decision_cache WHERE expires_at <= ?", (now,)).rowcount
+            evicted += conn.execute(
+                """
+                DELETE FROM decision_cache WHERE key IN (
+                    SELECT key FROM decision_cache ORDER BY last_hit_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            ).rowcount
+            conn.commit()
+            return evicted
+
+    def _drop_sync(self, key: str) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM decision_cache WHERE key = ?", (key,))
+            conn.commit()
+
+    def _count_sync(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM decision_cache").fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+    async def lookup(self, snapshot: MarketSnapshot | None) -> tuple[str, str] | None:
+        """Cached ("hold", reason) for this snapshot's bucket, or None."""
+        if not self.enabled or snapshot is None:
+            return None
+
+        key, _ = snapshot_key(snapshot)
+        row = await asyncio.to_thread(self._get_sync, key, time.time())
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.latency_saved_seconds += self.avg_llm_seconds
+        return row
+
+    async def store(self, snapshot: MarketSnapshot | None, side: str, reason: str) -> None:
+        if not self.enabled or snapshot is None:
+            return
+
+        key, bucket = snapshot_key(snapshot)
+        if side.lower() != "hold":
+            # A fresher BUY/SELL supersedes whatever HOLD the bucket held
+            await asyncio.to_thread(self._drop_sync, key)
+            return
+        self.evictions += await asyncio.to_thread(self._put_sync, key, bucket, side.lower(), reason, time.time())
+
+    def observe_llm_seconds(self, seconds: float) -> None:
+        """Feed the duration of a full LLM cycle; hits are credited with the running average."""
+        if self.avg_llm_seconds == 0:
+            self.avg_llm_seconds = seconds
+        else:
+            self.avg_llm_seconds = 0.8 * self.avg_llm_seconds + 0.2 * seconds
+
+    async def replay(self, snapshot: MarketSnapshot, side: str, reason: str) -> dict:
+        """Log a cached HOLD in place of an LLM run. Returns the logged decision."""
+        reason = f"[cache] {reason}"
+        action_id = await insert_action(
+            symbol=snapshot.symbol,
+            side=side,
+            price=snapshot.price_usd,
+            reason=reason,
+            decision_source="cache",
+        )
+        return {"id": action_id, "symbol": snapshot.symbol, "side": side, "reason": reason}
+
+    async def stats(self) -> DecisionCacheStats:
+        total = self.hits + self.misses
+        entries = await asyncio.to_thread(self._count_sync) if self.enabled else 0
+        return DecisionCacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / total if total else 0.0,
+            entries=entries,
+            evictions=self.evictions,
+            avg_llm_seconds=self.avg_llm_seconds,
+            latency_saved_seconds=self.latency_saved_seconds,
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+decision_cache = DecisionCache()
@@ -0,0 +1,155 @@
+from enum import Enum
+
+from app.config import settings
+from app.database.crud.actions import fetch_latest_action, insert_action
+from app.schemas.market_snapshot import DecisionGateStats, MarketSnapshot
+
+
+class GateVerdict(str, Enum):
+    LLM = "llm"      # state moved (or nothing to compare with): run the agent
+    SKIP = "skip"    # state unchanged: re-log the prior decision
+    AUDIT = "audit"  # state unchanged, but run the agent anyway to measure agreement
+
+
+class DecisionGate:
+    """
+    Pre-decision gate that skips the LLM when the market has not moved.
+
+    The snapshot of the last LLM-decided cycle is compared field by field with
+    the current one: numeric fields within tolerance, categorical fields equal.
+    Only HOLD decisions are repeated; re-logging a BUY/SELL would open a second
+    position. Every `audit_every`-th skippable cycle still runs the LLM so the
+    agreement rate between the gate and the model can be reported.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = settings.DECISION_GATE_ENABLED,
+        price_tolerance_pct: float = settings.DECISION_GATE_PRICE_TOLERANCE_PCT,
+        change_tolerance_pct: float = settings.DECISION_GATE_CHANGE_TOLERANCE_PCT,
+        holdings_tolerance_pct: float = settings.DECISION_GATE_HOLDINGS_TOLERANCE_PCT,
+        max_age_seconds: float = settings.DECISION_GATE_MAX_AGE_SECONDS,
+        audit_every: int = settings.DECISION_GATE_AUDIT_EVERY,
+    ):
+        self.enabled = enabled
+        self.price_tolerance_pct = price_tolerance_pct
+        self.change_tolerance_pct = change_tolerance_pct
+        self.holdings_tolerance_pct = holdings_tolerance_pct
+        self.max_age_seconds = max_age_seconds
+        self.audit_every = audit_every
+
+        self.last_snapshot: MarketSnapshot | None = None
+        self.last_decision: dict | None = None
+        self._last_action_id = 0
+        self._skippable = 0
+
+        self.cycles = 0
+        self.llm_calls = 0
+        self.llm_calls_saved = 0
+        self.audits = 0
+        self.agreements = 0
+
+    @staticmethod
+    def _within_pct(current: float, previous: float, tolerance_pct: float) -> bool:
+        if previous == 0:
+            return current == 0
+        return abs(current - previous) / abs(previous) * 100 <= tolerance_pct
+
+    def unchanged(self, snapshot: MarketSnapshot) -> bool:
+        last = self.last_snapshot
+        if last is None or last.symbol != snapshot.symbol:
+            return False
+
+        return (
+            self._within_pct(snapshot.price_usd, last.price_usd, self.price_tolerance_pct)
+            and abs(snapshot.change_24h_pct - last.change_24h_pct) <= self.change_tolerance_pct
+            and self._within_pct(snapshot.holdings_value_usd, last.holdings_value_usd, self.holdings_tolerance_pct)
+            and snapshot.order_book_signal == last.order_book_signal
+            and snapshot.candle_trend == last.candle_trend
+            and snapshot.news_sentiment == last.news_sentiment
+        )
+
+    def evaluate(self, snapshot: MarketSnapshot | None) -> GateVerdict:
+        self.cycles += 1
+
+        if not self.enabled or snapshot is None or self.last_decision is None:
+            return GateVerdict.LLM
+        if self.last_decision["side"] != "hold":
+            return GateVerdict.LLM
+        if snapshot.captured_at - self.last_snapshot.captured_at > self.max_age_seconds:
+            return GateVerdict.LLM
+        if not self.unchanged(snapshot):
+            return GateVerdict.LLM
+
+        self._skippable += 1
+        if self.audit_every and self._skippable % self.audit_every == 0:
+            return GateVerdict.AUDIT
+        return GateVerdict.SKIP
+
+    async def relog(self, snapshot: MarketSnapshot) -> str:
+        """Repeat the prior decision at the current price. Returns the logged side."""
+        side = self.last_decision["side"]
+        reason = f"[gate] Market unchanged since last LLM decision. {self.last_decision['reason']}"
+
+        self._last_action_id = await insert_action(
+            symbol=snapshot.symbol,
+            side=side,
+            price=snapshot.price_usd,
+            reason=reason,
+            decision_source="gate",
+        )
+        self.llm_calls_saved += 1
+        return side
+
+    async def record_llm_decision(self, snapshot: MarketSnapshot | None, verdict: GateVerdict) -> dict | None:
+        """
+        Remember the state the LLM just decided on (call after the agent run).
+        Returns the decision the agent logged this cycle, if any.
+        """
+        self.llm_calls += 1
+        if snapshot is None:
+            self.last_snapshot = self.last_decision = None
+            return None
+
+        decision = await fetch_latest_action(snapshot.symbol)
+        if decision is None or decision["id"] <= self._last_action_id:
+            # The agent did not log a decision this cycle; nothing to compare with
+            self.last_snapshot = self.last_decision = None
+            return None
+
+        if verdict == GateVerdict.AUDIT and self.last_decision is not None:
+            self.audits += 1
+            if decision["side"] == self.last_decision["side"]:
+                self.agreements += 1
+
+        self.last_snapshot = snapshot
+        self.last_decision = decision
+        self._last_action_id = decision["id"]
+        return decision
+
+    def record_cached_decision(self, snapshot: MarketSnapshot, decision: dict) -> None:
+        """Remember a decision logged from the cache as if the LLM had just made it."""
+        self.last_snapshot = snapshot
+        self.last_decision = decision
+        self._last_action_id = max(self._last_action_id, decision["id"])
+
+    def stats(self) -> DecisionGateStats:
+        return DecisionGateStats(
+            cycles=self.cycles,
+            llm_calls=self.llm_calls,
+            llm_calls_saved=self.llm_calls_saved,
+            audits=self.audits,
+            agreements=self.agreements,
+            agreement_rate=self.agreements / self.audits if self.audits else 0.0,
+        )
+
+
+decision_gate = DecisionGate()
+# One gate per symbol: each remembers its own last LLM-decided state
+_gates: dict[str, DecisionGate] = {"DOGE": decision_gate}
+
+
+def gate_for(symbol: str) -> DecisionGate:
+    if symbol not in _gates:
+        _gates[symbol] = DecisionGate()
+    return _gates[symbol]
@@ -0,0 +1,63 @@
+import time
+from collections import defaultdict
+
+from agents import RunHooks
+
+from app.metrics import counter, histogram
+
+# What function_tool returns to the model when the tool raised
+TOOL_ERROR_PREFIX = "An error occurred while running the tool"
+
+
+class MetricsRunHooks(RunHooks):
+    """
+    Run hooks that time every tool invocation and every model call of one
+    agent run. Create one instance per cycle; the totals split the cycle into
+    LLM time and tool time.
+    """
+
+    def __init__(self):
+        self._tool_started: dict[str, list[float]] = defaultdict(list)
+        self._llm_started: list[float] = []
+
+        self.tool_seconds = 0.0
+        self.llm_seconds = 0.0
+        self.tool_calls = 0
+        self.tool_errors = 0
+        self.llm_calls = 0
+
+    async def on_tool_start(self, context, agent, tool) -> None:
+        self._tool_started[tool.name].append(time.perf_counter())
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        started = self._tool_started[tool.name]
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop(0)
+
+        self.tool_calls += 1
+        self.tool_seconds += elapsed
+        histogram("agent_tool_seconds", "Latency of each function_tool invocation.", labels={"tool": tool.name}).observe(elapsed)
+
+        if isinstance(result, str) and result.startswith(TOOL_ERROR_PREFIX):
+            self.tool_errors += 1
+            counter("agent_tool_errors_total", "Tool invocations that raised.", labels={"tool": tool.name}).inc()
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        self._llm_started.append(time.perf_counter())
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        if not self._llm_started:
+            return
+        elapsed = time.perf_counter() - self._llm_started.pop(0)
+
+        self.llm_calls += 1
+        self.llm_seconds += elapsed
+        histogram("agent_llm_call_seconds", "Latency of each model call.", labels={"agent": agent.name}).observe(elapsed)
+
+    def observe_cycle(self) -> None:
+        """Record this run's LLM/tool split; call once the run finished."""
+        histogram("agent_cycle_llm_seconds", "Model time per LLM cycle.").observe(self.llm_seconds)
+        histogram("agent_cycle_tool_seconds", "Tool time per LLM cycle.").observe(self.tool_seconds)
+        counter("agent_tool_calls_total", "Tool invocations across all cycles.").inc(self.tool_calls)
+        counter("agent_llm_calls_total", "Model calls across all cycles.").inc(self.llm_calls)
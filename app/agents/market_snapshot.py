@@ -0,0 +1,99 @@
+import asyncio
+import time
+
+import numpy as np
+
+from app.analysis.executor import analysis_executor
+from app.analysis.indicators import kline_indicators, trend
+from app.analysis.news_digest import score_crypto_news, sentiment_from_labels
+from app.data.binance.market_data import fetch_klines, fetch_ticker_24hr
+from app.data.binance.order_book import fetch_order_book
+from app.data.news.crypto import fetch_crypto_news_payload
+from app.data.shared_market import shared_depth_qty
+from app.data.shared_ring import shared_klines
+from app.data.robinhood.account_cache import account_cache
+from app.schemas.actions_history import CandleTrend, NewsSentiment
+from app.schemas.binance_order_book import OrderBookRequest, OrderBookResponse
+from app.schemas.crypto_news import CryptoNewsRequest, CryptoNewsResponse
+from app.schemas.market_snapshot import MarketSnapshot
+
+# Order book qty imbalance beyond which one side is considered dominant
+IMBALANCE_THRESHOLD = 0.15
+# Close must sit this far from its SMA for the candles to count as trending
+TREND_THRESHOLD_PCT = 0.2
+TREND_PERIOD = 20
+
+
+def order_book_signal(book: OrderBookResponse) -> tuple[str, float]:
+    return imbalance_signal(float(np.sum(book.bids_qty)), float(np.sum(book.asks_qty)))
+
+
+def imbalance_signal(bid_qty: float, ask_qty: float) -> tuple[str, float]:
+    total = bid_qty + ask_qty
+    imbalance = (bid_qty - ask_qty) / total if total > 0 else 0.0
+
+    if imbalance >= IMBALANCE_THRESHOLD:
+        return "buy pressure", imbalance
+    if imbalance <= -IMBALANCE_THRESHOLD:
+        return "sell pressure", imbalance
+    return "balanced", imbalance
+
+
+def candle_trend(klines: list[list], period: int = TREND_PERIOD) -> CandleTrend:
+    return trend(np.array([float(k[4]) for k in klines[-period:]]), TREND_THRESHOLD_PCT)
+
+
+def news_sentiment(news: CryptoNewsResponse) -> NewsSentiment:
+    return sentiment_from_labels([item.SENTIMENT for item in news.Data])
+
+
+async def _book_qty(binance_symbol: str) -> tuple[float, float]:
+    # Sharded workers use the streamed partial depth instead of a REST snapshot
+    shared = shared_depth_qty(binance_symbol)
+    if shared is not None:
+        return shared
+    book = await fetch_order_book(OrderBookRequest(symbol=binance_symbol, limit=100), live=True)
+    return float(np.sum(book.bids_qty)), float(np.sum(book.asks_qty))
+
+
+async def _closes(binance_symbol: str, interval: str, limit: int = 50) -> np.ndarray:
+    # Sharded workers read candles from the market-data process's shared ring
+    shared = shared_klines(binance_symbol, interval, limit)
+    if shared is not None:
+        return np.ascontiguousarray(shared["close"])
+    klines = await fetch_klines(binance_symbol, interval=interval, limit=limit, live=True)
+    return np.array([float(k[4]) for k in klines])
+
+
+async def capture_market_snapshot(symbol: str, binance_symbol: str, interval: str = "15m") -> MarketSnapshot:
+    """
+    Compute the cycle's feature vector straight from the upstream APIs, without
+    the LLM. Market data is fetched live: while a breaker is open this fails
+    rather than hand the gate and the cache an old price as the current one.
+    """
+    ticker, (bid_qty, ask_qty), closes, news_payload, holding = await asyncio.gather(
+        fetch_ticker_24hr(binance_symbol, live=True),
+        _book_qty(binance_symbol),
+        _closes(binance_symbol, interval),
+        fetch_crypto_news_payload(CryptoNewsRequest(search_string=symbol, limit=20)),
+        account_cache.get_holding(symbol),
+    )
+
+    signal, imbalance = imbalance_signal(bid_qty, ask_qty)
+    (trend_now, rsi_14), sentiment = await asyncio.gather(
+        analysis_executor.run(kline_indicators, closes, TREND_PERIOD, TREND_THRESHOLD_PCT),
+        analysis_executor.run(score_crypto_news, news_payload),
+    )
+
+    return MarketSnapshot(
+        symbol=symbol.upper(),
+        captured_at=time.time(),
+        price_usd=float(ticker["lastPrice"]),
+        change_24h_pct=float(ticker["priceChangePercent"]),
+        order_book_signal=signal,
+        order_book_imbalance=imbalance,
+        candle_trend=trend_now,
+        rsi_14=rsi_14,
+        news_sentiment=sentiment,
+        holdings_value_usd=float(holding.in_usd) if holding else 0.0,
+    )
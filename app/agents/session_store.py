@@ -0,0 +1,415 @@
+"""
+Agent conversation memory in SQLite without blocking the event loop.
+
+SessionStore owns one database file (same tables as the agents SDK's
+SQLiteSession, so existing conversations.db files carry over). Every write
+goes through one dedicated writer thread that commits everything queued
+within SESSION_LINGER_MS as one transaction: the appends of a turn, and of
+every session sharing the file, share a commit instead of paying one each.
+Reads run on a small pool of reader threads with their own connections;
+WAL lets them proceed while the writer commits.
+
+Each session keeps its newest SESSION_MAX_ITEMS items, cut at the start of
+a turn (a user message) so a tool output never loses its call, and items
+older than SESSION_RETENTION_DAYS. Trimmed items move to <file>.archive.db.
+
+StoreSession implements the agents SDK Session protocol, so it is passed to
+Runner.run(session=...) like SQLiteSession; the SDK itself is not imported.
+"""
+import asyncio
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+from app.config import settings
+from app.schemas.session_store import SessionStoreStats
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_TABLE = "agent_sessions"
+MESSAGES_TABLE = "agent_messages"
+MAX_BATCH_OPS = 512
+_STOP = object()
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {SESSIONS_TABLE} (
+    session_id TEXT PRIMARY KEY,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS {MESSAGES_TABLE} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    message_data TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (session_id) REFERENCES {SESSIONS_TABLE} (session_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_{MESSAGES_TABLE}_session_id ON {MESSAGES_TABLE} (session_id, id);
+CREATE TABLE IF NOT EXISTS archive.{MESSAGES_TABLE} (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    message_data TEXT NOT NULL,
+    created_at TIMESTAMP,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS archive.idx_{MESSAGES_TABLE}_session_id ON {MESSAGES_TABLE} (session_id, id);
+"""
+
+
+def _decode(rows: list[tuple]) -> list[dict]:
+    items = []
+    for (data,) in rows:
+        try:
+            items.append(json.loads(data))
+        except (json.JSONDecodeError, TypeError):
+            continue
+    return items
+
+
+class _Op:
+    __slots__ = ("apply", "future", "loop")
+
+    def __init__(self, apply: Callable[[sqlite3.Connection], Any], future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.apply = apply
+        self.future = future
+        self.loop = loop
+
+    def resolve(self, result: Any = None, error: BaseException | None = None) -> None:
+        def set_outcome() -> None:
+            if self.future.done():
+                return
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(result)
+
+        try:
+            self.loop.call_soon_threadsafe(set_outcome)
+        except RuntimeError:
+            pass  # the caller's loop is closed; the write itself is committed
+
+
+class StoreSession:
+    """One conversation in a SessionStore (agents SDK Session protocol)."""
+
+    session_settings = None
+
+    def __init__(self, store: "SessionStore", session_id: str):
+        self.store = store
+        self.session_id = session_id
+
+    async def get_items(self, limit: int | None = None) -> list[dict]:
+        return await self.store.get_items(self.session_id, limit)
+
+    async def add_items(self, items: list[dict]) -> None:
+        await self.store.add_items(self.session_id, items)
+
+    async def pop_item(self) -> dict | None:
+        return await self.store.pop_item(self.session_id)
+
+    async def clear_session(self) -> None:
+        await self.store.clear_session(self.session_id)
+
+    async def archived_items(self, limit: int | None = None) -> list[dict]:
+        return await self.store.archived_items(self.session_id, limit)
+
+
+class SessionStore:
+    def __init__(
+        self,
+        db_path: str | Path = "conversations.db",
+        max_items: int = settings.SESSION_MAX_ITEMS,
+        retention_days: float = settings.SESSION_RETENTION_DAYS,
+        linger_ms: float = settings.SESSION_LINGER_MS,
+        readers: int = settings.SESSION_READERS,
+        retention_interval: float = settings.SESSION_RETENTION_INTERVAL_SECONDS,
+    ):
+        self.db_path = Path(db_path)
+        self.archive_path = self.db_path.with_suffix(".archive.db")
+        self.max_items = max_items
+        self.retention_days = retention_days
+        self.linger = linger_ms / 1000
+        self.retention_interval = retention_interval
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="session-read")
+        self._local = threading.local()
+        self._reader_connections: list[sqlite3.Connection] = []
+        self._sessions: dict[str, StoreSession] = {}
+        self._dirty: set[str] = set()
+        self._writer: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+        self.commits = self.ops = self.items_written = self.archived = 0
+        self.commit_seconds = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL makes NORMAL safe against corruption; a power cut may drop the last commits only
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("ATTACH DATABASE ? AS archive", (str(self.archive_path),))
+        return conn
+
+    def _start(self) -> None:
+        if self._writer is not None:
+            return
+        with self._start_lock:
+            if self._writer is not None:
+                return
+            if self._closed:
+                raise RuntimeError("SessionStore is closed")
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = self._connect()
+            conn.executescript(SCHEMA)
+            conn.execute("PRAGMA archive.journal_mode=WAL")
+            self._writer = threading.Thread(target=self._write_loop, args=(conn,), name="session-writer", daemon=True)
+            self._writer.start()
+
+    def session(self, session_id: str) -> StoreSession:
+        if session_id not in self._sessions:
+            self._sessions[session_id] = StoreSession(self, session_id)
+        return self._sessions[session_id]
+
+    # --- writer thread -------------------------------------------------------
+
+    def _write_loop(self, conn: sqlite3.Connection) -> None:
+        next_sweep = time.monotonic() + self.retention_interval
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=max(0.0, next_sweep - time.monotonic()))
+            except queue.Empty:
+                first = None
+            ops: list[_Op] = []
+            if first is _STOP:
+                stopping = True
+            elif first is not None:
+                ops.append(first)
+                # Let the rest of the turn's appends (and other sessions') join this commit
+                deadline = time.monotonic() + self.linger
+                while len(ops) < MAX_BATCH_OPS:
+                    try:
+                        op = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if op is _STOP:
+                        stopping = True
+                        break
+                    ops.append(op)
+            if ops:
+                self._commit(conn, ops)
+            if stopping or time.monotonic() >= next_sweep:
+                try:
+                    self._sweep(conn)
+                except sqlite3.Error as e:
+                    logger.warning(f"Session retention sweep failed: {e!r}")
+                next_sweep = time.monotonic() + self.retention_interval
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, ops: list[_Op]) -> None:
+        started = time.perf_counter()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            results = [op.apply(conn) for op in ops]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            # Isolate the failing op: the others commit one by one
+            for op in ops:
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    result = op.apply(conn)
+                    conn.execute("COMMIT")
+                except Exception as e:
+                    conn.execute("ROLLBACK")
+                    op.resolve(error=e)
+                else:
+                    op.resolve(result)
+                    self.commits += 1
+            return
+        self.commits += 1
+        self.ops += len(ops)
+        self.commit_seconds += time.perf_counter() - started
+        for op, result in zip(ops, results):
+            op.resolve(result)
+
+    def _sweep(self, conn: sqlite3.Connection) -> None:
+        """Archive items past the per-session cap (for sessions written since the last sweep) or too old."""
+        dirty, self._dirty = self._dirty, set()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            moved = 0
+            for session_id in dirty:
+                rows = conn.execute(
+                    f"SELECT id, message_data FROM {MESSAGES_TABLE} WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                    (session_id, self.max_items + 1),
+                ).fetchall()
+                if len(rows) <= self.max_items:
+                    continue
+                # Keep from the oldest turn start that fits, so no tool output loses its call
+                keep_from = None
+                for row_id, data in rows[:self.max_items]:
+                    try:
+                        if json.loads(data).get("role") == "user":
+                            keep_from = row_id
+                    except (json.JSONDecodeError, AttributeError):
+                        continue
+                if keep_from is not None:
+                    moved += self._archive(conn, "session_id = ? AND id < ?", (session_id, keep_from))
+            if self.retention_days:
+                moved += self._archive(conn, "created_at < datetime('now', ?)", (f"-{self.retention_days} days",))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self.archived += moved
+
+    @staticmethod
+    def _archive(conn: sqlite3.Connection, where: str, args: tuple) -> int:
+        conn.execute(
+            f"INSERT OR IGNORE INTO archive.{MESSAGES_TABLE} (id, session_id, message_data, created_at) "
+            f"SELECT id, session_id, message_data, created_at FROM main.{MESSAGES_TABLE} WHERE {where}",
+            args,
+        )
+        return conn.execute(f"DELETE FROM main.{MESSAGES_TABLE} WHERE {where}", args).rowcount
+
+    async def _write(self, apply: Callable[[sqlite3.Connection], Any]) -> Any:
+        self._start()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_Op(apply, future, loop))
+        # Shielded: a cancelled caller must not be told a write that still commits failed
+        return await asyncio.shield(future)
+
+    # --- reader threads ------------------------------------------------------
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            self._local.conn = conn
+            self._reader_connections.append(conn)
+        return conn
+
+    async def _read(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        self._start()
+        return await asyncio.get_running_loop().run_in_executor(self._readers, lambda: fn(self._reader()))
+
+    # --- session operations --------------------------------------------------
+
+    async def get_items(self, session_id: str, limit: int | None = None, table: str = f"main.{MESSAGES_TABLE}") -> list[dict]:
+        def read(conn: sqlite3.Connection) -> list[dict]:
+            if limit is None:
+                rows = conn.execute(f"SELECT message_data FROM {table} WHERE session_id = ? ORDER BY id", (session_id,))
+                return _decode(rows.fetchall())
+            rows = conn.execute(
+                f"SELECT message_data FROM {table} WHERE session_id = ? ORDER BY id DESC LIMIT ?", (session_id, limit)
+            ).fetchall()
+            return _decode(rows[::-1])
+
+        return await self._read(read)
+
+    async def archived_items(self, session_id: str, limit: int | None = None) -> list[dict]:
+        return await self.get_items(session_id, limit, table=f"archive.{MESSAGES_TABLE}")
+
+    async def add_items(self, session_id: str, items: list[dict]) -> None:
+        if not items:
+            return
+        rows = [(session_id, json.dumps(item)) for item in items]
+
+        def insert(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                f"INSERT INTO {SESSIONS_TABLE} (session_id) VALUES (?) "
+                "ON CONFLICT (session_id) DO UPDATE SET updated_at = CURRENT_TIMESTAMP",
+                (session_id,),
+            )
+            conn.executemany(f"INSERT INTO {MESSAGES_TABLE} (session_id, message_data) VALUES (?, ?)", rows)
+            self.items_written += len(rows)
+            self._dirty.add(session_id)
+
+        await self._write(insert)
+
+    async def pop_item(self, session_id: str) -> dict | None:
+        def pop(conn: sqlite3.Connection) -> dict | None:
+            while True:
+                row = conn.execute(
+                    f"DELETE FROM {MESSAGES_TABLE} WHERE id = "
+                    f"(SELECT id FROM {MESSAGES_TABLE} WHERE session_id = ? ORDER BY id DESC LIMIT 1) "
+                    "RETURNING message_data",
+                    (session_id,),
+                ).fetchone()
+                if row is None:
+                    return None
+                items = _decode([row])
+                if items:
+                    return items[0]
+
+        return await self._write(pop)
+
+    async def clear_session(self, session_id: str) -> None:
+        def clear(conn: sqlite3.Connection) -> None:
+            conn.execute(f"DELETE FROM {MESSAGES_TABLE} WHERE session_id = ?", (session_id,))
+            conn.execute(f"DELETE FROM {SESSIONS_TABLE} WHERE session_id = ?", (session_id,))
+
+        await self._write(clear)
+
+    async def flush(self) -> None:
+        """Wait until every write queued so far is committed."""
+        await self._write(lambda conn: None)
+
+    def stats(self) -> SessionStoreStats:
+        return SessionStoreStats(
+            path=str(self.db_path),
+            sessions=len(self._sessions),
+            queued=self._queue.qsize(),
+            commits=self.commits,
+            writes=self.ops,
+            items_written=self.items_written,
+            writes_per_commit=self.ops / self.commits if self.commits else 0.0,
+            mean_commit_ms=self.commit_seconds / self.commits * 1000 if self.commits else 0.0,
+            archived=self.archived,
+        )
+
+    def close(self) -> None:
+        """Commit what is queued, run a last retention sweep and close every connection."""
+        with self._start_lock:
+            self._closed = True
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(_STOP)
+            writer.join()
+        self._readers.shutdown(wait=True)
+        for conn in self._reader_connections:
+            conn.close()
+        self._reader_connections.clear()
+
+
+_stores: dict[Path, SessionStore] = {}
+
+
+def open_session(session_id: str, db_path: str | Path):
+    """A conversation session for the configured SESSION_BACKEND."""
+    if settings.SESSION_BACKEND == "sqlite":
+        from agents import SQLiteSession
+
+        return SQLiteSession(session_id=session_id, db_path=str(db_path))
+    path = Path(db_path).resolve()
+    if path not in _stores:
+        _stores[path] = SessionStore(path)
+    return _stores[path].session(session_id)
+
+
+def close_session_stores() -> None:
+    for store in _stores.values():
+        store.close()
+    _stores.clear()
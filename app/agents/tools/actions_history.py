@@ -1,7 +1,11 @@
-import datetime
 from agents import function_tool
-from app.database.database_class import Database
-from app.schemas.actions_history import ActionsHistoryData, ToolsRequest
+from app.database.crud.actions import (
+    fetch_recent_actions,
+    insert_action,
+    insert_tool_results,
+    update_action_status as crud_update_action_status,
+)
+from app.schemas.actions_history import ToolsRequest
 
 @function_tool
 async def log_action(
@@ -26,106 +30,24 @@ async def log_action(
         profit_loss: P/L if applicable (default 0.0)
     
     Returns:
-        Confirmation message
+        Confirmation message including the action id (pass it to place_crypto_order)
     """
-    db = Database()
+    action_id = await insert_action(symbol, side, price, reason, quantity, amount_usd, profit_loss)
     
-    query = """
-    INSERT INTO crypto_trade_history (symbol, side, quantity, price, amount_usd, reason, is_open, profit_loss)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-    """
-    
-    await db.insert_row(
-        query,
-        (
-            symbol,
-            side.lower(),  # Normalize to lowercase
-            quantity,
-            price,
-            amount_usd,
-            reason,
-            True if side.lower() in ['buy', 'sell'] else False,  # Hold is not open position
-            profit_loss
-        )
-    )
-    
-    return f"✓ Decision logged: {side.upper()} {symbol} at ${price:.4f} - {reason[:100]}"
+    return f"✓ Decision logged (id {action_id}): {side.upper()} {symbol} at ${price:.4f} - {reason[:100]}"
 
 @function_tool
 async def get_recent_actions(limit: int = 10) -> list[dict]:
-    db = Database()
-
-    limit = max(1, min(int(limit), 100))
-
-    query = """
-    SELECT id, symbol, side, quantity, price, amount_usd, timestamp, reason, is_open, profit_loss
-    FROM crypto_trade_history
-    ORDER BY timestamp DESC
-    LIMIT %s
-    """
-
-    rows = await db.fetch_all(query, (limit,))
-
-    columns = [
-        "id", "symbol", "side", "quantity", "price", "amount_usd",
-        "timestamp", "reason", "is_open", "profit_loss"
-    ]
-
-    result: list[dict] = []
-    for row in rows:
-        d = dict(zip(columns, row))
-
-        ts = d.get("timestamp")
-        if isinstance(ts, datetime.datetime):
-            d["timestamp"] = ts.isoformat()
-
-        # validate/normalize with Pydantic, then return as plain dict (JSON-safe)
-        result.append(ActionsHistoryData(**d).model_dump())
-
-    return result
+    return await fetch_recent_actions(limit)
 
 @function_tool
 async def update_action_status(action_id: int, is_open: bool, profit_loss: float):
-    db = Database()
-    
-    query = """
-    UPDATE crypto_trade_history
-    SET is_open = %s, profit_loss = %s
-    WHERE id = %s
-    """
-    
-    await db.update_row(query, (is_open, profit_loss, action_id))
+    await crud_update_action_status(action_id, is_open, profit_loss)
 
 @function_tool
 async def log_tool_results(
     request: ToolsRequest
 ) -> str:
-    db = Database()
-
-    # Coerce numerics defensively (handles str/Decimal)
-    step1_price_usd = float(request.step1_price_usd)
-    step1_change_24h_pct = float(request.step1_change_24h_pct)
-    step5_holdings_value_usd = float(request.step5_holdings_value_usd)
-    side = (request.side or "").lower().strip()
-
-    query = """
-    INSERT INTO crypto_tools_result (
-        step1_price_usd, step1_change_24h_pct, step2_order_book_signal,
-        step3_candle_trend, step4_news_sentiment, step5_holdings_value_usd, side
-    ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-    """
-
-    await db.insert_row(
-        query,
-        (
-            step1_price_usd,
-            step1_change_24h_pct,
-            request.step2_order_book_signal,
-            request.step3_candle_trend,
-            request.step4_news_sentiment,
-            step5_holdings_value_usd,
-            side,
-        ),
-    )
+    await insert_tool_results(request)
 
     return "✓ Tool results logged successfully."
\ No newline at end of file
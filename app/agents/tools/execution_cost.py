@@ -0,0 +1,10 @@
+from agents import function_tool
+from app.analysis.execution_cost import estimate_execution_cost
+from app.schemas.execution_cost import ExecutionCostEstimate, ExecutionCostRequest
+
+@function_tool
+async def estimate_order_cost(request: ExecutionCostRequest) -> ExecutionCostEstimate:
+    """Estimate what a market order would cost before placing it: expected average
+    fill price and slippage from the Binance book, Robinhood's quantity-aware
+    quote, and the recommended number of child orders for the target size."""
+    return await estimate_execution_cost(request)
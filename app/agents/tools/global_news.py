@@ -1,29 +1,32 @@
 from agents import function_tool
 from app.schemas.global_news import GlobalNewsRequest, GlobalNewsResponse
 from typing import Optional
-import httpx
-import os
-from dotenv import load_dotenv
+from app.analysis.executor import analysis_executor
+from app.config import settings
+from app.data.http_client import async_client
+from app.deadline import budget_notice, nearly_spent
 
-load_dotenv()
-
-BASE_URL = "https://eventregistry.org/api/v1/article"
+BASE_URL = settings.EVENTREGISTRY_API_URL
 
 @function_tool
-async def search_global_news(request: GlobalNewsRequest) -> GlobalNewsResponse:
-    api_key = os.getenv("NEWS_AI_API_KEY")
-    if api_key is None:
+async def search_global_news(request: GlobalNewsRequest) -> GlobalNewsResponse | str:
+    # The slowest tool: not worth starting once the cycle's budget is nearly spent
+    if nearly_spent():
+        return budget_notice("search_global_news")
+    api_key = settings.NEWS_AI_API_KEY
+    if not api_key:
         raise ValueError("NEWS_AI_API_KEY environment variable is not set")
     request.apiKey = api_key
     
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with async_client(timeout=30) as client:
         url = f"{BASE_URL}/getArticles"
         payload = request.model_dump(exclude_none=True)
         
-        response = await client.post(url, json=payload, headers={"Content-Type": "application/json"})
+        # A read-only search: safe to retry and hedge like a GET
+        response = await client.post(
+            url, json=payload, headers={"Content-Type": "application/json"}, extensions={"idempotent": True}
+        )
         response.raise_for_status()
-        data = response.json()
-        
-        news_response = GlobalNewsResponse(**data)
-        
-        return news_response
+
+    # Full article bodies: decode and validate off the event loop
+    return await analysis_executor.run(GlobalNewsResponse.model_validate_json, response.content)
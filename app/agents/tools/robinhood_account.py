@@ -8,50 +8,29 @@ from app.schemas.robinhood_account_info import (
     RobinhoodTradingPairsRequest
 )
 from app.config import settings
-import httpx
+from app.data.robinhood.account_cache import account_cache
+from app.data.robinhood.account_info import fetch_crypto_orders
+from app.data.http_client import async_client
 
 @function_tool
 async def get_account_info() -> RobinhoodAccountInfoResponse:
-    async with httpx.AsyncClient(timeout=10) as client:
-        url = f"{settings.ROBINHOOD_BASE_URL}/get-account"
-        response = await client.post(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        account_info = RobinhoodAccountInfoResponse(**data)
-        return account_info
+    # Served from the shared snapshot; refreshed on TTL expiry or order events
+    return await account_cache.get_account_info()
 
 @function_tool
 async def get_crypto_holdings() -> RobinhoodCryptoHoldingsResponse:
-    async with httpx.AsyncClient(timeout=10) as client:
-        url = f"{settings.ROBINHOOD_BASE_URL}/getCryptoHoldings"
-        response = await client.post(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        holdings = RobinhoodCryptoHoldingsResponse(**data)
-        return holdings
+    return await account_cache.get_holdings()
 
 @function_tool
 async def get_crypto_orders(request: RobinhoodCryptoOrdersRequest) -> RobinhoodCryptoOrdersResponse:
-     async with httpx.AsyncClient(timeout=10) as client:
-        url = f"{settings.ROBINHOOD_BASE_URL}/getCryptoOrders?startDate={request.start_date}&endDate={request.end_date}&symbol={request.symbol}&type={request.type}"
-        payload = {
-            "start_date": request.start_date,
-            "end_date": request.end_date,
-            "symbol": request.symbol,
-            "type": request.type
-        }
-        response = await client.post(url, json=payload)
-        response.raise_for_status()
-        data = response.json()
-        
-        orders = RobinhoodCryptoOrdersResponse(**data)
-        return orders
+    orders = await fetch_crypto_orders(request)
+    # A fill or cancel changes buying power and holdings
+    account_cache.observe_orders(orders)
+    return orders
 
 @function_tool
 async def get_trading_pairs(request: RobinhoodTradingPairsRequest) -> RobinhoodTradingPairsResponse:
-    async with httpx.AsyncClient(timeout=10) as client:
+    async with async_client(timeout=10) as client:
         url = f"{settings.ROBINHOOD_BASE_URL}/getTradingPairs"
         response = await client.post(url, json=request.model_dump())
         response.raise_for_status()
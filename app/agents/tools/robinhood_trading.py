@@ -1,28 +1,26 @@
 from agents import function_tool
-from app.schemas.trading import PlaceOrderRequest, PlaceOrderResponse, CancelOrderRequest, CancelOrderResponse
+from app.schemas.trading import PlaceOrderRequest, TrackedOrder, CancelOrderRequest, CancelOrderResponse
 from app.config import settings
-import httpx
+from app.data.robinhood.account_cache import account_cache
+from app.data.robinhood.order_manager import order_manager
+from app.data.http_client import async_client
 
 @function_tool
-async def place_crypto_order(request: PlaceOrderRequest) -> PlaceOrderResponse:
-    async with httpx.AsyncClient(timeout=10) as client:
-        url = f"{settings.ROBINHOOD_BASE_URL}/place/order"
-        payload = request.model_dump(exclude_none=True)
-        
-        response = await client.post(url, json=payload)
-        response.raise_for_status()
-        data = response.json()
-        
-        order_response = PlaceOrderResponse(**data)
-        return order_response
+async def place_crypto_order(request: PlaceOrderRequest, action_id: int | None = None) -> TrackedOrder:
+    """Place an order through the order manager. Pass the id returned by log_action
+    as action_id so the decision row is updated when the order fills."""
+    return await order_manager.submit(request, action_id=action_id)
     
 @function_tool
 async def cancel_crypto_order(request: CancelOrderRequest) -> CancelOrderResponse:
-    async with httpx.AsyncClient(timeout=10) as client:
+    async with async_client(timeout=10) as client:
         url = f"{settings.ROBINHOOD_BASE_URL}/cancel/order"
         payload = request.model_dump()
         
-        response = await client.post(url, json=payload)
+        try:
+            response = await client.post(url, json=payload)
+        finally:
+            account_cache.invalidate()
         response.raise_for_status()
         data = response.json()
         
@@ -1,36 +1,29 @@
-from agents import (
-    Agent,
-    Runner,
-    set_default_openai_api,
-    set_default_openai_client,
-    set_tracing_disabled,
-    SQLiteSession,
-    Tool,
-)
-from openai.types.responses import ResponseTextDeltaEvent
-from app.config import settings
-from openai import AsyncOpenAI
 import asyncio
-import sys
 import json
-import httpx
 import logging
-from datetime import datetime
+import sys
+import threading
 import time
+from datetime import datetime
 
-# Import all tools (excluding place and cancel order for safety)
-from app.agents.tools.binance_market_data import get_klines, get_ticker_price
-from app.agents.tools.binance_order_book import get_best_ticker, get_order_book
-from app.agents.tools.crypto_news import search_crypto_news
-from app.agents.tools.global_news import search_global_news
-from app.agents.tools.robinhood_account import (
-    get_account_info,
-    get_crypto_holdings,
-    get_crypto_orders,
-    get_trading_pairs,
-)
-from app.agents.tools.robinhood_prices import get_best_price
-from app.agents.tools.actions_history import get_recent_actions, log_action, log_tool_results
+import httpx
+
+from app.config import settings
+from app.data.robinhood.price_feed import price_feed
+from app.data.robinhood.order_manager import order_manager
+from app.analysis.cross_venue import cross_venue_monitor
+from app.analysis.executor import analysis_executor, loop_lag
+from app.agents.market_snapshot import capture_market_snapshot
+from app.agents.decision_gate import GateVerdict, gate_for
+from app.agents.decision_cache import decision_cache
+from app.agents.session_store import close_session_stores, open_session
+from app.data.http_client import InstrumentedTransport
+from app.data.tape import http_tape
+from app.deadline import cycle_deadlines, remaining
+from app.metrics import counter, histogram
+
+# The agents SDK, openai, the tool modules and their schemas take seconds to
+# import, so they are loaded by startup() rather than with this module.
 
 # Fix for Windows async compatibility
 if sys.platform == "win32":
@@ -54,19 +47,14 @@ for name in (
 # As a safety net, prevent noisy INFO logs from propagating
 logging.getLogger().setLevel(logging.WARNING)
 
-# -----------------------------------------------------------------------------
-
-BASE_URL = settings.GEMINI_BASE_URL
-API_KEY = settings.GEMINI_API_KEY
-MODEL_NAME = settings.GEMINI_MODEL
+logger = logging.getLogger(__name__)
 
-if not BASE_URL or not API_KEY or not MODEL_NAME:
-    raise ValueError("Please set BASE_URL, API_KEY, MODEL_NAME via .env")
+# -----------------------------------------------------------------------------
 
 ###############################################################################
 # Custom httpx Transport that modifies requests before sending
 ###############################################################################
-class SchemaCleaningTransport(httpx.AsyncHTTPTransport):
+class SchemaCleaningTransport(InstrumentedTransport):
     async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
         original_request = request
 
@@ -120,42 +108,10 @@ async def log_response(_response: httpx.Response):
     return
 
 
-# Create httpx client with custom transport and event hooks
-httpx_client = httpx.AsyncClient(
-    transport=SchemaCleaningTransport(),
-    event_hooks={"request": [log_request], "response": [log_response]},
-    timeout=60.0,
-)
-
-client = AsyncOpenAI(api_key=API_KEY, base_url=BASE_URL, http_client=httpx_client)
-
-set_default_openai_client(client=client, use_for_tracing=False)
-set_default_openai_api("chat_completions")
-set_tracing_disabled(disabled=True)
-
 ###############################################################################
-# All 13 tools (excluding place/cancel order for safety)
+# Agent (built by startup())
 ###############################################################################
-tools: list[Tool] = [
-    get_klines,
-    get_ticker_price,
-    get_best_ticker,
-    get_order_book,
-    search_crypto_news,
-    search_global_news,
-    get_account_info,
-    get_crypto_holdings,
-    get_crypto_orders,
-    get_trading_pairs,
-    get_best_price,
-    get_recent_actions,
-    log_action,
-    log_tool_results,
-]
-
-crypto_trader_agent = Agent(
-    name="DOGE_Analyzer",
-    instructions="""You are DOGE_Analyzer, an autonomous Dogecoin trading analysis agent.
+AGENT_INSTRUCTIONS = """You are DOGE_Analyzer, an autonomous Dogecoin trading analysis agent.
 
 **MISSION**: Analyze DOGE market conditions every cycle and make a BUY, SELL, or HOLD decision.
 
@@ -163,15 +119,16 @@ crypto_trader_agent = Agent(
 1. Get Account Info: call get_account_info() to understand current holdings and buying power
 2. Get DOGE price: call get_ticker_price(symbol="DOGEUSDT")
 3. Get Trading Pairs: call get_trading_pairs(request={"from_currency":"DOGE", "to_currency":"USD"}) to see available DOGE pairs
-4. Check order book: call get_order_book(request={"symbol":"DOGEUSDT","limit":int})
+4. Check order book: call get_order_book(request={"symbol":"DOGEUSDT","limit":1000,"mode":"digest"}) for depth bands, imbalance, walls and slippage
 5. Get recent candles: call get_klines(symbol="DOGEUSDT", interval="15m", limit=int)
 6. Search crypto news: call search_crypto_news(request={"search_string":"DOGE","limit":int})
 7. Search global news: call search_global_news(request={"search_string":str,"articlesCount":int, "dateStart":"YYYY-MM-DD", "dateEnd":"YYYY-MM-DD", "apiKey":""})
 8. Check holdings: call get_crypto_holdings()
 9. Review recent actions: call get_recent_actions(limit=int)
-10. MAKE DECISION: Based on ALL data, decide BUY, SELL, or HOLD
-11. LOG DECISION: call log_action() with your decision
-12. LOG TOOL RESULTS: call log_tool_results() with the analysis results
+10. Before a BUY or SELL: call estimate_order_cost(request={"symbol":"DOGE","binance_symbol":"DOGEUSDT","side":"buy"|"sell","notional_usd":float}) and weigh the slippage
+11. MAKE DECISION: Based on ALL data, decide BUY, SELL, or HOLD
+12. LOG DECISION: call log_action() with your decision
+13. LOG TOOL RESULTS: call log_tool_results() with the analysis results and the action_id from log_action
 **DECISION CRITERIA**:
 - BUY: Strong upward momentum, positive news, oversold conditions, order book shows demand
 - SELL: Downward momentum, negative news, overbought conditions, order book shows supply pressure
@@ -194,57 +151,280 @@ crypto_trader_agent = Agent(
 **OUTPUT FORMAT**:
 After analysis, state: "DECISION: [BUY/SELL/HOLD] - [Brief reason]"
 
-Be systematic, data-driven, and always conclude with a logged decision.""",
-    model=MODEL_NAME,
-    tools=tools,
-)
+Be systematic, data-driven, and always conclude with a logged decision."""
+
+crypto_trader_agent = None
+sql_lit_session = None
+_startup_lock = threading.Lock()
+# Per-symbol clones of the agent and their sessions, for the sharded runner
+_symbol_agents: dict[str, object] = {}
+_symbol_sessions: dict[str, object] = {}
+
+
+def startup() -> None:
+    """
+    Import the agents SDK and the tools, then build the model client, the
+    agent and the conversation session. Safe to call repeatedly and from a
+    worker thread; main() runs it off the event loop so the price feeds
+    connect while the SDK loads.
+    """
+    global crypto_trader_agent, sql_lit_session
+
+    with _startup_lock:
+        if crypto_trader_agent is not None:
+            return
+
+        if not settings.GEMINI_BASE_URL or not settings.GEMINI_API_KEY or not settings.GEMINI_MODEL:
+            raise ValueError("Please set BASE_URL, API_KEY, MODEL_NAME via .env")
+
+        from agents import (
+            Agent,
+            set_default_openai_api,
+            set_default_openai_client,
+            set_tracing_disabled,
+            Tool,
+        )
+        from openai import AsyncOpenAI
+
+        # Import all tools (excluding place and cancel order for safety)
+        from app.agents.tools.binance_market_data import get_klines, get_ticker_price
+        from app.agents.tools.binance_order_book import get_best_ticker, get_order_book
+        from app.agents.tools.crypto_news import search_crypto_news
+        from app.agents.tools.global_news import search_global_news
+        from app.agents.tools.robinhood_account import (
+            get_account_info,
+            get_crypto_holdings,
+            get_crypto_orders,
+            get_trading_pairs,
+        )
+        from app.agents.tools.robinhood_prices import get_best_price
+        from app.agents.tools.execution_cost import estimate_order_cost
+        from app.agents.tools.actions_history import get_recent_actions, log_action, log_tool_results
+
+        # Create httpx client with custom transport and event hooks
+        httpx_client = httpx.AsyncClient(
+            transport=SchemaCleaningTransport(),
+            event_hooks={"request": [log_request], "response": [log_response]},
+            timeout=60.0,
+        )
+
+        client = AsyncOpenAI(
+            api_key=settings.GEMINI_API_KEY, base_url=settings.GEMINI_BASE_URL, http_client=httpx_client
+        )
+
+        set_default_openai_client(client=client, use_for_tracing=False)
+        set_default_openai_api("chat_completions")
+        set_tracing_disabled(disabled=True)
+
+        # All 15 tools (excluding place/cancel order for safety)
+        tools: list[Tool] = [
+            get_klines,
+            get_ticker_price,
+            get_best_ticker,
+            get_order_book,
+            search_crypto_news,
+            search_global_news,
+            get_account_info,
+            get_crypto_holdings,
+            get_crypto_orders,
+            get_trading_pairs,
+            get_best_price,
+            estimate_order_cost,
+            get_recent_actions,
+            log_action,
+            log_tool_results,
+        ]
+
+        if sql_lit_session is None:
+            sql_lit_session = open_session("crypto_trader_v1", "conversations.db")
+        crypto_trader_agent = Agent(
+            name="DOGE_Analyzer",
+            instructions=AGENT_INSTRUCTIONS,
+            model=settings.GEMINI_MODEL,
+            tools=tools,
+        )
+
+
+def instructions_for(symbol: str, binance_symbol: str) -> str:
+    if symbol == "DOGE":
+        return AGENT_INSTRUCTIONS
+    return (
+        AGENT_INSTRUCTIONS.replace("DOGEUSDT", binance_symbol)
+        .replace("Dogecoin", symbol)
+        .replace("DOGE", symbol)
+    )
+
+
+def agent_for(symbol: str, binance_symbol: str):
+    """The DOGE agent, or a clone of it with the instructions rewritten for another symbol."""
+    if symbol == "DOGE":
+        return crypto_trader_agent
+    if symbol not in _symbol_agents:
+        _symbol_agents[symbol] = crypto_trader_agent.clone(
+            name=f"{symbol}_Analyzer", instructions=instructions_for(symbol, binance_symbol)
+        )
+    return _symbol_agents[symbol]
+
+
+def session_for(symbol: str):
+    if symbol == "DOGE":
+        return sql_lit_session
+    if symbol not in _symbol_sessions:
+        _symbol_sessions[symbol] = open_session(
+            f"crypto_trader_{symbol.lower()}", f"conversations_{symbol.lower()}.db"
+        )
+    return _symbol_sessions[symbol]
 
-sql_lit_session = SQLiteSession(session_id="crypto_trader_v1", db_path="conversations.db")
 
 ###############################################################################
 
 
-async def main():
-    analysis_counter = 0
-    ANALYSIS_INTERVAL = 900  # 15 minutes in seconds (change to 60 for testing)
+async def run_agent_cycle(symbol: str = "DOGE", binance_symbol: str = "DOGEUSDT") -> str:
+    """Run one full LLM analysis and return the agent's final text."""
+    autonomous_prompt = (
+        f"Analyze {symbol} market conditions right now. "
+        "Follow your workflow: get account info, get price, get trading pairs, check order book, analyze candles, search crypto news, search global news. "
+        "check holdings, review recent actions, then make a BUY/SELL/HOLD decision and log it using log_action and log_tool_results."
+    )
 
-    while True:
-        try:
-            analysis_counter += 1
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if crypto_trader_agent is None:
+        await asyncio.to_thread(startup)
 
-            print(f"\nCycle #{analysis_counter} | {current_time}")
+    from agents import Runner
+    from openai.types.responses import ResponseTextDeltaEvent
 
-            autonomous_prompt = (
-                "Analyze DOGE market conditions right now. "
-                "Follow your workflow: get account info, get price, get trading pairs, check order book, analyze candles, search crypto news, search global news. "
-                "check holdings, review recent actions, then make a BUY/SELL/HOLD decision and log it using log_action and log_tool_results."
-            )
+    from app.agents.instrumentation import MetricsRunHooks
 
-            result = Runner.run_streamed(
-                starting_agent=crypto_trader_agent,
-                input=autonomous_prompt,
-                session=sql_lit_session,
-            )
+    hooks = MetricsRunHooks()
+    result = Runner.run_streamed(
+        starting_agent=agent_for(symbol, binance_symbol),
+        input=autonomous_prompt,
+        session=session_for(symbol),
+        hooks=hooks,
+    )
+
+    final_output_chunks: list[str] = []
 
-            final_output_chunks: list[str] = []
+    async def collect() -> None:
+        async for event in result.stream_events():
+            # Collect streaming text for final output
+            if event.type == "raw_response_event" and isinstance(
+                event.data, ResponseTextDeltaEvent
+            ):
+                final_output_chunks.append(event.data.delta)
 
-            async for event in result.stream_events():
-                # Collect streaming text for final output
-                if event.type == "raw_response_event" and isinstance(
-                    event.data, ResponseTextDeltaEvent
-                ):
-                    final_output_chunks.append(event.data.delta)
+            # Print ONLY the tool name (no URLs)
+            elif event.type == "tool_call_event":
+                tool_name = event.data.get("name", "unknown_tool")
+                print(tool_name)
 
-                # Print ONLY the tool name (no URLs)
-                elif event.type == "tool_call_event":
-                    tool_name = event.data.get("name", "unknown_tool")
-                    print(tool_name)
+    left = remaining()
+    try:
+        await asyncio.wait_for(
+            collect(), None if left is None else max(0.0, left) + settings.CYCLE_LLM_OVERRUN_SECONDS
+        )
+    except asyncio.TimeoutError:
+        # Out of budget: stop the run; whatever the agent logged so far stands
+        result.cancel()
+        counter("agent_llm_deadline_cuts_total", "Agent runs cancelled past the cycle deadline.").inc()
+        logger.warning(f"{symbol} agent run cancelled {settings.CYCLE_LLM_OVERRUN_SECONDS:.0f}s past the cycle deadline")
+
+    hooks.observe_cycle()
+    return "".join(final_output_chunks).strip()
+
+
+async def run_cycle(cycle_number: int, symbol: str = "DOGE", binance_symbol: str = "DOGEUSDT") -> str:
+    """One decision (gate, cache or LLM); returns which of the three produced it."""
+    # Tape this cycle's upstream traffic when HTTP_TAPE_RECORD is on
+    cycle_id = f"cycle{cycle_number}" if symbol == "DOGE" else f"{symbol.lower()}-cycle{cycle_number}"
+    async with http_tape.cycle(cycle_id):
+        return await _run_cycle(cycle_number, symbol, binance_symbol)
+
+
+async def _run_cycle(cycle_number: int, symbol: str, binance_symbol: str) -> str:
+    current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    decision_gate = gate_for(symbol)
+
+    print(f"\nCycle #{cycle_number} {symbol} | {current_time}")
+    cycle_started = time.perf_counter()
+    source = "llm"
+
+    # Cheap feature vector first; the LLM only runs when the market moved
+    try:
+        snapshot = await capture_market_snapshot(symbol, binance_symbol)
+    except Exception as e:
+        logger.warning(f"Snapshot unavailable, running full analysis: {e!r}")
+        snapshot = None
+
+    verdict = decision_gate.evaluate(snapshot)
+    # Audits must reach the LLM, so only consult the cache for real misses
+    cached = await decision_cache.lookup(snapshot) if verdict == GateVerdict.LLM else None
+
+    if verdict == GateVerdict.SKIP:
+        source = "gate"
+        side = await decision_gate.relog(snapshot)
+        print(f"\nMarket unchanged - repeated {side.upper()} without the LLM")
+    elif cached is not None:
+        source = "cache"
+        side, reason = cached
+        decision = await decision_cache.replay(snapshot, side, reason)
+        decision_gate.record_cached_decision(snapshot, decision)
+        print(f"\nSimilar market seen before - logged cached {side.upper()} without the LLM")
+    else:
+        llm_started = time.perf_counter()
+        final_text = await run_agent_cycle(symbol, binance_symbol)
+        decision_cache.observe_llm_seconds(time.perf_counter() - llm_started)
+        if final_text:
+            print("\n" + final_text)
+
+        decision = await decision_gate.record_llm_decision(snapshot, verdict)
+        if decision is not None:
+            await decision_cache.store(snapshot, decision["side"], decision["reason"])
+
+    histogram(
+        "agent_cycle_seconds", "Wall time of a full decision cycle.", labels={"source": source}
+    ).observe(time.perf_counter() - cycle_started)
+
+    gate_stats = decision_gate.stats()
+    cache_stats = await decision_cache.stats()
+    print(
+        f"LLM calls saved: {gate_stats.llm_calls_saved}/{gate_stats.cycles} | "
+        f"gate agreement: {gate_stats.agreement_rate:.0%} over {gate_stats.audits} audits | "
+        f"cache hit rate: {cache_stats.hit_rate:.0%} ({cache_stats.latency_saved_seconds:.0f}s saved)"
+    )
+    return source
+
+
+async def main():
+    analysis_counter = 0
+    ANALYSIS_INTERVAL = 900  # 15 minutes in seconds (change to 60 for testing)
+
+    # Keep DOGE quotes warm so get_best_price is answered from memory
+    price_feed.track("DOGE")
+    price_feed.start()
+
+    # Watch Binance vs Robinhood dislocations alongside the analysis loop
+    cross_venue_monitor.track("DOGE", binance_symbol="DOGEUSDT")
+    cross_venue_monitor.add_listener(
+        lambda event: print(f"\nDislocation {event.snapshot.asset_code}: {event.kind}={event.value:.2f}")
+    )
+    price_feed.add_listener(cross_venue_monitor.on_robinhood_quote)
+    monitor_task = asyncio.create_task(cross_venue_monitor.run())
+    lag_task = asyncio.create_task(loop_lag.run())
+
+    # Load the agents SDK off the event loop while the feeds connect and the analysis workers warm up
+    await asyncio.gather(asyncio.to_thread(startup), analysis_executor.start())
 
-            # Print final agent output (full)
-            final_text = "".join(final_output_chunks).strip()
-            if final_text:
-                print("\n" + final_text)
+    while True:
+        try:
+            analysis_counter += 1
+            with cycle_deadlines.cycle():
+                await run_cycle(analysis_counter)
+            budget = cycle_deadlines.stats()
+            print(
+                f"Cycles inside the {budget.budget_seconds:.0f}s budget: "
+                f"{budget.inside}/{budget.cycles} ({budget.inside_fraction:.0%})"
+            )
 
             next_time = datetime.fromtimestamp(time.time() + ANALYSIS_INTERVAL).strftime(
                 "%H:%M:%S"
@@ -256,11 +436,20 @@ async def main():
         except KeyboardInterrupt:
             print(f"\nStopped - Completed {analysis_counter} cycles")
             break
-        except Exception as e:
-            # Keep errors short, no noisy logs
-            print(f"\nError: {str(e)[:200]}")
+        except Exception:
+            counter("agent_cycle_errors_total", "Decision cycles that raised.").inc()
+            logger.exception(f"Cycle #{analysis_counter} failed")
             await asyncio.sleep(60)
 
+    monitor_task.cancel()
+    lag_task.cancel()
+    await analysis_executor.stop()
+    await price_feed.stop()
+    # Write back any fills still queued for crypto_trade_history
+    await order_manager.stop()
+    # Commit queued conversation writes and close the session stores
+    await asyncio.to_thread(close_session_stores)
+
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+import numpy as np
+
+from app.config import settings
+from app.data.binance.book_ticker_websocket import subscribe_book_ticker_stream
+from app.schemas.binance_order_book import BookTickerResponse
+from app.schemas.cross_venue import CrossVenueSnapshot, DislocationEvent
+from app.schemas.robinhood_prices import BestPriceQuote
+
+logger = logging.getLogger(__name__)
+
+DislocationListener = Callable[[DislocationEvent], None]
+
+
+class _Ring:
+    """Fixed-size column store; rows are appended in time order."""
+
+    def __init__(self, capacity: int, columns: int):
+        self.data = np.zeros((capacity, columns), dtype=np.float64)
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+
+    def append(self, row: tuple[float, ...]) -> None:
+        self.data[self.head] = row
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def replace_last(self, row: tuple[float, ...]) -> None:
+        self.data[(self.head - 1) % self.capacity] = row
+
+    def last(self) -> np.ndarray:
+        return self.data[(self.head - 1) % self.capacity]
+
+    def ordered(self) -> np.ndarray:
+        if self.count < self.capacity:
+            return self.data[: self.count]
+        return np.concatenate((self.data[self.head :], self.data[: self.head]))
+
+
+# Column layouts
+BN_TS, BN_BID, BN_ASK, BN_MID = range(4)
+RH_TS, RH_MID, RH_BID, RH_ASK = range(4)
+
+
+class _SymbolState:
+    def __init__(self, asset_code: str, binance_symbol: str, window: int, binance_capacity: int):
+        self.asset_code = asset_code
+        self.binance_symbol = binance_symbol
+        self.binance = _Ring(binance_capacity, 4)
+        self.robinhood = _Ring(window, 4)
+        self.last_snapshot: CrossVenueSnapshot | None = None
+        self.last_event_at: dict[str, float] = {}
+        self.last_evaluated_at = float("-inf")
+
+
+class CrossVenueMonitor:
+    """
+    Joins Binance bookTicker updates with Robinhood best-price quotes per symbol.
+
+    Every Binance tick is an O(1) append plus a spread-adjusted edge check
+    against the latest Robinhood quote; an edge at or over threshold triggers
+    the full evaluation at most once per lag step. Each Robinhood quote
+    triggers it unconditionally: an as-of join of the Robinhood window onto
+    Binance mids, basis mean/z-score, and a lag estimate that picks the
+    Binance time shift which minimises basis variance. All of it is vectorised
+    with NumPy so one core keeps up with every tracked symbol.
+
+    Binance ticks are downsampled on insert to one row per lag step (the
+    newest tick in each step wins), and the Binance ring is sized by time:
+    the Robinhood window at the slowest quote interval plus the largest lag.
+    The join therefore always sees the history the Robinhood window spans,
+    whatever the bookTicker rate.
+    """
+
+    def __init__(
+        self,
+        window: int = settings.CROSS_VENUE_WINDOW,
+        edge_threshold_bps: float = settings.CROSS_VENUE_EDGE_THRESHOLD_BPS,
+        zscore_threshold: float = settings.CROSS_VENUE_ZSCORE_THRESHOLD,
+        max_lag_seconds: float = 10.0,
+        lag_step_seconds: float = 0.25,
+        event_cooldown_seconds: float = 30.0,
+        quote_interval_seconds: float = settings.PRICE_FEED_MAX_INTERVAL_SECONDS,
+    ):
+        self.window = window
+        self.lag_step_seconds = lag_step_seconds
+        span_seconds = window * quote_interval_seconds + max_lag_seconds
+        self.binance_capacity = int(np.ceil(span_seconds / lag_step_seconds)) + 1
+        self.edge_threshold_bps = edge_threshold_bps
+        self.zscore_threshold = zscore_threshold
+        self.lags = np.arange(0.0, max_lag_seconds + lag_step_seconds, lag_step_seconds)
+        self.event_cooldown_seconds = event_cooldown_seconds
+
+        self._by_asset: dict[str, _SymbolState] = {}
+        self._by_binance: dict[str, _SymbolState] = {}
+        self._listeners: list[DislocationListener] = []
+        self.events_emitted = 0
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+    def track(self, asset_code: str, binance_symbol: str | None = None) -> None:
+        asset_code = asset_code.upper()
+        binance_symbol = (binance_symbol or f"{asset_code}USDT").upper()
+        state = _SymbolState(asset_code, binance_symbol, self.window, self.binance_capacity)
+        self._by_asset[asset_code] = state
+        self._by_binance[binance_symbol] = state
+
+    def add_listener(self, listener: DislocationListener) -> None:
+        self._listeners.append(listener)
+
+    def snapshot(self, asset_code: str) -> CrossVenueSnapshot | None:
+        state = self._by_asset.get(asset_code.upper())
+        return state.last_snapshot if state else None
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+    def on_binance_ticker(self, ticker: BookTickerResponse, received_at: float | None = None) -> None:
+        state = self._by_binance.get(ticker.symbol.upper())
+        if state is None:
+            return
+
+        now = received_at if received_at is not None else time.time()
+        mid = (ticker.bid_price + ticker.ask_price) / 2
+        row = (now, ticker.bid_price, ticker.ask_price, mid)
+        step = self.lag_step_seconds
+        if state.binance.count and now // step == state.binance.last()[BN_TS] // step:
+            state.binance.replace_last(row)
+        else:
+            state.binance.append(row)
+
+        if state.robinhood.count == 0 or mid <= 0:
+            return
+
+        # Cheap scalar check so edges opened by Binance moves are not missed;
+        # while an edge persists, evaluate once per lag step, not every tick
+        if now - state.last_evaluated_at < step:
+            return
+        rh = state.robinhood.last()
+        buy_edge = (ticker.bid_price - rh[RH_ASK]) / mid * 10_000
+        sell_edge = (rh[RH_BID] - ticker.ask_price) / mid * 10_000
+        if max(buy_edge, sell_edge) >= self.edge_threshold_bps:
+            self._evaluate(state, now)
+
+    def on_robinhood_quote(self, quote: BestPriceQuote) -> None:
+        state = self._by_asset.get(quote.asset_code.upper())
+        if state is None:
+            return
+
+        raw = quote.quote
+        state.robinhood.append(
+            (quote.received_at, raw.price, raw.bid_inclusive_of_sell_spread, raw.ask_inclusive_of_buy_spread)
+        )
+        if state.binance.count:
+            self._evaluate(state, quote.received_at)
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+    def _evaluate(self, state: _SymbolState, now: float) -> None:
+        state.last_evaluated_at = now
+        bn = state.binance.ordered()
+        rh = state.robinhood.ordered()
+
+        bn_ts = bn[:, BN_TS]
+        bn_mid = bn[:, BN_MID]
+        rh_ts = rh[:, RH_TS]
+        rh_mid = rh[:, RH_MID]
+
+        # As-of join: Binance mid at (rh_ts - lag) for every quote and every lag
+        shifted = rh_ts[:, None] - self.lags[None, :]
+        idx = np.searchsorted(bn_ts, shifted, side="right") - 1
+        valid = idx >= 0
+        joined_mid = bn_mid[np.clip(idx, 0, None)]
+        basis = np.where(valid, (rh_mid[:, None] - joined_mid) / joined_mid * 10_000, np.nan)
+
+        # Lag = shift that makes the basis most stable
+        counts = valid.sum(axis=0)
+        means = np.where(valid, basis, 0.0).sum(axis=0) / np.maximum(counts, 1)
+        variances = np.where(valid, (basis - means) ** 2, 0.0).sum(axis=0) / np.maximum(counts, 1)
+        variances[counts < 2] = np.inf
+        lag_index = int(np.argmin(variances)) if np.isfinite(variances).any() else 0
+
+        zero_lag_basis = basis[:, 0]
+        finite = zero_lag_basis[np.isfinite(zero_lag_basis)]
+        latest_bn = bn[-1]
+        latest_rh = rh[-1]
+        binance_mid = latest_bn[BN_MID]
+        basis_now = (latest_rh[RH_MID] - binance_mid) / binance_mid * 10_000
+
+        mean = float(finite.mean()) if len(finite) else basis_now
+        std = float(finite.std()) if len(finite) > 1 else 0.0
+        zscore = (basis_now - mean) / std if std > 0 else 0.0
+
+        snapshot = CrossVenueSnapshot(
+            asset_code=state.asset_code,
+            binance_symbol=state.binance_symbol,
+            timestamp=now,
+            binance_mid=binance_mid,
+            robinhood_mid=latest_rh[RH_MID],
+            basis_bps=basis_now,
+            basis_mean_bps=mean,
+            basis_zscore=zscore,
+            buy_edge_bps=(latest_bn[BN_BID] - latest_rh[RH_ASK]) / binance_mid * 10_000,
+            sell_edge_bps=(latest_rh[RH_BID] - latest_bn[BN_ASK]) / binance_mid * 10_000,
+            lag_seconds=float(self.lags[lag_index]),
+            samples=len(rh),
+        )
+        state.last_snapshot = snapshot
+
+        if abs(zscore) >= self.zscore_threshold:
+            self._emit(state, "basis_zscore", zscore, self.zscore_threshold, snapshot)
+        if snapshot.buy_edge_bps >= self.edge_threshold_bps:
+            self._emit(state, "buy_edge", snapshot.buy_edge_bps, self.edge_threshold_bps, snapshot)
+        if snapshot.sell_edge_bps >= self.edge_threshold_bps:
+            self._emit(state, "sell_edge", snapshot.sell_edge_bps, self.edge_threshold_bps, snapshot)
+
+    def _emit(self, state: _SymbolState, kind: str, value: float, threshold: float, snapshot: CrossVenueSnapshot) -> None:
+        last = state.last_event_at.get(kind, 0.0)
+        if snapshot.timestamp - last < self.event_cooldown_seconds:
+            return
+        state.last_event_at[kind] = snapshot.timestamp
+        self.events_emitted += 1
+
+        event = DislocationEvent(kind=kind, value=value, threshold=threshold, snapshot=snapshot)
+        for listener in self._listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.warning(f"Dislocation listener failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+    async def run(self) -> None:
+        """Consume Binance bookTicker for all tracked symbols, reconnecting on errors."""
+        while True:
+            try:
+                async for ticker in subscribe_book_ticker_stream(list(self._by_binance)):
+                    self.on_binance_ticker(ticker)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"bookTicker stream dropped: {e}")
+                await asyncio.sleep(5)
+
+
+cross_venue_monitor = CrossVenueMonitor()
@@ -0,0 +1,208 @@
+"""
+Decision quality: how BUY/SELL/HOLD decisions did over the next 15m, 1h and 4h.
+
+Each refresh copies new decisions into crypto_decision_outcomes together
+with the features of their tool results (candle trend, news sentiment,
+order book signal), then fills every forward return whose horizon has
+passed from Binance 1m closes, adding it to the running sums in
+crypto_decision_quality at the same time. Work per refresh is bounded by
+the new decisions and the returns that came due, never the full history,
+and reports read only the small aggregate table.
+
+Prices come from the kline archive where it has the candles, otherwise from
+/klines; nothing is appended to the archive here. Decision timestamps are
+stored in the database server's TimeZone and read back as absolute times.
+
+    python -m app.analysis.decision_quality          # one refresh
+    python -m app.analysis.decision_quality --loop
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+from app.config import settings
+from app.data.binance.market_data import fetch_klines
+from app.data.kline_archive import KlineArchive, kline_archive
+from app.database.crud.decision_quality import (
+    HORIZON_COLUMNS,
+    QUALITY_KEY,
+    fetch_pending_outcomes,
+    fetch_quality,
+    fill_returns,
+    ingest_decisions,
+)
+from app.schemas.decision_quality import DecisionQualityBucket, DecisionQualityRefresh, DecisionQualityReport
+
+logger = logging.getLogger(__name__)
+
+MINUTE_MS = 60_000
+HORIZONS_MS = {"15m": 15 * MINUTE_MS, "1h": 60 * MINUTE_MS, "4h": 240 * MINUTE_MS}
+
+
+def _ms(timestamp: datetime) -> int:
+    if timestamp.tzinfo is None:
+        raise ValueError("decision timestamps must be timezone-aware (timestamptz)")
+    return int(timestamp.timestamp() * 1000)
+
+
+def _binance_symbol(symbol: str) -> str:
+    return symbol if symbol.endswith("USDT") else f"{symbol}USDT"
+
+
+def rollup(rows: list[dict], group_by: list[str]) -> list[DecisionQualityBucket]:
+    """Sum aggregate rows over the dimensions not in `group_by` (the sums are additive)."""
+    sums: dict[tuple, list[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0])
+    for row in rows:
+        total = sums[tuple(row[name] for name in group_by)]
+        total[0] += row["decisions"]
+        total[1] += row["sum_return"]
+        total[2] += row["sum_return_sq"]
+        total[3] += row["hits"]
+
+    buckets = []
+    for key, (n, s, ss, hits) in sums.items():
+        mean = s / n
+        buckets.append(DecisionQualityBucket(
+            group=dict(zip(group_by, key)),
+            decisions=n,
+            mean_return=mean,
+            std_return=float(np.sqrt(max(0.0, ss / n - mean * mean))),
+            hit_rate=hits / n,
+        ))
+    return sorted(buckets, key=lambda b: (-b.decisions, tuple(b.group.values())))
+
+
+class DecisionQuality:
+    def __init__(
+        self,
+        archive: KlineArchive = kline_archive,
+        settle_seconds: float = settings.DECISION_QUALITY_SETTLE_SECONDS,
+        link_window_seconds: float = settings.DECISION_QUALITY_LINK_WINDOW_SECONDS,
+        hold_band: float = settings.DECISION_QUALITY_HOLD_BAND,
+        max_age_days: int = settings.DECISION_QUALITY_MAX_AGE_DAYS,
+    ):
+        self.archive = archive
+        self.settle_seconds = settle_seconds
+        self.link_window_seconds = link_window_seconds
+        self.hold_band = hold_band
+        self.max_age_days = max_age_days
+        self.last_refresh: DecisionQualityRefresh | None = None
+
+    def _archived_closes(self, symbol: str, wanted: np.ndarray) -> dict[int, float]:
+        """Closes of the `wanted` 1m candles the archive holds (disk reads; run in a thread)."""
+        stored = self.archive.load(symbol, "1m", int(wanted[0]), int(wanted[-1]) + MINUTE_MS)
+        found = np.isin(stored["open_time"], wanted)
+        return dict(zip(stored["open_time"][found].tolist(), stored["close"][found].tolist()))
+
+    async def _closes(self, symbol: str, times_ms: np.ndarray) -> np.ndarray:
+        """Close of the last 1m candle finished by each time; NaN where none is available."""
+        open_times = times_ms // MINUTE_MS * MINUTE_MS - MINUTE_MS
+        wanted = np.unique(open_times)
+        closes = await asyncio.to_thread(self._archived_closes, symbol, wanted)
+
+        missing = [t for t in wanted.tolist() if t not in closes]
+        while missing:
+            start = missing[0]
+            rows = await fetch_klines(symbol, "1m", 1000, start_time=start, end_time=start + 1000 * MINUTE_MS - 1)
+            closes.update((int(row[0]), float(row[4])) for row in rows)
+            missing = [t for t in missing if t >= start + 1000 * MINUTE_MS]
+
+        return np.array([closes.get(t, np.nan) for t in open_times.tolist()], dtype=np.float64)
+
+    async def refresh(self) -> DecisionQualityRefresh:
+        started = time.perf_counter()
+        added = await ingest_decisions(self.settle_seconds, self.link_window_seconds)
+        pending = await fetch_pending_outcomes(min(HORIZONS_MS.values()) / 1000, self.max_age_days)
+
+        # A horizon is due once the 1m candle ending at it has closed
+        due_before = int(time.time() * 1000) - MINUTE_MS
+        by_symbol: dict[str, list[dict]] = defaultdict(list)
+        for outcome in pending:
+            by_symbol[outcome["symbol"]].append(outcome)
+
+        returns: dict[str, list[tuple[int, float]]] = {horizon: [] for horizon in HORIZONS_MS}
+        unpriced = 0
+        for symbol, outcomes in by_symbol.items():
+            base = np.array([_ms(o["timestamp"]) for o in outcomes], dtype=np.int64)
+            due = {
+                horizon: np.array([o[HORIZON_COLUMNS[horizon]] is None for o in outcomes]) & (base + step <= due_before)
+                for horizon, step in HORIZONS_MS.items()
+            }
+            times = np.concatenate([base] + [base[mask] + HORIZONS_MS[h] for h, mask in due.items()])
+            if len(times) == len(base):
+                continue
+            try:
+                closes = await self._closes(_binance_symbol(symbol), times)
+            except Exception as e:
+                logger.warning(f"No candles for {symbol} decision outcomes: {e!r}")
+                unpriced += sum(int(mask.sum()) for mask in due.values())
+                continue
+
+            start_price, offset = closes[:len(base)], len(base)
+            for horizon, mask in due.items():
+                end_price = closes[offset:offset + int(mask.sum())]
+                offset += int(mask.sum())
+                ids = np.array([o["action_id"] for o in outcomes])[mask]
+                ratio = end_price / start_price[mask] - 1
+                priced = np.isfinite(ratio)
+                unpriced += int((~priced).sum())
+                returns[horizon] += list(zip(ids[priced].tolist(), ratio[priced].tolist()))
+
+        filled = {horizon: await fill_returns(horizon, values, self.hold_band) for horizon, values in returns.items()}
+        self.last_refresh = DecisionQualityRefresh(
+            decisions_added=added,
+            pending=len(pending),
+            filled=filled,
+            unpriced=unpriced,
+            seconds=time.perf_counter() - started,
+        )
+        return self.last_refresh
+
+    async def run(self, interval: float = settings.DECISION_QUALITY_REFRESH_SECONDS) -> None:
+        """Refresh every `interval` seconds until cancelled."""
+        while True:
+            try:
+                stats = await self.refresh()
+                logger.info(f"Decision quality refreshed: {stats.model_dump()}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Decision quality refresh failed: {e!r}")
+            await asyncio.sleep(interval)
+
+    async def report(
+        self,
+        horizon: str = "1h",
+        group_by: list[str] | None = None,
+        symbol: str | None = None,
+        side: str | None = None,
+    ) -> DecisionQualityReport:
+        group_by = group_by or ["side"]
+        unknown = set(group_by) - set(QUALITY_KEY)
+        if unknown or horizon not in HORIZONS_MS:
+            raise ValueError(f"Unknown horizon {horizon} or dimensions {sorted(unknown)}")
+        buckets = rollup(await fetch_quality(horizon, symbol, side), group_by)
+        return DecisionQualityReport(
+            horizon=horizon,
+            group_by=group_by,
+            decisions=sum(b.decisions for b in buckets),
+            buckets=buckets,
+        )
+
+
+decision_quality = DecisionQuality()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--loop", action="store_true", help="keep refreshing every DECISION_QUALITY_REFRESH_SECONDS")
+    args = parser.parse_args()
+    if args.loop:
+        asyncio.run(decision_quality.run())
+    else:
+        print(asyncio.run(decision_quality.refresh()).model_dump_json(indent=2))
@@ -0,0 +1,140 @@
+import numpy as np
+
+from app.analysis.order_book_digest import walk_book
+from app.data.binance.order_book import fetch_order_book
+from app.data.robinhood.prices import fetch_estimated_price
+from app.schemas.binance_order_book import OrderBookRequest, OrderBookResponse
+from app.schemas.execution_cost import ExecutionCostEstimate, ExecutionCostRequest, SizeCost
+from app.schemas.robinhood_prices import BestPriceEstimatedRequest, Side
+
+MAX_CHILDREN = 20
+# Price drift risk charged for every extra child order, in bps. Splitting only
+# pays off when it saves more impact than this.
+CHILD_PENALTY_BPS = 1.0
+
+
+def book_side(book: OrderBookResponse, side: str) -> tuple[np.ndarray, np.ndarray]:
+    """Levels a market order on `side` consumes: asks for buys, bids for sells."""
+    if side.lower() == "buy":
+        return np.asarray(book.asks, dtype=np.float64), np.asarray(book.asks_qty, dtype=np.float64)
+    return np.asarray(book.bids, dtype=np.float64), np.asarray(book.bids_qty, dtype=np.float64)
+
+
+def slippage_curve(
+    prices: np.ndarray,
+    qtys: np.ndarray,
+    mid: float,
+    side: str,
+    notionals: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorised cost of many order sizes against one book side.
+    Returns (avg_price, slippage_bps vs mid, filled_pct).
+    """
+    notionals = np.asarray(notionals, dtype=np.float64)
+    avg_price, filled = walk_book(prices, qtys, notionals)
+
+    sign = 1.0 if side.lower() == "buy" else -1.0
+    slippage_bps = np.where(avg_price > 0, sign * (avg_price - mid) / mid * 10_000, 0.0)
+    filled_pct = np.divide(filled * 100, notionals, out=np.zeros_like(filled), where=notionals > 0)
+    return avg_price, slippage_bps, filled_pct
+
+
+def optimal_split(
+    prices: np.ndarray,
+    qtys: np.ndarray,
+    mid: float,
+    side: str,
+    notional: float,
+    max_children: int = MAX_CHILDREN,
+    child_penalty_bps: float = CHILD_PENALTY_BPS,
+) -> tuple[int, float, float] | None:
+    """
+    Pick the number of equal child orders that minimises expected cost, assuming
+    the book refills between children. Returns (children, child_notional, cost_bps),
+    or None when even max_children children are too big for the visible book.
+    """
+    children = np.arange(1, max_children + 1)
+    child_notional = notional / children
+    _, slippage_bps, filled_pct = slippage_curve(prices, qtys, mid, side, child_notional)
+
+    cost = slippage_bps + child_penalty_bps * (children - 1)
+    # A child the visible book cannot fill is never a good choice
+    cost = np.where(filled_pct >= 100, cost, np.inf)
+
+    if not np.isfinite(cost).any():
+        return None
+    best = int(np.argmin(cost))
+    return int(children[best]), float(child_notional[best]), float(cost[best])
+
+
+def estimate_from_book(
+    book: OrderBookResponse,
+    symbol: str,
+    side: str,
+    notional: float,
+    candidate_sizes: list[float] | None = None,
+) -> ExecutionCostEstimate:
+    """
+    Pure book-walk estimate; no network. Usable with any book source.
+    Raises ValueError for an empty or one-sided book, which has no mid to price against.
+    """
+    if book.best_bid <= 0 or book.best_ask <= 0:
+        raise ValueError(
+            f"{book.symbol} order book too thin to price: best bid {book.best_bid}, best ask {book.best_ask}"
+        )
+    mid = (book.best_bid + book.best_ask) / 2
+    prices, qtys = book_side(book, side)
+
+    sizes = np.asarray([notional, *(candidate_sizes or [])], dtype=np.float64)
+    avg_price, slippage_bps, filled_pct = slippage_curve(prices, qtys, mid, side, sizes)
+    costs = [
+        SizeCost(notional_usd=float(n), avg_price=float(p), slippage_bps=float(s), filled_pct=float(f))
+        for n, p, s, f in zip(sizes, avg_price, slippage_bps, filled_pct)
+    ]
+
+    children, child_notional, split_cost = optimal_split(prices, qtys, mid, side, notional) or (None, None, None)
+
+    return ExecutionCostEstimate(
+        symbol=symbol,
+        side=side.lower(),
+        mid=mid,
+        target=costs[0],
+        candidates=costs[1:],
+        children=children,
+        child_notional_usd=child_notional,
+        split_cost_bps=split_cost,
+    )
+
+
+async def estimate_execution_cost(request: ExecutionCostRequest) -> ExecutionCostEstimate:
+    """Walk the Binance book and, optionally, compare with Robinhood's quantity-aware quote."""
+    book = await fetch_order_book(OrderBookRequest(symbol=request.binance_symbol, limit=request.depth_limit))
+    estimate = estimate_from_book(
+        book, request.symbol, request.side, request.notional_usd, request.candidate_sizes_usd
+    )
+
+    if request.include_robinhood_quote and estimate.mid > 0:
+        quantity = request.notional_usd / estimate.mid
+        rh_side = Side.ASK if request.side.lower() == "buy" else Side.BID
+        try:
+            quote = await fetch_estimated_price(
+                BestPriceEstimatedRequest(
+                    from_currency=request.symbol,
+                    to_currency="USD",
+                    side=rh_side,
+                    quantity=f"{quantity:.8f}",
+                )
+            )
+        except Exception:
+            # The book walk is still useful without the Robinhood quote
+            return estimate
+
+        if quote.results:
+            raw = quote.results[0]
+            price = raw.ask_inclusive_of_buy_spread if rh_side == Side.ASK else raw.bid_inclusive_of_sell_spread
+            sign = 1.0 if rh_side == Side.ASK else -1.0
+            estimate.robinhood_price = price
+            estimate.robinhood_cost_bps = sign * (price - estimate.mid) / estimate.mid * 10_000
+
+    return estimate
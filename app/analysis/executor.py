@@ -0,0 +1,243 @@
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, TypeVar
+
+import numpy as np
+
+from app.config import settings
+from app.metrics import counter, histogram
+from app.schemas.analysis_executor import AnalysisExecutorStats, LoopLagStats
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Imported by every worker during warm-up, so the first real task does not pay for them
+WARM_MODULES = (
+    "numpy",
+    "app.analysis.indicators",
+    "app.analysis.news_digest",
+    "app.analysis.order_book_digest",
+    "app.data.binance.market_data",
+    "app.schemas.crypto_news",
+    "app.schemas.global_news",
+)
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _warm(modules: tuple[str, ...]) -> int:
+    for name in modules:
+        importlib.import_module(name)
+    # Hold the worker briefly so each warm-up task lands on a different process
+    time.sleep(0.05)
+    return os.getpid()
+
+
+class AnalysisExecutor:
+    """
+    Process pool for CPU-bound analysis: JSON decoding and pydantic validation
+    of large payloads, order book digests, kline formatting and indicators.
+
+    Until start() is called (scripts, benchmarks, an API without the
+    lifespan) every task runs inline, exactly as before. Arguments and
+    results are pickled across the process boundary, so callers hand over
+    raw response bytes or contiguous NumPy arrays (one buffer each) rather
+    than lists of floats or response models.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.ANALYSIS_WORKERS,
+        timeout: float = settings.ANALYSIS_TASK_TIMEOUT_SECONDS,
+        enabled: bool = settings.ANALYSIS_EXECUTOR_ENABLED,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.enabled = enabled and workers > 0
+
+        self._pool: ProcessPoolExecutor | None = None
+        # Bumped on every recycle, so a failure seen by a task on an old pool
+        # does not tear down the replacement
+        self._generation = 0
+        self._warming: asyncio.Task | None = None
+        self.warm_workers = 0
+        self.warmup_seconds = 0.0
+        self.tasks = 0
+        self.inline = 0
+        self.timeouts = 0
+        self.recycles = 0
+        self.resubmits = 0
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs an event loop and threads is unsafe
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def _warm(self) -> None:
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        pids = await asyncio.gather(
+            *(loop.run_in_executor(self._pool, _warm, WARM_MODULES) for _ in range(self.workers))
+        )
+        self.warm_workers = len(set(pids))
+        self.warmup_seconds = time.perf_counter() - started
+
+    async def start(self) -> None:
+        """Create the pool and wait until every worker has imported the analysis modules."""
+        if self._pool is not None or not self.enabled:
+            return
+        self._pool = self._new_pool()
+        try:
+            await self._warm()
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Analysis pool failed to start, running analysis inline: {e!r}")
+            pool, self._pool = self._pool, None
+            pool.shutdown(wait=False, cancel_futures=True)
+            return
+        logger.info(f"Analysis pool ready: {self.warm_workers} workers in {self.warmup_seconds:.2f}s")
+
+    async def stop(self) -> None:
+        pool, self._pool = self._pool, None
+        self._generation += 1
+        if self._warming is not None:
+            self._warming.cancel()
+        if pool is not None:
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    def _recycle(self, generation: int) -> None:
+        """
+        Replace the workers of pool `generation`; a process pool has no way to
+        stop one running call. A no-op if that pool was already replaced.
+        """
+        if generation != self._generation or self._pool is None:
+            return
+        pool = self._pool
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        self.recycles += 1
+        counter("analysis_pool_recycles_total", "Analysis worker pools replaced after a timeout or crash.").inc()
+
+        self._generation += 1
+        self._pool = self._new_pool()
+        self._warming = asyncio.get_running_loop().create_task(self._rewarm(self._generation))
+
+    async def _rewarm(self, generation: int) -> None:
+        try:
+            await self._warm()
+        except (BrokenProcessPool, OSError) as e:
+            if generation == self._generation:
+                logger.warning(f"Analysis pool warm-up after a recycle failed: {e!r}")
+
+    async def run(self, fn: Callable[..., T], *args, timeout: float | None = None) -> T:
+        """
+        fn(*args) in a worker process. `fn` must be a module-level function
+        (or a classmethod such as Model.model_validate_json) so workers can
+        import it. Raises TimeoutError after `timeout` seconds (default
+        ANALYSIS_TASK_TIMEOUT_SECONDS) and recycles the pool. Tasks displaced
+        by a recycle (theirs or another task's) are resubmitted once to the
+        replacement pool, with a fresh timeout.
+        """
+        name = getattr(fn, "__qualname__", repr(fn))
+        if self._pool is None:
+            self.inline += 1
+            return fn(*args)
+
+        timeout = timeout or self.timeout
+        started = time.perf_counter()
+        for attempt in range(2):
+            pool, generation = self._pool, self._generation
+            if pool is None:
+                # Stopped while this task waited on the old pool
+                raise BrokenProcessPool(f"analysis pool stopped while running {name}")
+            try:
+                result = await asyncio.wait_for(asyncio.get_running_loop().run_in_executor(pool, fn, *args), timeout)
+                break
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                counter(
+                    "analysis_task_timeouts_total", "Analysis tasks that exceeded their timeout.", labels={"task": name}
+                ).inc()
+                self._recycle(generation)
+                raise TimeoutError(f"{name} exceeded {timeout:.1f}s in the analysis pool") from None
+            except BrokenProcessPool:
+                if attempt:
+                    # Broke the replacement too: most likely this task kills its worker
+                    self._recycle(generation)
+                    raise
+                if generation == self._generation:
+                    logger.warning(f"Analysis pool broke while running {name}; resubmitting to a new pool")
+                self._recycle(generation)
+                self.resubmits += 1
+
+        self.tasks += 1
+        histogram(
+            "analysis_task_seconds", "Analysis task time in the process pool, including transfer.", labels={"task": name}
+        ).observe(time.perf_counter() - started)
+        return result
+
+    def stats(self) -> AnalysisExecutorStats:
+        return AnalysisExecutorStats(
+            enabled=self.enabled,
+            workers=self.workers if self._pool is not None else 0,
+            warm_workers=self.warm_workers,
+            warmup_seconds=self.warmup_seconds,
+            tasks=self.tasks,
+            inline=self.inline,
+            timeouts=self.timeouts,
+            recycles=self.recycles,
+            resubmits=self.resubmits,
+        )
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a periodic asyncio.sleep() wakes up,
+    which is the time the loop spent blocked in synchronous code.
+    """
+
+    def __init__(self, interval: float = settings.LOOP_LAG_INTERVAL_SECONDS, window: int = 2400):
+        self.interval = interval
+        self._lags: deque[float] = deque(maxlen=window)
+        self._running = False
+
+    async def run(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        lag_histogram = histogram(
+            "event_loop_lag_seconds", "How late the event loop woke a periodic timer.", buckets=LAG_BUCKETS
+        )
+        try:
+            while True:
+                started = time.perf_counter()
+                await asyncio.sleep(self.interval)
+                lag = max(0.0, time.perf_counter() - started - self.interval)
+                self._lags.append(lag)
+                lag_histogram.observe(lag)
+        finally:
+            self._running = False
+
+    def reset(self) -> None:
+        self._lags.clear()
+
+    def stats(self) -> LoopLagStats:
+        lags = np.asarray(self._lags or [0.0]) * 1000
+        return LoopLagStats(
+            samples=len(self._lags),
+            interval_ms=self.interval * 1000,
+            mean_ms=float(lags.mean()),
+            p50_ms=float(np.percentile(lags, 50)),
+            p99_ms=float(np.percentile(lags, 99)),
+            max_ms=float(lags.max()),
+        )
+
+
+analysis_executor = AnalysisExecutor()
+loop_lag = LoopLagMonitor()
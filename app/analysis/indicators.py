@@ -0,0 +1,46 @@
+import numpy as np
+
+from app.schemas.actions_history import CandleTrend
+
+
+def rsi(closes: np.ndarray, period: int = 14) -> float:
+    """Wilder's RSI of the last close. Returns 50 when there is not enough data."""
+    closes = np.asarray(closes, dtype=np.float64)
+    if len(closes) <= period:
+        return 50.0
+
+    deltas = np.diff(closes)
+    gains = np.clip(deltas, 0, None)
+    losses = np.clip(-deltas, 0, None)
+
+    avg_gain = gains[:period].mean()
+    avg_loss = losses[:period].mean()
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+
+    if avg_loss == 0:
+        return 100.0 if avg_gain > 0 else 50.0
+    return float(100 - 100 / (1 + avg_gain / avg_loss))
+
+
+def trend(closes: np.ndarray, threshold_pct: float) -> CandleTrend:
+    """Up/down when the last close sits `threshold_pct` beyond the SMA and the fitted slope agrees."""
+    closes = np.asarray(closes, dtype=np.float64)
+    if len(closes) < 2:
+        return CandleTrend.NEUTRAL
+
+    sma = closes.mean()
+    slope = np.polyfit(np.arange(len(closes)), closes, 1)[0]
+    distance_pct = (closes[-1] - sma) / sma * 100
+
+    if distance_pct >= threshold_pct and slope > 0:
+        return CandleTrend.UP_TREND
+    if distance_pct <= -threshold_pct and slope < 0:
+        return CandleTrend.DOWN_TREND
+    return CandleTrend.NEUTRAL
+
+
+def kline_indicators(closes: np.ndarray, trend_period: int, threshold_pct: float) -> tuple[CandleTrend, float]:
+    """Trend of the last `trend_period` closes and RSI-14; one analysis-pool task per snapshot."""
+    return trend(closes[-trend_period:], threshold_pct), rsi(closes)
@@ -0,0 +1,32 @@
+import json
+
+from app.schemas.actions_history import NewsSentiment
+
+
+def sentiment_from_labels(labels: list[str]) -> NewsSentiment:
+    """Majority sentiment of per-article labels (Positive / Negative / Neutral)."""
+    labels = [label.upper() for label in labels]
+    if not labels:
+        return NewsSentiment.NEUTRAL
+
+    positive = labels.count("POSITIVE") / len(labels)
+    negative = labels.count("NEGATIVE") / len(labels)
+    neutral = 1.0 - positive - negative
+
+    if neutral > 0.5:
+        return NewsSentiment.NEUTRAL
+    if positive > 0.6:
+        return NewsSentiment.POSITIVE
+    if negative > 0.6:
+        return NewsSentiment.NEGATIVE
+    if positive > negative:
+        return NewsSentiment.MIXED_POSITIVE
+    if negative > positive:
+        return NewsSentiment.MIXED_NEGATIVE
+    return NewsSentiment.MIXED
+
+
+def score_crypto_news(payload: bytes) -> NewsSentiment:
+    """Sentiment of a raw CoinDesk search response, without validating every article."""
+    articles = json.loads(payload).get("Data") or []
+    return sentiment_from_labels([str(article.get("SENTIMENT", "")) for article in articles])
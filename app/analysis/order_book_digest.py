@@ -0,0 +1,168 @@
+import json
+
+import numpy as np
+
+from app.schemas.binance_order_book import (
+    BookWall,
+    DepthBand,
+    OrderBookDigest,
+    OrderBookResponse,
+    SlippageEstimate,
+)
+
+DEPTH_BANDS_PCT = (0.1, 0.5, 1.0, 2.0)
+SLIPPAGE_NOTIONALS = (100.0, 1_000.0, 10_000.0, 100_000.0)
+WALLS_PER_SIDE = 3
+
+
+def walk_book(prices: np.ndarray, qtys: np.ndarray, notionals: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Average fill price for each target notional when sweeping one side of the
+    book (levels ordered best first). Sizes beyond the visible depth fill
+    partially; returns (avg_price, filled_notional), both shaped like `notionals`.
+    """
+    notionals = np.asarray(notionals, dtype=np.float64)
+    if len(prices) == 0:
+        return np.zeros_like(notionals), np.zeros_like(notionals)
+
+    cum_notional = np.cumsum(prices * qtys)
+    cum_qty = np.cumsum(qtys)
+
+    filled = np.minimum(notionals, cum_notional[-1])
+    idx = np.minimum(np.searchsorted(cum_notional, filled, side="left"), len(prices) - 1)
+
+    prev_notional = np.where(idx > 0, cum_notional[idx - 1], 0.0)
+    prev_qty = np.where(idx > 0, cum_qty[idx - 1], 0.0)
+    qty = prev_qty + (filled - prev_notional) / prices[idx]
+
+    avg_price = np.divide(filled, qty, out=np.zeros_like(filled), where=qty > 0)
+    return avg_price, filled
+
+
+def _walls(side: str, prices: np.ndarray, qtys: np.ndarray, mid: float) -> list[BookWall]:
+    if len(prices) == 0:
+        return []
+    notional = prices * qtys
+    top = np.argsort(notional)[::-1][:WALLS_PER_SIDE]
+    return [
+        BookWall(
+            side=side,
+            price=float(prices[i]),
+            qty=float(qtys[i]),
+            notional=float(notional[i]),
+            distance_pct=float(abs(prices[i] - mid) / mid * 100),
+        )
+        for i in top
+    ]
+
+
+def digest_order_book(
+    book: OrderBookResponse,
+    notionals: tuple[float, ...] = SLIPPAGE_NOTIONALS,
+) -> OrderBookDigest:
+    """Fixed-size summary of an order book, independent of how many levels were fetched."""
+    return _digest(
+        book.symbol,
+        np.asarray(book.bids, dtype=np.float64),
+        np.asarray(book.bids_qty, dtype=np.float64),
+        np.asarray(book.asks, dtype=np.float64),
+        np.asarray(book.asks_qty, dtype=np.float64),
+        book.last_update_id,
+        notionals,
+    )
+
+
+def _levels(levels: list[list[str]]) -> tuple[np.ndarray, np.ndarray]:
+    table = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+    return np.ascontiguousarray(table[:, 0]), np.ascontiguousarray(table[:, 1])
+
+
+def digest_depth_payload(
+    symbol: str,
+    payload: bytes,
+    notionals: tuple[float, ...] = SLIPPAGE_NOTIONALS,
+) -> OrderBookDigest:
+    """
+    digest_order_book() straight from a raw /api/v3/depth response. Decoding a
+    deep book is the expensive part, so the analysis pool gets the bytes and
+    only the fixed-size digest comes back.
+    """
+    book = json.loads(payload)
+    bids, bids_qty = _levels(book["bids"])
+    asks, asks_qty = _levels(book["asks"])
+    return _digest(symbol, bids, bids_qty, asks, asks_qty, book["lastUpdateId"], notionals)
+
+
+def _digest(
+    symbol: str,
+    bids: np.ndarray,
+    bids_qty: np.ndarray,
+    asks: np.ndarray,
+    asks_qty: np.ndarray,
+    last_update_id: int,
+    notionals: tuple[float, ...],
+) -> OrderBookDigest:
+    best_bid = float(bids[0]) if len(bids) else 0.0
+    best_ask = float(asks[0]) if len(asks) else 0.0
+    mid = (best_bid + best_ask) / 2 if best_bid and best_ask else (best_bid or best_ask)
+
+    top_bid_qty = bids_qty[0] if len(bids_qty) else 0.0
+    top_ask_qty = asks_qty[0] if len(asks_qty) else 0.0
+    top_qty = top_bid_qty + top_ask_qty
+    microprice = (best_bid * top_ask_qty + best_ask * top_bid_qty) / top_qty if top_qty > 0 else mid
+
+    # Cumulative depth within each band: bids descend, asks ascend from the touch
+    bands = np.asarray(DEPTH_BANDS_PCT)
+    bid_cut = np.searchsorted(-bids, -(mid * (1 - bands / 100)), side="right")
+    ask_cut = np.searchsorted(asks, mid * (1 + bands / 100), side="right")
+
+    bid_cum_qty = np.concatenate(([0.0], np.cumsum(bids_qty)))
+    ask_cum_qty = np.concatenate(([0.0], np.cumsum(asks_qty)))
+    bid_cum_notional = np.concatenate(([0.0], np.cumsum(bids * bids_qty)))
+    ask_cum_notional = np.concatenate(([0.0], np.cumsum(asks * asks_qty)))
+
+    depth_bands = []
+    for i, pct in enumerate(DEPTH_BANDS_PCT):
+        bid_notional = bid_cum_notional[bid_cut[i]]
+        ask_notional = ask_cum_notional[ask_cut[i]]
+        total = bid_notional + ask_notional
+        depth_bands.append(
+            DepthBand(
+                pct_from_mid=pct,
+                bid_qty=float(bid_cum_qty[bid_cut[i]]),
+                ask_qty=float(ask_cum_qty[ask_cut[i]]),
+                bid_notional=float(bid_notional),
+                ask_notional=float(ask_notional),
+                imbalance=float((bid_notional - ask_notional) / total) if total > 0 else 0.0,
+            )
+        )
+
+    targets = np.asarray(notionals, dtype=np.float64)
+    slippage = []
+    for side, prices, qtys, sign in (("buy", asks, asks_qty, 1), ("sell", bids, bids_qty, -1)):
+        avg_price, filled = walk_book(prices, qtys, targets)
+        for target, price, done in zip(targets, avg_price, filled):
+            slippage.append(
+                SlippageEstimate(
+                    side=side,
+                    notional=float(target),
+                    avg_price=float(price),
+                    slippage_bps=float(sign * (price - mid) / mid * 10_000) if price > 0 and mid else 0.0,
+                    filled_pct=float(done / target * 100) if target > 0 else 0.0,
+                )
+            )
+
+    return OrderBookDigest(
+        symbol=symbol,
+        type="depth_digest",
+        best_bid=best_bid,
+        best_ask=best_ask,
+        mid=mid,
+        spread_bps=(best_ask - best_bid) / mid * 10_000 if mid else 0.0,
+        microprice=float(microprice),
+        levels=len(bids) + len(asks),
+        depth_bands=depth_bands,
+        walls=_walls("bid", bids, bids_qty, mid) + _walls("ask", asks, asks_qty, mid),
+        slippage=slippage,
+        last_update_id=last_update_id,
+    )
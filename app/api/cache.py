@@ -0,0 +1,150 @@
+import asyncio
+import gzip
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from app.metrics import counter
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 512
+
+
+class CachedBody:
+    """A serialised JSON payload with its ETag and a pre-compressed copy."""
+
+    __slots__ = ("body", "gzipped", "etag", "created_at", "expires_at")
+
+    def __init__(self, payload: Any, ttl: float):
+        self.body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+        self.gzipped = gzip.compress(self.body, compresslevel=5) if len(self.body) >= GZIP_MIN_BYTES else None
+        self.etag = f'"{hashlib.blake2b(self.body, digest_size=12).hexdigest()}"'
+        self.created_at = time.time()
+        self.expires_at = time.monotonic() + ttl
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class ResponseCache:
+    """
+    In-process cache of endpoint payloads shared by every client.
+
+    Each key is loaded at most once per TTL: concurrent misses wait on the
+    same in-flight load instead of hitting the upstream API again. Entries are
+    serialised, hashed and gzipped once at load time so a hit costs no JSON
+    encoding or compression.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: dict[str, CachedBody] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str, ttl: float, loader: Callable[[], Awaitable[Any]]) -> CachedBody:
+        entry = self._entries.get(key)
+        if entry is not None and entry.fresh:
+            self.hits += 1
+            counter("api_cache_requests_total", "API cache lookups.", labels={"result": "hit"}).inc()
+            return entry
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            counter("api_cache_requests_total", "API cache lookups.", labels={"result": "coalesced"}).inc()
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leader was cancelled (client gone, shutdown); load it ourselves
+                return await self.get(key, ttl, loader)
+
+        self.misses += 1
+        counter("api_cache_requests_total", "API cache lookups.", labels={"result": "miss"}).inc()
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = CachedBody(await loader(), ttl)
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelled (client gone, shutdown): release the coalesced waiters
+            future.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        if len(self._entries) >= self.max_entries:
+            self._evict()
+        self._entries[key] = entry
+        future.set_result(entry)
+        return entry
+
+    def _evict(self) -> None:
+        stale = [key for key, entry in self._entries.items() if not entry.fresh]
+        for key in stale or list(self._entries)[: max(1, self.max_entries // 10)]:
+            self._entries.pop(key, None)
+
+    def invalidate(self, prefix: str = "") -> None:
+        for key in [k for k in self._entries if k.startswith(prefix)]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+response_cache = ResponseCache()
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = (tag.strip().removeprefix("W/") for tag in header.split(","))
+    return any(tag in ("*", etag) for tag in candidates)
+
+
+def cached_response(request: Request, entry: CachedBody, ttl: float) -> Response:
+    """200 with the (optionally gzipped) cached body, or 304 when the client's ETag matches."""
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={max(0, int(ttl))}",
+        "Vary": "Accept-Encoding",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        counter("api_responses_total", "API responses by outcome.", labels={"outcome": "not_modified"}).inc()
+        return Response(status_code=304, headers=headers)
+
+    if entry.gzipped is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        counter("api_responses_total", "API responses by outcome.", labels={"outcome": "gzip"}).inc()
+        headers["Content-Encoding"] = "gzip"
+        return Response(entry.gzipped, media_type="application/json", headers=headers)
+
+    counter("api_responses_total", "API responses by outcome.", labels={"outcome": "identity"}).inc()
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+
+async def serve_cached(request: Request, ttl: float, loader: Callable[[], Awaitable[Any]]) -> Response:
+    """Serve `loader()`'s payload from the shared cache, keyed by path and query string."""
+    key = request.url.path
+    if request.url.query:
+        key += "?" + "&".join(sorted(request.url.query.split("&")))
+    entry = await response_cache.get(key, ttl, loader)
+    return cached_response(request, entry, ttl)
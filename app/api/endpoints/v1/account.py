@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Request, Response
+
+from app.api.cache import serve_cached
+from app.data.robinhood.account_cache import account_cache
+
+router = APIRouter(prefix="/account", tags=["account"])
+
+# The account cache already bounds upstream calls; this only saves re-encoding
+HOLDINGS_TTL_SECONDS = 5.0
+
+
+@router.get("/holdings")
+async def holdings(request: Request) -> Response:
+    """Robinhood crypto holdings."""
+    return await serve_cached(request, HOLDINGS_TTL_SECONDS, account_cache.get_holdings)
@@ -0,0 +1,26 @@
+from typing import Literal
+
+from fastapi import APIRouter, Query, Request, Response
+
+from app.analysis.decision_quality import decision_quality
+from app.api.cache import serve_cached
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+QUALITY_TTL_SECONDS = 30.0
+
+Dimension = Literal["symbol", "side", "candle_trend", "news_sentiment", "order_book_signal"]
+
+
+@router.get("/decision-quality")
+async def decision_quality_report(
+    request: Request,
+    horizon: Literal["15m", "1h", "4h"] = "1h",
+    group_by: list[Dimension] = Query(["side", "candle_trend"]),
+    symbol: str | None = Query(None, examples=["DOGE"]),
+    side: Literal["buy", "sell", "hold"] | None = None,
+) -> Response:
+    """Forward returns of logged decisions per feature combination, from the precomputed aggregates."""
+    return await serve_cached(
+        request, QUALITY_TTL_SECONDS, lambda: decision_quality.report(horizon, list(dict.fromkeys(group_by)), symbol, side)
+    )
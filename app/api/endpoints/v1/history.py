@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Query, Request, Response
+
+from app.api.cache import serve_cached
+from app.database.crud.actions import fetch_recent_actions, fetch_recent_tool_results
+
+router = APIRouter(prefix="/history", tags=["history"])
+
+HISTORY_TTL_SECONDS = 5.0
+
+
+@router.get("/actions")
+async def recent_actions(request: Request, limit: int = Query(10, ge=1, le=100)) -> Response:
+    """Most recent logged decisions, newest first."""
+    return await serve_cached(request, HISTORY_TTL_SECONDS, lambda: fetch_recent_actions(limit))
+
+
+@router.get("/tool-results")
+async def recent_tool_results(request: Request, limit: int = Query(10, ge=1, le=100)) -> Response:
+    """Most recent per-cycle tool summaries, newest first."""
+    return await serve_cached(request, HISTORY_TTL_SECONDS, lambda: fetch_recent_tool_results(limit))
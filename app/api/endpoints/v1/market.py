@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Query, Request, Response
+
+from app.analysis.executor import analysis_executor
+from app.analysis.order_book_digest import digest_depth_payload
+from app.api.cache import serve_cached
+from app.data.binance.market_data import fetch_klines, fetch_ticker_24hr
+from app.data.binance.order_book import fetch_order_book_payload
+from app.schemas.binance_order_book import OrderBookRequest
+
+router = APIRouter(prefix="/market", tags=["market"])
+
+TICKER_TTL_SECONDS = 2.0
+ORDER_BOOK_TTL_SECONDS = 1.0
+KLINES_TTL_SECONDS = 10.0
+
+
+@router.get("/ticker")
+async def ticker(request: Request, symbol: str = Query("DOGEUSDT", examples=["DOGEUSDT"])) -> Response:
+    """Binance 24h ticker statistics."""
+    return await serve_cached(request, TICKER_TTL_SECONDS, lambda: fetch_ticker_24hr(symbol))
+
+
+@router.get("/order-book")
+async def order_book(
+    request: Request,
+    symbol: str = Query("DOGEUSDT", examples=["DOGEUSDT"]),
+    limit: int = Query(1000, ge=5, le=5000),
+) -> Response:
+    """Fixed-size digest of the Binance order book (depth bands, walls, slippage)."""
+
+    async def load():
+        payload, age = await fetch_order_book_payload(OrderBookRequest(symbol=symbol, limit=limit))
+        digest = await analysis_executor.run(digest_depth_payload, symbol, payload)
+        digest.stale_seconds = age
+        return digest
+
+    return await serve_cached(request, ORDER_BOOK_TTL_SECONDS, load)
+
+
+@router.get("/klines")
+async def klines(
+    request: Request,
+    symbol: str = Query("DOGEUSDT", examples=["DOGEUSDT"]),
+    interval: str = Query("15m", examples=["1m", "15m", "1h"]),
+    limit: int = Query(100, ge=1, le=1000),
+) -> Response:
+    """Raw Binance kline rows."""
+    return await serve_cached(request, KLINES_TTL_SECONDS, lambda: fetch_klines(symbol, interval=interval, limit=limit))
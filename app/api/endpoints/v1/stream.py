@@ -0,0 +1,73 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.broker import TOPICS, stream_broker
+from app.schemas.stream import StreamBrokerStats
+
+router = APIRouter(prefix="/stream", tags=["stream"])
+
+# SSE comment sent when idle so proxies keep the connection open
+SSE_HEARTBEAT_SECONDS = 15.0
+
+
+def _topics(topics: str | None) -> set[str]:
+    if not topics:
+        return set(TOPICS)
+    requested = {t.strip() for t in topics.split(",") if t.strip()}
+    unknown = requested - TOPICS
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown topics: {sorted(unknown)}; expected {sorted(TOPICS)}")
+    return requested
+
+
+@router.websocket("/ws")
+async def stream_ws(websocket: WebSocket, topics: str | None = Query(None, examples=["decision,kline"])) -> None:
+    """Push events as JSON messages. A slow client only ever delays itself."""
+    try:
+        wanted = _topics(topics)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    subscriber = stream_broker.subscribe(wanted)
+    try:
+        while True:
+            event = await subscriber.get()
+            await websocket.send_text(event.model_dump_json())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        stream_broker.unsubscribe(subscriber)
+
+
+@router.get("/sse")
+async def stream_sse(topics: str | None = Query(None, examples=["decision,tool_result"])) -> StreamingResponse:
+    """Server-sent events; `id` is the broker sequence number."""
+    subscriber = stream_broker.subscribe(_topics(topics))
+
+    async def events():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"id: {event.seq}\nevent: {event.topic}\ndata: {event.model_dump_json()}\n\n"
+        finally:
+            stream_broker.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+async def stream_stats() -> StreamBrokerStats:
+    """Published/throttled counts and per-subscriber queue depth, drops and lag."""
+    return stream_broker.stats()
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+
+from app.api.endpoints.v1 import account, analytics, history, market, stream
+
+api_router = APIRouter()
+api_router.include_router(market.router)
+api_router.include_router(account.router)
+api_router.include_router(history.router)
+api_router.include_router(analytics.router)
+api_router.include_router(stream.router)
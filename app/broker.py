@@ -0,0 +1,162 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Any
+
+from app.config import settings
+from app.metrics import counter
+from app.schemas.stream import StreamBrokerStats, StreamEvent, SubscriberStats
+
+# Every event matters: a slow subscriber loses the oldest ones first
+DROP_OLDEST_TOPICS = {"decision", "tool_result"}
+# Only the latest value per key matters: a slow subscriber gets the newest one
+CONFLATED_TOPICS = {"kline", "book_ticker"}
+TOPICS = DROP_OLDEST_TOPICS | CONFLATED_TOPICS
+
+
+class Subscriber:
+    """
+    One client's view of the broker. `offer` never blocks: drop-oldest topics
+    go to a bounded FIFO, conflated topics keep only the latest event per key.
+    """
+
+    def __init__(self, subscriber_id: int, topics: set[str], max_queue: int):
+        self.id = subscriber_id
+        self.topics = topics
+        self.max_queue = max_queue
+
+        self._fifo: deque[StreamEvent] = deque()
+        self._latest: OrderedDict[tuple[str, str], StreamEvent] = OrderedDict()
+        self._ready = asyncio.Event()
+
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.last_seq = 0
+
+    def offer(self, event: StreamEvent) -> None:
+        if event.topic in CONFLATED_TOPICS:
+            slot = (event.topic, event.key)
+            if slot in self._latest:
+                self.conflated += 1
+                del self._latest[slot]
+            elif len(self._latest) >= self.max_queue:
+                self._latest.popitem(last=False)
+                self.dropped += 1
+            self._latest[slot] = event
+        else:
+            if len(self._fifo) >= self.max_queue:
+                self._fifo.popleft()
+                self.dropped += 1
+                counter("stream_events_dropped_total", "Events dropped for slow subscribers.", labels={"topic": event.topic}).inc()
+            self._fifo.append(event)
+        self._ready.set()
+
+    def _pop(self) -> StreamEvent | None:
+        # Oldest first across both queues so the stream stays roughly in order
+        head = self._fifo[0] if self._fifo else None
+        latest = next(iter(self._latest.values())) if self._latest else None
+        if head is None and latest is None:
+            return None
+        if latest is None or (head is not None and head.seq < latest.seq):
+            return self._fifo.popleft()
+        return self._latest.popitem(last=False)[1]
+
+    async def get(self) -> StreamEvent:
+        while True:
+            event = self._pop()
+            if event is not None:
+                self.delivered += 1
+                self.last_seq = event.seq
+                return event
+            self._ready.clear()
+            await self._ready.wait()
+
+    @property
+    def queued(self) -> int:
+        return len(self._fifo) + len(self._latest)
+
+    def stats(self, head_seq: int) -> SubscriberStats:
+        heads = [self._fifo[0]] if self._fifo else []
+        heads += [next(iter(self._latest.values()))] if self._latest else []
+        oldest = min((e.published_at for e in heads), default=None)
+        return SubscriberStats(
+            id=self.id,
+            topics=sorted(self.topics),
+            queued=self.queued,
+            delivered=self.delivered,
+            dropped=self.dropped,
+            conflated=self.conflated,
+            lag_events=max(0, head_seq - self.last_seq) if self.queued else 0,
+            lag_seconds=time.time() - oldest if oldest is not None else 0.0,
+        )
+
+
+class StreamBroker:
+    """
+    In-process fan-out of decisions, tool results and market updates to live
+    subscribers (WebSocket / SSE clients).
+
+    `publish` is synchronous and O(subscribers); it never awaits a client, so
+    the agent loop cannot be stalled by a slow consumer. Market topics can be
+    throttled at the source with `min_interval`, per key or per `throttle_key`
+    when the key is finer than the rate should be (one per candle).
+    """
+
+    def __init__(self, max_queue: int = settings.STREAM_MAX_QUEUE):
+        self.max_queue = max_queue
+        self._subscribers: dict[int, Subscriber] = {}
+        self._next_id = 0
+        self._seq = 0
+        self._last_published: dict[tuple[str, str], float] = {}
+
+        self.published = 0
+        self.throttled = 0
+
+    def subscribe(self, topics: set[str] | None = None, max_queue: int | None = None) -> Subscriber:
+        self._next_id += 1
+        subscriber = Subscriber(self._next_id, set(topics or TOPICS), max_queue or self.max_queue)
+        # Start at the head: lag is measured from the moment of subscribing
+        subscriber.last_seq = self._seq
+        self._subscribers[subscriber.id] = subscriber
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.pop(subscriber.id, None)
+
+    def publish(
+        self,
+        topic: str,
+        data: dict[str, Any],
+        key: str = "",
+        min_interval: float = 0.0,
+        throttle_key: str | None = None,
+    ) -> bool:
+        """Fan an event out to every subscriber of `topic`. Returns False if throttled."""
+        now = time.time()
+        if min_interval > 0:
+            slot = (topic, key if throttle_key is None else throttle_key)
+            if now - self._last_published.get(slot, 0.0) < min_interval:
+                self.throttled += 1
+                return False
+            self._last_published[slot] = now
+
+        self._seq += 1
+        event = StreamEvent(seq=self._seq, topic=topic, key=key, published_at=now, data=data)
+        self.published += 1
+        counter("stream_events_published_total", "Events published to the stream broker.", labels={"topic": topic}).inc()
+
+        for subscriber in self._subscribers.values():
+            if topic in subscriber.topics:
+                subscriber.offer(event)
+        return True
+
+    def stats(self) -> StreamBrokerStats:
+        return StreamBrokerStats(
+            published=self.published,
+            throttled=self.throttled,
+            subscribers=[s.stats(self._seq) for s in self._subscribers.values()],
+        )
+
+
+stream_broker = StreamBroker()
@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     POSTGRES_HOST: str = "localhost"
     POSTGRES_PORT: int = 5432
     POSTGRES_DB: str = ""
+    POSTGRES_SSLMODE: str = "require"  # "disable" for a local database
 
     # JWT Security
     SECRET_KEY: str = ""
@@ -20,6 +21,39 @@ class Settings(BaseSettings):
     # API Settings
     API_V1_PREFIX: str = "/api/v1"
     PROJECT_NAME: str = "Meta Custom Automation"
+    RUN_AGENT_LOOP: bool = False  # run the trading loop inside the API process
+
+    # HTTP tapes (record/replay of upstream traffic per decision cycle)
+    HTTP_TAPE_RECORD: bool = False
+    HTTP_TAPE_DIR: str = "tapes"
+
+    # Upstream resilience (ResilientTransport under every async_client)
+    HTTP_RESILIENCE_ENABLED: bool = True
+    HTTP_RETRIES: int = 2  # extra attempts for idempotent requests (GET, or extensions={"idempotent": True})
+    HTTP_RETRY_BASE_SECONDS: float = 0.2  # full-jitter backoff: uniform(0, base * 2**attempt)
+    HTTP_RETRY_MAX_SECONDS: float = 2.0
+    HTTP_BREAKER_FAILURES: int = 5  # consecutive failed attempts that open a host's breaker
+    HTTP_BREAKER_COOLDOWN_SECONDS: float = 30.0  # open this long before one probe is let through
+    HTTP_HEDGE_ENABLED: bool = True
+    HTTP_HEDGE_WINDOW: int = 200  # recent latencies per host; their p95 is the hedge delay
+    HTTP_HEDGE_MIN_MS: float = 50.0
+    HTTP_HEDGE_MAX_FRACTION: float = 0.1  # at most this share of a host's requests is duplicated
+    HTTP_FALLBACK_CACHE_ENTRIES: int = 512  # last good responses kept for open breakers
+    HTTP_FALLBACK_MAX_AGE_SECONDS: float = 900.0
+    HTTP_FALLBACK_PRICE_MAX_AGE_SECONDS: float = 15.0  # Binance ticker, bookTicker, depth and klines
+
+    # Kline archive (columnar candles on disk, read through numpy.memmap)
+    KLINE_ARCHIVE_DIR: str = "archive"
+    KLINE_ARCHIVE_MAX_SEGMENTS: int = 256  # appends are compacted into one segment beyond this
+    KLINE_BACKFILL_CONCURRENCY: int = 8  # /klines requests in flight
+    KLINE_BACKFILL_WEIGHT_PER_MINUTE: int = 3000  # share of Binance's 6000 request weight per minute
+
+    # Live stream (WebSocket / SSE)
+    STREAM_MAX_QUEUE: int = 256  # per subscriber, for decision/tool_result events
+    STREAM_MARKET_ENABLED: bool = True
+    STREAM_MARKET_SYMBOLS: list[str] = ["DOGEUSDT"]
+    STREAM_KLINE_INTERVAL: str = "1m"
+    STREAM_MARKET_MIN_INTERVAL_SECONDS: float = 1.0  # per symbol and topic
 
     # Models APIs
     OPENAI_API_KEY: str = ""  # For OpenAI GPT-4 (alternative to Gemini)
@@ -27,11 +61,89 @@ class Settings(BaseSettings):
     GEMINI_MODEL: str = ""
     GEMINI_BASE_URL: str = ""
 
+    # Cycle time budget (app.deadline; bounds every HTTP, DB and model call in a cycle)
+    CYCLE_BUDGET_SECONDS: float = 120.0
+    CYCLE_BUDGET_RESERVE_SECONDS: float = 20.0  # below this, tools answer from local data (stale) or skip
+    CYCLE_MIN_CALL_SECONDS: float = 1.0  # floor on any call's timeout, so a late decision is still logged
+    CYCLE_LLM_OVERRUN_SECONDS: float = 30.0  # the agent run is cancelled this long after the deadline
+
+    # Decision gate (skip the LLM when the market has not moved)
+    DECISION_GATE_ENABLED: bool = True
+    DECISION_GATE_PRICE_TOLERANCE_PCT: float = 0.5
+    DECISION_GATE_CHANGE_TOLERANCE_PCT: float = 1.0  # absolute, in 24h-change percentage points
+    DECISION_GATE_HOLDINGS_TOLERANCE_PCT: float = 1.0
+    DECISION_GATE_MAX_AGE_SECONDS: float = 3600  # always re-ask the LLM at least this often
+    DECISION_GATE_AUDIT_EVERY: int = 10  # run the LLM on every Nth skippable cycle (0 = never)
+
+    # Decision cache (LLM decisions keyed by quantised market snapshot)
+    DECISION_CACHE_ENABLED: bool = True
+    DECISION_CACHE_DB_PATH: str = "decision_cache.db"
+    DECISION_CACHE_TTL_SECONDS: float = 6 * 3600
+    DECISION_CACHE_MAX_ENTRIES: int = 5000
+
     # News APIs
     NEWS_AI_API_KEY: str = ""
+    COINDESK_API_URL: str = "https://data-api.coindesk.com/news/v1"
+    EVENTREGISTRY_API_URL: str = "https://eventregistry.org/api/v1/article"
+
+    # Binance (public market data)
+    BINANCE_API_URL: str = "https://api.binance.com"
+    BINANCE_WS_URL: str = "wss://stream.binance.com:9443"
 
     # Robinhood
     ROBINHOOD_BASE_URL: str = ""
+    ACCOUNT_CACHE_TTL_SECONDS: float = 30.0  # account/holdings snapshot shared across cycles
+    PRICE_FEED_MIN_INTERVAL_SECONDS: float = 1.0
+    PRICE_FEED_MAX_INTERVAL_SECONDS: float = 15.0
+    PRICE_FEED_MAX_AGE_SECONDS: float = 10.0  # older feed quotes fall back to a direct request
+    ORDER_SUBMIT_RETRIES: int = 3  # resubmits reuse the client_order_id, so they cannot double-fill
+    ORDER_POLL_MIN_INTERVAL_SECONDS: float = 1.0
+    ORDER_POLL_MAX_INTERVAL_SECONDS: float = 30.0
+
+    # Cross-venue monitor (Binance vs Robinhood)
+    CROSS_VENUE_WINDOW: int = 256  # Robinhood quotes kept per symbol
+    CROSS_VENUE_EDGE_THRESHOLD_BPS: float = 25.0
+    CROSS_VENUE_ZSCORE_THRESHOLD: float = 3.0
+
+    # Analysis process pool (CPU-bound parsing and indicators off the event loop)
+    ANALYSIS_EXECUTOR_ENABLED: bool = True
+    ANALYSIS_WORKERS: int = 2
+    ANALYSIS_TASK_TIMEOUT_SECONDS: float = 10.0  # the pool is recycled when a task overruns
+    LOOP_LAG_INTERVAL_SECONDS: float = 0.25  # event-loop lag sampling period
+
+    # Sharded runner (python -m app.runner.supervisor)
+    RUNNER_SYMBOLS: list[str] = ["DOGE"]  # Robinhood asset codes; Binance pairs are <code>USDT
+    RUNNER_WORKERS: int = 2
+    RUNNER_CYCLE_INTERVAL_SECONDS: float = 900.0  # per symbol
+    RUNNER_MAX_CONCURRENT_CYCLES: int = 4  # per worker
+    RUNNER_HEARTBEAT_TIMEOUT_SECONDS: float = 60.0  # a worker whose event loop stalls this long is restarted
+    RUNNER_MAX_RESTARTS: int = 3  # within the window, before a worker's symbols are moved to the others
+    RUNNER_RESTART_WINDOW_SECONDS: float = 600.0
+    SHARED_MARKET_MAX_AGE_SECONDS: float = 5.0  # older shared rows fall back to a REST request
+    SHARED_KLINE_INTERVAL: str = "15m"  # candles kept in a shared ring per symbol
+    SHARED_KLINE_CAPACITY: int = 500  # candles per ring
+
+    # Columnar export of trade history and tool results (python -m app.database.export)
+    EXPORT_DIR: str = "exports"
+    EXPORT_BATCH_ROWS: int = 10_000  # rows per server-side cursor fetch
+    EXPORT_ROWS_PER_FILE: int = 250_000  # a partition file closes at this size or at a new day
+    EXPORT_SETTLE_SECONDS: float = 5.0  # rows younger than this wait for the next run
+
+    # Decision-quality aggregates (forward returns per decision, refreshed incrementally)
+    DECISION_QUALITY_ENABLED: bool = False  # refresh in the API process
+    DECISION_QUALITY_REFRESH_SECONDS: float = 300.0
+    DECISION_QUALITY_SETTLE_SECONDS: float = 120.0  # decisions wait this long for their tool results row
+    DECISION_QUALITY_LINK_WINDOW_SECONDS: float = 600.0  # tool results without action_id: matched by time and side
+    DECISION_QUALITY_HOLD_BAND: float = 0.005  # a HOLD is a hit while the price moves less than this
+    DECISION_QUALITY_MAX_AGE_DAYS: int = 7  # outcomes still missing a return after this are left unfilled
+
+    # Agent conversation memory (app.agents.session_store)
+    SESSION_BACKEND: str = "store"  # "store" (writer thread, group commit) or "sqlite" (the SDK's SQLiteSession)
+    SESSION_MAX_ITEMS: int = 200  # per session; older turns move to <db>.archive.db
+    SESSION_RETENTION_DAYS: float = 7.0  # items older than this are archived; 0 keeps them
+    SESSION_LINGER_MS: float = 2.0  # the writer waits this long for more writes to share a commit
+    SESSION_READERS: int = 4  # reader threads per store
+    SESSION_RETENTION_INTERVAL_SECONDS: float = 60.0
 
     class Config:
         env_file = str(ROOT_PATH / ".env")
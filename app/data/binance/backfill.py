@@ -0,0 +1,322 @@
+"""
+Historical kline backfill from Binance /api/v3/klines.
+
+Splits [start, end) into 1000-candle windows, fetches them concurrently
+within a request-weight budget and streams each window into a sink (the
+kline archive by default) as it arrives. Missing candles are detected per
+response and refetched; ranges still missing after that are recorded as
+exchange gaps. Progress is checkpointed per window, keyed by symbol, interval
+and start (which fix the window grid), so an interrupted run resumes where
+it stopped, and an open-ended rerun only fetches the candles closed since.
+A final pass over the sink refills any holes left by earlier runs or by
+failed windows.
+
+    python -m app.data.binance.backfill DOGEUSDT 1m --start 2024-01-01 --end 2025-01-01
+    python -m app.data.binance.backfill BTCUSDT 1h --start 2020-01-01 --concurrency 16 --weight-per-minute 4000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Protocol
+
+import httpx
+import numpy as np
+
+from app.config import settings
+from app.data.binance.market_data import base_url, klines_params
+from app.data.http_client import InstrumentedTransport, async_client
+from app.data.kline_archive import KlineArchive, interval_ms
+from app.data.shared_ring import KLINE, kline_row
+from app.schemas.kline_archive import KlineBackfillStats
+
+logger = logging.getLogger(__name__)
+
+KLINES_LIMIT = 1000
+KLINES_WEIGHT = 2
+RETRYABLE_STATUS = {408, 500, 502, 503, 504}
+RATE_LIMIT_STATUS = {418, 429}
+
+
+class KlineSink(Protocol):
+    def append(self, symbol: str, interval: str, klines, now_ms: int | None = None) -> int: ...
+
+
+def windows(start_ms: int, end_ms: int, step_ms: int, limit: int = KLINES_LIMIT) -> list[tuple[int, int]]:
+    """[start, end) windows of at most `limit` candles covering the range."""
+    span = step_ms * limit
+    return [(s, min(s + span, end_ms)) for s in range(start_ms, end_ms, span)]
+
+
+def find_gaps(open_times: np.ndarray, step_ms: int, start_ms: int, end_ms: int) -> list[tuple[int, int]]:
+    """[start, end) ranges missing at least one candle, given sorted unique open times."""
+    times = open_times[(open_times >= start_ms) & (open_times < end_ms)]
+    if not len(times):
+        return [(start_ms, end_ms)] if end_ms - start_ms >= step_ms else []
+    gaps = []
+    if times[0] - start_ms >= step_ms:
+        gaps.append((start_ms, int(times[0])))
+    gaps += [(int(times[i]) + step_ms, int(times[i + 1])) for i in np.flatnonzero(np.diff(times) > step_ms)]
+    if end_ms - times[-1] > step_ms:
+        gaps.append((int(times[-1]) + step_ms, end_ms))
+    return gaps
+
+
+def _to_array(klines: list[list]) -> np.ndarray:
+    rows = np.array([kline_row(k) for k in klines], dtype=KLINE)
+    rows = rows[np.argsort(rows["open_time"], kind="stable")]
+    return rows[np.concatenate(([True], np.diff(rows["open_time"]) != 0))] if len(rows) else rows
+
+
+class WeightBudget:
+    """
+    Token bucket over Binance request weight: `per_minute` weight refills
+    continuously with a few seconds of burst. A 429/418, or the exchange
+    reporting more used weight than the budget (other clients on the same
+    IP), pauses every caller.
+    """
+
+    def __init__(self, per_minute: int, burst_seconds: float = 5.0):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60
+        self.capacity = max(self.rate * burst_seconds, KLINES_WEIGHT)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, weight: int) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return
+                await asyncio.sleep((weight - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+    def observe(self, used_weight: int) -> None:
+        if used_weight > self.per_minute:
+            # Binance weight windows are calendar minutes
+            self.pause(60 - time.time() % 60)
+
+
+class KlineBackfill:
+    def __init__(
+        self,
+        symbol: str,
+        interval: str,
+        start_ms: int,
+        end_ms: int,
+        sink: KlineSink | None = None,
+        concurrency: int = settings.KLINE_BACKFILL_CONCURRENCY,
+        weight_per_minute: int = settings.KLINE_BACKFILL_WEIGHT_PER_MINUTE,
+        checkpoint_dir: str | Path | None = None,
+        max_retries: int = 5,
+        url: str = base_url,
+    ):
+        self.symbol = symbol.upper()
+        self.interval = interval
+        self.step_ms = interval_ms(interval)
+        now_ms = int(time.time() * 1000)
+        # Only closed candles: stop at the start of the one still open
+        self.start_ms = start_ms
+        self.end_ms = min(end_ms, now_ms - now_ms % self.step_ms)
+        self.sink = sink if sink is not None else KlineArchive()
+        self.concurrency = concurrency
+        self.budget = WeightBudget(weight_per_minute)
+        self.max_retries = max_retries
+        self.url = url
+
+        root = Path(checkpoint_dir) if checkpoint_dir else Path(getattr(self.sink, "root", settings.KLINE_ARCHIVE_DIR)) / "checkpoints"
+        # Not keyed by the end: an open-ended run asks for "now" every time
+        self.checkpoint_path = root / f"{self.symbol}_{interval}_{start_ms}.json"
+        # Window start -> the end it was filled to (the last window of a run may be partial)
+        self._done: dict[int, int] = {}
+        self._unfilled: list[tuple[int, int]] = []
+
+        self.requests = self.retries = self.rate_limited = self.max_used_weight = 0
+        self.candles = self.gaps_found = self.gaps_refilled = self.windows_failed = 0
+
+    def _load_checkpoint(self) -> None:
+        if self.checkpoint_path.exists():
+            data = json.loads(self.checkpoint_path.read_text())
+            self._done = {start: end for start, end in data["done"]}
+            self._unfilled = [tuple(gap) for gap in data["unfilled"]]
+
+    def _save_checkpoint(self) -> None:
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "symbol": self.symbol,
+            "interval": self.interval,
+            "start_ms": self.start_ms,
+            "end_ms": self.end_ms,
+            "done": sorted(self._done.items()),
+            "unfilled": sorted(self._unfilled),
+        }))
+        os.replace(tmp, self.checkpoint_path)
+
+    async def _fetch(self, client: httpx.AsyncClient, start_ms: int, end_ms: int) -> list[list]:
+        params = klines_params(self.symbol, self.interval, KLINES_LIMIT, start_ms, end_ms - 1)
+        attempt = 0
+        while True:
+            await self.budget.acquire(KLINES_WEIGHT)
+            self.requests += 1
+            try:
+                response = await client.get(f"{self.url}/klines", params=params)
+            except httpx.TransportError as e:
+                error: Exception = e
+            else:
+                used = int(response.headers.get("x-mbx-used-weight-1m", 0))
+                self.max_used_weight = max(self.max_used_weight, used)
+                self.budget.observe(used)
+                if response.status_code in RATE_LIMIT_STATUS:
+                    # Not an attempt: the budget waits out the ban for every caller
+                    self.rate_limited += 1
+                    self.budget.pause(float(response.headers.get("retry-after", 60)))
+                    continue
+                if response.status_code not in RETRYABLE_STATUS:
+                    response.raise_for_status()
+                    return json.loads(response.content)
+                error = httpx.HTTPStatusError(f"{response.status_code}", request=response.request, response=response)
+
+            if attempt >= self.max_retries:
+                raise error
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(min(30.0, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.5))
+
+    async def _fill(self, client: httpx.AsyncClient, start_ms: int, end_ms: int) -> list[tuple[int, int]]:
+        """Fetch one window into the sink, refetching its gaps once; returns what is still missing."""
+        rows = await self._fetch(client, start_ms, end_ms)
+        gaps = find_gaps(_to_array(rows)["open_time"], self.step_ms, start_ms, end_ms)
+        self.gaps_found += len(gaps)
+        for gap_start, gap_end in gaps:
+            rows += await self._fetch(client, gap_start, gap_end)
+        array = _to_array(rows)
+        missing = find_gaps(array["open_time"], self.step_ms, start_ms, end_ms)
+        self.gaps_refilled += max(0, len(gaps) - len(missing))
+        self.candles += self.sink.append(self.symbol, self.interval, array)
+        return missing
+
+    async def _worker(self, client: httpx.AsyncClient, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            start_ms, end_ms = queue.get_nowait()
+            try:
+                missing = await self._fill(client, start_ms, end_ms)
+            except (httpx.HTTPError, ValueError) as e:
+                self.windows_failed += 1
+                logger.warning(f"{self.symbol} {self.interval} window {start_ms}-{end_ms} failed: {e!r}")
+                continue
+            self._done[start_ms] = max(end_ms, self._done.get(start_ms, end_ms))
+            self._unfilled += missing
+            self._save_checkpoint()
+
+    def _confirmed(self, gap: tuple[int, int]) -> bool:
+        return any(start <= gap[0] and gap[1] <= end for start, end in self._unfilled)
+
+    async def _repair(self, client: httpx.AsyncClient) -> None:
+        """Refill holes the sink still has in the range, except known exchange gaps."""
+        if not hasattr(self.sink, "load"):
+            return
+        open_times = np.asarray(self.sink.load(self.symbol, self.interval, self.start_ms, self.end_ms)["open_time"])
+        gaps = [gap for gap in find_gaps(open_times, self.step_ms, self.start_ms, self.end_ms) if not self._confirmed(gap)]
+        if not gaps:
+            return
+        self.gaps_found += len(gaps)
+        queue: asyncio.Queue = asyncio.Queue()
+        for gap_start, gap_end in gaps:
+            for window in windows(gap_start, gap_end, self.step_ms):
+                queue.put_nowait(window)
+        before = len(self._unfilled)
+        await asyncio.gather(*(self._worker(client, queue) for _ in range(min(self.concurrency, queue.qsize()))))
+        self.gaps_refilled += max(0, len(gaps) - (len(self._unfilled) - before))
+
+    async def run(self) -> KlineBackfillStats:
+        started = time.perf_counter()
+        self._load_checkpoint()
+        all_windows = windows(self.start_ms, self.end_ms, self.step_ms)
+        queue: asyncio.Queue = asyncio.Queue()
+        for window in all_windows:
+            if self._done.get(window[0], window[0]) < window[1]:
+                queue.put_nowait(window)
+        resumed = len(all_windows) - queue.qsize()
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        async with async_client(timeout=30, transport=InstrumentedTransport(limits=limits)) as client:
+            await asyncio.gather(*(self._worker(client, queue) for _ in range(min(self.concurrency, queue.qsize()))))
+            await self._repair(client)
+        if hasattr(self.sink, "compact"):
+            self.sink.compact(self.symbol, self.interval)
+
+        seconds = time.perf_counter() - started
+        return KlineBackfillStats(
+            symbol=self.symbol,
+            interval=self.interval,
+            start_ms=self.start_ms,
+            end_ms=self.end_ms,
+            windows=len(all_windows),
+            windows_resumed=resumed,
+            windows_failed=self.windows_failed,
+            requests=self.requests,
+            retries=self.retries,
+            rate_limited=self.rate_limited,
+            max_used_weight=self.max_used_weight,
+            candles=self.candles,
+            gaps_found=self.gaps_found,
+            gaps_refilled=self.gaps_refilled,
+            gaps_unfilled=sorted(set(self._unfilled)),
+            seconds=seconds,
+            candles_per_second=self.candles / seconds if seconds else 0.0,
+        )
+
+
+def _ms(value: str) -> int:
+    if value.isdigit():
+        return int(value)
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() * 1000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("symbol", help="Binance pair, e.g. DOGEUSDT")
+    parser.add_argument("interval", help="kline interval with a fixed length, e.g. 1m, 1h, 1d")
+    parser.add_argument("--start", required=True, help="ISO date/time (UTC unless given) or Unix ms")
+    parser.add_argument("--end", help="ISO date/time or Unix ms (default: now)")
+    parser.add_argument("--concurrency", type=int, default=settings.KLINE_BACKFILL_CONCURRENCY)
+    parser.add_argument("--weight-per-minute", type=int, default=settings.KLINE_BACKFILL_WEIGHT_PER_MINUTE)
+    parser.add_argument("--dir", default=settings.KLINE_ARCHIVE_DIR, help="kline archive directory")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    backfill = KlineBackfill(
+        args.symbol,
+        args.interval,
+        _ms(args.start),
+        _ms(args.end) if args.end else int(time.time() * 1000),
+        sink=KlineArchive(args.dir),
+        concurrency=args.concurrency,
+        weight_per_minute=args.weight_per_minute,
+    )
+    print(asyncio.run(backfill.run()).model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
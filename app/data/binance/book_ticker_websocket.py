@@ -0,0 +1,35 @@
+import json
+import websockets
+from app.config import settings
+from app.schemas.binance_order_book import BookTickerResponse
+
+
+async def subscribe_book_ticker_stream(symbols: list[str]):
+    """Yield best bid/ask updates for several symbols over one combined stream."""
+    streams = "/".join(f"{symbol.lower()}@bookTicker" for symbol in symbols)
+    url = f"{settings.BINANCE_WS_URL}/stream?streams={streams}"
+
+    async with websockets.connect(url) as websocket:
+        async for message in websocket:
+            try:
+                data = json.loads(message)["data"]
+
+                bid = float(data["b"])
+                ask = float(data["a"])
+                spread = ask - bid
+                spread_bps = (spread / ((ask + bid) / 2)) * 10_000 if (ask + bid) > 0 else 0
+
+                yield BookTickerResponse(
+                    symbol=data["s"],
+                    type="bookTicker",
+                    bid_price=bid,
+                    ask_price=ask,
+                    spread=spread,
+                    spread_bps=spread_bps,
+                    bid_quantity=float(data["B"]),
+                    ask_quantity=float(data["A"])
+                )
+
+            except (KeyError, ValueError, json.JSONDecodeError) as e:
+                print(f"Error parsing WebSocket message: {e}")
+                continue
@@ -1,12 +1,13 @@
 import asyncio
 import json
 import websockets
+from app.config import settings
 from app.schemas.klines_websocket import KlineWebSocketRequest, KlineWebSocketResponse, KData
 
 
 async def subscribe_kline_stream(request: KlineWebSocketRequest):
     symbol_lower = request.symbol.lower()
-    url = f"wss://stream.binance.com:9443/ws/{symbol_lower}@kline_{request.interval}"
+    url = f"{settings.BINANCE_WS_URL}/ws/{symbol_lower}@kline_{request.interval}"
     
     async with websockets.connect(url) as websocket:
         async for message in websocket:
@@ -1,15 +1,129 @@
+import json
 import requests
 from datetime import datetime
 
 from app.schemas.market_data import Kline, TickerPrice
+from app.config import settings
+from app.data.http_client import async_client
+from app.data.kline_archive import interval_ms, kline_archive
+from app.data.resilience import fallback_age
+from app.data.shared_market import shared_ticker_24hr
+from app.data.shared_ring import KLINE, shared_klines
 
-base_url = "https://api.binance.com/api/v3"
+base_url = f"{settings.BINANCE_API_URL}/api/v3"
 
-def get_klines(input: Kline, url: str = base_url) -> str:
+KLINES_HEADER = f"{'Open Time':<20} {'Open':<15} {'High':<15} {'Low':<15} {'Close':<15} {'Volume':<12} {'Close Time':<20} {'Quote Vol':<15} {'Trades':<10} {'Taker Buy Base':<15} {'Taker Buy Quote':<15}\n"
+
+
+def klines_params(
+    symbol: str, interval: str, limit: int = 500, start_time: int | None = None, end_time: int | None = None
+) -> dict:
+    """/klines query; without start_time Binance returns the latest `limit` candles before end_time (or now)."""
     params = {
-        "symbol": input.symbol,
-        "interval": input.interval,
+        "symbol": symbol.upper(),
+        "interval": interval,
+        "limit": min(max(limit, 1), 1000),
     }
+    if start_time is not None:
+        params["startTime"] = start_time
+    if end_time is not None:
+        params["endTime"] = end_time
+    return params
+
+
+async def fetch_klines_payload(
+    symbol: str,
+    interval: str = "1h",
+    limit: int = 500,
+    url: str = base_url,
+    start_time: int | None = None,
+    end_time: int | None = None,
+    live: bool = False,
+) -> tuple[bytes, float | None]:
+    """
+    Undecoded /klines response body, for parsing in the analysis pool, and its
+    age when it is a breaker fallback (None when fresh). live=True fails
+    instead of falling back.
+    """
+    params = klines_params(symbol, interval, limit, start_time, end_time)
+    async with async_client(timeout=10) as client:
+        response = await client.get(url=f"{url}/klines", params=params, extensions={"live": live})
+        response.raise_for_status()
+    return response.content, fallback_age(response)
+
+
+async def fetch_klines(
+    symbol: str,
+    interval: str = "1h",
+    limit: int = 500,
+    url: str = base_url,
+    start_time: int | None = None,
+    end_time: int | None = None,
+    live: bool = False,
+) -> list[list]:
+    """Raw kline rows from Binance (async)."""
+    payload, _ = await fetch_klines_payload(symbol, interval, limit, url, start_time, end_time, live)
+    return json.loads(payload)
+
+
+def local_klines(symbol: str, interval: str, limit: int) -> list[tuple]:
+    """
+    The latest candles held locally (shared ring, then the kline archive),
+    oldest first; may be stale. Reads disk: call it off the event loop.
+    """
+    shared = shared_klines(symbol, interval, limit)
+    if shared is not None:
+        return shared.tolist()
+    last_open = kline_archive.info(symbol, interval).last_open_time
+    if last_open is None:
+        return []
+    try:
+        start_ms = last_open - (limit - 1) * interval_ms(interval)
+    except ValueError:
+        start_ms = None  # months: no fixed length, read it all
+    stored = kline_archive.load(symbol, interval, start_ms)
+    return list(zip(*(stored[name][-limit:].tolist() for name in KLINE.names)))
+
+
+async def fetch_ticker_24hr(symbol: str, url: str = base_url, live: bool = False) -> dict:
+    """
+    24hr ticker statistics from Binance (async). A breaker fallback carries
+    its age as "staleSeconds"; live=True fails instead of falling back.
+    """
+    # Sharded workers read the market-data process's shared table instead
+    shared = shared_ticker_24hr(symbol)
+    if shared is not None:
+        return shared
+    async with async_client(timeout=10) as client:
+        response = await client.get(url=f"{url}/ticker/24hr", params={"symbol": symbol.upper()}, extensions={"live": live})
+        response.raise_for_status()
+    ticker = response.json()
+    age = fallback_age(response)
+    if age is not None:
+        ticker["staleSeconds"] = age
+    return ticker
+
+
+def format_klines(klines: list[list]) -> str:
+    output_klines = KLINES_HEADER + '=' * 180 + '\n'
+
+    for kline in klines:
+        open_time = datetime.fromtimestamp(kline[0] / 1000).strftime('%Y-%m-%d %H:%M:%S')
+        close_time = datetime.fromtimestamp(kline[6] / 1000).strftime('%Y-%m-%d %H:%M:%S')
+        line = f"{open_time:<20} {kline[1]:<12} {kline[2]:<12} {kline[3]:<12} {kline[4]:<12} {kline[5]:<15} {close_time:<20} {kline[7]:<15} {kline[8]:<8} {kline[9]:<15} {kline[10]:<15}\n"
+        output_klines += line
+    return output_klines
+
+
+def format_klines_payload(payload: bytes) -> str:
+    """format_klines() from a raw /klines response; runs in the analysis pool."""
+    return format_klines(json.loads(payload))
+
+
+def get_klines(input: Kline, url: str = base_url) -> str:
+    params = klines_params(input.symbol, input.interval.value, input.limit or 500, input.startTime, input.endTime)
+    if input.timeZone:
+        params["timeZone"] = input.timeZone
     kline_response = requests.get(
         url=url + "/klines",
         params=params
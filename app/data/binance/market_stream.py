@@ -0,0 +1,49 @@
+import asyncio
+import logging
+
+from app.broker import StreamBroker
+from app.data.binance.book_ticker_websocket import subscribe_book_ticker_stream
+from app.data.binance.klines_websocket import subscribe_kline_stream
+from app.schemas.klines_websocket import KlineWebSocketRequest
+
+logger = logging.getLogger(__name__)
+
+
+async def _book_tickers(broker: StreamBroker, symbols: list[str], min_interval: float) -> None:
+    while True:
+        try:
+            async for ticker in subscribe_book_ticker_stream(symbols):
+                broker.publish("book_ticker", ticker.model_dump(), key=ticker.symbol, min_interval=min_interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"bookTicker stream dropped: {e}")
+            await asyncio.sleep(5)
+
+
+async def _klines(broker: StreamBroker, symbol: str, interval: str, min_interval: float) -> None:
+    request = KlineWebSocketRequest(symbol=symbol, interval=interval)
+    while True:
+        try:
+            async for update in subscribe_kline_stream(request):
+                # A closed candle is final: never throttle it away. Keying by candle
+                # start means conflation only merges updates of the same candle;
+                # the throttle is per symbol so its state does not grow per candle.
+                throttle = 0.0 if update.kline.is_kline_closed else min_interval
+                key = f"{update.symbol}:{update.kline.kline_start_time}"
+                broker.publish(
+                    "kline", update.model_dump(), key=key, min_interval=throttle, throttle_key=update.symbol
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"kline stream for {symbol} dropped: {e}")
+            await asyncio.sleep(5)
+
+
+async def pump_market_updates(broker: StreamBroker, symbols: list[str], interval: str, min_interval: float) -> None:
+    """Forward throttled Binance bookTicker and kline updates into the broker until cancelled."""
+    await asyncio.gather(
+        _book_tickers(broker, symbols, min_interval),
+        *(_klines(broker, symbol, interval, min_interval) for symbol in symbols),
+    )
@@ -1,8 +1,96 @@
+import json
 import requests
 from app.schemas.binance_order_book import BookTickerRequest, OrderBookRequest, BookTickerResponse, OrderBookResponse
+from app.config import settings
+from app.data.http_client import async_client
+from app.data.resilience import fallback_age
+from app.data.shared_market import shared_book_ticker
+
+BASE_URL = settings.BINANCE_API_URL
+
+
+def parse_book_ticker(symbol: str, data: dict) -> BookTickerResponse:
+    bid = float(data['bidPrice'])
+    ask = float(data['askPrice'])
+    spread = ask - bid
+    spread_bps = (spread / ((ask + bid) / 2)) * 10_000 if (ask + bid) > 0 else 0
+    bid_qty = float(data['bidQty'])
+    ask_qty = float(data['askQty'])
+
+    return BookTickerResponse(
+        symbol=symbol,
+        type="bookTicker",
+        bid_price=bid,
+        ask_price=ask,
+        spread=spread,
+        spread_bps=spread_bps,
+        bid_quantity=bid_qty,
+        ask_quantity=ask_qty
+    )
+
+
+def parse_order_book(request: OrderBookRequest, book: dict) -> OrderBookResponse:
+    best_bid = float(book["bids"][0][0]) if book["bids"] else 0.0
+    best_ask = float(book["asks"][0][0]) if book["asks"] else 0.0
+
+    bids = [float(p) for p, _ in book["bids"]]
+    asks = [float(p) for p, _ in book["asks"]]
+
+    bids_qty = [float(q) for _, q in book["bids"]]
+    asks_qty = [float(q) for _, q in book["asks"]]
+
+    return OrderBookResponse(
+        symbol=request.symbol,
+        type="depth",
+        best_bid=best_bid,
+        best_ask=best_ask,
+        spread=best_ask - best_bid,
+        bids=bids,
+        bids_qty=bids_qty,
+        asks=asks,
+        asks_qty=asks_qty,
+        limit=request.limit,
+        last_update_id=book["lastUpdateId"]
+    )
+
+
+async def fetch_best_ticker(request: BookTickerRequest) -> BookTickerResponse:
+    shared = shared_book_ticker(request.symbol)
+    if shared is not None:
+        return parse_book_ticker(request.symbol, shared)
+    async with async_client(timeout=10) as client:
+        response = await client.get(f"{BASE_URL}/api/v3/ticker/bookTicker", params={"symbol": request.symbol})
+        response.raise_for_status()
+    ticker = parse_book_ticker(request.symbol, response.json())
+    ticker.stale_seconds = fallback_age(response)
+    return ticker
+
+
+async def fetch_order_book_payload(request: OrderBookRequest, live: bool = False) -> tuple[bytes, float | None]:
+    """
+    Undecoded /depth response body, for digesting in the analysis pool, and
+    its age when it is a breaker fallback (None when fresh). live=True fails
+    instead of falling back.
+    """
+    async with async_client(timeout=10) as client:
+        response = await client.get(
+            f"{BASE_URL}/api/v3/depth",
+            params={"symbol": request.symbol, "limit": request.limit},
+            extensions={"live": live},
+        )
+        response.raise_for_status()
+    return response.content, fallback_age(response)
+
+
+async def fetch_order_book(request: OrderBookRequest, live: bool = False) -> OrderBookResponse:
+    payload, age = await fetch_order_book_payload(request, live)
+    book = parse_order_book(request, json.loads(payload))
+    book.stale_seconds = age
+    return book
+
 
 class BinanceOrderBook:
-    BASE_URL = "https://api.binance.com"
+    BASE_URL = BASE_URL
 
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
@@ -12,54 +100,13 @@ class BinanceOrderBook:
         url = f"{self.BASE_URL}/api/v3/ticker/bookTicker"
         response = self.session.get(url, params={"symbol": request.symbol}, timeout=self.timeout)
         response.raise_for_status()
-        data = response.json()
-
-        bid = float(data['bidPrice'])
-        ask = float(data['askPrice'])
-        spread = ask - bid
-        spread_bps = (spread / ((ask + bid) / 2)) * 10_000 if (ask + bid) > 0 else 0
-        bid_qty = float(data['bidQty'])
-        ask_qty = float(data['askQty'])
-
-        return BookTickerResponse(
-            symbol=request.symbol,
-            type="bookTicker",
-            bid_price=bid,
-            ask_price=ask,
-            spread=spread,
-            spread_bps=spread_bps,
-            bid_quantity=bid_qty,
-            ask_quantity=ask_qty
-        )
+        return parse_book_ticker(request.symbol, response.json())
     
     def get_order_book(self, request: OrderBookRequest) -> OrderBookResponse:
         url = f"{self.BASE_URL}/api/v3/depth"
         response = self.session.get(url, params={"symbol": request.symbol, "limit": request.limit}, timeout=self.timeout)
         response.raise_for_status()
-        book = response.json()
-
-        best_bid = float(book["bids"][0][0]) if book["bids"] else 0.0
-        best_ask = float(book["asks"][0][0]) if book["asks"] else 0.0
-
-        bids = [ float(p) for p, _ in book["bids"]]
-        asks = [ float(p) for p, _ in book["asks"]]
-
-        bids_qty = [ float(q) for _, q in book["bids"]]
-        asks_qty = [ float(q) for _, q in book["asks"]]
-        
-        return OrderBookResponse(
-            symbol=request.symbol,
-            type="depth",
-            best_bid=best_bid,
-            best_ask=best_ask,
-            spread=best_ask - best_bid,
-            bids=bids,
-            bids_qty=bids_qty,
-            asks=asks,
-            asks_qty=asks_qty,
-            limit=request.limit,
-            last_update_id=book["lastUpdateId"]
-        )
+        return parse_order_book(request, response.json())
     
     def close(self):
         self.session.close()
@@ -0,0 +1,210 @@
+import asyncio
+import random
+import time
+
+import httpx
+
+from app.config import settings
+from app.deadline import call_timeout, remaining
+from app.data.resilience import CLOSED, CircuitOpen, HostState, upstream_resilience
+from app.data.tape import WIRE_HEADERS, http_tape
+from app.metrics import counter, histogram
+
+# Statuses worth another attempt; they also count against the host's breaker
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS"}
+TIMEOUT_PHASES = ("connect", "read", "write", "pool")
+
+
+def _bound_by_deadline(request: httpx.Request) -> None:
+    """Inside a decision cycle, cap every timeout phase at the cycle's remaining budget."""
+    if remaining() is None:
+        return
+    timeout = request.extensions.get("timeout") or {}
+    request.extensions["timeout"] = {phase: call_timeout(timeout.get(phase)) for phase in TIMEOUT_PHASES}
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """
+    Records per-host latency and error counts for every upstream request, and
+    hands each exchange to the HTTP tape (recorded per cycle, or answered from
+    a tape with no network while replaying). Timeouts are capped by the
+    cycle's remaining budget (app/deadline.py).
+    """
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _bound_by_deadline(request)
+        if http_tape.replaying:
+            return await http_tape.serve(request)
+
+        host = request.url.host or "unknown"
+        started = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        except Exception as e:
+            http_tape.capture_error(request, e, time.perf_counter() - started)
+            counter(
+                "upstream_errors_total",
+                "Upstream requests that failed without a response.",
+                labels={"host": host, "error": type(e).__name__},
+            ).inc()
+            raise
+        finally:
+            histogram(
+                "upstream_request_seconds",
+                "Upstream HTTP latency until response headers, per host.",
+                labels={"host": host},
+            ).observe(time.perf_counter() - started)
+
+        counter(
+            "upstream_responses_total",
+            "Upstream responses per host and status code.",
+            labels={"host": host, "status": str(response.status_code)},
+        ).inc()
+        return await http_tape.capture(request, response, time.perf_counter() - started)
+
+
+def _idempotent(request: httpx.Request) -> bool:
+    """GETs, and requests sent with extensions={"idempotent": True} (read-only POST searches)."""
+    return request.method in IDEMPOTENT_METHODS or bool(request.extensions.get("idempotent"))
+
+
+class ResilientTransport(InstrumentedTransport):
+    """
+    InstrumentedTransport guarded per upstream host (app/data/resilience.py):
+
+    - a circuit breaker fails requests fast while the host is down, answering
+      idempotent ones from the last good response when there is one;
+    - idempotent requests are retried on network errors and 429/5xx, with
+      full-jitter exponential backoff (or the server's Retry-After), while
+      the retries fit in one read timeout: a timed-out request is not
+      retried, so a hung host costs one timeout, not one per attempt;
+    - an idempotent request still unanswered after the host's p95 latency is
+      sent again, within a budget, and the first good response wins.
+
+    Replayed tapes are served as recorded, and nothing is hedged while a
+    cycle is being recorded.
+    """
+
+    async def _attempt(self, request: httpx.Request, state: HostState) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await super().handle_async_request(request)
+        except asyncio.CancelledError:
+            state.breaker.release()
+            raise
+        except Exception:
+            state.breaker.failure()
+            raise
+        if response.status_code in RETRY_STATUSES:
+            state.breaker.failure()
+        else:
+            state.breaker.success()
+            state.latencies.append(time.perf_counter() - started)
+        return response
+
+    async def _hedged(self, request: httpx.Request, state: HostState, delay: float | None) -> httpx.Response:
+        if delay is None:
+            return await self._attempt(request, state)
+
+        primary = asyncio.create_task(self._attempt(request, state))
+        tasks, hedge, result = {primary}, None, None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                hedge = asyncio.create_task(self._attempt(request, state))
+                tasks.add(hedge)
+                state.hedges += 1
+                counter("upstream_hedges_total", "Duplicate requests sent after the host's p95.", labels={"host": state.host}).inc()
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task
+                    if task.exception() is None and task.result().status_code not in RETRY_STATUSES:
+                        if task is hedge:
+                            state.hedge_wins += 1
+                        return task.result()
+            # Every attempt failed: the last one's error or retryable response
+            return result.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif task is not result and not task.cancelled() and task.exception() is None:
+                    await task.result().aclose()
+
+    async def _remember(self, request: httpx.Request, response: httpx.Response) -> httpx.Response:
+        """Keep a good response for the breaker fallback; returns one the caller can still read."""
+        if not 200 <= response.status_code < 300 or upstream_resilience.max_entries <= 0:
+            return response
+        content = await response.aread()
+        await response.aclose()
+        headers = [(k, v) for k, v in response.headers.multi_items() if k.lower() not in WIRE_HEADERS]
+        upstream_resilience.remember(request, response.status_code, headers, content)
+        return httpx.Response(
+            response.status_code, headers=headers, content=content, request=request, extensions=response.extensions
+        )
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: str | None) -> float:
+        if retry_after:
+            try:
+                return min(settings.HTTP_RETRY_MAX_SECONDS, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        return random.uniform(0, min(settings.HTTP_RETRY_MAX_SECONDS, settings.HTTP_RETRY_BASE_SECONDS * 2 ** attempt))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if http_tape.replaying or not settings.HTTP_RESILIENCE_ENABLED:
+            return await super().handle_async_request(request)
+
+        _bound_by_deadline(request)
+        state = upstream_resilience.host(request)
+        state.requests += 1
+        idempotent = _idempotent(request)
+        attempts = settings.HTTP_RETRIES + 1 if idempotent else 1
+        budget = (request.extensions.get("timeout") or {}).get("read") or float("inf")
+        started = time.monotonic()
+        for attempt in range(attempts):
+            if not state.breaker.allow():
+                fallback = upstream_resilience.fallback(request) if idempotent else None
+                if fallback is None:
+                    raise CircuitOpen(f"Circuit breaker open for {state.host}", request=request)
+                return fallback
+
+            hedge_delay = None
+            if idempotent and state.breaker.state == CLOSED and not http_tape.recording:
+                hedge_delay = state.hedge_delay()
+            last = attempt == attempts - 1
+            try:
+                response = await self._hedged(request, state, hedge_delay)
+            except httpx.TransportError:
+                # This failure may just have opened the breaker: answer from the cache then
+                fallback = upstream_resilience.fallback(request) if idempotent and state.breaker.state != CLOSED else None
+                if fallback is not None:
+                    return fallback
+                backoff = self._backoff(attempt, None)
+                if last or time.monotonic() - started + backoff > budget:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    return await self._remember(request, response) if idempotent else response
+                fallback = upstream_resilience.fallback(request) if idempotent and state.breaker.state != CLOSED else None
+                if fallback is not None:
+                    await response.aclose()
+                    return fallback
+                backoff = self._backoff(attempt, response.headers.get("retry-after"))
+                if last or time.monotonic() - started + backoff > budget:
+                    return response
+                await response.aclose()
+
+            state.retries += 1
+            counter("upstream_retries_total", "Idempotent requests attempted again.", labels={"host": state.host}).inc()
+            await asyncio.sleep(backoff)
+
+
+def async_client(timeout: float = 10, **kwargs) -> httpx.AsyncClient:
+    """httpx.AsyncClient whose requests show up in the upstream metrics and go through ResilientTransport."""
+    kwargs.setdefault("transport", ResilientTransport())
+    return httpx.AsyncClient(timeout=timeout, **kwargs)
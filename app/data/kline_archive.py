@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.config import settings
+from app.data.shared_ring import KLINE, kline_row
+from app.schemas.kline_archive import KlineArchiveInfo, KlineSegment
+
+META_FILE = "meta.json"
+UNIT_MS = {"s": 1_000, "m": 60_000, "h": 3_600_000, "d": 86_400_000, "w": 604_800_000}
+
+
+def interval_ms(interval: str) -> int:
+    """Length of a Binance kline interval ("1m", "4h", ...); months have no fixed length."""
+    if interval[-1] not in UNIT_MS:
+        raise ValueError(f"interval {interval} has no fixed length")
+    return int(interval[:-1]) * UNIT_MS[interval[-1]]
+
+
+def to_columns(klines) -> dict[str, np.ndarray]:
+    """REST kline rows (lists) or a KLINE array as one array per column."""
+    if not isinstance(klines, np.ndarray):
+        klines = np.array([kline_row(k) for k in klines], dtype=KLINE)
+    return {name: np.ascontiguousarray(klines[name]) for name in KLINE.names}
+
+
+def _latest_sorted(columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """Rows sorted by open_time with one row per candle (the last written copy wins)."""
+    open_times = columns["open_time"]
+    # Stable sort of the reversed rows keeps the newest copy first among equal open times
+    order = len(open_times) - 1 - np.argsort(open_times[::-1], kind="stable")
+    keep = order[np.concatenate(([True], np.diff(open_times[order]) != 0))] if len(order) else order
+    return {name: np.ascontiguousarray(values[keep]) for name, values in columns.items()}
+
+
+class KlineArchive:
+    """
+    Append-only columnar kline archive on disk, one directory per (symbol,
+    interval): a raw file per KLINE column plus meta.json. Reads go through
+    numpy.memmap, so loading years of candles maps the files instead of
+    parsing them, and a time range is two binary searches on the sorted
+    open_time column (the time index) followed by zero-copy slices.
+
+    Every append becomes a checksummed segment. Appends of newer candles keep
+    the archive sorted; older or repeated ones (e.g. filling a gap) mark it
+    unsorted until compact() rewrites it sorted and de-duplicated, as a new
+    generation of files swapped in atomically, so readers holding maps of
+    the previous generation are unaffected. One writer per archive: only
+    append() (and the backfill that owns it) compacts; load() never writes,
+    and sorts an unsorted range in memory instead.
+    """
+
+    def __init__(self, root: str | Path = settings.KLINE_ARCHIVE_DIR, max_segments: int = settings.KLINE_ARCHIVE_MAX_SEGMENTS):
+        self.root = Path(root)
+        self.max_segments = max_segments
+
+    def _dir(self, symbol: str, interval: str) -> Path:
+        return self.root / symbol.upper() / interval
+
+    def _meta(self, symbol: str, interval: str) -> dict:
+        path = self._dir(symbol, interval) / META_FILE
+        if not path.exists():
+            return {"rows": 0, "sorted": True, "generation": 0, "segments": [], "first_open_time": None, "last_open_time": None}
+        return json.loads(path.read_text())
+
+    def _write_meta(self, symbol: str, interval: str, meta: dict) -> None:
+        path = self._dir(symbol, interval) / META_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, path)
+
+    def _column_path(self, symbol: str, interval: str, generation: int, name: str) -> Path:
+        return self._dir(symbol, interval) / f"g{generation}" / f"{name}.bin"
+
+    @staticmethod
+    def _checksum(columns: dict[str, np.ndarray]) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        for name in KLINE.names:
+            digest.update(columns[name].tobytes())
+        return digest.hexdigest()
+
+    def symbols(self) -> list[tuple[str, str]]:
+        return sorted((path.parent.parent.name, path.parent.name) for path in self.root.glob(f"*/*/{META_FILE}"))
+
+    def append(self, symbol: str, interval: str, klines, now_ms: int | None = None) -> int:
+        """
+        Archive closed candles (close_time before `now_ms`, default now).
+        Returns the number of rows written.
+        """
+        columns = to_columns(klines)
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        closed = columns["close_time"] < now_ms
+        columns = {name: values[closed] for name, values in columns.items()}
+        rows = len(columns["open_time"])
+        if not rows:
+            return 0
+
+        meta = self._meta(symbol, interval)
+        directory = self._dir(symbol, interval) / f"g{meta['generation']}"
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in KLINE.names:
+            path = self._column_path(symbol, interval, meta["generation"], name)
+            with open(path, "ab") as f:
+                # Bytes past meta["rows"] are leftovers of an interrupted append
+                f.truncate(meta["rows"] * KLINE[name].itemsize)
+                f.write(columns[name].tobytes())
+
+        open_times = columns["open_time"]
+        in_order = bool(np.all(np.diff(open_times) > 0)) and (
+            meta["last_open_time"] is None or int(open_times[0]) > meta["last_open_time"]
+        )
+        meta["segments"].append({"start": meta["rows"], "rows": rows, "checksum": self._checksum(columns)})
+        meta["rows"] += rows
+        meta["sorted"] = meta["sorted"] and in_order
+        first, last = int(open_times.min()), int(open_times.max())
+        meta["first_open_time"] = first if meta["first_open_time"] is None else min(first, meta["first_open_time"])
+        meta["last_open_time"] = last if meta["last_open_time"] is None else max(last, meta["last_open_time"])
+        self._write_meta(symbol, interval, meta)
+
+        if len(meta["segments"]) > self.max_segments:
+            self.compact(symbol, interval)
+        return rows
+
+    def _map(self, symbol: str, interval: str, meta: dict) -> dict[str, np.ndarray]:
+        rows = meta["rows"]
+        if not rows:
+            return {name: np.empty(0, dtype=KLINE[name]) for name in KLINE.names}
+        return {
+            name: np.memmap(self._column_path(symbol, interval, meta["generation"], name), dtype=KLINE[name], mode="r", shape=(rows,))
+            for name in KLINE.names
+        }
+
+    def load(self, symbol: str, interval: str, start_ms: int | None = None, end_ms: int | None = None) -> dict[str, np.ndarray]:
+        """
+        Read-only memmap slices per column for candles opening in
+        [start_ms, end_ms). While the archive is unsorted (until its writer
+        compacts it) the range is copied, sorted and de-duplicated in memory.
+        """
+        meta = self._meta(symbol, interval)
+        columns = self._map(symbol, interval, meta)
+        open_times = columns["open_time"]
+        if not meta["sorted"]:
+            wanted = np.ones(len(open_times), dtype=bool)
+            if start_ms is not None:
+                wanted &= open_times >= start_ms
+            if end_ms is not None:
+                wanted &= open_times < end_ms
+            rows = np.flatnonzero(wanted)
+            return _latest_sorted({name: values[rows] for name, values in columns.items()})
+        lo = 0 if start_ms is None else int(np.searchsorted(open_times, start_ms, side="left"))
+        hi = len(open_times) if end_ms is None else int(np.searchsorted(open_times, end_ms, side="left"))
+        return {name: values[lo:hi] for name, values in columns.items()}
+
+    def compact(self, symbol: str, interval: str) -> KlineArchiveInfo:
+        """Rewrite as one sorted, de-duplicated segment (the last write of a candle wins)."""
+        meta = self._meta(symbol, interval)
+        compacted = _latest_sorted(self._map(symbol, interval, meta))
+
+        generation = meta["generation"] + 1
+        directory = self._dir(symbol, interval) / f"g{generation}"
+        shutil.rmtree(directory, ignore_errors=True)
+        directory.mkdir(parents=True)
+        for name in KLINE.names:
+            with open(directory / f"{name}.bin", "wb") as f:
+                f.write(compacted[name].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        rows = len(compacted["open_time"])
+        new_meta = {
+            "rows": rows,
+            "sorted": True,
+            "generation": generation,
+            "segments": [{"start": 0, "rows": rows, "checksum": self._checksum(compacted)}] if rows else [],
+            "first_open_time": int(compacted["open_time"][0]) if rows else None,
+            "last_open_time": int(compacted["open_time"][-1]) if rows else None,
+        }
+        self._write_meta(symbol, interval, new_meta)
+        # Open maps of the old generation stay valid: unlinking keeps the inodes alive
+        shutil.rmtree(self._dir(symbol, interval) / f"g{meta['generation']}", ignore_errors=True)
+        return self.info(symbol, interval)
+
+    def verify(self, symbol: str, interval: str) -> list[int]:
+        """Indexes of segments whose bytes no longer match their checksum (empty when intact)."""
+        meta = self._meta(symbol, interval)
+        columns = self._map(symbol, interval, meta)
+        return [
+            i for i, segment in enumerate(meta["segments"])
+            if self._checksum({
+                name: values[segment["start"]:segment["start"] + segment["rows"]] for name, values in columns.items()
+            }) != segment["checksum"]
+        ]
+
+    def info(self, symbol: str, interval: str) -> KlineArchiveInfo:
+        meta = self._meta(symbol, interval)
+        return KlineArchiveInfo(
+            symbol=symbol.upper(),
+            interval=interval,
+            rows=meta["rows"],
+            first_open_time=meta["first_open_time"],
+            last_open_time=meta["last_open_time"],
+            sorted=meta["sorted"],
+            generation=meta["generation"],
+            segments=[KlineSegment(**segment) for segment in meta["segments"]],
+            bytes=meta["rows"] * KLINE.itemsize,
+        )
+
+
+kline_archive = KlineArchive()
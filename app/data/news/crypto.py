@@ -1,8 +1,44 @@
 import requests
 from app.schemas.crypto_news import CryptoNewsRequest, CryptoNewsResponse
+from app.config import settings
+from app.analysis.executor import analysis_executor
+from app.data.http_client import async_client
+
+BASE_URL = settings.COINDESK_API_URL
+
+
+def build_news_params(request: CryptoNewsRequest) -> dict:
+    params = {
+        "lang": request.lang,
+        "source_key": request.source_key,
+        "search_string": request.search_string,
+        "limit": request.limit
+    }
+
+    if request.to_ts != -1:
+        params["to_ts"] = request.to_ts
+    return params
+
+
+async def fetch_crypto_news_payload(request: CryptoNewsRequest) -> bytes:
+    """Undecoded /search response body, for parsing in the analysis pool."""
+    async with async_client(timeout=10) as client:
+        response = await client.get(
+            f"{BASE_URL}/search",
+            params=build_news_params(request),
+            headers={"Content-type": "application/json; charset=UTF-8"}
+        )
+        response.raise_for_status()
+    return response.content
+
+
+async def fetch_crypto_news(request: CryptoNewsRequest) -> CryptoNewsResponse:
+    # Article bodies make this payload large; decode and validate it off the event loop
+    return await analysis_executor.run(CryptoNewsResponse.model_validate_json, await fetch_crypto_news_payload(request))
+
 
 class CryptoNews:
-    BASE_URL = "https://data-api.coindesk.com/news/v1"
+    BASE_URL = BASE_URL
 
     def __init__(self, timeout: int = 10):
         self.timeout = timeout
@@ -11,17 +47,7 @@ class CryptoNews:
 
     def search_news(self, request: CryptoNewsRequest) -> CryptoNewsResponse:
         url = f"{self.BASE_URL}/search"
-        params = {
-            "lang": request.lang,
-            "source_key": request.source_key,
-            "search_string": request.search_string,
-            "limit": request.limit
-        }
-        
-        if request.to_ts != -1:
-            params["to_ts"] = request.to_ts
-        
-        response = self.session.get(url, params=params, timeout=self.timeout)
+        response = self.session.get(url, params=build_news_params(request), timeout=self.timeout)
         response.raise_for_status()
         data = response.json()
         
@@ -1,18 +1,15 @@
 import requests
-import os
-from dotenv import load_dotenv
+from app.config import settings
 from app.schemas.global_news import GlobalNewsRequest, GlobalNewsResponse
 
-load_dotenv()
-
 class GlobalNews:
-    BASE_URL = "https://eventregistry.org/api/v1/article"
+    BASE_URL = settings.EVENTREGISTRY_API_URL
 
     def __init__(self, timeout: int = 30):
         self.timeout = timeout
         self.session = requests.Session()
         self.session.headers.update({"Content-Type": "application/json"})
-        self.api_key = os.getenv("NEWS_AI_API_KEY")
+        self.api_key = settings.NEWS_AI_API_KEY or None
 
     def get_articles(self, request: GlobalNewsRequest) -> str:
         url = f"{self.BASE_URL}/getArticles"
@@ -0,0 +1,190 @@
+"""
+Per-host state behind ResilientTransport (app/data/http_client.py).
+
+Every upstream host gets a circuit breaker, a window of recent latencies
+(its p95 is the hedge delay) and a count of hedges against a budget. Good
+responses to idempotent requests are kept in a small LRU so a host whose
+breaker is open can still be answered, stale, from the last good result.
+Such answers carry their age in FALLBACK_AGE_HEADER (read it with
+fallback_age()); market-data endpoints are only answered for a few seconds,
+and requests sent with extensions={"live": True} never are.
+
+State is process-wide: async_client() builds a new transport per call, and
+the breakers must outlive them.
+"""
+import hashlib
+import time
+from collections import OrderedDict, deque
+
+import httpx
+import numpy as np
+
+from app.config import settings
+from app.metrics import counter
+from app.schemas.resilience import ResilienceStats, UpstreamHostStats
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+MIN_HEDGE_SAMPLES = 20
+FALLBACK_AGE_HEADER = "x-upstream-fallback-age"
+# Prices go stale in seconds: these paths get HTTP_FALLBACK_PRICE_MAX_AGE_SECONDS
+PRICE_PATHS = ("/ticker", "/ticker/24hr", "/ticker/price", "/ticker/bookTicker", "/depth", "/klines")
+
+
+class CircuitOpen(httpx.TransportError):
+    """The host's breaker is open and nothing is cached; tools see it like a network failure."""
+
+
+def fallback_age(response: httpx.Response) -> float | None:
+    """Seconds since a breaker fallback was first received, or None for a fresh response."""
+    age = response.headers.get(FALLBACK_AGE_HEADER)
+    return float(age) if age is not None else None
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failed attempts; after `cooldown`
+    seconds one probe request is let through (half-open), and its outcome
+    closes the breaker or opens it for another cooldown.
+    """
+
+    def __init__(self, host: str, failures: int = settings.HTTP_BREAKER_FAILURES,
+                 cooldown: float = settings.HTTP_BREAKER_COOLDOWN_SECONDS):
+        self.host = host
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def success(self) -> None:
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._probing = False
+
+    def failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or (self.state == CLOSED and self.consecutive_failures >= self.failures):
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+            counter(
+                "upstream_breaker_opened_total", "Times a host's circuit breaker opened.", labels={"host": self.host}
+            ).inc()
+
+    def release(self) -> None:
+        """An attempt ended without an outcome (a cancelled hedge): free the half-open probe."""
+        self._probing = False
+
+
+class HostState:
+    def __init__(self, host: str):
+        self.host = host
+        self.breaker = CircuitBreaker(host)
+        self.latencies: deque[float] = deque(maxlen=settings.HTTP_HEDGE_WINDOW)
+        self.requests = self.retries = self.hedges = self.hedge_wins = self.fallbacks = 0
+
+    def hedge_delay(self) -> float | None:
+        """Seconds to wait before a duplicate request, or None when hedging is off or over budget."""
+        if not settings.HTTP_HEDGE_ENABLED or len(self.latencies) < MIN_HEDGE_SAMPLES:
+            return None
+        if self.hedges >= settings.HTTP_HEDGE_MAX_FRACTION * self.requests:
+            return None
+        return max(settings.HTTP_HEDGE_MIN_MS / 1000, float(np.percentile(self.latencies, 95)))
+
+
+class UpstreamResilience:
+    def __init__(
+        self,
+        max_entries: int = settings.HTTP_FALLBACK_CACHE_ENTRIES,
+        max_age: float = settings.HTTP_FALLBACK_MAX_AGE_SECONDS,
+        price_max_age: float = settings.HTTP_FALLBACK_PRICE_MAX_AGE_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.price_max_age = price_max_age
+        self._hosts: dict[str, HostState] = {}
+        self._cache: OrderedDict[str, tuple[float, int, list[tuple[str, str]], bytes]] = OrderedDict()
+
+    def host(self, request: httpx.Request) -> HostState:
+        host = request.url.host or "unknown"
+        if host not in self._hosts:
+            self._hosts[host] = HostState(host)
+        return self._hosts[host]
+
+    @staticmethod
+    def _key(request: httpx.Request) -> str:
+        return hashlib.sha1(b"\n".join([request.method.encode(), str(request.url).encode(), request.content])).hexdigest()
+
+    def remember(self, request: httpx.Request, status: int, headers: list[tuple[str, str]], content: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        key = self._key(request)
+        self._cache[key] = (time.monotonic(), status, headers, content)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+    def fallback(self, request: httpx.Request) -> httpx.Response | None:
+        """
+        The last good response to this exact request, if younger than max_age
+        (price_max_age for PRICE_PATHS). None for requests that asked to fail
+        rather than be answered stale.
+        """
+        if request.extensions.get("live"):
+            return None
+        entry = self._cache.get(self._key(request))
+        if entry is None:
+            return None
+        stored_at, status, headers, content = entry
+        age = time.monotonic() - stored_at
+        if age > (self.price_max_age if request.url.path.endswith(PRICE_PATHS) else self.max_age):
+            return None
+        self.host(request).fallbacks += 1
+        counter(
+            "upstream_fallbacks_total",
+            "Requests answered from the last good response while the host's breaker was open.",
+            labels={"host": request.url.host or "unknown"},
+        ).inc()
+        return httpx.Response(
+            status,
+            headers=[*headers, (FALLBACK_AGE_HEADER, f"{age:.1f}")],
+            content=content,
+            request=request,
+        )
+
+    def stats(self) -> ResilienceStats:
+        return ResilienceStats(
+            cached_responses=len(self._cache),
+            hosts=[
+                UpstreamHostStats(
+                    host=state.host,
+                    breaker=state.breaker.state,
+                    consecutive_failures=state.breaker.consecutive_failures,
+                    requests=state.requests,
+                    retries=state.retries,
+                    hedges=state.hedges,
+                    hedge_wins=state.hedge_wins,
+                    fallbacks=state.fallbacks,
+                    p95_ms=float(np.percentile(state.latencies, 95)) * 1000 if state.latencies else None,
+                )
+                for state in self._hosts.values()
+            ],
+        )
+
+    def reset(self) -> None:
+        self._hosts.clear()
+        self._cache.clear()
+
+
+upstream_resilience = UpstreamResilience()
@@ -0,0 +1,145 @@
+import asyncio
+import time
+
+from app.config import settings
+from app.data.http_client import async_client
+from app.schemas.robinhood_account_info import (
+    RobinhoodAccountInfoResponse,
+    RobinhoodCryptoHoldingsResponse,
+    RobinhoodCryptoHoldingsResultsItem,
+    RobinhoodCryptoOrdersResponse,
+)
+
+
+class AccountStateCache:
+    """
+    Shared snapshot of the Robinhood account and crypto holdings.
+
+    Account info and holdings only change when an order fills, so every cycle
+    (and every symbol within a cycle) reads the same snapshot until the TTL
+    expires or an order event invalidates it. Concurrent callers share a single
+    in-flight upstream request.
+    """
+
+    def __init__(self, ttl: float = settings.ACCOUNT_CACHE_TTL_SECONDS, timeout: int = 10):
+        self.ttl = ttl
+        self.timeout = timeout
+
+        self._account_info: RobinhoodAccountInfoResponse | None = None
+        self._account_info_at = 0.0
+        self._holdings: RobinhoodCryptoHoldingsResponse | None = None
+        self._holdings_by_asset: dict[str, RobinhoodCryptoHoldingsResultsItem] = {}
+        self._holdings_at = 0.0
+
+        # Bumped on every invalidation so a fetch that started before an order
+        # event never repopulates the cache with pre-order state.
+        self._generation = 0
+        self._order_states: dict[str, str] = {}
+        self._orders_observed = False
+
+        self._account_lock = asyncio.Lock()
+        self._holdings_lock = asyncio.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _is_fresh(self, fetched_at: float) -> bool:
+        return (time.monotonic() - fetched_at) < self.ttl
+
+    async def _post(self, path: str) -> dict:
+        async with async_client(timeout=self.timeout) as client:
+            response = await client.post(f"{settings.ROBINHOOD_BASE_URL}{path}")
+            response.raise_for_status()
+            return response.json()
+
+    async def get_account_info(self) -> RobinhoodAccountInfoResponse:
+        if self._account_info is not None and self._is_fresh(self._account_info_at):
+            self.hits += 1
+            return self._account_info
+
+        async with self._account_lock:
+            # Another caller may have refreshed while we waited for the lock
+            if self._account_info is not None and self._is_fresh(self._account_info_at):
+                self.hits += 1
+                return self._account_info
+
+            self.misses += 1
+            generation = self._generation
+            account_info = RobinhoodAccountInfoResponse(**await self._post("/get-account"))
+
+            if generation == self._generation:
+                self._account_info = account_info
+                self._account_info_at = time.monotonic()
+            return account_info
+
+    async def get_holdings(self) -> RobinhoodCryptoHoldingsResponse:
+        if self._holdings is not None and self._is_fresh(self._holdings_at):
+            self.hits += 1
+            return self._holdings
+
+        async with self._holdings_lock:
+            if self._holdings is not None and self._is_fresh(self._holdings_at):
+                self.hits += 1
+                return self._holdings
+
+            self.misses += 1
+            generation = self._generation
+            holdings = RobinhoodCryptoHoldingsResponse(**await self._post("/getCryptoHoldings"))
+
+            if generation == self._generation:
+                self._holdings = holdings
+                self._holdings_by_asset = {item.asset_code.upper(): item for item in holdings.results}
+                self._holdings_at = time.monotonic()
+            return holdings
+
+    async def get_holding(self, asset_code: str) -> RobinhoodCryptoHoldingsResultsItem | None:
+        """Holding for a single asset (e.g. "DOGE"), or None if the account holds none."""
+        asset_code = asset_code.upper()
+        holdings = await self.get_holdings()
+        if holdings is self._holdings:
+            return self._holdings_by_asset.get(asset_code)
+        # Fetched while an order invalidated the cache: not indexed, but still this caller's answer
+        return next((item for item in holdings.results if item.asset_code.upper() == asset_code), None)
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; the next read goes upstream."""
+        self._generation += 1
+        self._account_info = None
+        self._holdings = None
+        self._holdings_by_asset = {}
+        self._account_info_at = 0.0
+        self._holdings_at = 0.0
+        self.invalidations += 1
+
+    def observe_orders(self, orders: RobinhoodCryptoOrdersResponse) -> bool:
+        """
+        Record the latest known state of each order and invalidate the snapshot
+        if any order changed state (or a new order appeared) since the last call.
+        Returns True when the cache was invalidated.
+        """
+        changed = False
+        for order in orders.data:
+            previous = self._order_states.get(order.id)
+            if previous != order.state and (previous is not None or self._orders_observed):
+                changed = True
+            self._order_states[order.id] = order.state
+        self._orders_observed = True
+
+        if changed:
+            self.invalidate()
+        return changed
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "invalidations": self.invalidations,
+            "account_info_age": time.monotonic() - self._account_info_at if self._account_info else None,
+            "holdings_age": time.monotonic() - self._holdings_at if self._holdings else None,
+        }
+
+
+account_cache = AccountStateCache()
@@ -1,6 +1,31 @@
+import httpx
 import requests
 from app.schemas.robinhood_account_info import RobinhoodCryptoOrdersRequest, RobinhoodAccountInfoResponse, RobinhoodCryptoHoldingsResponse, RobinhoodCryptoOrdersResponse, RobinhoodTradingPairsResponse, RobinhoodTradingPairsRequest
 from app.config import settings
+from app.data.http_client import async_client
+
+def _crypto_orders_call(request: RobinhoodCryptoOrdersRequest) -> tuple[str, dict]:
+    url = f"{settings.ROBINHOOD_BASE_URL}/getCryptoOrders?startDate={request.start_date}&endDate={request.end_date}&symbol={request.symbol}&type={request.type}"
+    payload = {
+        "start_date": request.start_date,
+        "end_date": request.end_date,
+        "symbol": request.symbol,
+        "type": request.type
+    }
+    return url, payload
+
+
+async def fetch_crypto_orders(request: RobinhoodCryptoOrdersRequest, client: httpx.AsyncClient | None = None) -> RobinhoodCryptoOrdersResponse:
+    url, payload = _crypto_orders_call(request)
+    if client is not None:
+        response = await client.post(url, json=payload)
+    else:
+        async with async_client(timeout=10) as new_client:
+            response = await new_client.post(url, json=payload)
+    response.raise_for_status()
+
+    return RobinhoodCryptoOrdersResponse(**response.json())
+
 
 class RobinhoodAccountInfo:
     BASE_URL = settings.ROBINHOOD_BASE_URL
@@ -26,13 +51,7 @@ class RobinhoodAccountInfo:
         return RobinhoodCryptoHoldingsResponse(**data)
     
     def get_crypto_orders(self, request: RobinhoodCryptoOrdersRequest) -> RobinhoodCryptoOrdersResponse:
-        url = f"{self.BASE_URL}/getCryptoOrders?startDate={request.start_date}&endDate={request.end_date}&symbol={request.symbol}&type={request.type}"
-        payload = {
-            "start_date": request.start_date,
-            "end_date": request.end_date,
-            "symbol": request.symbol,
-            "type": request.type
-        }
+        url, payload = _crypto_orders_call(request)
         response = self.session.post(url, json=payload, timeout=self.timeout)
         response.raise_for_status()
         data = response.json()
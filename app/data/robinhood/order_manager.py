@@ -0,0 +1,456 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.config import settings
+from app.data.http_client import async_client
+from app.data.robinhood.account_cache import account_cache
+from app.data.robinhood.account_info import fetch_crypto_orders
+from app.database.crud.actions import update_action_statuses
+from app.metrics import counter, histogram
+from app.schemas.actions_history import ActionStatusUpdate
+from app.schemas.robinhood_account_info import RobinhoodCryptoOrdersDataItem, RobinhoodCryptoOrdersRequest
+from app.schemas.trading import (
+    OrderExecution,
+    OrderManagerStats,
+    PlaceOrderRequest,
+    PlaceOrderResponse,
+    TrackedOrder,
+)
+
+logger = logging.getLogger(__name__)
+
+FILLED_STATES = {"filled"}
+NOT_FILLED_STATES = {"canceled", "cancelled", "rejected", "failed"}
+# Responses after which the order may or may not exist upstream
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+# An order whose submit outcome was unknown and that never shows up upstream
+UNKNOWN_ORDER_TIMEOUT_SECONDS = 300
+
+
+def _parse_ts(value: str) -> float | None:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def _is_ambiguous(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS
+    return isinstance(error, httpx.TransportError)
+
+
+def _float(value) -> float | None:
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def _executed(order: TrackedOrder) -> tuple[float, float]:
+    """(asset quantity, average price) actually executed, whatever the final state."""
+    fills = [(_float(e.quantity) or 0.0, _float(e.effective_price) or 0.0) for e in order.executions]
+    quantity = order.filled_asset_quantity or sum(q for q, _ in fills)
+    price = order.average_price
+    if not price and quantity:
+        price = sum(q * p for q, p in fills) / (sum(q for q, _ in fills) or 1.0)
+    return quantity, price or 0.0
+
+
+class OrderManager:
+    """
+    Places Robinhood orders idempotently and tracks them until they settle.
+
+    Every order gets a `client_order_id` before its first attempt. When a
+    submit fails without a definite answer (timeout, 5xx, 429) the manager
+    first looks the order up by that ID and only resubmits, with the same ID,
+    when it is not there, so a retry can never place a second order.
+
+    Open orders are tracked by one background task that polls
+    `getCryptoOrders` for all of them concurrently (one request per symbol and
+    order type), backing off while nothing changes. Settled orders are written
+    back to `crypto_trade_history` in batches via `update_action_statuses`.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = settings.ORDER_SUBMIT_RETRIES,
+        min_poll_interval: float = settings.ORDER_POLL_MIN_INTERVAL_SECONDS,
+        max_poll_interval: float = settings.ORDER_POLL_MAX_INTERVAL_SECONDS,
+        timeout: int = 10,
+    ):
+        self.max_retries = max_retries
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+
+        self.orders: dict[str, TrackedOrder] = {}
+        self._settled: dict[str, asyncio.Event] = {}
+        self._pending_updates: list[ActionStatusUpdate] = []
+        # Fills seen by this process, per symbol: (asset quantity, cost in USD).
+        # Used as the cost basis when a sell settles.
+        self._positions: dict[str, tuple[float, float]] = {}
+
+        self.interval = min_poll_interval
+        self._task: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+
+        self.submitted = 0
+        self.acked = 0
+        self.retries = 0
+        self.reconciled = 0
+        self.filled = 0
+        self.not_filled = 0
+        self.polls = 0
+        self.poll_errors = 0
+        self.status_updates_flushed = 0
+
+        self.submit_to_ack = histogram(
+            "robinhood_order_submit_to_ack_seconds", "Time from first submit attempt to Robinhood acknowledging the order."
+        )
+        self.ack_to_fill = histogram(
+            "robinhood_order_ack_to_fill_seconds", "Time from acknowledgement to the last execution of a filled order."
+        )
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+    async def _post_order(self, client: httpx.AsyncClient, request: PlaceOrderRequest) -> PlaceOrderResponse:
+        response = await client.post(
+            f"{settings.ROBINHOOD_BASE_URL}/place/order",
+            json=request.model_dump(exclude_none=True),
+        )
+        response.raise_for_status()
+        return PlaceOrderResponse(**response.json())
+
+    def _orders_request(self, order: TrackedOrder) -> RobinhoodCryptoOrdersRequest:
+        start = datetime.fromtimestamp(order.submitted_at, timezone.utc).date()
+        end = datetime.now(timezone.utc).date() + timedelta(days=1)
+        return RobinhoodCryptoOrdersRequest(
+            start_date=start.isoformat(),
+            end_date=end.isoformat(),
+            symbol=order.symbol,
+            type=order.type,
+        )
+
+    async def _find_upstream(self, client: httpx.AsyncClient, order: TrackedOrder) -> RobinhoodCryptoOrdersDataItem | None:
+        try:
+            orders = await fetch_crypto_orders(self._orders_request(order), client)
+        except Exception as e:
+            logger.warning(f"Order lookup for {order.client_order_id} failed: {e}")
+            return None
+        return next((item for item in orders.data if item.client_order_id == order.client_order_id), None)
+
+    async def submit(
+        self,
+        request: PlaceOrderRequest,
+        action_id: int | None = None,
+        order_type: str = "market",
+    ) -> TrackedOrder:
+        """
+        Place an order and start tracking it. `action_id` links the order to the
+        decision row that is updated once it settles. Submitting a request whose
+        `client_order_id` is already tracked (and not failed) returns the tracked order.
+        """
+        client_order_id = request.client_order_id or str(uuid.uuid4())
+        existing = self.orders.get(client_order_id)
+        if existing is not None and existing.state != "failed":
+            return existing
+
+        request = request.model_copy(update={"client_order_id": client_order_id})
+        order = TrackedOrder(
+            client_order_id=client_order_id,
+            symbol=request.symbol.upper(),
+            side=request.side.lower(),
+            type=order_type,
+            action_id=action_id,
+            submitted_at=time.time(),
+        )
+        self.orders[client_order_id] = order
+        self._settled[client_order_id] = asyncio.Event()
+        self.submitted += 1
+
+        started = time.perf_counter()
+        try:
+            async with async_client(timeout=self.timeout) as client:
+                upstream = await self._submit_with_retries(client, request, order)
+        except Exception as e:
+            if _is_ambiguous(e) or order.attempts > 1:
+                # It may still have landed (a resubmit can be refused because an
+                # earlier attempt did); the poller finds it by client_order_id
+                order.state = "unknown"
+                self._ensure_polling()
+            else:
+                order.state = "failed"
+                self._settle(order)
+                await self.flush()
+            raise
+        finally:
+            # Invalidate even on failure: the order may have reached the exchange
+            account_cache.invalidate()
+
+        self.acked += 1
+        order.acked_at = time.time()
+        self.submit_to_ack.observe(time.perf_counter() - started)
+
+        self._apply_upstream(order, upstream)
+        if order.settled_at is None:
+            self._ensure_polling()
+        else:
+            await self.flush()
+        return order
+
+    async def _submit_with_retries(
+        self,
+        client: httpx.AsyncClient,
+        request: PlaceOrderRequest,
+        order: TrackedOrder,
+    ) -> PlaceOrderResponse | RobinhoodCryptoOrdersDataItem:
+        for attempt in range(self.max_retries + 1):
+            order.attempts += 1
+            try:
+                return await self._post_order(client, request)
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                if not _is_ambiguous(e) and attempt > 0:
+                    # E.g. a duplicate client_order_id: an earlier attempt may have landed after all
+                    found = await self._find_upstream(client, order)
+                    if found is not None:
+                        self.reconciled += 1
+                        counter(
+                            "robinhood_order_reconciled_total", "Ambiguous submits found upstream by client_order_id."
+                        ).inc()
+                        return found
+                    raise
+                if not _is_ambiguous(e) or attempt == self.max_retries:
+                    raise
+                logger.warning(f"Order {order.client_order_id} submit failed ({e!r}), checking upstream")
+
+            # Outcome unknown: the order may have landed. Never resubmit before looking.
+            found = await self._find_upstream(client, order)
+            if found is not None:
+                self.reconciled += 1
+                counter("robinhood_order_reconciled_total", "Ambiguous submits found upstream by client_order_id.").inc()
+                return found
+
+            self.retries += 1
+            counter("robinhood_order_retries_total", "Order resubmits after an ambiguous failure.").inc()
+            await asyncio.sleep(0.5 * 2 ** attempt + random.uniform(0, 0.25))
+
+        raise RuntimeError("unreachable")
+
+    # ------------------------------------------------------------------
+    # State tracking
+    # ------------------------------------------------------------------
+    def _apply_upstream(self, order: TrackedOrder, item: PlaceOrderResponse | RobinhoodCryptoOrdersDataItem) -> bool:
+        """Copy the upstream view onto the tracked order. Returns True if the state changed."""
+        changed = item.state != order.state or len(item.executions) != len(order.executions)
+
+        order.order_id = item.id
+        order.state = item.state
+        if order.acked_at is None:
+            order.acked_at = time.time()
+        order.average_price = _float(item.average_price)
+        order.filled_asset_quantity = _float(item.filled_asset_quantity)
+        order.executions = [
+            OrderExecution(effective_price=e.effective_price, quantity=e.quantity, timestamp=e.timestamp)
+            for e in item.executions
+        ]
+
+        if order.state in FILLED_STATES or order.state in NOT_FILLED_STATES:
+            self._settle(order)
+        return changed
+
+    def _settle(self, order: TrackedOrder) -> None:
+        if order.settled_at is not None:
+            return
+        order.settled_at = time.time()
+        # A partial fill counts even when the rest was canceled
+        filled = order.state in FILLED_STATES or _executed(order)[0] > 0
+
+        if filled:
+            self.filled += 1
+            # Prefer the exchange's execution time; the poll interval would otherwise dominate
+            last_execution = max(
+                (ts for ts in (_parse_ts(e.timestamp) for e in order.executions) if ts is not None),
+                default=order.settled_at,
+            )
+            if order.acked_at is not None:
+                self.ack_to_fill.observe(max(0.0, last_execution - order.acked_at))
+            account_cache.invalidate()
+        else:
+            self.not_filled += 1
+
+        if order.action_id is not None:
+            self._pending_updates.append(self._status_update(order, filled))
+
+        event = self._settled.get(order.client_order_id)
+        if event is not None:
+            event.set()
+
+    def _status_update(self, order: TrackedOrder, filled: bool) -> ActionStatusUpdate:
+        if not filled:
+            # Nothing executed: the decision never became a position
+            return ActionStatusUpdate(action_id=order.action_id, is_open=False, quantity=0.0, amount_usd=0.0)
+
+        quantity, price = _executed(order)
+        held_qty, held_cost = self._positions.get(order.symbol, (0.0, 0.0))
+
+        if order.side == "buy":
+            self._positions[order.symbol] = (held_qty + quantity, held_cost + quantity * price)
+            return ActionStatusUpdate(
+                action_id=order.action_id, is_open=True, quantity=quantity, price=price, amount_usd=quantity * price
+            )
+
+        profit_loss = 0.0
+        if held_qty > 0:
+            avg_cost = held_cost / held_qty
+            closed = min(quantity, held_qty)
+            profit_loss = (price - avg_cost) * closed
+            self._positions[order.symbol] = (held_qty - closed, held_cost - avg_cost * closed)
+
+        return ActionStatusUpdate(
+            action_id=order.action_id,
+            is_open=False,
+            profit_loss=profit_loss,
+            quantity=quantity,
+            price=price,
+            amount_usd=quantity * price,
+        )
+
+    def open_orders(self) -> list[TrackedOrder]:
+        return [o for o in self.orders.values() if o.state != "submitting" and o.settled_at is None]
+
+    async def poll_once(self) -> bool:
+        """Refresh every open order. Returns True if any order changed."""
+        open_orders = self.open_orders()
+        if not open_orders:
+            return False
+        self.polls += 1
+
+        # One request per (symbol, type, window) covers all orders in that group
+        groups: dict[tuple, RobinhoodCryptoOrdersRequest] = {}
+        for order in open_orders:
+            request = self._orders_request(order)
+            groups.setdefault((request.symbol, request.type, request.start_date), request)
+
+        if self._client is not None:
+            results = await asyncio.gather(
+                *(fetch_crypto_orders(r, self._client) for r in groups.values()), return_exceptions=True
+            )
+        else:
+            async with async_client(timeout=self.timeout) as client:
+                results = await asyncio.gather(
+                    *(fetch_crypto_orders(r, client) for r in groups.values()), return_exceptions=True
+                )
+
+        by_id: dict[str, RobinhoodCryptoOrdersDataItem] = {}
+        by_client_id: dict[str, RobinhoodCryptoOrdersDataItem] = {}
+        for result in results:
+            if isinstance(result, Exception):
+                self.poll_errors += 1
+                logger.warning(f"Order poll failed: {result}")
+                continue
+            account_cache.observe_orders(result)
+            for item in result.data:
+                by_id[item.id] = item
+                by_client_id[item.client_order_id] = item
+
+        changed = False
+        now = time.time()
+        for order in open_orders:
+            item = by_id.get(order.order_id) or by_client_id.get(order.client_order_id)
+            if item is not None:
+                changed = self._apply_upstream(order, item) or changed
+            elif order.state == "unknown" and now - order.submitted_at > UNKNOWN_ORDER_TIMEOUT_SECONDS:
+                # Never reached the exchange
+                order.state = "failed"
+                self._settle(order)
+                changed = True
+        return changed
+
+    async def flush(self) -> int:
+        """Write queued status updates in one batch. Returns the number written."""
+        if not self._pending_updates:
+            return 0
+
+        batch, self._pending_updates = self._pending_updates, []
+        try:
+            await update_action_statuses(batch)
+        except Exception as e:
+            # Keep them for the next flush rather than losing fills
+            self._pending_updates = batch + self._pending_updates
+            logger.error(f"Flushing {len(batch)} order status updates failed: {e}")
+            return 0
+
+        self.status_updates_flushed += len(batch)
+        return len(batch)
+
+    async def _run(self) -> None:
+        self.interval = self.min_poll_interval
+        async with async_client(timeout=self.timeout) as client:
+            self._client = client
+            try:
+                while self.open_orders():
+                    await asyncio.sleep(self.interval)
+                    try:
+                        if await self.poll_once():
+                            self.interval = self.min_poll_interval
+                        else:
+                            self.interval = min(self.max_poll_interval, self.interval * 2)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        self.poll_errors += 1
+                        self.interval = self.max_poll_interval
+                        logger.warning(f"Order poll failed: {e}")
+                    await self.flush()
+            finally:
+                self._client = None
+
+    def _ensure_polling(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    # ------------------------------------------------------------------
+    # Reads / lifecycle
+    # ------------------------------------------------------------------
+    async def wait(self, client_order_id: str, timeout: float | None = None) -> TrackedOrder:
+        """Wait until the order settles (filled, canceled, rejected or failed)."""
+        await asyncio.wait_for(self._settled[client_order_id].wait(), timeout)
+        return self.orders[client_order_id]
+
+    def stats(self) -> OrderManagerStats:
+        return OrderManagerStats(
+            submitted=self.submitted,
+            acked=self.acked,
+            retries=self.retries,
+            reconciled=self.reconciled,
+            filled=self.filled,
+            not_filled=self.not_filled,
+            open_orders=len(self.open_orders()),
+            polls=self.polls,
+            poll_errors=self.poll_errors,
+            poll_interval_seconds=self.interval,
+            status_updates_flushed=self.status_updates_flushed,
+            submit_to_ack_seconds=self.submit_to_ack.snapshot(),
+            ack_to_fill_seconds=self.ack_to_fill.snapshot(),
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+order_manager = OrderManager()
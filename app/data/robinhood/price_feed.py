@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+import httpx
+
+from app.config import settings
+from app.data.http_client import async_client
+from app.schemas.robinhood_prices import BestPriceQuote, BestPriceResponse, PriceFeedStats
+
+logger = logging.getLogger(__name__)
+
+QuoteListener = Callable[[BestPriceQuote], None]
+
+
+class RobinhoodPriceFeed:
+    """
+    Background poller that keeps the latest Robinhood best bid/ask for every
+    tracked asset in memory.
+
+    All tracked assets are requested in one batched `/getBestPrice` call per
+    poll. Assets missing from the batched response are fetched individually,
+    and so is everything when the batched call fails; a proxy that rejects
+    the list form with a 4xx is asked one pair at a time from then on, so a
+    proxy that only answers single pairs still works. The poll interval halves
+    while prices are moving and backs off towards `max_interval` while they are
+    flat.
+    """
+
+    def __init__(
+        self,
+        to_currency: str = "USD",
+        min_interval: float = settings.PRICE_FEED_MIN_INTERVAL_SECONDS,
+        max_interval: float = settings.PRICE_FEED_MAX_INTERVAL_SECONDS,
+        move_threshold_bps: float = 1.0,
+        timeout: int = 10,
+    ):
+        self.to_currency = to_currency.upper()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.move_threshold_bps = move_threshold_bps
+        self.timeout = timeout
+
+        self.interval = min_interval
+        self.quotes: dict[str, BestPriceQuote] = {}
+        self._tracked: set[str] = set()
+        self._listeners: list[QuoteListener] = []
+        self._task: asyncio.Task | None = None
+        self._client: httpx.AsyncClient | None = None
+        # Cleared once the proxy rejects a list of pairs
+        self._batching = True
+
+        self.polls = 0
+        self.errors = 0
+        self.updates = 0
+        self.last_poll_latency_ms = 0.0
+        self._rate_window_start = time.time()
+        self._rate_window_updates = 0
+        self._updates_per_second = 0.0
+
+    # ------------------------------------------------------------------
+    # Subscription management
+    # ------------------------------------------------------------------
+    def track(self, *asset_codes: str) -> None:
+        self._tracked.update(code.upper() for code in asset_codes)
+
+    def untrack(self, *asset_codes: str) -> None:
+        for code in asset_codes:
+            self._tracked.discard(code.upper())
+            self.quotes.pop(code.upper(), None)
+
+    def add_listener(self, listener: QuoteListener) -> None:
+        """Register a callback invoked with every new quote."""
+        self._listeners.append(listener)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def get_quote(self, asset_code: str, max_age: float | None = None) -> BestPriceQuote | None:
+        quote = self.quotes.get(asset_code.upper())
+        if quote is None:
+            return None
+        if max_age is not None and (time.time() - quote.received_at) > max_age:
+            return None
+        return quote
+
+    def staleness(self) -> dict[str, float]:
+        now = time.time()
+        return {code: now - quote.received_at for code, quote in self.quotes.items()}
+
+    def stats(self) -> PriceFeedStats:
+        return PriceFeedStats(
+            tracked=sorted(self._tracked),
+            polls=self.polls,
+            errors=self.errors,
+            interval_seconds=self.interval,
+            last_poll_latency_ms=self.last_poll_latency_ms,
+            updates_per_second=self._updates_per_second,
+            staleness_seconds=self.staleness(),
+        )
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def ingest(self, response: BestPriceResponse) -> bool:
+        """
+        Store quotes from a best-price response (from the feed itself or from a
+        direct tool call). Returns True if any price moved beyond the threshold.
+        """
+        now = time.time()
+        moved = False
+
+        for raw in response.results:
+            asset_code = raw.symbol.split("-")[0].upper()
+            previous = self.quotes.get(asset_code)
+
+            if previous is not None and previous.quote.timestamp == raw.timestamp:
+                continue
+
+            if previous is None or previous.quote.price <= 0:
+                moved = True
+            else:
+                change_bps = abs(raw.price - previous.quote.price) / previous.quote.price * 10_000
+                moved = moved or change_bps >= self.move_threshold_bps
+
+            quote = BestPriceQuote(
+                asset_code=asset_code,
+                quote=raw,
+                received_at=now,
+                updates=(previous.updates if previous else 0) + 1,
+            )
+            self.quotes[asset_code] = quote
+            self.updates += 1
+            self._rate_window_updates += 1
+
+            for listener in self._listeners:
+                try:
+                    listener(quote)
+                except Exception as e:
+                    logger.warning(f"Price feed listener failed: {e}")
+
+        return moved
+
+    async def _fetch(self, assets: list[str]) -> BestPriceResponse:
+        # A single asset is sent as a plain string, matching get_best_price
+        json_body = {
+            "from": assets[0] if len(assets) == 1 else assets,
+            "to": self.to_currency,
+        }
+        url = f"{settings.ROBINHOOD_BASE_URL}/getBestPrice"
+        if self._client is not None:
+            response = await self._client.post(url=url, json=json_body)
+        else:
+            async with async_client(timeout=self.timeout) as client:
+                response = await client.post(url=url, json=json_body)
+        response.raise_for_status()
+        return BestPriceResponse(**response.json())
+
+    async def poll_once(self) -> bool:
+        tracked = sorted(self._tracked)
+        if not tracked:
+            return False
+
+        started = time.perf_counter()
+        self.polls += 1
+
+        moved = False
+        received: set[str] = set()
+        if self._batching and len(tracked) > 1:
+            try:
+                batch = await self._fetch(tracked)
+            except httpx.HTTPStatusError as e:
+                self.errors += 1
+                if e.response.status_code < 500:
+                    self._batching = False
+                logger.warning(f"Batched price request failed ({e.response.status_code}), fetching per asset")
+            else:
+                moved = self.ingest(batch)
+                received = {raw.symbol.split("-")[0].upper() for raw in batch.results}
+
+        missing = [code for code in tracked if code not in received]
+        if missing:
+            singles = await asyncio.gather(*(self._fetch([code]) for code in missing), return_exceptions=True)
+            failures = [single for single in singles if isinstance(single, Exception)]
+            if len(failures) == len(tracked):
+                # Nothing answered: let the loop back off
+                raise failures[0]
+            self.errors += len(failures)
+            for single in singles:
+                if not isinstance(single, Exception):
+                    moved = self.ingest(single) or moved
+
+        self.last_poll_latency_ms = (time.perf_counter() - started) * 1000
+        return moved
+
+    def _update_rate(self) -> None:
+        elapsed = time.time() - self._rate_window_start
+        if elapsed >= 10:
+            self._updates_per_second = self._rate_window_updates / elapsed
+            self._rate_window_start = time.time()
+            self._rate_window_updates = 0
+
+    async def _run(self) -> None:
+        async with async_client(timeout=self.timeout) as client:
+            self._client = client
+            while True:
+                try:
+                    moved = await self.poll_once()
+                    if moved:
+                        self.interval = max(self.min_interval, self.interval / 2)
+                    else:
+                        self.interval = min(self.max_interval, self.interval * 1.5)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.errors += 1
+                    self.interval = self.max_interval
+                    logger.warning(f"Price feed poll failed: {e}")
+
+                self._update_rate()
+                await asyncio.sleep(self.interval)
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._client = None
+
+
+price_feed = RobinhoodPriceFeed()
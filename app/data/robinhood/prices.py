@@ -1,6 +1,7 @@
 import requests
 from app.config import settings
 from app.schemas.robinhood_prices import BestPriceRequest, BestPriceResponse, BestPriceEstimatedRequest, BestPriceEstimatedResponse
+from app.data.http_client import async_client
 BASE_URL = settings.ROBINHOOD_BASE_URL
 
 def get_best_price(inputs: BestPriceRequest) -> BestPriceResponse:
@@ -17,20 +18,36 @@ def get_best_price(inputs: BestPriceRequest) -> BestPriceResponse:
     return BestPriceResponse(**response.json())
 
 
-def get_estimated_price(inputs: BestPriceEstimatedRequest) -> BestPriceEstimatedResponse:
-
-    json_body = {
+def _estimated_price_body(inputs: BestPriceEstimatedRequest) -> dict:
+    return {
         "from": inputs.from_currency,
-        "to": inputs.to_currency
+        "to": inputs.to_currency,
+        "side": inputs.side.value,
+        "quantity": inputs.quantity
     }
+
+
+def get_estimated_price(inputs: BestPriceEstimatedRequest) -> BestPriceEstimatedResponse:
+
     response = requests.post(
         url=BASE_URL + '/getEstimatedPrice',
-        json=json_body
+        json=_estimated_price_body(inputs)
     )
 
     return BestPriceEstimatedResponse(**response.json())
 
 
+async def fetch_estimated_price(inputs: BestPriceEstimatedRequest) -> BestPriceEstimatedResponse:
+    async with async_client(timeout=10) as client:
+        response = await client.post(
+            url=BASE_URL + '/getEstimatedPrice',
+            json=_estimated_price_body(inputs)
+        )
+        response.raise_for_status()
+
+    return BestPriceEstimatedResponse(**response.json())
+
+
 
 def main():
     inputs = BestPriceRequest(
@@ -1,6 +1,8 @@
+import uuid
 import requests
 from app.schemas.trading import PlaceOrderRequest, PlaceOrderResponse, CancelOrderRequest, CancelOrderResponse
 from app.config import settings
+from app.data.robinhood.account_cache import account_cache
 
 class RobinhoodTrading:
     BASE_URL = settings.ROBINHOOD_BASE_URL
@@ -11,9 +13,15 @@ class RobinhoodTrading:
 
     def place_order(self, request: PlaceOrderRequest) -> PlaceOrderResponse:
         url = f"{self.BASE_URL}/place/order"
+        # Callers retrying with the same request reuse the same idempotency key
+        if request.client_order_id is None:
+            request.client_order_id = str(uuid.uuid4())
         payload = request.model_dump(exclude_none=True)
         
-        response = self.session.post(url, json=payload, timeout=self.timeout)
+        try:
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+        finally:
+            account_cache.invalidate()
         response.raise_for_status()
         data = response.json()
         
@@ -23,7 +31,10 @@ class RobinhoodTrading:
         url = f"{self.BASE_URL}/cancel/order"
         payload = request.model_dump()
         
-        response = self.session.post(url, json=payload, timeout=self.timeout)
+        try:
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+        finally:
+            account_cache.invalidate()
         response.raise_for_status()
         data = response.json()
         
@@ -0,0 +1,194 @@
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from app.config import settings
+
+MAGIC = 0x524D4B54  # "RMKT"
+HEADER = np.dtype([("magic", np.uint32), ("version", np.uint32), ("rows", np.uint64), ("row_size", np.uint64)])
+HEADER_BYTES = 64
+ROW = np.dtype([
+    ("seq", np.uint64),  # odd while the writer is updating the row
+    ("symbol", "S16"),
+    ("updated_at", np.float64),
+    # 24h ticker (<symbol>@ticker)
+    ("ticker_at", np.float64),
+    ("event_time", np.int64),
+    ("last_price", np.float64),
+    ("open_price", np.float64),
+    ("high_price", np.float64),
+    ("low_price", np.float64),
+    ("prev_close_price", np.float64),
+    ("price_change", np.float64),
+    ("price_change_pct", np.float64),
+    ("weighted_avg_price", np.float64),
+    ("volume", np.float64),
+    ("quote_volume", np.float64),
+    ("trades", np.int64),
+    # Best bid/ask (<symbol>@bookTicker)
+    ("book_at", np.float64),
+    ("bid_price", np.float64),
+    ("bid_qty", np.float64),
+    ("ask_price", np.float64),
+    ("ask_qty", np.float64),
+    # Partial depth (<symbol>@depth20@100ms), summed over the levels
+    ("depth_at", np.float64),
+    ("depth_levels", np.int64),
+    ("depth_bid_qty", np.float64),
+    ("depth_ask_qty", np.float64),
+])
+
+
+class SharedMarketTable:
+    """
+    Latest market state per symbol in one shared-memory segment: a fixed
+    table with one row per symbol, written by the market-data process and
+    read by any number of agent workers without upstream connections.
+
+    Each row is guarded by a sequence counter (seqlock): the single writer
+    makes it odd before touching the row and even afterwards, and readers
+    retry when the counter was odd or changed while they copied the row.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self._shm = shm
+        self.owner = owner
+        header = np.ndarray((), dtype=HEADER, buffer=shm.buf)
+        if int(header["magic"]) != MAGIC or int(header["row_size"]) != ROW.itemsize:
+            raise ValueError(f"{shm.name} is not a market table of this version")
+        self._rows = np.ndarray((int(header["rows"]),), dtype=ROW, buffer=shm.buf, offset=HEADER_BYTES)
+        self._index = {row.decode(): i for i, row in enumerate(self._rows["symbol"])}
+
+    @classmethod
+    def create(cls, name: str, symbols: list[str]) -> "SharedMarketTable":
+        size = HEADER_BYTES + ROW.itemsize * len(symbols)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        np.frombuffer(shm.buf, dtype=np.uint8)[:] = 0
+        header = np.ndarray((), dtype=HEADER, buffer=shm.buf)
+        header["magic"], header["version"], header["rows"], header["row_size"] = MAGIC, 1, len(symbols), ROW.itemsize
+        rows = np.ndarray((len(symbols),), dtype=ROW, buffer=shm.buf, offset=HEADER_BYTES)
+        rows["symbol"] = [symbol.upper().encode() for symbol in symbols]
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, writer: bool = False) -> "SharedMarketTable":
+        # Readers are spawned by the creator and share its resource tracker, so the
+        # segment stays registered once and is unlinked by the owner's close()
+        table = cls(shared_memory.SharedMemory(name=name), owner=False)
+        if writer:
+            # A previous writer that died mid-write left its row odd: readers
+            # would skip it forever. Its next write refreshes the fields.
+            seq = table._rows["seq"]
+            seq[seq % 2 == 1] += 1
+        return table
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._index)
+
+    def write(self, symbol: str, **fields) -> None:
+        """Update some columns of one row; only the market-data process writes."""
+        i = self._index[symbol.upper()]
+        rows = self._rows
+        rows["seq"][i] += 1
+        for key, value in fields.items():
+            rows[key][i] = value
+        rows["updated_at"][i] = time.time()
+        rows["seq"][i] += 1
+
+    def read(self, symbol: str, retries: int = 100) -> np.void | None:
+        """Consistent copy of one row, or None if the symbol is unknown or was never written."""
+        i = self._index.get(symbol.upper())
+        if i is None:
+            return None
+        seq = self._rows["seq"]
+        for _ in range(retries):
+            before = int(seq[i])
+            if before & 1:
+                continue
+            row = self._rows[i].copy()
+            if int(seq[i]) == before:
+                return row if before else None
+        return None
+
+    def close(self) -> None:
+        self._rows = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+
+# Set in processes started by the sharded runner; the fetchers below read it first
+shared_market: SharedMarketTable | None = None
+
+
+def attach_shared_market(name: str) -> SharedMarketTable:
+    global shared_market
+    shared_market = SharedMarketTable.attach(name)
+    return shared_market
+
+
+def _fresh(symbol: str, column: str) -> np.void | None:
+    if shared_market is None:
+        return None
+    row = shared_market.read(symbol)
+    if row is None or time.time() - float(row[column]) > settings.SHARED_MARKET_MAX_AGE_SECONDS:
+        return None
+    return row
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.8f}"
+
+
+def shared_ticker_24hr(symbol: str) -> dict | None:
+    """/api/v3/ticker/24hr-shaped statistics from the shared table, when fresh."""
+    row = _fresh(symbol, "ticker_at")
+    if row is None:
+        return None
+    return {
+        "symbol": symbol.upper(),
+        "priceChange": _fmt(row["price_change"]),
+        "priceChangePercent": f"{row['price_change_pct']:.3f}",
+        "weightedAvgPrice": _fmt(row["weighted_avg_price"]),
+        "prevClosePrice": _fmt(row["prev_close_price"]),
+        "lastPrice": _fmt(row["last_price"]),
+        "bidPrice": _fmt(row["bid_price"]),
+        "bidQty": _fmt(row["bid_qty"]),
+        "askPrice": _fmt(row["ask_price"]),
+        "askQty": _fmt(row["ask_qty"]),
+        "openPrice": _fmt(row["open_price"]),
+        "highPrice": _fmt(row["high_price"]),
+        "lowPrice": _fmt(row["low_price"]),
+        "volume": _fmt(row["volume"]),
+        "quoteVolume": _fmt(row["quote_volume"]),
+        "closeTime": int(row["event_time"]),
+        "count": int(row["trades"]),
+    }
+
+
+def shared_book_ticker(symbol: str) -> dict | None:
+    """/api/v3/ticker/bookTicker-shaped best bid/ask from the shared table, when fresh."""
+    row = _fresh(symbol, "book_at")
+    if row is None:
+        return None
+    return {
+        "symbol": symbol.upper(),
+        "bidPrice": _fmt(row["bid_price"]),
+        "bidQty": _fmt(row["bid_qty"]),
+        "askPrice": _fmt(row["ask_price"]),
+        "askQty": _fmt(row["ask_qty"]),
+    }
+
+
+def shared_depth_qty(symbol: str) -> tuple[float, float] | None:
+    """(bid qty, ask qty) summed over the streamed partial depth, when fresh."""
+    row = _fresh(symbol, "depth_at")
+    if row is None:
+        return None
+    return float(row["depth_bid_qty"]), float(row["depth_ask_qty"])
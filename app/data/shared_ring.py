@@ -0,0 +1,216 @@
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from app.config import settings
+
+MAGIC = 0x5252494E  # "RRIN"
+HEADER = np.dtype([
+    ("magic", np.uint32),
+    ("version", np.uint32),
+    ("capacity", np.uint64),
+    ("row_size", np.uint64),
+    ("head", np.uint64),  # rows ever appended; the newest row is head - 1
+    ("seq", np.uint64),  # odd while the writer is changing a row
+    ("updated_at", np.float64),
+])
+HEADER_BYTES = 64
+# Polls of an odd seq before last() gives up: far longer than one row write,
+# short enough that a writer that died mid-write cannot hang a reader
+SPIN_LIMIT = 100_000
+# One Binance kline row, in the order of the REST/stream fields
+KLINE = np.dtype([
+    ("open_time", np.int64),
+    ("open", np.float64),
+    ("high", np.float64),
+    ("low", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+    ("close_time", np.int64),
+    ("quote_volume", np.float64),
+    ("trades", np.int64),
+    ("taker_base_volume", np.float64),
+    ("taker_quote_volume", np.float64),
+])
+
+
+@dataclass(frozen=True)
+class RingView:
+    """The last rows of a ring as a zero-copy view, with the writer state it was taken at."""
+    rows: np.ndarray
+    head: int
+    seq: int
+
+
+class SharedRing:
+    """
+    Fixed-capacity ring of NumPy rows in shared memory, for one (symbol,
+    stream): a single writer appends rows (or rewrites the newest one, e.g.
+    the open candle) and any number of processes read the last N rows.
+
+    Every row is stored twice, at slot i and i + capacity, so the last N rows
+    are always one contiguous slice and last() returns a view into shared
+    memory without copying. Readers never lock: each slot carries the
+    sequence number of the write that last touched it, so valid() can tell
+    whether a view was overwritten or modified while it was being used.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, dtype: np.dtype, owner: bool):
+        self._shm = shm
+        self.owner = owner
+        self._header = np.ndarray((), dtype=HEADER, buffer=shm.buf)
+        if int(self._header["magic"]) != MAGIC or int(self._header["row_size"]) != dtype.itemsize:
+            raise ValueError(f"{shm.name} is not a ring of {dtype}")
+        self.capacity = int(self._header["capacity"])
+        self._rows = np.ndarray((2 * self.capacity,), dtype=dtype, buffer=shm.buf, offset=HEADER_BYTES)
+        self._stamps = np.ndarray(
+            (2 * self.capacity,), dtype=np.uint64, buffer=shm.buf,
+            offset=HEADER_BYTES + 2 * self.capacity * dtype.itemsize,
+        )
+
+    @classmethod
+    def create(cls, name: str, dtype: np.dtype, capacity: int) -> "SharedRing":
+        size = HEADER_BYTES + 2 * capacity * (dtype.itemsize + 8)
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        np.frombuffer(shm.buf, dtype=np.uint8)[:] = 0
+        header = np.ndarray((), dtype=HEADER, buffer=shm.buf)
+        header["magic"], header["version"], header["capacity"], header["row_size"] = MAGIC, 1, capacity, dtype.itemsize
+        return cls(shm, dtype, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, dtype: np.dtype, writer: bool = False) -> "SharedRing":
+        # Readers are spawned by the creator and share its resource tracker (see shared_market)
+        ring = cls(shared_memory.SharedMemory(name=name), dtype, owner=False)
+        if writer and int(ring._header["seq"]) & 1:
+            # The previous writer died mid-write; the row it was writing gets
+            # rewritten by the backfill, so only the parity needs fixing
+            ring._header["seq"] += 1
+        return ring
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def head(self) -> int:
+        return int(self._header["head"])
+
+    @property
+    def updated_at(self) -> float:
+        return float(self._header["updated_at"])
+
+    def _put(self, index: int, row) -> None:
+        header = self._header
+        header["seq"] += 1
+        seq = header["seq"]
+        slot = index % self.capacity
+        # Stamp before the data: a reader that sees the new bytes also sees the stamp
+        self._stamps[slot] = self._stamps[slot + self.capacity] = seq
+        self._rows[slot] = self._rows[slot + self.capacity] = row
+        header["updated_at"] = time.time()
+        header["seq"] += 1
+
+    def append(self, row) -> None:
+        head = self.head
+        self._put(head, row)
+        self._header["head"] = head + 1
+
+    def replace_last(self, row) -> None:
+        """Rewrite the newest row in place (or append the first one)."""
+        head = self.head
+        if head == 0:
+            self.append(row)
+        else:
+            self._put(head - 1, row)
+
+    def upsert(self, row, key: str) -> None:
+        """Append `row`, or replace the newest row when their `key` fields are equal (the same candle)."""
+        head = self.head
+        if head == 0:
+            self.append(row)
+            return
+        last = self._rows[(head - 1) % self.capacity][key]
+        value = row[self._rows.dtype.names.index(key)]
+        if value == last:
+            self._put(head - 1, row)
+        elif value > last:
+            self.append(row)
+
+    def last(self, n: int) -> RingView | None:
+        """
+        The last min(n, available) rows as a view into shared memory; check
+        valid() after using it. None if the writer stayed mid-write for
+        SPIN_LIMIT polls (it died, or is stalled).
+        """
+        header = self._header
+        for _ in range(SPIN_LIMIT):
+            seq = int(header["seq"])
+            if seq & 1:
+                continue
+            head = int(header["head"])
+            n = min(n, head, self.capacity)
+            start = (head - n) % self.capacity
+            if int(header["seq"]) == seq:
+                return RingView(self._rows[start:start + n], head, seq)
+        return None
+
+    def valid(self, view: RingView) -> bool:
+        """True if no row of `view` was overwritten or rewritten since last() returned it."""
+        if int(self._header["seq"]) == view.seq:
+            return True
+        n = len(view.rows)
+        if not n:
+            return True
+        start = (view.head - n) % self.capacity
+        return int(self._stamps[start:start + n].max()) <= view.seq
+
+    def read_last(self, n: int, retries: int = 100) -> np.ndarray | None:
+        """A consistent copy of the last rows, or None if the writer kept changing them."""
+        for _ in range(retries):
+            view = self.last(n)
+            if view is None:
+                return None
+            rows = view.rows.copy()
+            if self.valid(view):
+                return rows
+        return None
+
+    def close(self) -> None:
+        self._header = self._rows = self._stamps = None
+        self._shm.close()
+        if self.owner:
+            self._shm.unlink()
+
+
+def ring_name(prefix: str, symbol: str, stream: str) -> str:
+    return f"{prefix}_{symbol.lower()}_{stream}"
+
+
+def kline_row(kline: list) -> tuple:
+    """A REST kline row (strings and ints) as a KLINE tuple."""
+    return (
+        int(kline[0]), float(kline[1]), float(kline[2]), float(kline[3]), float(kline[4]), float(kline[5]),
+        int(kline[6]), float(kline[7]), int(kline[8]), float(kline[9]), float(kline[10]),
+    )
+
+
+# (symbol, stream) -> ring, set in processes started by the sharded runner
+shared_rings: dict[tuple[str, str], SharedRing] = {}
+
+
+def attach_shared_ring(prefix: str, symbol: str, stream: str, dtype: np.dtype = KLINE) -> SharedRing:
+    ring = SharedRing.attach(ring_name(prefix, symbol, stream), dtype)
+    shared_rings[(symbol.upper(), stream)] = ring
+    return ring
+
+
+def shared_klines(symbol: str, interval: str, limit: int) -> np.ndarray | None:
+    """The last `limit` candles from the shared ring, when it holds that many and is fresh."""
+    ring = shared_rings.get((symbol.upper(), f"kline_{interval}"))
+    if ring is None or ring.head < limit:
+        return None
+    if time.time() - ring.updated_at > settings.SHARED_MARKET_MAX_AGE_SECONDS:
+        return None
+    return ring.read_last(limit)
@@ -0,0 +1,289 @@
+import asyncio
+import base64
+import contextvars
+import gzip
+import hashlib
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+
+from app.config import settings
+from app.schemas.tape import HttpTapeStats, TapeIndexEntry
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.jsonl"
+# Never written to a tape, and ignored when matching a replayed request
+SECRET_HEADERS = {"authorization", "x-api-key", "api-key", "cookie", "set-cookie", "x-goog-api-key"}
+SECRET_FIELDS = {"apikey", "api_key", "key", "token", "secret"}
+# Describe the wire encoding of the original body, not the decoded body on the tape
+WIRE_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+REDACTED = "REDACTED"
+
+
+class TapeMiss(httpx.TransportError):
+    """A replayed request that is not on the tape; tools see it like a network failure."""
+
+
+def _redact_url(url: httpx.URL) -> str:
+    query = sorted(
+        (k, REDACTED if k.lower() in SECRET_FIELDS else v)
+        for k, v in parse_qsl(url.query.decode(), keep_blank_values=True)
+    )
+    return str(url.copy_with(query=urlencode(query).encode() or None))
+
+
+def _redact_json(value):
+    if isinstance(value, dict):
+        return {k: REDACTED if k.lower() in SECRET_FIELDS else _redact_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_redact_json(v) for v in value]
+    return value
+
+
+def _redact_body(content: bytes) -> bytes:
+    if not content:
+        return b""
+    try:
+        return json.dumps(_redact_json(json.loads(content)), sort_keys=True).encode()
+    except (ValueError, UnicodeDecodeError):
+        return content
+
+
+def _encode(content: bytes) -> dict:
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"b64": base64.b64encode(content).decode()}
+
+
+def _decode(body: dict) -> bytes:
+    return body["text"].encode("utf-8") if "text" in body else base64.b64decode(body.get("b64", ""))
+
+
+def _headers(headers: httpx.Headers, drop: set[str]) -> list[list[str]]:
+    return [[k, v] for k, v in headers.multi_items() if k.lower() not in SECRET_HEADERS | drop]
+
+
+class _Cassette:
+    """One cycle's exchanges, matched exactly first and then by method and URL in recorded order."""
+
+    def __init__(self, cycle_id: str, exchanges: list[dict], latency: bool = False):
+        self.cycle_id = cycle_id
+        self.exchanges = exchanges
+        self.latency = latency
+        self._used = [False] * len(exchanges)
+
+    def take(self, key: str, method: str, url: str) -> dict | None:
+        for match in (lambda e: e["key"] == key, lambda e: e["method"] == method and e["url"] == url):
+            for i, exchange in enumerate(self.exchanges):
+                if not self._used[i] and match(exchange):
+                    self._used[i] = True
+                    return exchange
+        return None
+
+    @property
+    def unused(self) -> int:
+        return self._used.count(False)
+
+
+class HttpTape:
+    """
+    Transport-level recorder/replayer for upstream HTTP traffic.
+
+    Every client built by async_client() (and the model client in
+    trading_agent) goes through InstrumentedTransport, which hands each
+    exchange to this tape. With recording on, the exchanges of one decision
+    cycle are written to <dir>/<cycle_id>.jsonl.gz and summarised in
+    index.jsonl. Inside `async with http_tape.replay(cycle_id)` requests are
+    answered from that tape with no network. Only requests made inside
+    `async with http_tape.cycle(...)` are recorded, so background pollers do
+    not fill the tapes. Credentials are redacted.
+    """
+
+    def __init__(self, directory: str = settings.HTTP_TAPE_DIR, record: bool = settings.HTTP_TAPE_RECORD):
+        self.directory = Path(directory)
+        self.record = record
+
+        self._recording: contextvars.ContextVar[tuple[str, list[dict], float] | None] = contextvars.ContextVar(
+            "http_tape_recording", default=None
+        )
+        self._replaying: contextvars.ContextVar[_Cassette | None] = contextvars.ContextVar(
+            "http_tape_replaying", default=None
+        )
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Tape files
+    # ------------------------------------------------------------------
+    def index(self) -> list[TapeIndexEntry]:
+        path = self.directory / INDEX_FILE
+        if not path.exists():
+            return []
+        return [TapeIndexEntry(**json.loads(line)) for line in path.read_text().splitlines() if line.strip()]
+
+    def load(self, cycle_id: str) -> list[dict]:
+        with gzip.open(self.directory / f"{cycle_id}.jsonl.gz", "rt", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _write_sync(self, cycle_id: str, exchanges: list[dict], started_at: float) -> TapeIndexEntry:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{cycle_id}.jsonl.gz"
+        with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+            for exchange in exchanges:
+                f.write(json.dumps(exchange, separators=(",", ":")) + "\n")
+
+        hosts: dict[str, int] = {}
+        for exchange in exchanges:
+            host = httpx.URL(exchange["url"]).host
+            hosts[host] = hosts.get(host, 0) + 1
+        entry = TapeIndexEntry(
+            cycle_id=cycle_id,
+            file=path.name,
+            started_at=started_at,
+            duration_seconds=time.time() - started_at,
+            exchanges=len(exchanges),
+            hosts=hosts,
+            bytes=path.stat().st_size,
+        )
+        with open(self.directory / INDEX_FILE, "a", encoding="utf-8") as f:
+            f.write(entry.model_dump_json() + "\n")
+        return entry
+
+    # ------------------------------------------------------------------
+    # Cycle scope
+    # ------------------------------------------------------------------
+    @asynccontextmanager
+    async def cycle(self, name: str):
+        """Record the HTTP traffic of one decision cycle to a tape named after the start time and `name`."""
+        if not self.record or self.replaying:
+            yield
+            return
+
+        started_at = time.time()
+        cycle_id = f"{datetime.fromtimestamp(started_at).strftime('%Y%m%dT%H%M%S')}-{name}"
+        exchanges: list[dict] = []
+        token = self._recording.set((cycle_id, exchanges, time.perf_counter()))
+        try:
+            yield
+        finally:
+            self._recording.reset(token)
+            try:
+                await asyncio.to_thread(self._write_sync, cycle_id, exchanges, started_at)
+            except OSError as e:
+                logger.warning(f"Could not write HTTP tape {cycle_id}: {e}")
+
+    @asynccontextmanager
+    async def replay(self, cycle_id: str, latency: bool = False):
+        """
+        Serve requests made inside this block from the tape `cycle_id`;
+        `latency` delays each response by the time it originally took.
+        """
+        cassette = _Cassette(cycle_id, await asyncio.to_thread(self.load, cycle_id), latency)
+        token = self._replaying.set(cassette)
+        try:
+            yield cassette
+        finally:
+            self._replaying.reset(token)
+
+    # ------------------------------------------------------------------
+    # Transport hooks (called by InstrumentedTransport)
+    # ------------------------------------------------------------------
+    @property
+    def replaying(self) -> bool:
+        return self._replaying.get() is not None
+
+    @property
+    def recording(self) -> bool:
+        return self._recording.get() is not None
+
+    @staticmethod
+    def _key(method: str, url: str, body: bytes) -> str:
+        return hashlib.sha1(b"\n".join([method.encode(), url.encode(), body])).hexdigest()
+
+    async def serve(self, request: httpx.Request) -> httpx.Response:
+        cassette = self._replaying.get()
+        body = _redact_body(request.content)
+        url = _redact_url(request.url)
+        exchange = cassette.take(self._key(request.method, url, body), request.method, url)
+        if exchange is None:
+            self.misses += 1
+            raise TapeMiss(f"{request.method} {url} is not on tape {cassette.cycle_id}", request=request)
+
+        self.replayed += 1
+        if cassette.latency:
+            await asyncio.sleep(exchange["elapsed_ms"] / 1000)
+        if "error" in exchange:
+            error = getattr(httpx, exchange["error"]["type"], httpx.TransportError)
+            raise error(exchange["error"]["message"], request=request)
+        return httpx.Response(
+            exchange["status"],
+            headers=exchange["headers"],
+            content=_decode(exchange["body"]),
+            request=request,
+        )
+
+    def _append(self, request: httpx.Request, elapsed: float, outcome: dict) -> None:
+        _, exchanges, cycle_started = self._recording.get()
+        body = _redact_body(request.content)
+        url = _redact_url(request.url)
+        exchanges.append({
+            "seq": len(exchanges),
+            "offset_seconds": round(time.perf_counter() - cycle_started - elapsed, 4),
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "key": self._key(request.method, url, body),
+            "method": request.method,
+            "url": url,
+            "request_headers": _headers(request.headers, set()),
+            "request_body": _encode(body),
+            **outcome,
+        })
+        self.recorded += 1
+
+    def capture_error(self, request: httpx.Request, error: Exception, elapsed: float) -> None:
+        """Record a request that failed without a response, so replay fails it the same way."""
+        if self._recording.get() is not None:
+            self._append(request, elapsed, {"error": {"type": type(error).__name__, "message": str(error)}})
+
+    async def capture(self, request: httpx.Request, response: httpx.Response, elapsed: float) -> httpx.Response:
+        """Record one exchange if a cycle is being recorded; returns a response the caller can still read."""
+        if self._recording.get() is None:
+            return response
+
+        # The tape needs the whole body, so streamed responses (the model's SSE) are buffered here
+        content = await response.aread()
+        await response.aclose()
+        self._append(request, elapsed, {
+            "status": response.status_code,
+            "headers": _headers(response.headers, WIRE_HEADERS),
+            "body": _encode(content),
+        })
+        return httpx.Response(
+            response.status_code,
+            headers=_headers(response.headers, WIRE_HEADERS),
+            content=content,
+            request=request,
+            extensions=response.extensions,
+        )
+
+    def stats(self) -> HttpTapeStats:
+        recording, cassette = self._recording.get(), self._replaying.get()
+        return HttpTapeStats(
+            mode="replay" if cassette else "record" if self.record else "off",
+            directory=str(self.directory),
+            cycle_id=recording[0] if recording else cassette.cycle_id if cassette else None,
+            recorded=self.recorded,
+            replayed=self.replayed,
+            misses=self.misses,
+        )
+
+
+http_tape = HttpTape()
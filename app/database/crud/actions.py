@@ -0,0 +1,196 @@
+import datetime
+from app.broker import stream_broker
+from app.database.database_class import Database
+from app.schemas.actions_history import ActionStatusUpdate, ActionsHistoryData, ToolsRequest, ToolsResults
+
+ACTION_COLUMNS = [
+    "id", "symbol", "side", "quantity", "price", "amount_usd",
+    "timestamp", "reason", "is_open", "profit_loss", "decision_source"
+]
+
+TOOLS_RESULT_COLUMNS = [
+    "id", "step1_price_usd", "step1_change_24h_pct", "step2_order_book_signal",
+    "step3_candle_trend", "step4_news_sentiment", "step5_holdings_value_usd", "side"
+]
+
+
+def _row_to_action(row) -> dict:
+    d = dict(zip(ACTION_COLUMNS, row))
+
+    ts = d.get("timestamp")
+    if isinstance(ts, datetime.datetime):
+        d["timestamp"] = ts.isoformat()
+
+    # validate/normalize with Pydantic, then return as plain dict (JSON-safe)
+    return ActionsHistoryData(**d).model_dump()
+
+
+async def insert_action(
+    symbol: str,
+    side: str,
+    price: float,
+    reason: str,
+    quantity: float = 0.0,
+    amount_usd: float = 0.0,
+    profit_loss: float = 0.0,
+    decision_source: str = "llm"
+) -> int:
+    """Insert a decision and return its id."""
+    db = Database()
+
+    query = """
+    INSERT INTO crypto_trade_history (symbol, side, quantity, price, amount_usd, reason, is_open, profit_loss, decision_source)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    RETURNING id
+    """
+
+    row = await db.insert_returning(
+        query,
+        (
+            symbol,
+            side.lower(),  # Normalize to lowercase
+            quantity,
+            price,
+            amount_usd,
+            reason,
+            True if side.lower() in ['buy', 'sell'] else False,  # Hold is not open position
+            profit_loss,
+            decision_source
+        )
+    )
+
+    stream_broker.publish(
+        "decision",
+        {
+            "id": row[0],
+            "symbol": symbol,
+            "side": side.lower(),
+            "price": price,
+            "quantity": quantity,
+            "amount_usd": amount_usd,
+            "reason": reason,
+            "decision_source": decision_source,
+        },
+        key=symbol,
+    )
+    return row[0]
+
+
+async def fetch_recent_actions(limit: int = 10) -> list[dict]:
+    db = Database()
+
+    limit = max(1, min(int(limit), 100))
+
+    query = """
+    SELECT id, symbol, side, quantity, price, amount_usd, timestamp, reason, is_open, profit_loss, decision_source
+    FROM crypto_trade_history
+    ORDER BY timestamp DESC
+    LIMIT %s
+    """
+
+    rows = await db.fetch_all(query, (limit,))
+    return [_row_to_action(row) for row in rows]
+
+
+async def fetch_latest_action(symbol: str) -> dict | None:
+    db = Database()
+
+    query = """
+    SELECT id, symbol, side, quantity, price, amount_usd, timestamp, reason, is_open, profit_loss, decision_source
+    FROM crypto_trade_history
+    WHERE symbol = %s
+    ORDER BY timestamp DESC
+    LIMIT 1
+    """
+
+    row = await db.fetch_one(query, (symbol,))
+    return _row_to_action(row) if row else None
+
+
+async def update_action_status(action_id: int, is_open: bool, profit_loss: float) -> int:
+    db = Database()
+
+    query = """
+    UPDATE crypto_trade_history
+    SET is_open = %s, profit_loss = %s
+    WHERE id = %s
+    """
+
+    return await db.update_row(query, (is_open, profit_loss, action_id))
+
+
+async def update_action_statuses(updates: list[ActionStatusUpdate]) -> int:
+    """
+    Apply many status updates in one round trip. Fill fields left as None keep
+    the values logged with the decision.
+    """
+    db = Database()
+
+    query = """
+    UPDATE crypto_trade_history
+    SET is_open = %s,
+        profit_loss = %s,
+        quantity = COALESCE(%s, quantity),
+        price = COALESCE(%s, price),
+        amount_usd = COALESCE(%s, amount_usd)
+    WHERE id = %s
+    """
+
+    return await db.execute_many(
+        query,
+        [
+            (u.is_open, u.profit_loss, u.quantity, u.price, u.amount_usd, u.action_id)
+            for u in updates
+        ],
+    )
+
+
+async def insert_tool_results(request: ToolsRequest) -> int:
+    db = Database()
+
+    # Coerce numerics defensively (handles str/Decimal)
+    step1_price_usd = float(request.step1_price_usd)
+    step1_change_24h_pct = float(request.step1_change_24h_pct)
+    step5_holdings_value_usd = float(request.step5_holdings_value_usd)
+    side = (request.side or "").lower().strip()
+
+    query = """
+    INSERT INTO crypto_tools_result (
+        step1_price_usd, step1_change_24h_pct, step2_order_book_signal,
+        step3_candle_trend, step4_news_sentiment, step5_holdings_value_usd, side, action_id
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """
+
+    inserted = await db.insert_row(
+        query,
+        (
+            step1_price_usd,
+            step1_change_24h_pct,
+            request.step2_order_book_signal,
+            request.step3_candle_trend,
+            request.step4_news_sentiment,
+            step5_holdings_value_usd,
+            side,
+            request.action_id,
+        ),
+    )
+
+    stream_broker.publish("tool_result", request.model_dump(mode="json"), key=side)
+    return inserted
+
+
+async def fetch_recent_tool_results(limit: int = 10) -> list[dict]:
+    db = Database()
+
+    limit = max(1, min(int(limit), 100))
+
+    query = """
+    SELECT id, step1_price_usd, step1_change_24h_pct, step2_order_book_signal,
+           step3_candle_trend, step4_news_sentiment, step5_holdings_value_usd, side
+    FROM crypto_tools_result
+    ORDER BY id DESC
+    LIMIT %s
+    """
+
+    rows = await db.fetch_all(query, (limit,))
+    return [ToolsResults(**dict(zip(TOOLS_RESULT_COLUMNS, row))).model_dump() for row in rows]
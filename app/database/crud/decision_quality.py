@@ -0,0 +1,143 @@
+from app.database.database_class import Database
+
+# Column of crypto_decision_outcomes per forward-return horizon
+HORIZON_COLUMNS = {"15m": "return_15m", "1h": "return_1h", "4h": "return_4h"}
+QUALITY_KEY = ["symbol", "side", "candle_trend", "news_sentiment", "order_book_signal"]
+QUALITY_COLUMNS = [*QUALITY_KEY, "decisions", "sum_return", "sum_return_sq", "hits"]
+ID_MAX = 2_147_483_647  # SERIAL
+FILL_BATCH = 1000
+
+
+async def ingest_decisions(settle_seconds: float, link_window_seconds: float) -> int:
+    """
+    Copy decisions above the outcomes' high-water mark into
+    crypto_decision_outcomes, with the features of their tool results: the
+    row logged with their action_id, else the first one of the same side
+    logged within the link window after them. Returns the rows added.
+    """
+    db = Database()
+
+    # Decisions younger than the settle time wait for their tool results; the
+    # id bound stops below the first of them so none is jumped over
+    query = """
+    WITH mark AS (SELECT COALESCE(max(action_id), 0) AS id FROM crypto_decision_outcomes)
+    INSERT INTO crypto_decision_outcomes (
+        action_id, timestamp, symbol, side, decision_source,
+        candle_trend, news_sentiment, order_book_signal
+    )
+    SELECT h.id, h.timestamp, upper(h.symbol), lower(h.side), h.decision_source,
+           COALESCE(t.step3_candle_trend, 'unknown'),
+           COALESCE(t.step4_news_sentiment, 'unknown'),
+           COALESCE(left(lower(t.step2_order_book_signal), 50), 'unknown')
+    FROM crypto_trade_history h
+    CROSS JOIN mark
+    LEFT JOIN LATERAL (
+        SELECT r.step2_order_book_signal, r.step3_candle_trend, r.step4_news_sentiment
+        FROM crypto_tools_result r
+        WHERE r.action_id = h.id
+           OR (r.action_id IS NULL
+               AND r.timestamp >= h.timestamp
+               AND r.timestamp < h.timestamp + make_interval(secs => %s)
+               AND lower(r.side) = lower(h.side))
+        ORDER BY (r.action_id IS NOT DISTINCT FROM h.id) DESC, r.timestamp
+        LIMIT 1
+    ) t ON TRUE
+    WHERE h.id > mark.id
+      AND h.id < COALESCE(
+          (SELECT min(y.id) FROM crypto_trade_history y
+           WHERE y.id > mark.id AND y.timestamp >= LOCALTIMESTAMP - make_interval(secs => %s)),
+          %s)
+      AND lower(h.side) IN ('buy', 'sell', 'hold')
+    ON CONFLICT (action_id) DO NOTHING
+    """
+
+    return await db.execute_write(query, (link_window_seconds, settle_seconds, ID_MAX))
+
+
+async def fetch_pending_outcomes(min_age_seconds: float, max_age_days: int) -> list[dict]:
+    """Outcomes old enough for their first horizon that still miss a return."""
+    db = Database()
+
+    query = """
+    SELECT action_id, symbol,
+           -- Stored as local time of the server's TimeZone; make it an absolute instant
+           timestamp AT TIME ZONE current_setting('TimeZone'),
+           return_15m, return_1h, return_4h
+    FROM crypto_decision_outcomes
+    WHERE (return_15m IS NULL OR return_1h IS NULL OR return_4h IS NULL)
+      AND timestamp < LOCALTIMESTAMP - make_interval(secs => %s)
+      AND timestamp >= LOCALTIMESTAMP - make_interval(days => %s)
+    ORDER BY action_id
+    """
+
+    rows = await db.fetch_all(query, (min_age_seconds, max_age_days))
+    return [
+        dict(zip(["action_id", "symbol", "timestamp", *HORIZON_COLUMNS.values()], row))
+        for row in rows
+    ]
+
+
+async def fill_returns(horizon: str, returns: list[tuple[int, float]], hold_band: float) -> int:
+    """
+    Set one horizon's forward returns and add them to crypto_decision_quality
+    in the same statement, so the sums count every outcome exactly once even
+    when refreshes overlap. Returns the outcomes filled.
+    """
+    db = Database()
+    column = HORIZON_COLUMNS[horizon]
+    filled = 0
+
+    for start in range(0, len(returns), FILL_BATCH):
+        batch = returns[start:start + FILL_BATCH]
+        values = ", ".join(["(%s::integer, %s::float)"] * len(batch))
+        query = f"""
+        WITH v (action_id, r) AS (VALUES {values}),
+        filled AS (
+            UPDATE crypto_decision_outcomes o SET {column} = v.r
+            FROM v
+            WHERE o.action_id = v.action_id AND o.{column} IS NULL
+            RETURNING o.symbol, o.side, o.candle_trend, o.news_sentiment, o.order_book_signal, v.r
+        ),
+        summed AS (
+            INSERT INTO crypto_decision_quality (
+                symbol, side, candle_trend, news_sentiment, order_book_signal, horizon,
+                decisions, sum_return, sum_return_sq, hits
+            )
+            SELECT symbol, side, candle_trend, news_sentiment, order_book_signal, %s,
+                   count(*), sum(r), sum(r * r),
+                   count(*) FILTER (WHERE CASE side WHEN 'buy' THEN r > 0 WHEN 'sell' THEN r < 0 ELSE abs(r) < %s END)
+            FROM filled
+            GROUP BY symbol, side, candle_trend, news_sentiment, order_book_signal
+            ON CONFLICT (symbol, side, candle_trend, news_sentiment, order_book_signal, horizon) DO UPDATE SET
+                decisions = crypto_decision_quality.decisions + EXCLUDED.decisions,
+                sum_return = crypto_decision_quality.sum_return + EXCLUDED.sum_return,
+                sum_return_sq = crypto_decision_quality.sum_return_sq + EXCLUDED.sum_return_sq,
+                hits = crypto_decision_quality.hits + EXCLUDED.hits,
+                updated_at = CURRENT_TIMESTAMP
+            RETURNING 1
+        )
+        SELECT count(*) FROM filled
+        """
+        args = [value for pair in batch for value in pair] + [horizon, hold_band]
+        row = await db.insert_returning(query, args)
+        filled += row[0] if row else 0
+
+    return filled
+
+
+async def fetch_quality(horizon: str, symbol: str | None = None, side: str | None = None) -> list[dict]:
+    """Aggregate rows of one horizon, optionally for one symbol and side."""
+    db = Database()
+
+    query = f"""
+    SELECT {", ".join(QUALITY_COLUMNS)}
+    FROM crypto_decision_quality
+    WHERE horizon = %s
+      AND (%s::text IS NULL OR symbol = %s)
+      AND (%s::text IS NULL OR side = %s)
+    """
+
+    symbol = symbol.upper() if symbol else None
+    side = side.lower() if side else None
+    rows = await db.fetch_all(query, (horizon, symbol, symbol, side, side))
+    return [dict(zip(QUALITY_COLUMNS, row)) for row in rows]
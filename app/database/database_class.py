@@ -1,10 +1,15 @@
 from __future__ import annotations
-from typing import Any, Sequence
+from typing import Any, AsyncIterator, Sequence
 from psycopg import AsyncConnection
 from psycopg.abc import Query
 
 from app.config import settings
+from app.deadline import call_timeout
+from app.metrics import counter, histogram
+from contextlib import asynccontextmanager
 import logging
+import math
+import time
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,6 +18,29 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _statement(query: Query) -> str:
+    """SELECT / INSERT / UPDATE / ... used as the metrics label."""
+    words = query.split(maxsplit=1) if isinstance(query, str) else []
+    return words[0].upper() if words else "OTHER"
+
+
+@asynccontextmanager
+async def _timed(query: Query):
+    statement = _statement(query)
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        counter("db_errors_total", "Failed database statements.", labels={"statement": statement}).inc()
+        raise
+    finally:
+        histogram(
+            "db_query_seconds",
+            "Database round trip including connect, per statement type.",
+            labels={"statement": statement},
+        ).observe(time.perf_counter() - started)
+
+
 class Database:
     def __init__(self) -> None:
         self.user = settings.POSTGRES_USER
@@ -20,9 +48,21 @@ class Database:
         self.host = settings.POSTGRES_HOST
         self.port = settings.POSTGRES_PORT
         self.db = settings.POSTGRES_DB
+        self.sslmode = settings.POSTGRES_SSLMODE
 
     async def get_connection(self) -> AsyncConnection:
-        """Creates and returns a new async database connection."""
+        """
+        Creates and returns a new async database connection. Inside a decision
+        cycle, connecting and every statement are bounded by the cycle's
+        remaining budget.
+        """
+        limits = {}
+        timeout = call_timeout(None)
+        if timeout is not None:
+            limits = {
+                "connect_timeout": max(2, math.ceil(timeout)),  # libpq's minimum
+                "options": f"-c statement_timeout={int(timeout * 1000)}",
+            }
         try:
             conn = await AsyncConnection.connect(
                 host=self.host,
@@ -30,7 +70,8 @@ class Database:
                 user=self.user,
                 password=self.password,
                 port=self.port,
-                sslmode="require",
+                sslmode=self.sslmode,
+                **limits,
             )
             return conn
         except Exception as e:
@@ -40,7 +81,7 @@ class Database:
     async def fetch_one(self, query: Query, args: Sequence[Any] | None = None) -> Any | None:
         """Read 1 row."""
         try:
-            async with await self.get_connection() as conn:
+            async with _timed(query), await self.get_connection() as conn:
                 async with conn.cursor() as cur:
                     await cur.execute(query, args or ())
                     return await cur.fetchone()
@@ -51,7 +92,7 @@ class Database:
     async def fetch_all(self, query: Query, args: Sequence[Any] | None = None) -> list[Any]:
         """Read all rows."""
         try:
-            async with await self.get_connection() as conn:
+            async with _timed(query), await self.get_connection() as conn:
                 async with conn.cursor() as cur:
                     await cur.execute(query, args or ())
                     return await cur.fetchall()
@@ -59,13 +100,30 @@ class Database:
             logger.error(f"❌ fetch_all failed: {e}")
             raise
 
+    async def stream(
+        self, query: Query, args: Sequence[Any] | None = None, batch_size: int = 10_000
+    ) -> AsyncIterator[list[Any]]:
+        """
+        Read rows in batches through a server-side cursor, so memory stays
+        bounded by `batch_size` however many rows the query returns.
+        """
+        try:
+            async with _timed(query), await self.get_connection() as conn:
+                async with conn.cursor(name="stream") as cur:
+                    await cur.execute(query, args or ())
+                    while rows := await cur.fetchmany(batch_size):
+                        yield rows
+        except Exception as e:
+            logger.error(f"❌ stream failed: {e}")
+            raise
+
     async def execute_write(self, query: Query, args: Sequence[Any] | None = None) -> int:
         """
         Generic method for INSERT/UPDATE/DELETE.
         Returns the number of rows affected.
         """
         try:
-            async with await self.get_connection() as conn:
+            async with _timed(query), await self.get_connection() as conn:
                 async with conn.cursor() as cur:
                     await cur.execute(query, args or ())
                     await conn.commit()
@@ -75,6 +133,40 @@ class Database:
             logger.error(f"❌ Write operation failed: {e}")
             raise
 
+    async def insert_returning(self, query: Query, args: Sequence[Any] | None = None) -> Any | None:
+        """
+        INSERT ... RETURNING in a single round trip.
+        Returns the first returned row.
+        """
+        try:
+            async with _timed(query), await self.get_connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(query, args or ())
+                    row = await cur.fetchone()
+                    await conn.commit()
+                    return row
+        except Exception as e:
+            logger.error(f"❌ Insert returning failed: {e}")
+            raise
+
+    async def execute_many(self, query: Query, args_seq: Sequence[Sequence[Any]]) -> int:
+        """
+        Run the same INSERT/UPDATE for every parameter set in one transaction.
+        Returns the number of rows affected.
+        """
+        if not args_seq:
+            return 0
+        try:
+            async with _timed(query), await self.get_connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.executemany(query, args_seq)
+                    await conn.commit()
+                    logger.info(f"✅ Batch executed ({len(args_seq)} statements). Rows affected: {cur.rowcount}")
+                    return cur.rowcount
+        except Exception as e:
+            logger.error(f"❌ Batch operation failed: {e}")
+            raise
+
     # Optional wrappers
     async def insert_row(self, query: Query, args: Sequence[Any] | None = None) -> int:
         return await self.execute_write(query, args)
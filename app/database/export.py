@@ -0,0 +1,284 @@
+"""
+Incremental columnar export of crypto_trade_history and crypto_tools_result.
+
+Each run streams the rows above the table's high-water mark (the last
+exported id) through a server-side cursor and appends them as partition
+files, so analysis reads files instead of querying the live database:
+
+    exports/<table>/<YYYY-MM-DD>/part-<first id>.npz
+    exports/<table>/state.json
+
+A partition file holds one array per column: numbers as int64/float64/bool,
+timestamps as datetime64[us], text as UTF-8 bytes plus offsets and a null
+mask. Memory is bounded by EXPORT_ROWS_PER_FILE, whatever the table size.
+
+    python -m app.database.export                  # every table, new rows only
+    python -m app.database.export --table crypto_tools_result --full
+
+    columns = columnar_export.load("crypto_trade_history", start=date(2025, 1, 1))
+    frame = pandas.DataFrame(columns)
+
+Rows are exported as they are at export time: later updates of a trade
+(is_open, profit_loss after a fill) only show up after a --full rebuild.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import AsyncIterator
+
+import numpy as np
+
+from app.config import settings
+from app.database.database_class import Database
+from app.schemas.export import ExportStats
+
+STATE_FILE = "state.json"
+ID_MAX = 2_147_483_647  # SERIAL
+EMPTY_DTYPES = {"int": np.int64, "float": np.float64, "bool": bool, "time": "datetime64[us]", "text": object}
+
+# Column name and kind, in SELECT order; id and timestamp come first
+EXPORT_TABLES: dict[str, list[tuple[str, str]]] = {
+    "crypto_trade_history": [
+        ("id", "int"), ("timestamp", "time"), ("symbol", "text"), ("side", "text"), ("quantity", "float"),
+        ("price", "float"), ("amount_usd", "float"), ("reason", "text"), ("is_open", "bool"),
+        ("profit_loss", "float"), ("decision_source", "text"),
+    ],
+    "crypto_tools_result": [
+        ("id", "int"), ("timestamp", "time"), ("step1_price_usd", "float"), ("step1_change_24h_pct", "float"),
+        ("step2_order_book_signal", "text"), ("step3_candle_trend", "text"), ("step4_news_sentiment", "text"),
+        ("step5_holdings_value_usd", "float"), ("side", "text"),
+        # NULL until the decision is linked, so NaN-able like pandas' nullable ints
+        ("action_id", "float"),
+    ],
+}
+
+
+def _encode(kind: str, values: tuple) -> dict[str, np.ndarray]:
+    """One column of a fetched batch as the arrays stored for it."""
+    if kind == "int":
+        return {"": np.array(values, dtype=np.int64)}
+    if kind == "float":
+        return {"": np.array([np.nan if v is None else v for v in values], dtype=np.float64)}
+    if kind == "bool":
+        return {"": np.array([bool(v) for v in values], dtype=bool)}
+    if kind == "time":
+        return {"": np.array(values, dtype="datetime64[us]")}
+    encoded = [(v or "").encode() for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    return {
+        ".data": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        ".offsets": offsets,
+        ".null": np.array([v is None for v in values], dtype=bool),
+    }
+
+
+def _concat(kind: str, chunks: list[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    if kind != "text":
+        return {"": np.concatenate([c[""] for c in chunks])}
+    shifts = np.cumsum([0] + [len(c[".data"]) for c in chunks[:-1]])
+    return {
+        ".data": np.concatenate([c[".data"] for c in chunks]),
+        ".offsets": np.concatenate([chunks[0][".offsets"][:1]] + [c[".offsets"][1:] + s for c, s in zip(chunks, shifts)]),
+        ".null": np.concatenate([c[".null"] for c in chunks]),
+    }
+
+
+def _slice(kind: str, column: dict[str, np.ndarray], lo: int, hi: int) -> dict[str, np.ndarray]:
+    if kind != "text":
+        return {"": column[""][lo:hi]}
+    offsets = column[".offsets"][lo:hi + 1]
+    return {
+        ".data": column[".data"][offsets[0]:offsets[-1]],
+        ".offsets": offsets - offsets[0],
+        ".null": column[".null"][lo:hi],
+    }
+
+
+def _decode(kind: str, part, name: str) -> np.ndarray:
+    if kind != "text":
+        return part[name]
+    blob, offsets, null = part[f"{name}.data"].tobytes(), part[f"{name}.offsets"], part[f"{name}.null"]
+    values = np.array([blob[a:b].decode() for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())], dtype=object)
+    values[null] = None
+    return values
+
+
+class ColumnarExport:
+    def __init__(
+        self,
+        root: str | Path = settings.EXPORT_DIR,
+        batch_rows: int = settings.EXPORT_BATCH_ROWS,
+        rows_per_file: int = settings.EXPORT_ROWS_PER_FILE,
+        settle_seconds: float = settings.EXPORT_SETTLE_SECONDS,
+    ):
+        self.root = Path(root)
+        self.batch_rows = batch_rows
+        self.rows_per_file = rows_per_file
+        self.settle_seconds = settle_seconds
+
+    def _dir(self, table: str) -> Path:
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"{table} is not exportable; expected one of {sorted(EXPORT_TABLES)}")
+        return self.root / table
+
+    def state(self, table: str) -> dict:
+        path = self._dir(table) / STATE_FILE
+        if not path.exists():
+            return {"last_id": 0, "last_timestamp": None, "rows": 0, "files": 0}
+        return json.loads(path.read_text())
+
+    def _write_state(self, table: str, state: dict) -> None:
+        path = self._dir(table) / STATE_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, path)
+
+    def reset(self, table: str) -> None:
+        shutil.rmtree(self._dir(table), ignore_errors=True)
+
+    def _query(self, table: str) -> str:
+        columns = ", ".join(name for name, _ in EXPORT_TABLES[table])
+        # Stop below the first row younger than the settle time, so an insert
+        # still committing is not jumped over by the high-water mark
+        return f"""
+        SELECT {columns}
+        FROM {table}
+        WHERE id > %s AND id < COALESCE(
+            (SELECT min(id) FROM {table}
+             WHERE id > %s AND timestamp >= LOCALTIMESTAMP - make_interval(secs => %s)),
+            {ID_MAX})
+        ORDER BY id
+        """
+
+    async def export(self, table: str, db: Database | None = None) -> ExportStats:
+        """Append the rows above the high-water mark; returns what this run wrote."""
+        last_id = self.state(table)["last_id"]
+        db = db or Database()
+        batches = db.stream(self._query(table), (last_id, last_id, self.settle_seconds), batch_size=self.batch_rows)
+        return await self.write(table, batches)
+
+    def _flush(self, table: str, chunks: list[list[dict[str, np.ndarray]]], state: dict) -> int:
+        spec = EXPORT_TABLES[table]
+        columns = [_concat(kind, [chunk[i] for chunk in chunks]) for i, (_, kind) in enumerate(spec)]
+        ids, stamps = columns[0][""], columns[1][""]
+        path = self._dir(table) / str(stamps[0].astype("datetime64[D]")) / f"part-{int(ids[0]):012d}.npz"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **{f"{name}{suffix}": array for (name, _), column in zip(spec, columns) for suffix, array in column.items()})
+        os.replace(tmp, path)
+
+        state["last_id"] = int(ids[-1])
+        state["last_timestamp"] = str(stamps[-1])
+        state["rows"] += len(ids)
+        state["files"] += 1
+        # After the file: a crash in between re-exports the same rows into the same file name
+        self._write_state(table, state)
+        return len(ids)
+
+    async def write(self, table: str, batches: AsyncIterator[list[tuple]]) -> ExportStats:
+        """Append row batches (ordered by id, above the high-water mark) as partition files."""
+        spec = EXPORT_TABLES[table]
+        started = time.perf_counter()
+        state = self.state(table)
+        before_rows, before_files = state["rows"], state["files"]
+        self._dir(table).mkdir(parents=True, exist_ok=True)
+
+        chunks: list[list[dict[str, np.ndarray]]] = []
+        buffered, day = 0, None
+        async for rows in batches:
+            values = list(zip(*rows))
+            batch = [_encode(kind, values[i]) for i, (_, kind) in enumerate(spec)]
+            days = batch[1][""].astype("datetime64[D]")
+            # Cut where the day changes or the current file is full
+            cuts = [0, *(np.flatnonzero(days[1:] != days[:-1]) + 1).tolist(), len(rows)]
+            for lo, hi in zip(cuts[:-1], cuts[1:]):
+                while lo < hi:
+                    if day is not None and (days[lo] != day or buffered >= self.rows_per_file):
+                        self._flush(table, chunks, state)
+                        chunks, buffered = [], 0
+                    take = min(hi, lo + self.rows_per_file - buffered)
+                    chunks.append([_slice(kind, column, lo, take) for (_, kind), column in zip(spec, batch)])
+                    buffered += take - lo
+                    day, lo = days[lo], take
+        if chunks:
+            self._flush(table, chunks, state)
+
+        seconds = time.perf_counter() - started
+        rows = state["rows"] - before_rows
+        return ExportStats(
+            table=table,
+            rows=rows,
+            files=state["files"] - before_files,
+            last_id=state["last_id"],
+            last_timestamp=state["last_timestamp"],
+            total_rows=state["rows"],
+            total_files=state["files"],
+            seconds=seconds,
+            rows_per_second=rows / seconds if seconds else 0.0,
+        )
+
+    def files(self, table: str, start: datetime.date | None = None, end: datetime.date | None = None) -> list[Path]:
+        """Partition files in id order, pruned to the days in [start, end]."""
+        return [
+            path for path in sorted(self._dir(table).glob("*/part-*.npz"), key=lambda p: p.name)
+            if (start is None or path.parent.name >= start.isoformat()[:10])
+            and (end is None or path.parent.name <= end.isoformat()[:10])
+        ]
+
+    def load(
+        self,
+        table: str,
+        columns: list[str] | None = None,
+        start: datetime.datetime | datetime.date | None = None,
+        end: datetime.datetime | datetime.date | None = None,
+    ) -> dict[str, np.ndarray]:
+        """
+        Exported rows as one array per column (text as object arrays), for
+        timestamps in [start, end). Ready for pandas.DataFrame(...).
+        """
+        kinds = dict(EXPORT_TABLES[table])
+        names = columns or list(kinds)
+        parts: dict[str, list[np.ndarray]] = {name: [] for name in names}
+        for path in self.files(table, start, end):
+            with np.load(path) as part:
+                stamps = part["timestamp"]
+                keep = np.ones(len(stamps), dtype=bool)
+                if start is not None:
+                    keep &= stamps >= np.datetime64(start, "us")
+                if end is not None:
+                    keep &= stamps < np.datetime64(end, "us")
+                for name in names:
+                    if kinds[name] == "float" and name not in part.files:
+                        # Column added after this partition was written
+                        parts[name].append(np.full(int(keep.sum()), np.nan))
+                        continue
+                    parts[name].append(_decode(kinds[name], part, name)[keep])
+        return {
+            name: np.concatenate(arrays) if arrays else np.empty(0, dtype=EMPTY_DTYPES[kinds[name]])
+            for name, arrays in parts.items()
+        }
+
+
+columnar_export = ColumnarExport()
+
+
+async def _main(tables: list[str], full: bool) -> None:
+    for table in tables:
+        if full:
+            columnar_export.reset(table)
+        print((await columnar_export.export(table)).model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--table", action="append", choices=sorted(EXPORT_TABLES), help="repeatable (default: all)")
+    parser.add_argument("--full", action="store_true", help="drop the table's files and export everything again")
+    args = parser.parse_args()
+    asyncio.run(_main(args.table or list(EXPORT_TABLES), args.full))
@@ -23,11 +23,81 @@ async def init_tables():
         timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
         reason TEXT,
         is_open BOOLEAN DEFAULT TRUE,
-        profit_loss FLOAT
+        profit_loss FLOAT,
+        decision_source VARCHAR(10) DEFAULT 'llm'
     );
     """
+
+    # Existing deployments: who produced the decision (llm, gate or cache)
+    add_decision_source = """
+    ALTER TABLE crypto_trade_history
+    ADD COLUMN IF NOT EXISTS decision_source VARCHAR(10) DEFAULT 'llm';
+    """
     
-    # 2. SQL for System Logs
+    # 2. SQL for Tool Results (one row per decision cycle's tool outputs)
+    create_tools_table = """
+    CREATE TABLE IF NOT EXISTS crypto_tools_result (
+        id SERIAL PRIMARY KEY,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        step1_price_usd FLOAT NOT NULL,
+        step1_change_24h_pct FLOAT NOT NULL,
+        step2_order_book_signal VARCHAR(50),
+        step3_candle_trend VARCHAR(20),
+        step4_news_sentiment VARCHAR(20),
+        step5_holdings_value_usd FLOAT NOT NULL,
+        side VARCHAR(10),
+        action_id INTEGER
+    );
+    """
+
+    # Existing deployments: when the row was written (incremental export high-water mark)
+    add_tools_timestamp = """
+    ALTER TABLE crypto_tools_result
+    ADD COLUMN IF NOT EXISTS timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+    """
+
+    # Existing deployments: the crypto_trade_history decision the tool results belong to
+    add_tools_action_id = """
+    ALTER TABLE crypto_tools_result
+    ADD COLUMN IF NOT EXISTS action_id INTEGER;
+    """
+
+    # 3. SQL for Decision Quality: forward returns per decision, filled in as candles arrive
+    create_outcomes_table = """
+    CREATE TABLE IF NOT EXISTS crypto_decision_outcomes (
+        action_id INTEGER PRIMARY KEY,
+        timestamp TIMESTAMP NOT NULL,
+        symbol VARCHAR(50) NOT NULL,
+        side VARCHAR(10) NOT NULL,
+        decision_source VARCHAR(10),
+        candle_trend VARCHAR(20) NOT NULL,
+        news_sentiment VARCHAR(20) NOT NULL,
+        order_book_signal VARCHAR(50) NOT NULL,
+        return_15m FLOAT,
+        return_1h FLOAT,
+        return_4h FLOAT
+    );
+    """
+
+    # ...and their running sums per feature combination and horizon
+    create_quality_table = """
+    CREATE TABLE IF NOT EXISTS crypto_decision_quality (
+        symbol VARCHAR(50) NOT NULL,
+        side VARCHAR(10) NOT NULL,
+        candle_trend VARCHAR(20) NOT NULL,
+        news_sentiment VARCHAR(20) NOT NULL,
+        order_book_signal VARCHAR(50) NOT NULL,
+        horizon VARCHAR(5) NOT NULL,
+        decisions INTEGER NOT NULL,
+        sum_return FLOAT NOT NULL,
+        sum_return_sq FLOAT NOT NULL,
+        hits INTEGER NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (symbol, side, candle_trend, news_sentiment, order_book_signal, horizon)
+    );
+    """
+
+    # 4. SQL for System Logs
     create_logs_table = """
     CREATE TABLE IF NOT EXISTS crypto_system_logs (
         id SERIAL PRIMARY KEY,
@@ -40,7 +110,17 @@ async def init_tables():
     try:
         logger.info("🔨 Creating 'trade_history' table...")
         await db.execute_write(create_trades_table)
+        await db.execute_write(add_decision_source)
         
+        logger.info("🔨 Creating 'tools_result' table...")
+        await db.execute_write(create_tools_table)
+        await db.execute_write(add_tools_timestamp)
+        await db.execute_write(add_tools_action_id)
+
+        logger.info("🔨 Creating 'decision_outcomes' and 'decision_quality' tables...")
+        await db.execute_write(create_outcomes_table)
+        await db.execute_write(create_quality_table)
+
         logger.info("🔨 Creating 'system_logs' table...")
         await db.execute_write(create_logs_table)
         
@@ -0,0 +1,97 @@
+"""
+Per-cycle time budget, carried in a context variable.
+
+The loop opens `cycle_deadlines.cycle()` around each decision cycle; tasks
+and threads started inside it inherit the deadline (asyncio and
+asyncio.to_thread copy the context). Every upstream request
+(InstrumentedTransport) and database connection then uses the remaining
+budget as its timeout, never less than CYCLE_MIN_CALL_SECONDS so a late
+decision can still be logged. Tools check `nearly_spent()` and answer from
+local data, marked stale, or skip with an explicit notice instead of
+starting a slow request.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+
+from app.config import settings
+from app.metrics import counter, histogram
+from app.schemas.deadline import CycleBudgetStats
+
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar("cycle_deadline", default=None)
+
+
+def remaining() -> float | None:
+    """Seconds left in the current cycle's budget (negative once over), or None outside a cycle."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def call_timeout(default: float | None) -> float | None:
+    """`default` capped by the remaining budget, floored at CYCLE_MIN_CALL_SECONDS."""
+    left = remaining()
+    if left is None:
+        return default
+    capped = left if default is None else min(default, left)
+    return max(settings.CYCLE_MIN_CALL_SECONDS, capped)
+
+
+def nearly_spent() -> bool:
+    left = remaining()
+    return left is not None and left < settings.CYCLE_BUDGET_RESERVE_SECONDS
+
+
+def budget_notice(what: str) -> str:
+    """What a tool returns instead of `what` when the budget is nearly spent."""
+    return (
+        f"SKIPPED {what}: the cycle's time budget is nearly spent ({max(0.0, remaining() or 0.0):.0f}s left). "
+        "Decide with the data already gathered."
+    )
+
+
+class CycleDeadlines:
+    """Sets each cycle's deadline and counts the cycles that finished inside it."""
+
+    def __init__(self, budget: float = settings.CYCLE_BUDGET_SECONDS):
+        self.budget = budget
+        self.cycles = 0
+        self.inside = 0
+        self.worst_overrun = 0.0
+
+    @contextmanager
+    def cycle(self):
+        started = time.monotonic()
+        token = _deadline.set(started + self.budget)
+        completed = False
+        try:
+            yield
+            completed = True
+        finally:
+            _deadline.reset(token)
+            elapsed = time.monotonic() - started
+            inside = completed and elapsed <= self.budget
+            self.cycles += 1
+            self.inside += inside
+            self.worst_overrun = max(self.worst_overrun, elapsed - self.budget)
+            counter(
+                "agent_cycle_budget_total",
+                "Decision cycles per outcome against the cycle time budget.",
+                labels={"outcome": "inside" if inside else "over" if completed else "failed"},
+            ).inc()
+            histogram(
+                "agent_cycle_budget_used_ratio",
+                "Fraction of the cycle time budget used.",
+                buckets=(0.1, 0.25, 0.5, 0.75, 0.9, 1.0, 1.25, 1.5, 2.0),
+            ).observe(elapsed / self.budget)
+
+    def stats(self) -> CycleBudgetStats:
+        return CycleBudgetStats(
+            budget_seconds=self.budget,
+            cycles=self.cycles,
+            inside=self.inside,
+            inside_fraction=self.inside / self.cycles if self.cycles else 0.0,
+            worst_overrun_seconds=max(0.0, self.worst_overrun),
+        )
+
+
+cycle_deadlines = CycleDeadlines()
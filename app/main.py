@@ -0,0 +1,69 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.analysis.executor import analysis_executor, loop_lag
+from app.api.router import api_router
+from app.broker import stream_broker
+from app.config import settings
+from app.data.binance.market_stream import pump_market_updates
+from app.metrics import render_prometheus
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background: list[asyncio.Task] = [asyncio.create_task(loop_lag.run())]
+    await analysis_executor.start()
+    if settings.STREAM_MARKET_ENABLED:
+        background.append(
+            asyncio.create_task(
+                pump_market_updates(
+                    stream_broker,
+                    settings.STREAM_MARKET_SYMBOLS,
+                    settings.STREAM_KLINE_INTERVAL,
+                    settings.STREAM_MARKET_MIN_INTERVAL_SECONDS,
+                )
+            )
+        )
+
+    if settings.DECISION_QUALITY_ENABLED:
+        from app.analysis.decision_quality import decision_quality
+
+        background.append(asyncio.create_task(decision_quality.run()))
+
+    if settings.RUN_AGENT_LOOP:
+        # Imported lazily; the agents SDK itself loads in startup(), off the event loop
+        from app.agents.trading_agent import main as agent_loop
+
+        background.append(asyncio.create_task(agent_loop()))
+
+    yield
+
+    for task in background:
+        task.cancel()
+    await asyncio.gather(*background, return_exceptions=True)
+    await analysis_executor.stop()
+
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+app.include_router(api_router, prefix=settings.API_V1_PREFIX)
+
+
+@app.exception_handler(httpx.HTTPError)
+async def upstream_error(_request: Request, exc: httpx.HTTPError) -> JSONResponse:
+    """An upstream API failed; nothing was cached for this request."""
+    return JSONResponse(status_code=502, content={"detail": f"Upstream error: {exc!r}"})
+
+
+@app.get("/health")
+async def health() -> dict:
+    return {"status": "ok"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,165 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Latency buckets in seconds, upper bounds (le). +Inf is implicit.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _labels(labels: dict[str, str] | None) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in (labels or {}).items()))
+
+
+def _format_labels(labels: Labels, extra: tuple[str, str] | None = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str = "",
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+        labels: Labels = (),
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, value)] += 1
+            self._sum += value
+            self._count += 1
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def quantile(self, q: float) -> float:
+        """Bucket upper bound below which `q` of the observations fall (0.0 when empty)."""
+        with self._lock:
+            if self._count == 0:
+                return 0.0
+            target = q * self._count
+            seen = 0
+            for bound, count in zip(self.buckets, self._counts):
+                seen += count
+                if seen >= target:
+                    return bound
+            return float("inf")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, count in zip(self.buckets, self._counts):
+                running += count
+                cumulative[str(bound)] = running
+            cumulative["+Inf"] = self._count
+            count, total = self._count, self._sum
+
+        return {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": cumulative,
+        }
+
+    def render(self) -> list[str]:
+        snap = self.snapshot()
+        lines = [
+            f"{self.name}_bucket{_format_labels(self.labels, ('le', le))} {count}"
+            for le, count in snap["buckets"].items()
+        ]
+        lines.append(f"{self.name}_sum{_format_labels(self.labels)} {snap['sum']}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels)} {snap['count']}")
+        return lines
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name: str, help: str = "", labels: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labels)} {self.value}"]
+
+
+_registry: dict[tuple[str, Labels], Histogram | Counter] = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(
+    name: str,
+    help: str = "",
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    labels: dict[str, str] | None = None,
+) -> Histogram:
+    """Get or create the process-wide histogram series `name{labels}`."""
+    key = (name, _labels(labels))
+    with _registry_lock:
+        if key not in _registry:
+            _registry[key] = Histogram(name, help, buckets, key[1])
+        return _registry[key]
+
+
+def counter(name: str, help: str = "", labels: dict[str, str] | None = None) -> Counter:
+    """Get or create the process-wide counter series `name{labels}`."""
+    key = (name, _labels(labels))
+    with _registry_lock:
+        if key not in _registry:
+            _registry[key] = Counter(name, help, key[1])
+        return _registry[key]
+
+
+def render_prometheus() -> str:
+    """All registered series in the Prometheus text exposition format (0.0.4)."""
+    with _registry_lock:
+        series = sorted(_registry.values(), key=lambda m: (m.name, m.labels))
+
+    helps: dict[str, str] = {}
+    for metric in series:
+        if metric.help:
+            helps.setdefault(metric.name, metric.help)
+
+    lines: list[str] = []
+    current = None
+    for metric in series:
+        if metric.name != current:
+            current = metric.name
+            if current in helps:
+                lines.append(f"# HELP {current} {helps[current]}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import logging
+import time
+
+import websockets
+
+from app.config import settings
+from app.data.binance.market_data import fetch_klines
+from app.data.kline_archive import interval_ms
+from app.data.shared_market import SharedMarketTable
+from app.data.shared_ring import KLINE, SharedRing, kline_row, ring_name
+
+logger = logging.getLogger(__name__)
+
+# Binance allows 1024 streams per connection; stay well under it
+STREAMS_PER_CONNECTION = 300
+STREAM_KINDS = ("ticker", "bookTicker", "depth20@100ms")
+KLINES_PAGE = 1000  # /klines maximum limit
+
+
+def _ticker_fields(data: dict) -> dict:
+    return {
+        "ticker_at": time.time(),
+        "event_time": int(data["E"]),
+        "last_price": float(data["c"]),
+        "open_price": float(data["o"]),
+        "high_price": float(data["h"]),
+        "low_price": float(data["l"]),
+        "prev_close_price": float(data["x"]),
+        "price_change": float(data["p"]),
+        "price_change_pct": float(data["P"]),
+        "weighted_avg_price": float(data["w"]),
+        "volume": float(data["v"]),
+        "quote_volume": float(data["q"]),
+        "trades": int(data["n"]),
+    }
+
+
+def _book_fields(data: dict) -> dict:
+    return {
+        "book_at": time.time(),
+        "bid_price": float(data["b"]),
+        "bid_qty": float(data["B"]),
+        "ask_price": float(data["a"]),
+        "ask_qty": float(data["A"]),
+    }
+
+
+def _kline_row(k: dict) -> tuple:
+    return (
+        int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"]),
+        int(k["T"]), float(k["q"]), int(k["n"]), float(k["V"]), float(k["Q"]),
+    )
+
+
+def _depth_fields(data: dict) -> dict:
+    return {
+        "depth_at": time.time(),
+        "depth_levels": min(len(data["bids"]), len(data["asks"])),
+        "depth_bid_qty": sum(float(qty) for _, qty in data["bids"]),
+        "depth_ask_qty": sum(float(qty) for _, qty in data["asks"]),
+    }
+
+
+class MarketFeed:
+    """
+    The only process with Binance market streams in the sharded runner.
+
+    Subscribes to the 24h ticker, best bid/ask and 20-level partial depth of
+    every symbol over combined streams and writes each message into its row
+    of the shared market table, where the agent workers read it. Candles of
+    one interval go to a shared ring per symbol, backfilled over REST on
+    every (re)connect so a dropped stream leaves no gap.
+    """
+
+    def __init__(
+        self,
+        table: SharedMarketTable,
+        binance_symbols: list[str],
+        updates=None,
+        kline_interval: str = settings.SHARED_KLINE_INTERVAL,
+    ):
+        self.table = table
+        self.binance_symbols = binance_symbols
+        self.kline_interval = kline_interval
+        self.rings = {
+            symbol.upper(): SharedRing.attach(ring_name(table.name, symbol, f"kline_{kline_interval}"), KLINE, writer=True)
+            for symbol in binance_symbols
+        }
+        # multiprocessing.Value shared with the supervisor, or None
+        self._updates = updates
+        self.reconnects = 0
+
+    def streams(self) -> list[list[str]]:
+        kinds = (*STREAM_KINDS, f"kline_{self.kline_interval}")
+        names = [f"{symbol.lower()}@{kind}" for symbol in self.binance_symbols for kind in kinds]
+        return [names[i:i + STREAMS_PER_CONNECTION] for i in range(0, len(names), STREAMS_PER_CONNECTION)]
+
+    async def backfill(self, symbol: str) -> None:
+        """
+        Page /klines forward from the ring's newest candle (or from a full
+        ring's worth back, if older or empty) up to the open one, however
+        long the stream was down.
+        """
+        ring = self.rings[symbol.upper()]
+        step = interval_ms(self.kline_interval)
+        now_ms = int(time.time() * 1000)
+        oldest = now_ms - now_ms % step - (ring.capacity - 1) * step
+        start = oldest if ring.head == 0 else max(oldest, int(ring.read_last(1)[0]["open_time"]))
+        while True:
+            klines = await fetch_klines(symbol, interval=self.kline_interval, limit=KLINES_PAGE, start_time=start)
+            for kline in klines:
+                ring.upsert(kline_row(kline), "open_time")
+            if len(klines) < KLINES_PAGE:
+                return
+            start = int(klines[-1][0]) + step
+
+    def apply(self, stream: str, data: dict) -> None:
+        symbol, _, kind = stream.partition("@")
+        if kind.startswith("kline_"):
+            self.rings[symbol.upper()].upsert(_kline_row(data["k"]), "open_time")
+            if self._updates is not None:
+                self._updates.value += 1
+            return
+        if kind == "ticker":
+            fields = _ticker_fields(data)
+        elif kind == "bookTicker":
+            fields = _book_fields(data)
+        elif kind.startswith("depth"):
+            fields = _depth_fields(data)
+        else:
+            return
+        self.table.write(symbol, **fields)
+        if self._updates is not None:
+            self._updates.value += 1
+
+    async def _connection(self, streams: list[str]) -> None:
+        url = f"{settings.BINANCE_WS_URL}/stream?streams={'/'.join(streams)}"
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(url, max_size=None) as websocket:
+                    backoff = 1.0
+                    symbols = {stream.partition("@")[0] for stream in streams if "@kline_" in stream}
+                    await asyncio.gather(*(self.backfill(symbol) for symbol in symbols))
+                    async for message in websocket:
+                        try:
+                            payload = json.loads(message)
+                            self.apply(payload["stream"], payload["data"])
+                        except (KeyError, ValueError) as e:
+                            logger.warning(f"Unreadable market message: {e!r}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Market stream dropped ({len(streams)} streams): {e!r}")
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def run(self) -> None:
+        await asyncio.gather(*(self._connection(streams) for streams in self.streams()))
+
+    def close(self) -> None:
+        for ring in self.rings.values():
+            ring.close()
+
+
+def run_market_feed(table_name: str, binance_symbols: list[str], updates) -> None:
+    """Process entry point: publish the streams of `binance_symbols` into the named table."""
+    logging.basicConfig(level=logging.WARNING)
+    table = SharedMarketTable.attach(table_name, writer=True)
+    feed = MarketFeed(table, binance_symbols, updates)
+    try:
+        asyncio.run(feed.run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        feed.close()
+        table.close()
@@ -0,0 +1,297 @@
+"""
+Sharded agent runner.
+
+One market-data process owns the Binance streams and publishes them into a
+shared-memory table (app/data/shared_market.py) and per-symbol kline rings
+(app/data/shared_ring.py); N worker processes each run the agent loop for a
+shard of the symbols and read market data from there instead of opening
+their own upstream connections. The supervisor
+restarts crashed or stalled processes with backoff and, when a worker keeps
+failing, retires it and rebalances its symbols over the others.
+
+    python -m app.runner.supervisor
+    python -m app.runner.supervisor --symbols DOGE BTC ETH --workers 2 --interval 60
+    python -m app.runner.supervisor --duration 300 --stats stats.json
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque
+from pathlib import Path
+
+from app.config import settings
+from app.data.shared_market import SharedMarketTable
+from app.data.shared_ring import KLINE, SharedRing, ring_name
+from app.runner.market_feed import run_market_feed
+from app.runner.worker import run_worker
+from app.schemas.runner import RunnerStats, RunnerWorkerStats
+
+logger = logging.getLogger(__name__)
+
+MONITOR_INTERVAL = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+
+
+def rss_mb(pid: int | None) -> float | None:
+    """Resident set size of a process from /proc (Linux only)."""
+    if pid is None:
+        return None
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def shard(symbols: list[str], slots: list[int]) -> dict[int, list[str]]:
+    """Round-robin symbols over the given worker slots."""
+    return {slot: symbols[i::len(slots)] for i, slot in enumerate(slots)}
+
+
+class _Slot:
+    def __init__(self, ctx, index: int):
+        self.index = index
+        self.symbols: list[str] = []
+        self.process: multiprocessing.Process | None = None
+        self.heartbeat = ctx.Value("d", 0.0, lock=False)
+        self.cycles = ctx.Value("q", 0, lock=False)
+        self.errors = ctx.Value("q", 0, lock=False)
+        self.restarts = 0
+        self.recent_restarts: deque[float] = deque()
+        self.restart_at = 0.0
+        self.retired = False
+
+
+class Supervisor:
+    def __init__(
+        self,
+        symbols: list[str] = settings.RUNNER_SYMBOLS,
+        workers: int = settings.RUNNER_WORKERS,
+        interval: float = settings.RUNNER_CYCLE_INTERVAL_SECONDS,
+        max_concurrent: int = settings.RUNNER_MAX_CONCURRENT_CYCLES,
+        heartbeat_timeout: float = settings.RUNNER_HEARTBEAT_TIMEOUT_SECONDS,
+        max_restarts: int = settings.RUNNER_MAX_RESTARTS,
+        restart_window: float = settings.RUNNER_RESTART_WINDOW_SECONDS,
+    ):
+        self.symbols = [symbol.upper() for symbol in symbols]
+        self.interval = interval
+        self.max_concurrent = max_concurrent
+        self.heartbeat_timeout = heartbeat_timeout
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+
+        # spawn: children must not inherit the supervisor's threads or sockets
+        self._ctx = multiprocessing.get_context("spawn")
+        self._slots = [_Slot(self._ctx, i) for i in range(max(1, min(workers, len(self.symbols))))]
+        self._table: SharedMarketTable | None = None
+        self._rings: list[SharedRing] = []
+        self._market: multiprocessing.Process | None = None
+        self._market_updates = self._ctx.Value("q", 0, lock=False)
+        self.market_restarts = 0
+        self.rebalances = 0
+        self._started = 0.0
+        self._stopping = False
+        self.last_stats: RunnerStats | None = None
+
+    def _binance_symbols(self) -> list[str]:
+        return [f"{symbol}USDT" for symbol in self.symbols]
+
+    def _start_market(self) -> None:
+        self._market = self._ctx.Process(
+            target=run_market_feed,
+            args=(self._table.name, self._binance_symbols(), self._market_updates),
+            name="market-feed",
+            daemon=True,
+        )
+        self._market.start()
+
+    def _start_worker(self, slot: _Slot) -> None:
+        slot.heartbeat.value = time.time()
+        slot.process = self._ctx.Process(
+            target=run_worker,
+            args=(
+                slot.index, slot.symbols, self._table.name, self.interval, self.max_concurrent,
+                slot.heartbeat, slot.cycles, slot.errors,
+            ),
+            name=f"agent-worker-{slot.index}",
+            daemon=True,
+        )
+        slot.process.start()
+
+    @staticmethod
+    def _kill(process: multiprocessing.Process | None, grace: float = 5.0) -> None:
+        if process is None or not process.is_alive():
+            return
+        process.terminate()
+        process.join(grace)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def start(self) -> None:
+        self._started = time.time()
+        self._table = SharedMarketTable.create(f"rh_market_{os.getpid()}", self._binance_symbols())
+        self._rings = [
+            SharedRing.create(
+                ring_name(self._table.name, symbol, f"kline_{settings.SHARED_KLINE_INTERVAL}"),
+                KLINE, settings.SHARED_KLINE_CAPACITY,
+            )
+            for symbol in self._binance_symbols()
+        ]
+        self._start_market()
+        for slot, symbols in shard(self.symbols, [s.index for s in self._slots]).items():
+            self._slots[slot].symbols = symbols
+            self._start_worker(self._slots[slot])
+        logger.info(f"Runner started: {len(self.symbols)} symbols over {len(self._slots)} workers")
+
+    def _active(self) -> list[_Slot]:
+        return [slot for slot in self._slots if not slot.retired]
+
+    def _rebalance(self) -> None:
+        """Re-shard every symbol over the remaining workers and restart those whose shard changed."""
+        active = self._active()
+        if not active:
+            raise RuntimeError("every worker was retired after repeated failures")
+        self.rebalances += 1
+        for index, symbols in shard(self.symbols, [s.index for s in active]).items():
+            slot = self._slots[index]
+            if symbols != slot.symbols:
+                slot.symbols = symbols
+                self._kill(slot.process)
+                self._start_worker(slot)
+
+    def _failed(self, slot: _Slot, now: float, why: str) -> None:
+        self._kill(slot.process)
+        slot.process = None
+        slot.recent_restarts.append(now)
+        while slot.recent_restarts and now - slot.recent_restarts[0] > self.restart_window:
+            slot.recent_restarts.popleft()
+
+        if len(slot.recent_restarts) > self.max_restarts:
+            logger.error(
+                f"Worker {slot.index} {why}, its {len(slot.recent_restarts)}th failure in "
+                f"{self.restart_window:.0f}s; moving {slot.symbols} to the other workers"
+            )
+            slot.retired = True
+            self._rebalance()
+            return
+
+        backoff = min(MAX_BACKOFF_SECONDS, 2.0 ** (len(slot.recent_restarts) - 1))
+        slot.restart_at = now + backoff
+        logger.warning(f"Worker {slot.index} {why}; restarting in {backoff:.0f}s")
+
+    def check(self) -> None:
+        """One monitoring pass: restart what died or stalled."""
+        now = time.time()
+        if self._market is not None and not self._market.is_alive():
+            logger.warning(f"Market feed exited with {self._market.exitcode}; restarting")
+            self.market_restarts += 1
+            self._start_market()
+
+        for slot in self._active():
+            if slot.process is None:
+                if now >= slot.restart_at:
+                    slot.restarts += 1
+                    self._start_worker(slot)
+            elif not slot.process.is_alive():
+                self._failed(slot, now, f"exited with {slot.process.exitcode}")
+            elif now - slot.heartbeat.value > self.heartbeat_timeout:
+                self._failed(slot, now, f"missed its heartbeat for {now - slot.heartbeat.value:.0f}s")
+
+    def run(self, duration: float | None = None) -> None:
+        """Start, then monitor until SIGINT/SIGTERM or `duration` seconds."""
+        self._stopping = False
+
+        def stop(*_):
+            self._stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.start()
+        try:
+            while not self._stopping:
+                if duration is not None and time.time() - self._started >= duration:
+                    break
+                time.sleep(MONITOR_INTERVAL)
+                self.check()
+        finally:
+            # Taken before stop(): counters survive the processes, RSS does not
+            self.last_stats = self.stats()
+            self.stop()
+
+    def stop(self) -> None:
+        for slot in self._slots:
+            if slot.process is not None and slot.process.is_alive():
+                slot.process.terminate()
+        for slot in self._slots:
+            self._kill(slot.process)
+        self._kill(self._market)
+        for ring in self._rings:
+            ring.close()
+        self._rings = []
+        if self._table is not None:
+            self._table.close()
+            self._table = None
+
+    def stats(self) -> RunnerStats:
+        now = time.time()
+        workers = [
+            RunnerWorkerStats(
+                slot=slot.index,
+                pid=slot.process.pid if slot.process else None,
+                alive=bool(slot.process and slot.process.is_alive()),
+                retired=slot.retired,
+                symbols=slot.symbols,
+                cycles=slot.cycles.value,
+                errors=slot.errors.value,
+                restarts=slot.restarts,
+                heartbeat_age_seconds=now - slot.heartbeat.value if slot.process else None,
+                rss_mb=rss_mb(slot.process.pid if slot.process else None),
+            )
+            for slot in self._slots
+        ]
+        return RunnerStats(
+            uptime_seconds=now - self._started if self._started else 0.0,
+            symbols=len(self.symbols),
+            workers=len(self._slots),
+            active_workers=len(self._active()),
+            cycles=sum(w.cycles for w in workers),
+            errors=sum(w.errors for w in workers),
+            restarts=sum(w.restarts for w in workers),
+            rebalances=self.rebalances,
+            market_pid=self._market.pid if self._market else None,
+            market_updates=self._market_updates.value,
+            market_restarts=self.market_restarts,
+            market_rss_mb=rss_mb(self._market.pid if self._market else None),
+            worker_stats=workers,
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", nargs="+", default=settings.RUNNER_SYMBOLS, help="Robinhood asset codes")
+    parser.add_argument("--workers", type=int, default=settings.RUNNER_WORKERS)
+    parser.add_argument("--interval", type=float, default=settings.RUNNER_CYCLE_INTERVAL_SECONDS, help="seconds between cycles per symbol")
+    parser.add_argument("--max-concurrent", type=int, default=settings.RUNNER_MAX_CONCURRENT_CYCLES, help="cycles in flight per worker")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    parser.add_argument("--stats", help="write the final RunnerStats JSON to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    supervisor = Supervisor(args.symbols, args.workers, args.interval, args.max_concurrent)
+    try:
+        supervisor.run(args.duration)
+    finally:
+        if args.stats and supervisor.last_stats is not None:
+            Path(args.stats).write_text(json.dumps(supervisor.last_stats.model_dump(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
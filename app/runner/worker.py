@@ -0,0 +1,85 @@
+import asyncio
+import logging
+import time
+
+from app.config import settings
+from app.data.shared_market import attach_shared_market
+from app.data.shared_ring import attach_shared_ring
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 1.0
+
+
+async def _heartbeat(heartbeat) -> None:
+    # Written from the event loop, so a blocked loop shows up as a stale heartbeat
+    while True:
+        heartbeat.value = time.time()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+
+async def _symbol_loop(
+    symbol: str, offset: float, interval: float, slots: asyncio.Semaphore, cycles, errors
+) -> None:
+    from app.agents.trading_agent import run_cycle
+    from app.deadline import cycle_deadlines
+
+    await asyncio.sleep(offset)
+    cycle_number = 0
+    while True:
+        cycle_number += 1
+        started = time.monotonic()
+        async with slots:
+            try:
+                with cycle_deadlines.cycle():
+                    await run_cycle(cycle_number, symbol, f"{symbol}USDT")
+            except Exception:
+                errors.value += 1
+                logger.exception(f"{symbol} cycle #{cycle_number} failed")
+            cycles.value += 1
+        await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+
+async def _run(slot, symbols, interval, max_concurrent, heartbeat, cycles, errors) -> None:
+    from app.agents.trading_agent import startup
+
+    heartbeat_task = asyncio.create_task(_heartbeat(heartbeat))
+    await asyncio.to_thread(startup)
+
+    slots = asyncio.Semaphore(max_concurrent)
+    # Spread the shard's first cycles over one interval instead of starting them together
+    step = interval / len(symbols) if symbols else 0.0
+    loops = [
+        asyncio.create_task(_symbol_loop(symbol, i * step, interval, slots, cycles, errors))
+        for i, symbol in enumerate(symbols)
+    ]
+    try:
+        await asyncio.gather(heartbeat_task, *loops)
+    finally:
+        for task in (heartbeat_task, *loops):
+            task.cancel()
+
+
+def run_worker(slot, symbols, table_name, interval, max_concurrent, heartbeat, cycles, errors) -> None:
+    """
+    Process entry point: run the agent loop for one shard of symbols.
+    Market data comes from the shared table and kline rings; `heartbeat`, `cycles` and
+    `errors` are multiprocessing.Values read by the supervisor.
+    """
+    logging.basicConfig(level=logging.WARNING)
+    table = attach_shared_market(table_name)
+    rings = [
+        attach_shared_ring(table_name, f"{symbol}USDT", f"kline_{settings.SHARED_KLINE_INTERVAL}")
+        for symbol in symbols
+    ]
+    try:
+        asyncio.run(_run(slot, symbols, interval, max_concurrent, heartbeat, cycles, errors))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        from app.agents.session_store import close_session_stores
+
+        close_session_stores()
+        for ring in rings:
+            ring.close()
+        table.close()
@@ -24,6 +24,15 @@ class ActionsHistoryData(BaseModel):
     timestamp: str = Field(description="The timestamp when the action occurred.")
     reason: str = Field(description="The reason for the action (e.g., profit target hit, stop loss triggered).")
     is_open: bool = Field(description="Indicates whether the position is still open.") 
+    decision_source: str = Field(default="llm", description="Who produced the decision: llm, gate (unchanged market) or cache.")
+
+class ActionStatusUpdate(BaseModel):
+    action_id: int = Field(description="crypto_trade_history id of the decision the order executes.")
+    is_open: bool = Field(description="Whether the position is still open after the order settled.")
+    profit_loss: float = Field(default=0.0, description="Realised profit/loss in USD.")
+    quantity: float | None = Field(default=None, description="Filled asset quantity (None keeps the logged value).")
+    price: float | None = Field(default=None, description="Average fill price (None keeps the logged value).")
+    amount_usd: float | None = Field(default=None, description="Filled notional in USD (None keeps the logged value).")
 
 class ToolsRequest(BaseModel):
     step1_price_usd: float = Field(description="Price at step 1 (e.g., current price).")
@@ -33,6 +42,7 @@ class ToolsRequest(BaseModel):
     step4_news_sentiment: NewsSentiment = Field(description="News sentiment at step 4 (e.g., positive, negative).")
     step5_holdings_value_usd: float = Field(description="Current holdings value in USD at step 5.")
     side: str = Field(description="The side of the action (e.g., buy, sell, hold).")
+    action_id: int | None = Field(default=None, description="Decision id returned by log_action in the same cycle.")
 
 class ToolsResults(BaseModel):
     id: int = Field(description="Unique identifier for the tool result record.")
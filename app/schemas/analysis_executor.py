@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+
+
+class LoopLagStats(BaseModel):
+    samples: int
+    interval_ms: float = Field(description="Sampling period; lag is how late each sample woke up.")
+    mean_ms: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class AnalysisExecutorStats(BaseModel):
+    enabled: bool
+    workers: int
+    warm_workers: int = Field(description="Distinct worker processes that completed the warm-up task.")
+    warmup_seconds: float
+    tasks: int = Field(description="Tasks completed in the pool.")
+    inline: int = Field(description="Tasks run on the event loop because the pool was not started.")
+    timeouts: int
+    recycles: int = Field(description="Times the worker processes were replaced after a timeout or crash.")
+    resubmits: int = Field(description="Tasks displaced by a recycle and run again on the replacement pool.")
@@ -1,11 +1,17 @@
+from enum import Enum
 from pydantic import BaseModel
 
+class OrderBookMode(str, Enum):
+    RAW = "raw"        # every level as parallel price/qty lists
+    DIGEST = "digest"  # fixed-size depth summary, whatever the limit
+
 class BookTickerRequest(BaseModel):
     symbol: str
 
 class OrderBookRequest(BaseModel):
     symbol: str
     limit: int = 20
+    mode: OrderBookMode = OrderBookMode.RAW
 
 class BookTickerResponse(BaseModel):
     symbol: str
@@ -16,6 +22,7 @@ class BookTickerResponse(BaseModel):
     spread_bps: float
     bid_quantity: float
     ask_quantity: float
+    stale_seconds: float | None = None  # set when answered from an open breaker's fallback
 
 class OrderBookResponse(BaseModel):
     symbol: str
@@ -28,4 +35,42 @@ class OrderBookResponse(BaseModel):
     asks: list[float]
     asks_qty: list[float]
     limit: int
-    last_update_id: int
\ No newline at end of file
+    last_update_id: int
+    stale_seconds: float | None = None  # set when answered from an open breaker's fallback
+
+class DepthBand(BaseModel):
+    pct_from_mid: float
+    bid_qty: float
+    ask_qty: float
+    bid_notional: float
+    ask_notional: float
+    imbalance: float  # (bid - ask) / (bid + ask) notional within the band
+
+class BookWall(BaseModel):
+    side: str
+    price: float
+    qty: float
+    notional: float
+    distance_pct: float
+
+class SlippageEstimate(BaseModel):
+    side: str  # buy walks the asks, sell walks the bids
+    notional: float
+    avg_price: float
+    slippage_bps: float  # vs mid
+    filled_pct: float  # < 100 when the fetched depth cannot absorb the size
+
+class OrderBookDigest(BaseModel):
+    symbol: str
+    type: str
+    best_bid: float
+    best_ask: float
+    mid: float
+    spread_bps: float
+    microprice: float  # top-of-book size-weighted mid
+    levels: int
+    depth_bands: list[DepthBand]
+    walls: list[BookWall]
+    slippage: list[SlippageEstimate]
+    last_update_id: int
+    stale_seconds: float | None = None  # set when answered from an open breaker's fallback
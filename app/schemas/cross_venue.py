@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+
+
+class CrossVenueSnapshot(BaseModel):
+    asset_code: str = Field(description="Robinhood asset code (e.g., DOGE).")
+    binance_symbol: str = Field(description="Binance symbol used for the comparison (e.g., DOGEUSDT).")
+    timestamp: float = Field(description="Unix seconds of the evaluation.")
+    binance_mid: float = Field(description="Latest Binance mid price.")
+    robinhood_mid: float = Field(description="Latest Robinhood price.")
+    basis_bps: float = Field(description="Robinhood mid minus Binance mid, in bps of the Binance mid.")
+    basis_mean_bps: float = Field(description="Rolling mean of the basis over the window.")
+    basis_zscore: float = Field(description="Z-score of the latest basis against the rolling window.")
+    buy_edge_bps: float = Field(description="Binance bid minus Robinhood ask (incl. buy spread), in bps.")
+    sell_edge_bps: float = Field(description="Robinhood bid (incl. sell spread) minus Binance ask, in bps.")
+    lag_seconds: float = Field(description="Estimated lag of Robinhood quotes behind Binance.")
+    samples: int = Field(description="Number of Robinhood quotes in the rolling window.")
+
+
+class DislocationEvent(BaseModel):
+    kind: str = Field(description="basis_zscore, buy_edge or sell_edge.")
+    value: float = Field(description="Value that crossed the threshold.")
+    threshold: float = Field(description="Configured threshold.")
+    snapshot: CrossVenueSnapshot
@@ -0,0 +1,9 @@
+from pydantic import BaseModel, Field
+
+
+class CycleBudgetStats(BaseModel):
+    budget_seconds: float
+    cycles: int
+    inside: int = Field(description="Cycles that completed within the budget.")
+    inside_fraction: float
+    worst_overrun_seconds: float
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+
+
+class DecisionQualityRefresh(BaseModel):
+    decisions_added: int = Field(description="Decisions copied into crypto_decision_outcomes by this refresh.")
+    pending: int = Field(description="Outcomes that were still missing a return.")
+    filled: dict[str, int] = Field(description="Returns filled per horizon.")
+    unpriced: int = Field(description="Due returns left for later: no candle for the decision or horizon time yet.")
+    seconds: float
+
+
+class DecisionQualityBucket(BaseModel):
+    group: dict[str, str] = Field(description="Value of every group_by dimension.")
+    decisions: int
+    mean_return: float = Field(description="Mean forward price return (0.01 = +1%).")
+    std_return: float
+    hit_rate: float = Field(description="BUY followed by a rise, SELL by a fall, HOLD by a move inside the hold band.")
+
+
+class DecisionQualityReport(BaseModel):
+    horizon: str
+    group_by: list[str]
+    decisions: int
+    buckets: list[DecisionQualityBucket]
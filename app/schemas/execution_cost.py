@@ -0,0 +1,31 @@
+from pydantic import BaseModel, Field
+
+
+class ExecutionCostRequest(BaseModel):
+    symbol: str = Field(description="Robinhood asset code (e.g., DOGE).", examples=["DOGE"])
+    binance_symbol: str = Field(description="Binance symbol whose book is walked (e.g., DOGEUSDT).", examples=["DOGEUSDT"])
+    side: str = Field(description="buy or sell.", examples=["buy", "sell"])
+    notional_usd: float = Field(description="Target order size in USD.", examples=[500.0])
+    candidate_sizes_usd: list[float] = Field(default_factory=list, description="Extra order sizes to cost alongside the target.")
+    depth_limit: int = Field(default=1000, description="Binance depth levels to walk.")
+    include_robinhood_quote: bool = Field(default=True, description="Also ask Robinhood for a quantity-aware estimated price.")
+
+
+class SizeCost(BaseModel):
+    notional_usd: float = Field(description="Order size in USD.")
+    avg_price: float = Field(description="Expected average fill price.")
+    slippage_bps: float = Field(description="Cost vs mid in bps (positive = worse than mid).")
+    filled_pct: float = Field(description="Share of the size the visible depth can fill.")
+
+
+class ExecutionCostEstimate(BaseModel):
+    symbol: str
+    side: str
+    mid: float = Field(description="Binance mid price.")
+    target: SizeCost = Field(description="Cost of the target size as a single market order.")
+    candidates: list[SizeCost] = Field(description="Cost of each candidate size.")
+    robinhood_price: float | None = Field(default=None, description="Robinhood estimated price incl. spread for the target quantity.")
+    robinhood_cost_bps: float | None = Field(default=None, description="Robinhood estimated price vs Binance mid in bps.")
+    children: int | None = Field(description="Recommended number of child orders; None when no split fills against the visible book.")
+    child_notional_usd: float | None = Field(description="Size of each child order.")
+    split_cost_bps: float | None = Field(description="Expected cost of the recommended split incl. the per-child penalty.")
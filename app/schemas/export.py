@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+
+
+class ExportStats(BaseModel):
+    table: str
+    rows: int = Field(description="Rows appended by this run.")
+    files: int = Field(description="Partition files written by this run.")
+    last_id: int = Field(description="High-water mark: the highest id exported so far.")
+    last_timestamp: str | None
+    total_rows: int
+    total_files: int
+    seconds: float
+    rows_per_second: float
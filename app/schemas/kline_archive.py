@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+
+
+class KlineSegment(BaseModel):
+    start: int = Field(description="First row of the segment.")
+    rows: int
+    checksum: str = Field(description="blake2b over the segment's bytes in every column file.")
+
+
+class KlineArchiveInfo(BaseModel):
+    symbol: str
+    interval: str
+    rows: int
+    first_open_time: int | None
+    last_open_time: int | None
+    sorted: bool = Field(description="False after an out-of-order append, until the next compaction.")
+    generation: int = Field(description="Bumped by every compaction, which writes a fresh set of column files.")
+    segments: list[KlineSegment]
+    bytes: int
+
+
+class KlineBackfillStats(BaseModel):
+    symbol: str
+    interval: str
+    start_ms: int
+    end_ms: int
+    windows: int = Field(description="1000-candle windows in the range.")
+    windows_resumed: int = Field(description="Windows already done according to the checkpoint.")
+    windows_failed: int = Field(description="Windows given up after retries; a re-run picks them up.")
+    requests: int
+    retries: int = Field(description="Requests repeated after a 5xx, a timeout or a dropped connection.")
+    rate_limited: int = Field(description="429/418 answers; the budget paused for their Retry-After.")
+    max_used_weight: int = Field(description="Highest X-MBX-USED-WEIGHT-1M the exchange reported.")
+    candles: int = Field(description="Candles handed to the sink.")
+    gaps_found: int = Field(description="Missing ranges detected in responses and in the sink afterwards.")
+    gaps_refilled: int
+    gaps_unfilled: list[tuple[int, int]] = Field(description="[start, end) ranges the exchange has no candles for.")
+    seconds: float
+    candles_per_second: float
@@ -0,0 +1,35 @@
+from pydantic import BaseModel, Field
+from app.schemas.actions_history import CandleTrend, NewsSentiment
+
+
+class MarketSnapshot(BaseModel):
+    """Compact per-cycle feature vector, mirroring the ToolsRequest fields."""
+    symbol: str = Field(description="Robinhood asset code (e.g., DOGE).")
+    captured_at: float = Field(description="Unix seconds when the snapshot was taken.")
+    price_usd: float = Field(description="Last traded price.")
+    change_24h_pct: float = Field(description="24-hour percentage change.")
+    order_book_signal: str = Field(description="buy pressure, sell pressure or balanced.")
+    order_book_imbalance: float = Field(description="(bid qty - ask qty) / total qty over the fetched depth.")
+    candle_trend: CandleTrend = Field(description="Trend of recent candles.")
+    rsi_14: float = Field(default=50.0, description="14-period RSI of the candle closes.")
+    news_sentiment: NewsSentiment = Field(description="Majority sentiment of recent crypto news.")
+    holdings_value_usd: float = Field(description="Current holdings value in USD.")
+
+
+class DecisionGateStats(BaseModel):
+    cycles: int = Field(description="Cycles evaluated by the gate.")
+    llm_calls: int = Field(description="Cycles that ran the LLM.")
+    llm_calls_saved: int = Field(description="Cycles answered by re-logging the prior decision.")
+    audits: int = Field(description="Skippable cycles that ran the LLM anyway to measure agreement.")
+    agreements: int = Field(description="Audits where the LLM repeated the prior decision.")
+    agreement_rate: float = Field(description="agreements / audits.")
+
+
+class DecisionCacheStats(BaseModel):
+    hits: int = Field(description="Cycles answered from the cache.")
+    misses: int = Field(description="Lookups that fell through to the LLM.")
+    hit_rate: float = Field(description="hits / (hits + misses).")
+    entries: int = Field(description="Entries currently stored.")
+    evictions: int = Field(description="Entries removed by TTL or LRU.")
+    avg_llm_seconds: float = Field(description="Moving average of a full LLM cycle.")
+    latency_saved_seconds: float = Field(description="Estimated LLM time avoided by hits.")
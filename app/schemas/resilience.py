@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+
+
+class UpstreamHostStats(BaseModel):
+    host: str
+    breaker: str = Field(description="closed, open or half_open.")
+    consecutive_failures: int
+    requests: int
+    retries: int
+    hedges: int = Field(description="Duplicate requests sent after the host's p95 latency.")
+    hedge_wins: int = Field(description="Hedges that answered before the original request.")
+    fallbacks: int = Field(description="Requests answered from the last good response while the breaker was open.")
+    p95_ms: float | None = Field(description="Over the recent successful attempts; the hedge delay.")
+
+
+class ResilienceStats(BaseModel):
+    cached_responses: int
+    hosts: list[UpstreamHostStats]
@@ -18,6 +18,9 @@ class BestPriceRaw(BaseModel):
     
 class BestPriceResponse(BaseModel):
     results: List[BestPriceRaw]
+    stale_seconds: float | None = Field(
+        default=None, description="Set when an older quote was served because the cycle's time budget was nearly spent."
+    )
 
 #######################################################################
 
@@ -44,4 +47,20 @@ class BestPriceEstimatedRaw(BaseModel):
 
 class BestPriceEstimatedResponse(BaseModel):
     results: List[BestPriceEstimatedRaw]
-    
\ No newline at end of file
+
+#######################################################################
+
+class BestPriceQuote(BaseModel):
+    asset_code: str
+    quote: BestPriceRaw
+    received_at: float  # unix seconds when the feed stored the quote
+    updates: int = 0
+
+class PriceFeedStats(BaseModel):
+    tracked: List[str]
+    polls: int
+    errors: int
+    interval_seconds: float
+    last_poll_latency_ms: float
+    updates_per_second: float
+    staleness_seconds: Dict[str, float]
@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+
+
+class RunnerWorkerStats(BaseModel):
+    slot: int
+    pid: int | None
+    alive: bool
+    retired: bool = Field(description="Restarted too often; its symbols were moved to the other workers.")
+    symbols: list[str]
+    cycles: int = Field(description="Decision cycles run, including failed ones, across restarts.")
+    errors: int = Field(description="Cycles that raised.")
+    restarts: int
+    heartbeat_age_seconds: float | None
+    rss_mb: float | None
+
+
+class RunnerStats(BaseModel):
+    uptime_seconds: float
+    symbols: int
+    workers: int
+    active_workers: int
+    cycles: int
+    errors: int
+    restarts: int
+    rebalances: int
+    market_pid: int | None
+    market_updates: int = Field(description="Stream messages written to the shared market table.")
+    market_restarts: int
+    market_rss_mb: float | None
+    worker_stats: list[RunnerWorkerStats]
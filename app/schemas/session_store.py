@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+
+
+class SessionStoreStats(BaseModel):
+    path: str
+    sessions: int = Field(description="Sessions opened on this store by this process.")
+    queued: int = Field(description="Writes waiting for the writer thread.")
+    commits: int
+    writes: int = Field(description="Appends, pops and clears committed.")
+    items_written: int
+    writes_per_commit: float = Field(description="Writes sharing one transaction, on average.")
+    mean_commit_ms: float
+    archived: int = Field(description="Items moved to the archive file by retention.")
@@ -0,0 +1,28 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class StreamEvent(BaseModel):
+    seq: int = Field(description="Broker-wide sequence number; gaps mean events were dropped or conflated.")
+    topic: str = Field(description="decision, tool_result, kline or book_ticker.")
+    key: str = Field(description="Conflation key within the topic (e.g., the symbol).")
+    published_at: float = Field(description="Unix seconds when the broker accepted the event.")
+    data: dict[str, Any]
+
+
+class SubscriberStats(BaseModel):
+    id: int
+    topics: list[str]
+    queued: int = Field(description="Events waiting to be sent.")
+    delivered: int
+    dropped: int = Field(description="Events discarded by drop-oldest.")
+    conflated: int = Field(description="Events replaced by a newer one with the same key.")
+    lag_events: int = Field(description="Events published since the last one this subscriber received.")
+    lag_seconds: float = Field(description="Age of the oldest event still queued.")
+
+
+class StreamBrokerStats(BaseModel):
+    published: int
+    throttled: int
+    subscribers: list[SubscriberStats]
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+
+
+class TapeIndexEntry(BaseModel):
+    cycle_id: str = Field(description="Tape name, one per decision cycle.")
+    file: str = Field(description="gzip JSONL file holding the cycle's exchanges, relative to the tape directory.")
+    started_at: float = Field(description="Unix seconds when the cycle started.")
+    duration_seconds: float
+    exchanges: int = Field(description="Request/response pairs on the tape.")
+    hosts: dict[str, int] = Field(description="Exchanges per upstream host.")
+    bytes: int = Field(description="Compressed size of the tape file.")
+
+
+class HttpTapeStats(BaseModel):
+    mode: str  # off, record, or replay while inside a replay block
+    directory: str
+    cycle_id: str | None  # tape currently being recorded or replayed
+    recorded: int
+    replayed: int
+    misses: int  # replayed requests that were not on the tape
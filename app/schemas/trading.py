@@ -27,6 +27,7 @@ class PlaceOrderRequest(BaseModel):
     percentage: Optional[float] = Field(default=None, description="Percentage of holdings to trade.")
     quantity: Optional[float] = Field(default=None, description="Quantity to trade.")
     side: str = Field(description="Buy or sell.", examples=["buy", "sell"])
+    client_order_id: Optional[str] = Field(default=None, description="Idempotency key; resubmitting the same ID never places a second order.")
 
 class OrderExecution(BaseModel):
     effective_price: str = Field(description="Effective price of execution.")
@@ -56,3 +57,34 @@ class CancelOrderRequest(BaseModel):
 
 class CancelOrderResponse(BaseModel):
     outcome: str = Field(description="Outcome of the cancellation request (e.g., success, failure).")
+
+class TrackedOrder(BaseModel):
+    client_order_id: str = Field(description="Idempotency key assigned at submission.")
+    order_id: Optional[str] = Field(default=None, description="Robinhood order ID once acknowledged.")
+    symbol: str
+    side: str
+    type: str = Field(default="market")
+    action_id: Optional[int] = Field(default=None, description="crypto_trade_history row updated when the order settles.")
+    state: str = Field(default="submitting", description="Last known order state.")
+    submitted_at: float = Field(description="Unix seconds when the first submit attempt started.")
+    acked_at: Optional[float] = Field(default=None, description="Unix seconds when Robinhood acknowledged the order.")
+    settled_at: Optional[float] = Field(default=None, description="Unix seconds when a terminal state was observed.")
+    attempts: int = Field(default=0, description="Submit attempts made.")
+    average_price: Optional[float] = None
+    filled_asset_quantity: Optional[float] = None
+    executions: list[OrderExecution] = Field(default_factory=list)
+
+class OrderManagerStats(BaseModel):
+    submitted: int
+    acked: int
+    retries: int
+    reconciled: int = Field(description="Submits whose outcome was unknown and were found upstream by client_order_id.")
+    filled: int
+    not_filled: int = Field(description="Orders that settled canceled/rejected/failed.")
+    open_orders: int
+    polls: int
+    poll_errors: int
+    poll_interval_seconds: float
+    status_updates_flushed: int
+    submit_to_ack_seconds: dict
+    ack_to_fill_seconds: dict
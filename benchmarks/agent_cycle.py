@@ -0,0 +1,313 @@
+"""
+Offline benchmark of the full decision cycle against local upstream stubs.
+
+A stub server (benchmarks/stubs.py) is started in a subprocess and every
+upstream, including the chat model, is pointed at it. The decision gate and
+cache are off by default so every cycle runs the LLM path. Reports, as JSON:
+
+    tools    per-tool latency (exact, from run hooks)
+    cycles   run_cycle() wall time, the LLM/tool split per cycle and the
+             share of cycles finished inside the --budget deadline
+    memory   tracemalloc growth and peak per cycle (separate pass, tracemalloc is slow)
+    db       write throughput against Postgres, only with --db
+
+Without --db the decision and tool-result CRUD runs against an in-memory
+stand-in (MemoryDatabase), so cycles complete and log their decisions
+without touching the configured database; Postgres itself is pointed at a
+closed local port. With --db, point POSTGRES_* at a scratch database:
+cycles log decisions there.
+
+    python -m benchmarks.agent_cycle
+    python -m benchmarks.agent_cycle --cycles 20 --latency-scale 0 --output run.json
+    python -m benchmarks.agent_cycle --db --db-rows 1000
+    python -m benchmarks.agent_cycle --binance http://127.0.0.1:8791   # with benchmarks.binance_sim running
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+from benchmarks.stubs import stub_env
+
+
+def _summary(values: list[float]) -> dict:
+    ms = np.asarray(values or [0.0]) * 1000
+    return {
+        "count": len(values),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "max_ms": float(ms.max()),
+    }
+
+
+async def _wait_ready(url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{url}/health")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("stub server did not start")
+
+
+class MemoryDatabase:
+    """
+    Just enough of Database for app.database.crud.actions: decisions and tool
+    results kept in lists, in the column order of the real tables' SELECTs.
+    """
+
+    def __init__(self):
+        self.actions: list[list] = []
+        self.tool_results: list[tuple] = []
+
+    async def insert_returning(self, query, args):
+        symbol, side, quantity, price, amount_usd, reason, is_open, profit_loss, decision_source = args
+        action_id = len(self.actions) + 1
+        self.actions.append([
+            action_id, symbol, side, quantity, price, amount_usd, datetime.now(), reason, is_open, profit_loss,
+            decision_source,
+        ])
+        return (action_id,)
+
+    async def insert_row(self, query, args) -> int:
+        self.tool_results.append((len(self.tool_results) + 1, *args[:7]))
+        return 1
+
+    async def fetch_one(self, query, args):
+        # fetch_latest_action: the newest decision for a symbol
+        return next((tuple(row) for row in reversed(self.actions) if row[1] == args[0]), None)
+
+    async def fetch_all(self, query, args) -> list:
+        rows = self.tool_results if "crypto_tools_result" in query else [tuple(row) for row in self.actions]
+        return rows[::-1][: args[0]]
+
+    async def update_row(self, query, args) -> int:
+        is_open, profit_loss, action_id = args
+        if not 0 < action_id <= len(self.actions):
+            return 0
+        self.actions[action_id - 1][8:10] = [is_open, profit_loss]
+        return 1
+
+    async def execute_many(self, query, args_seq) -> int:
+        return sum([await self.update_row(query, (args[0], args[1], args[-1])) for args in args_seq])
+
+
+async def db_throughput(rows: int, concurrency: int) -> dict:
+    """Insert `rows` benchmark decisions three ways, then delete them."""
+    from app.database.crud.actions import insert_action
+    from app.database.database_class import Database
+
+    db = Database()
+    results = {}
+
+    started = time.perf_counter()
+    for i in range(rows):
+        await insert_action("BENCH", "hold", 0.15, f"benchmark {i}", decision_source="benchmark")
+    results["sequential_rows_per_s"] = rows / (time.perf_counter() - started)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def insert(i: int) -> None:
+        async with semaphore:
+            await insert_action("BENCH", "hold", 0.15, f"benchmark {i}", decision_source="benchmark")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(insert(i) for i in range(rows)))
+    results["concurrent_rows_per_s"] = rows / (time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await db.execute_many(
+        """
+        INSERT INTO crypto_trade_history (symbol, side, quantity, price, amount_usd, reason, is_open, profit_loss, decision_source)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """,
+        [("BENCH", "hold", 0.0, 0.15, 0.0, f"benchmark {i}", False, 0.0, "benchmark") for i in range(rows)],
+    )
+    results["batched_rows_per_s"] = rows / (time.perf_counter() - started)
+
+    deleted = await db.execute_write("DELETE FROM crypto_trade_history WHERE decision_source = %s", ("benchmark",))
+    return {"rows": rows, "concurrency": concurrency, **results, "deleted": deleted}
+
+
+async def run(args) -> dict:
+    # Imported here: settings must see the stub environment set by main()
+    from agents import SQLiteSession
+
+    from app.agents import instrumentation, trading_agent
+    from app.agents.instrumentation import MetricsRunHooks
+    from app.deadline import CycleDeadlines
+
+    tool_seconds: dict[str, list[float]] = defaultdict(list)
+    tool_errors: dict[str, int] = defaultdict(int)
+    splits: list[dict] = []
+
+    class RecordingHooks(MetricsRunHooks):
+        async def on_tool_end(self, context, agent, tool, result) -> None:
+            started = self._tool_started[tool.name]
+            if started:
+                tool_seconds[tool.name].append(time.perf_counter() - started[0])
+            errors_before = self.tool_errors
+            await super().on_tool_end(context, agent, tool, result)
+            if self.tool_errors > errors_before:
+                tool_errors[tool.name] += 1
+
+        def observe_cycle(self) -> None:
+            super().observe_cycle()
+            splits.append({"llm_seconds": self.llm_seconds, "tool_seconds": self.tool_seconds, "tool_calls": self.tool_calls})
+
+    instrumentation.MetricsRunHooks = RecordingHooks
+    if not args.db:
+        from app.database.crud import actions
+
+        memory_db = MemoryDatabase()
+        actions.Database = lambda: memory_db
+    trading_agent.sql_lit_session = SQLiteSession("benchmark", db_path="benchmark_conversations.db")
+
+    errors: dict[str, str] = {}
+    deadlines = CycleDeadlines(args.budget)
+
+    async def cycle(n: int) -> tuple[float, str]:
+        started = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()), deadlines.cycle():
+                source = await trading_agent.run_cycle(n)
+        except Exception as e:
+            source = f"error:{type(e).__name__}"
+            errors.setdefault(source, str(e).splitlines()[0][:200])
+        return time.perf_counter() - started, source
+
+    for n in range(args.warmup):
+        await cycle(n)
+    tool_seconds.clear()
+    tool_errors.clear()
+    splits.clear()
+    errors.clear()
+    deadlines = CycleDeadlines(args.budget)
+
+    walls, sources = [], defaultdict(int)
+    for n in range(args.cycles):
+        wall, source = await cycle(n)
+        walls.append(wall)
+        sources[source] += 1
+    budget = deadlines.stats()
+
+    memory = []
+    tracemalloc.start()
+    for n in range(args.memory_cycles):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        await cycle(n)
+        current, peak = tracemalloc.get_traced_memory()
+        memory.append({"retained_bytes": current - before, "peak_bytes": peak - before})
+    tracemalloc.stop()
+
+    db = {"skipped": "pass --db to benchmark writes against POSTGRES_* (use a scratch database)"}
+    if args.db:
+        try:
+            db = await db_throughput(args.db_rows, args.db_concurrency)
+        except Exception as e:
+            db = {"error": repr(e)}
+
+    llm = [s["llm_seconds"] for s in splits[: args.cycles]]
+    tools = [s["tool_seconds"] for s in splits[: args.cycles]]
+    return {
+        "config": {
+            "cycles": args.cycles,
+            "warmup": args.warmup,
+            "latency_scale": args.latency_scale,
+            "gate_and_cache": args.with_gate,
+            "db": args.db,
+            "binance": args.binance or "stubs",
+            "python": sys.version.split()[0],
+        },
+        "tools": {
+            name: {**_summary(values), "errors": tool_errors.get(name, 0)}
+            for name, values in sorted(tool_seconds.items())
+        },
+        "cycles": {
+            **_summary(walls),
+            "sources": dict(sources),
+            "errors": errors,
+            "llm_mean_ms": float(np.mean(llm or [0.0]) * 1000),
+            "tool_mean_ms": float(np.mean(tools or [0.0]) * 1000),
+            "cycles_per_min": 60 / float(np.mean(walls)) if walls else 0.0,
+            "budget": budget.model_dump(),
+        },
+        "memory": {
+            "cycles": len(memory),
+            "retained_bytes_per_cycle": float(np.mean([m["retained_bytes"] for m in memory] or [0])),
+            "peak_bytes_per_cycle": float(np.max([m["peak_bytes"] for m in memory] or [0])),
+            "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        },
+        "db": db,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8790, help="stub server port")
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--budget", type=float, default=120.0, help="cycle deadline in seconds (CYCLE_BUDGET_SECONDS)")
+    parser.add_argument("--memory-cycles", type=int, default=3)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on recorded upstream/LLM latencies")
+    parser.add_argument("--binance", help="URL of a running benchmarks.binance_sim to use for Binance")
+    parser.add_argument("--with-gate", action="store_true", help="keep the decision gate and cache enabled")
+    parser.add_argument("--db", action="store_true", help="use the configured Postgres and measure write throughput")
+    parser.add_argument("--db-rows", type=int, default=500)
+    parser.add_argument("--db-concurrency", type=int, default=8)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    base = f"http://127.0.0.1:{args.port}"
+    output_path = Path(args.output).resolve() if args.output else None
+    args.workdir = tempfile.mkdtemp(prefix="agent_cycle_")
+    os.environ.update(stub_env(base, args.binance))
+    os.environ.update({
+        "DECISION_GATE_ENABLED": str(args.with_gate).lower(),
+        "DECISION_CACHE_ENABLED": str(args.with_gate).lower(),
+        "DECISION_CACHE_DB_PATH": "decision_cache.db",
+    })
+    if not args.db:
+        os.environ.update({"POSTGRES_HOST": "127.0.0.1", "POSTGRES_PORT": "1"})
+    # Per-request INFO logs and failed-write errors would flood the output
+    logging.disable(logging.ERROR)
+
+    stubs = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.stubs", "--port", str(args.port), "--latency-scale", str(args.latency_scale)]
+    )
+    # The agent module opens ./conversations.db at import; keep the repo's copy untouched
+    os.chdir(args.workdir)
+    try:
+        asyncio.run(_wait_ready(base))
+        result = asyncio.run(run(args))
+    finally:
+        stubs.terminate()
+        stubs.wait()
+
+    output = json.dumps(result, indent=2)
+    if output_path is not None:
+        output_path.write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Load-test the cached v1 API.
+
+By default a single uvicorn worker is started in a subprocess with the
+upstream fetchers replaced by synthetic payloads, so only the API and its
+cache are measured. Point --url at a running server to test it instead.
+--asgi drives the ASGI app directly (no sockets, no HTTP client), which
+isolates the per-worker cost of the app itself when the load generator
+shares the machine.
+
+    python -m benchmarks.api_load
+    python -m benchmarks.api_load --asgi
+    python -m benchmarks.api_load --url http://localhost:8000 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from app.config import settings
+
+ENDPOINTS = (
+    "/market/ticker?symbol=DOGEUSDT",
+    "/market/order-book?symbol=DOGEUSDT&limit=1000",
+    "/market/klines?symbol=DOGEUSDT&interval=15m&limit=100",
+)
+MODES = ("identity", "gzip", "conditional")
+
+
+def synthetic_app():
+    """The API app with the upstream fetchers replaced by synthetic payloads."""
+    from app.api.endpoints.v1 import market
+    from app.main import app
+    from benchmarks.order_book_digest_tokens import synthetic_book
+
+    async def ticker(symbol):
+        return {"symbol": symbol, "lastPrice": "0.15", "priceChangePercent": "1.2", "volume": "123456789"}
+
+    async def order_book(request):
+        return synthetic_book(request.symbol, request.limit)
+
+    async def klines(symbol, interval="15m", limit=100):
+        now = int(time.time() * 1000)
+        return [[now - i * 900_000, "0.15", "0.151", "0.149", "0.1505", "1000", now, "150", 10, "500", "75", "0"] for i in range(limit)]
+
+    market.fetch_ticker_24hr = ticker
+    market.fetch_order_book = order_book
+    market.fetch_klines = klines
+    return app
+
+
+def serve(port: int) -> None:
+    """Run one uvicorn worker with synthetic upstream data."""
+    import uvicorn
+
+    uvicorn.run(synthetic_app(), host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+async def run_asgi(app, path: str, mode: str, duration: float) -> dict:
+    """Call the ASGI app in a loop; measures the app, not the network stack."""
+    raw_path, _, query = (settings.API_V1_PREFIX + path).partition("?")
+    headers = [(b"accept-encoding", b"gzip" if mode == "gzip" else b"identity")]
+    status = {}
+    etag = b""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal etag
+        if message["type"] == "http.response.start":
+            status[message["status"]] = status.get(message["status"], 0) + 1
+            etag = dict(message["headers"]).get(b"etag", etag)
+
+    def scope():
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": raw_path, "raw_path": raw_path.encode(), "root_path": "",
+            "query_string": query.encode(), "headers": list(headers),
+            "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80),
+        }
+
+    await app(scope(), receive, send)
+    if mode == "conditional":
+        headers.append((b"if-none-match", etag))
+    status.clear()
+
+    requests = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        await app(scope(), receive, send)
+        requests += 1
+    elapsed = time.perf_counter() - started
+    return {"path": path, "mode": mode, "requests": requests, "rps": requests / elapsed, "statuses": status}
+
+
+async def _wait_ready(url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{url}/health")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+
+async def run_mode(base: str, path: str, mode: str, concurrency: int, duration: float) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, limits=limits, timeout=10) as client:
+        headers = {"Accept-Encoding": "gzip" if mode == "gzip" else "identity"}
+        if mode == "conditional":
+            first = await client.get(path, headers=headers)
+            headers["If-None-Match"] = first.headers["etag"]
+
+        latencies: list[float] = []
+        statuses: dict[int, int] = {}
+        wire_bytes = 0
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal wire_bytes
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                wire_bytes += len(response.content) if mode != "gzip" else int(response.headers.get("content-length", 0))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    lat = np.asarray(latencies) * 1000
+    return {
+        "path": path,
+        "mode": mode,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p99_ms": float(np.percentile(lat, 99)),
+        "avg_bytes": wire_bytes / max(1, len(latencies)),
+        "statuses": statuses,
+    }
+
+
+async def main_async(args) -> list[dict]:
+    await _wait_ready(args.url.rstrip("/"))
+    base = args.url.rstrip("/") + settings.API_V1_PREFIX
+    results = []
+    for path in ENDPOINTS:
+        for mode in MODES:
+            results.append(await run_mode(base, path, mode, args.concurrency, args.duration))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="existing server (default: start a local worker)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per endpoint and mode")
+    parser.add_argument("--asgi", action="store_true", help="drive the ASGI app in-process")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    # Per-request INFO logs would dominate the client's CPU time
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.serve:
+        serve(args.port)
+        return
+
+    if args.asgi:
+        app = synthetic_app()
+
+        async def run_all():
+            return [await run_asgi(app, path, mode, args.duration) for path in ENDPOINTS for mode in MODES]
+
+        print(json.dumps(asyncio.run(run_all()), indent=2))
+        return
+
+    server = None
+    if args.url is None:
+        args.url = f"http://127.0.0.1:{args.port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.api_load", "--serve", "--port", str(args.port)],
+            env={**os.environ, "RUN_AGENT_LOOP": "false", "STREAM_MARKET_ENABLED": "false"},
+        )
+    try:
+        results = asyncio.run(main_async(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
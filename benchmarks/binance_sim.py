@@ -0,0 +1,573 @@
+"""
+Local Binance exchange simulator for load tests.
+
+Implements the subset of the Binance API the app uses, driven by a simulated
+clock that runs at --speed x real time (1-1000):
+
+    REST  /api/v3/klines, /ticker/24hr, /ticker/bookTicker, /depth, /time, /ping
+    WS    /ws/<stream> and /stream?streams=a/b/c with <symbol>@kline_<interval>,
+          <symbol>@ticker, <symbol>@bookTicker, <symbol>@depth[@100ms] and
+          <symbol>@depth<5|10|20>[@100ms]
+
+Each symbol replays a tape of candles: --klines-symbol replays the recorded
+fixture (or --klines FILE, a JSON list of Binance kline rows) and every other
+symbol a seeded synthetic random walk, so multi-symbol scaling needs no extra
+data. The tape loops, rescaled so prices
+stay continuous, and serves history before the simulation started. Candles
+for any interval are rebuilt from the intra-candle path open -> low/high ->
+high/low -> close. The order book is synthetic around that path.
+
+Latency and faults (5xx, 429 rate limits, stalls, dropped sockets) are
+injected per request/message and can be changed while running. Request
+weight is counted per minute like Binance (X-MBX-USED-WEIGHT-1M, 429 past
+--weight-limit), and --kline-gap-rate leaves candles out of /klines for
+good, as an exchange outage would:
+
+    curl -X POST localhost:8791/sim -H 'content-type: application/json' -d '{"speed": 500, "error_rate": 0.05}'
+
+Point the app at it with
+
+    BINANCE_API_URL=http://127.0.0.1:8791 BINANCE_WS_URL=ws://127.0.0.1:8791
+
+    python -m benchmarks.binance_sim --speed 60 --symbols DOGEUSDT,BTCUSDT,ETHUSDT
+    python -m benchmarks.binance_sim --speed 1000 --latency-ms 30 --jitter-ms 20 --error-rate 0.01 --ws-drop-rate 0.001
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+SECOND_MS = 1000
+MINUTE_MS = 60 * SECOND_MS
+DAY_MS = 24 * 60 * MINUTE_MS
+INTERVAL_MS = {
+    "1s": SECOND_MS, "1m": MINUTE_MS, "3m": 3 * MINUTE_MS, "5m": 5 * MINUTE_MS, "15m": 15 * MINUTE_MS,
+    "30m": 30 * MINUTE_MS, "1h": 60 * MINUTE_MS, "2h": 120 * MINUTE_MS, "4h": 240 * MINUTE_MS,
+    "6h": 360 * MINUTE_MS, "8h": 480 * MINUTE_MS, "12h": 720 * MINUTE_MS, "1d": DAY_MS, "3d": 3 * DAY_MS,
+    "1w": 7 * DAY_MS, "1M": 30 * DAY_MS,  # calendar months are approximated as 30 days
+}
+WEEK_OFFSET_MS = 4 * DAY_MS  # weekly candles open on Monday; the epoch was a Thursday
+SAMPLES_PER_CANDLE = 32
+# Binance request weights; anything else costs 1
+REQUEST_WEIGHT = {"/api/v3/klines": 2, "/api/v3/depth": 5, "/api/v3/ticker/24hr": 2}
+START_PRICES = {"BTCUSDT": 60_000.0, "ETHUSDT": 3_000.0, "BNBUSDT": 550.0, "SOLUSDT": 150.0, "DOGEUSDT": 0.15}
+
+
+class SimConfig(BaseModel):
+    """Clock speed, latency and fault injection; all adjustable at runtime via POST /sim."""
+
+    speed: float = Field(default=1.0, ge=1.0, le=1000.0, description="simulated seconds per real second")
+    latency_ms: float = Field(default=0.0, ge=0.0, description="added to every REST response and WS push")
+    jitter_ms: float = Field(default=0.0, ge=0.0, description="uniform 0..jitter added on top of latency")
+    error_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="REST requests answered with a 5xx")
+    rate_limit_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="REST requests answered with a 429")
+    stall_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="REST requests held for stall_seconds")
+    stall_seconds: float = Field(default=30.0, ge=0.0)
+    ws_drop_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="WS pushes after which the socket is dropped")
+    min_push_ms: float = Field(default=5.0, ge=0.0, description="floor on the real time between WS pushes")
+    weight_limit: int = Field(default=0, ge=0, description="request weight per real minute before 429s (0: unlimited)")
+    kline_gap_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="candles missing from /klines, as in exchange outages")
+
+
+class SimClock:
+    """Simulated epoch milliseconds advancing at `speed` x wall time."""
+
+    def __init__(self, speed: float = 1.0, start_ms: int | None = None):
+        self.speed = speed
+        self._base_sim_ms = float(start_ms if start_ms is not None else time.time() * 1000)
+        self._base_wall = time.monotonic()
+
+    def now_ms(self) -> int:
+        return int(self._base_sim_ms + (time.monotonic() - self._base_wall) * 1000 * self.speed)
+
+    def set_speed(self, speed: float) -> None:
+        # Rebase so simulated time stays continuous across the change
+        self._base_sim_ms = float(self.now_ms())
+        self._base_wall = time.monotonic()
+        self.speed = speed
+
+    def wall_seconds(self, sim_ms: float) -> float:
+        return sim_ms / 1000 / self.speed
+
+
+def _interval_start(t_ms: int, interval_ms: int) -> int:
+    offset = WEEK_OFFSET_MS if interval_ms == INTERVAL_MS["1w"] else 0
+    return (t_ms - offset) // interval_ms * interval_ms + offset
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.8f}"
+
+
+class MarketTape:
+    """
+    One symbol's looping price/volume path built from candles of `step_ms`.
+
+    Within a candle the price moves linearly through open, the first extreme,
+    the second extreme and close (down first for up candles), so any interval
+    can be rebuilt by sampling. Each loop is scaled by last_close/first_open to
+    keep the path continuous.
+    """
+
+    def __init__(self, symbol: str, rows: np.ndarray, step_ms: int, origin_ms: int):
+        # rows: (n, 6) open, high, low, close, volume, trades
+        self.symbol = symbol
+        self.step_ms = step_ms
+        self.origin_ms = origin_ms
+        self.seed = zlib.crc32(symbol.encode())
+
+        opens, highs, lows, closes = rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3]
+        up = closes >= opens
+        first = np.where(up, lows, highs)
+        second = np.where(up, highs, lows)
+        n = len(rows)
+        starts = np.arange(n) * step_ms
+        self.knot_t = np.column_stack([starts, starts + step_ms / 3, starts + 2 * step_ms / 3]).ravel()
+        self.knot_p = np.column_stack([opens, first, second]).ravel()
+        self.knot_t = np.append(self.knot_t, n * step_ms)
+        self.knot_p = np.append(self.knot_p, closes[-1])
+
+        self.span_ms = n * step_ms
+        self.loop_ratio = float(closes[-1] / opens[0])
+        self.cum_volume = np.concatenate([[0.0], np.cumsum(rows[:, 4])])
+        self.cum_trades = np.concatenate([[0.0], np.cumsum(rows[:, 5])])
+        self.bar_t = np.arange(n + 1) * step_ms
+
+    @classmethod
+    def synthetic(cls, symbol: str, origin_ms: int, days: int = 7) -> "MarketTape":
+        seed = zlib.crc32(symbol.encode())
+        rng = np.random.default_rng(seed)
+        n = days * 24 * 60
+        start = START_PRICES.get(symbol, 1.0 + seed % 1000)
+        closes = start * np.exp(np.cumsum(rng.normal(0, 0.0008, n)))
+        opens = np.concatenate([[start], closes[:-1]])
+        wick = np.abs(rng.normal(0, 0.0005, (2, n)))
+        highs = np.maximum(opens, closes) * (1 + wick[0])
+        lows = np.minimum(opens, closes) * (1 - wick[1])
+        volume = rng.lognormal(np.log(2e5 / start), 0.6, n)
+        trades = rng.integers(50, 500, n).astype(float)
+        return cls(symbol, np.column_stack([opens, highs, lows, closes, volume, trades]), MINUTE_MS, origin_ms)
+
+    @classmethod
+    def from_klines(cls, symbol: str, klines: list[list], origin_ms: int) -> "MarketTape":
+        rows = np.array([[float(k[1]), float(k[2]), float(k[3]), float(k[4]), float(k[5]), float(k[8])] for k in klines])
+        step_ms = int(klines[1][0] - klines[0][0]) if len(klines) > 1 else MINUTE_MS
+        return cls(symbol, rows, step_ms, origin_ms)
+
+    def _split(self, t_ms: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        offset = np.asarray(t_ms, dtype=float) - self.origin_ms
+        loops = np.floor(offset / self.span_ms)
+        return offset - loops * self.span_ms, loops
+
+    def price(self, t_ms) -> np.ndarray:
+        rel, loops = self._split(t_ms)
+        return np.interp(rel, self.knot_t, self.knot_p) * self.loop_ratio ** loops
+
+    def _cumulative(self, t_ms, table: np.ndarray) -> np.ndarray:
+        rel, loops = self._split(t_ms)
+        return np.interp(rel, self.bar_t, table) + loops * table[-1]
+
+    def volume_between(self, start_ms, end_ms) -> np.ndarray:
+        return self._cumulative(end_ms, self.cum_volume) - self._cumulative(start_ms, self.cum_volume)
+
+    def trades_between(self, start_ms, end_ms) -> np.ndarray:
+        return self._cumulative(end_ms, self.cum_trades) - self._cumulative(start_ms, self.cum_trades)
+
+    def candles(self, starts: np.ndarray, interval_ms: int, now_ms: int) -> list[list]:
+        """Binance kline rows for candles opening at `starts`; the newest may still be open."""
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.minimum(starts + interval_ms, now_ms)
+        frac = np.linspace(0.0, 1.0, SAMPLES_PER_CANDLE)
+        samples = self.price(starts[:, None] + (ends - starts)[:, None] * frac)
+        volume = self.volume_between(starts, ends)
+        trades = self.trades_between(starts, ends).astype(np.int64)
+        mean_price = samples.mean(axis=1)
+        rows = []
+        for i, start in enumerate(starts.tolist()):
+            quote = volume[i] * mean_price[i]
+            rows.append([
+                start, _fmt(samples[i, 0]), _fmt(samples[i].max()), _fmt(samples[i].min()), _fmt(samples[i, -1]),
+                _fmt(volume[i]), start + interval_ms - 1, _fmt(quote), int(trades[i]),
+                _fmt(volume[i] / 2), _fmt(quote / 2), "0",
+            ])
+        return rows
+
+    def tick_size(self, price: float) -> float:
+        return 10.0 ** (np.floor(np.log10(price)) - 4)
+
+    def book(self, now_ms: int, limit: int) -> dict:
+        """Synthetic depth around the current price; quantities change every simulated second."""
+        mid = float(self.price(now_ms))
+        tick = self.tick_size(mid)
+        best_bid = np.floor(mid / tick) * tick
+        rng = np.random.default_rng([self.seed, now_ms // SECOND_MS])
+        depth = np.arange(limit)
+        # ~$5k per level near the touch, thickening further out
+        qty = 5_000 / mid * rng.lognormal(0, 0.8, (2, limit)) * (1 + depth / 50)
+        decimals = max(0, int(-np.log10(tick)))
+        return {
+            "lastUpdateId": now_ms // 10,
+            "bids": [[f"{best_bid - i * tick:.{decimals}f}", _fmt(q)] for i, q in zip(depth, qty[0])],
+            "asks": [[f"{best_bid + (i + 1) * tick:.{decimals}f}", _fmt(q)] for i, q in zip(depth, qty[1])],
+        }
+
+
+class Exchange:
+    """All tapes behind one simulated clock; unknown symbols get a synthetic tape on first use."""
+
+    def __init__(self, clock: SimClock, recorded: dict[str, list[list]] | None = None, history_days: int = 7):
+        self.clock = clock
+        self.history_days = history_days
+        self._recorded = recorded or {}
+        self._tapes: dict[str, MarketTape] = {}
+        # The tape's first loop ends when the simulation starts, so it all serves as history
+        self._start_ms = clock.now_ms()
+
+    def tape(self, symbol: str) -> MarketTape:
+        symbol = symbol.upper()
+        if symbol not in self._tapes:
+            if symbol in self._recorded:
+                klines = self._recorded[symbol]
+                span = (klines[1][0] - klines[0][0]) * len(klines) if len(klines) > 1 else MINUTE_MS
+                self._tapes[symbol] = MarketTape.from_klines(symbol, klines, self._start_ms - span)
+            else:
+                self._tapes[symbol] = MarketTape.synthetic(symbol, self._start_ms - self.history_days * DAY_MS, self.history_days)
+        return self._tapes[symbol]
+
+    @property
+    def symbols(self) -> list[str]:
+        return sorted(self._tapes)
+
+    def klines(self, symbol: str, interval: str, limit: int = 500, start_time: int | None = None, end_time: int | None = None) -> list[list]:
+        interval_ms = INTERVAL_MS[interval]
+        now = self.clock.now_ms()
+        limit = min(max(limit, 1), 1000)
+        last = _interval_start(min(end_time, now) if end_time else now, interval_ms)
+        if start_time is not None:
+            first = _interval_start(start_time, interval_ms)
+            if first < start_time:
+                first += interval_ms
+            last = min(last, first + (limit - 1) * interval_ms)
+        else:
+            first = last - (limit - 1) * interval_ms
+        if last < first:
+            return []
+        return self.tape(symbol).candles(np.arange(first, last + 1, interval_ms), interval_ms, now)
+
+    def book_ticker(self, symbol: str) -> dict:
+        book = self.tape(symbol).book(self.clock.now_ms(), 1)
+        return {
+            "symbol": symbol.upper(),
+            "bidPrice": book["bids"][0][0], "bidQty": book["bids"][0][1],
+            "askPrice": book["asks"][0][0], "askQty": book["asks"][0][1],
+        }
+
+    def ticker_24hr(self, symbol: str) -> dict:
+        tape = self.tape(symbol)
+        now = self.clock.now_ms()
+        open_time = now - DAY_MS
+        path = tape.price(np.linspace(open_time, now, 24 * 60 + 1))
+        volume = float(tape.volume_between(open_time, now))
+        quote = volume * float(path.mean())
+        trades = int(tape.trades_between(open_time, now))
+        ticker = self.book_ticker(symbol)
+        open_price, last = float(path[0]), float(path[-1])
+        return {
+            "symbol": symbol.upper(),
+            "priceChange": _fmt(last - open_price),
+            "priceChangePercent": f"{(last / open_price - 1) * 100:.3f}",
+            "weightedAvgPrice": _fmt(quote / volume if volume else last),
+            "prevClosePrice": _fmt(float(tape.price(open_time - 1))),
+            "lastPrice": _fmt(last),
+            "lastQty": _fmt(1000 / last),
+            "bidPrice": ticker["bidPrice"], "bidQty": ticker["bidQty"],
+            "askPrice": ticker["askPrice"], "askQty": ticker["askQty"],
+            "openPrice": _fmt(open_price),
+            "highPrice": _fmt(float(path.max())),
+            "lowPrice": _fmt(float(path.min())),
+            "volume": _fmt(volume),
+            "quoteVolume": _fmt(quote),
+            "openTime": open_time,
+            "closeTime": now,
+            "firstId": max(0, int(tape.trades_between(tape.origin_ms, open_time))),
+            "lastId": int(tape.trades_between(tape.origin_ms, now)),
+            "count": trades,
+        }
+
+
+def load_recorded(path: Path, symbol: str) -> dict[str, list[list]]:
+    """{symbol: kline rows} from a fixture ({"body": [...]}) or a bare list of Binance kline rows."""
+    data = json.loads(path.read_text())
+    return {symbol.upper(): data["body"] if isinstance(data, dict) else data}
+
+
+class _Stream:
+    """One subscribed WS stream with its own push cadence in simulated time."""
+
+    def __init__(self, name: str):
+        self.name = name
+        symbol, _, rest = name.partition("@")
+        self.symbol = symbol.upper()
+        parts = rest.split("@")
+        self.kind = parts[0]
+        self.fast = "100ms" in parts[1:]
+        self.interval_ms = 0
+        self.levels = 0
+        self.last_candle = None
+        self.last_book = None
+
+        if self.kind.startswith("kline_"):
+            self.interval_ms = INTERVAL_MS[self.kind.removeprefix("kline_")]
+            self.every_ms = 1000 if self.interval_ms == SECOND_MS else 2000
+            self.kind = "kline"
+        elif self.kind == "ticker":
+            self.every_ms = 1000
+        elif self.kind == "bookTicker":
+            self.every_ms = 100
+        elif self.kind.startswith("depth"):
+            self.levels = int(self.kind.removeprefix("depth") or 0)
+            if self.levels and self.levels not in (5, 10, 20):
+                raise ValueError(f"unsupported stream {name}")
+            self.every_ms = 100 if self.fast else 1000
+            self.kind = "depth"
+        else:
+            raise ValueError(f"unsupported stream {name}")
+        self.next_ms = 0
+
+    def messages(self, exchange: Exchange, now: int) -> list[dict]:
+        tape = exchange.tape(self.symbol)
+        if self.kind == "kline":
+            current = _interval_start(now, self.interval_ms)
+            starts = [current]
+            if self.last_candle is not None and current > self.last_candle:
+                # Closed candles are final: emit each once (bounded when far behind)
+                closed = list(range(max(self.last_candle, current - 50 * self.interval_ms), current, self.interval_ms))
+                starts = closed + starts
+            self.last_candle = current
+            rows = tape.candles(np.asarray(starts), self.interval_ms, now)
+            return [self._kline_event(row, now, closed=row[0] != current) for row in rows]
+
+        if self.kind == "ticker":
+            t = exchange.ticker_24hr(self.symbol)
+            return [{"e": "24hrTicker", "E": now, "s": self.symbol, "p": t["priceChange"], "P": t["priceChangePercent"],
+                     "w": t["weightedAvgPrice"], "x": t["prevClosePrice"], "c": t["lastPrice"], "Q": t["lastQty"],
+                     "b": t["bidPrice"], "B": t["bidQty"], "a": t["askPrice"], "A": t["askQty"],
+                     "o": t["openPrice"], "h": t["highPrice"], "l": t["lowPrice"], "v": t["volume"],
+                     "q": t["quoteVolume"], "O": t["openTime"], "C": t["closeTime"], "F": t["firstId"],
+                     "L": t["lastId"], "n": t["count"]}]
+
+        if self.kind == "bookTicker":
+            ticker = exchange.book_ticker(self.symbol)
+            return [{"u": now // 10, "s": self.symbol, "b": ticker["bidPrice"], "B": ticker["bidQty"],
+                     "a": ticker["askPrice"], "A": ticker["askQty"]}]
+
+        book = tape.book(now, self.levels or 20)
+        if self.levels:
+            return [book]
+        first = self.last_book + 1 if self.last_book is not None else book["lastUpdateId"]
+        self.last_book = book["lastUpdateId"]
+        return [{"e": "depthUpdate", "E": now, "s": self.symbol, "U": first, "u": book["lastUpdateId"],
+                 "b": book["bids"], "a": book["asks"]}]
+
+    def _kline_event(self, row: list, now: int, closed: bool) -> dict:
+        interval = next(name for name, ms in INTERVAL_MS.items() if ms == self.interval_ms)
+        return {
+            "e": "kline", "E": now, "s": self.symbol,
+            "k": {"t": row[0], "T": row[6], "s": self.symbol, "i": interval, "f": 0, "L": row[8],
+                  "o": row[1], "c": row[4], "h": row[2], "l": row[3], "v": row[5], "n": row[8],
+                  "x": closed, "q": row[7], "V": row[9], "Q": row[10], "B": "0"},
+        }
+
+
+def create_app(config: SimConfig, recorded: dict[str, list[list]] | None = None, symbols: list[str] | None = None) -> FastAPI:
+    clock = SimClock(config.speed)
+    exchange = Exchange(clock, recorded)
+    for symbol in symbols or []:
+        exchange.tape(symbol)
+
+    app = FastAPI(title="Binance simulator")
+    app.state.config = config
+    app.state.counts = {"requests": 0, "errors": 0, "rate_limited": 0, "stalled": 0, "ws_messages": 0, "ws_dropped": 0}
+    # [minute, weight used in it]
+    app.state.weight = [0, 0]
+
+    def delay() -> float:
+        cfg = app.state.config
+        return (cfg.latency_ms + random.uniform(0, cfg.jitter_ms)) / 1000
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if not request.url.path.startswith("/api/"):
+            return await call_next(request)
+        cfg, counts = app.state.config, app.state.counts
+        counts["requests"] += 1
+        minute = int(time.time() // 60)
+        if app.state.weight[0] != minute:
+            app.state.weight = [minute, 0]
+        app.state.weight[1] += REQUEST_WEIGHT.get(request.url.path, 1)
+        used = {"X-MBX-USED-WEIGHT-1M": str(app.state.weight[1])}
+        if cfg.weight_limit and app.state.weight[1] > cfg.weight_limit:
+            counts["rate_limited"] += 1
+            return JSONResponse({"code": -1003, "msg": "Too much request weight used."}, status_code=429,
+                                headers={**used, "Retry-After": str(60 - int(time.time()) % 60)})
+        if delay_s := delay():
+            await asyncio.sleep(delay_s)
+
+        roll = random.random()
+        if roll < cfg.error_rate:
+            counts["errors"] += 1
+            return JSONResponse({"code": -1001, "msg": "Internal error; unable to process your request."},
+                                status_code=random.choice((500, 502, 503)))
+        roll -= cfg.error_rate
+        if roll < cfg.rate_limit_rate:
+            counts["rate_limited"] += 1
+            return JSONResponse({"code": -1003, "msg": "Too many requests."}, status_code=429, headers={"Retry-After": "1"})
+        roll -= cfg.rate_limit_rate
+        if roll < cfg.stall_rate:
+            counts["stalled"] += 1
+            await asyncio.sleep(cfg.stall_seconds)
+        response = await call_next(request)
+        response.headers.update(used)
+        return response
+
+    def bad_request(msg: str, code: int = -1100) -> JSONResponse:
+        return JSONResponse({"code": code, "msg": msg}, status_code=400)
+
+    @app.get("/api/v3/ping")
+    async def ping() -> dict:
+        return {}
+
+    @app.get("/api/v3/time")
+    async def server_time() -> dict:
+        return {"serverTime": clock.now_ms()}
+
+    @app.get("/api/v3/klines")
+    async def klines(symbol: str, interval: str, limit: int = 500, startTime: int | None = None, endTime: int | None = None):
+        if interval not in INTERVAL_MS:
+            return bad_request("Invalid interval.", -1120)
+        rows = exchange.klines(symbol, interval, limit, startTime, endTime)
+        if gap_rate := app.state.config.kline_gap_rate:
+            rows = [r for r in rows if zlib.crc32(f"{symbol.upper()}{r[0]}".encode()) / 2**32 >= gap_rate]
+        return rows
+
+    @app.get("/api/v3/ticker/24hr")
+    async def ticker_24hr(symbol: str):
+        return exchange.ticker_24hr(symbol)
+
+    @app.get("/api/v3/ticker/bookTicker")
+    async def book_ticker(symbol: str):
+        return exchange.book_ticker(symbol)
+
+    @app.get("/api/v3/depth")
+    async def depth(symbol: str, limit: int = 100):
+        limit = min(max(limit, 1), 5000)
+        return exchange.tape(symbol).book(clock.now_ms(), limit)
+
+    @app.get("/sim")
+    async def sim_state() -> dict:
+        return {
+            "config": app.state.config.model_dump(),
+            "sim_time_ms": clock.now_ms(),
+            "symbols": exchange.symbols,
+            "counts": app.state.counts,
+        }
+
+    @app.post("/sim")
+    async def sim_update(update: dict) -> dict:
+        config = SimConfig(**{**app.state.config.model_dump(), **update})
+        if config.speed != clock.speed:
+            clock.set_speed(config.speed)
+        app.state.config = config
+        return await sim_state()
+
+    async def push(websocket: WebSocket, names: list[str], combined: bool) -> None:
+        try:
+            streams = [_Stream(name) for name in names]
+        except (ValueError, KeyError) as e:
+            await websocket.close(code=1008, reason=str(e))
+            return
+
+        counts = app.state.counts
+        try:
+            while True:
+                now = clock.now_ms()
+                for stream in streams:
+                    if now < stream.next_ms:
+                        continue
+                    stream.next_ms = now + stream.every_ms
+                    for message in stream.messages(exchange, now):
+                        await websocket.send_text(json.dumps({"stream": stream.name, "data": message} if combined else message))
+                        counts["ws_messages"] += 1
+                        if random.random() < app.state.config.ws_drop_rate:
+                            counts["ws_dropped"] += 1
+                            await websocket.close(code=1011)
+                            return
+
+                cfg = app.state.config
+                due_ms = min(stream.next_ms for stream in streams) - clock.now_ms()
+                await asyncio.sleep(max(clock.wall_seconds(max(due_ms, 0)), cfg.min_push_ms / 1000) + delay())
+        except (WebSocketDisconnect, RuntimeError):
+            # RuntimeError: the client went away between the check and the send
+            pass
+
+    @app.websocket("/ws/{name:path}")
+    async def raw_stream(websocket: WebSocket, name: str):
+        await websocket.accept()
+        await push(websocket, [n for n in name.split("/") if n], combined=False)
+
+    @app.websocket("/stream")
+    async def combined_stream(websocket: WebSocket, streams: str):
+        await websocket.accept()
+        await push(websocket, [n for n in streams.split("/") if n], combined=True)
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8791)
+    parser.add_argument("--symbols", default="DOGEUSDT", help="comma-separated symbols to build up front")
+    parser.add_argument("--klines", type=Path, default=FIXTURES_DIR / "binance_klines.json",
+                        help="recorded kline rows to replay")
+    parser.add_argument("--klines-symbol", default="DOGEUSDT", help="symbol the --klines rows were recorded for")
+    parser.add_argument("--synthetic", action="store_true", help="ignore --klines; every symbol is synthetic")
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=30.0)
+    parser.add_argument("--ws-drop-rate", type=float, default=0.0)
+    parser.add_argument("--weight-limit", type=int, default=0, help="request weight per minute, as Binance's 6000 (0: unlimited)")
+    parser.add_argument("--kline-gap-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None, help="seed the fault/jitter dice")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    config = SimConfig(
+        speed=args.speed, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, stall_rate=args.stall_rate, stall_seconds=args.stall_seconds,
+        ws_drop_rate=args.ws_drop_rate, weight_limit=args.weight_limit, kline_gap_rate=args.kline_gap_rate,
+    )
+    recorded = {} if args.synthetic else load_recorded(args.klines, args.klines_symbol)
+
+    import uvicorn
+
+    app = create_app(config, recorded, [s.strip() for s in args.symbols.split(",") if s.strip()])
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Throughput of the incremental columnar export (app/database/export.py).
+
+Exports --rows synthetic trade-history rows, spread over --days, then
+appends --increment more rows and exports again, which only has to read
+the new ones. Reports, as JSON: rows per second and files for the full and
+the incremental run, peak resident memory (bounded by the file size, not
+the table), the size on disk, and how long loading everything or one day
+back from the files takes.
+
+    python -m benchmarks.columnar_export                         # synthetic rows, no database
+    python -m benchmarks.columnar_export --rows 5000000 --output export.json
+    python -m benchmarks.columnar_export --db --rows 2000000     # through Postgres
+
+Without --db the rows come from an in-process generator batched like the
+server-side cursor, which measures the file side alone (plus building the
+rows). With --db, point POSTGRES_* at a scratch database: the rows are
+COPYed into a bench_export_trade_history table, exported through Database.stream() like
+the real tables, and the table is dropped afterwards. The ad-hoc baseline
+times a plain SELECT of one day straight from that table.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from app.config import settings
+from app.database.database_class import Database
+from app.database.export import EXPORT_TABLES, ColumnarExport
+
+SOURCE = "crypto_trade_history"
+TABLE = "bench_export_trade_history"
+COLUMNS = [name for name, _ in EXPORT_TABLES[SOURCE]]
+SIDES = ("buy", "sell", "hold")
+START = datetime.datetime(2025, 1, 1)
+
+
+def synthetic_row(i: int, seconds_per_row: float) -> tuple:
+    return (
+        i, START + datetime.timedelta(seconds=i * seconds_per_row), "DOGE", SIDES[i % 3], float(i % 500),
+        0.15 + (i % 1000) * 1e-5, (i % 500) * 0.15, f"benchmark decision {i}: momentum and book imbalance",
+        i % 5 != 0, None if i % 4 else 0.01 * (i % 200 - 100), ("llm", "gate", "cache")[i % 3],
+    )
+
+
+async def synthetic_batches(first: int, rows: int, batch_rows: int, seconds_per_row: float):
+    for start in range(first, first + rows, batch_rows):
+        yield [synthetic_row(i, seconds_per_row) for i in range(start, min(first + rows, start + batch_rows))]
+
+
+async def seed(db: Database, first: int, rows: int, seconds_per_row: float) -> float:
+    started = time.perf_counter()
+    async with await db.get_connection() as conn:
+        async with conn.cursor() as cur:
+            async with cur.copy(f"COPY {TABLE} ({', '.join(COLUMNS)}) FROM STDIN") as copy:
+                for i in range(first, first + rows):
+                    await copy.write_row(synthetic_row(i, seconds_per_row))
+        await conn.commit()
+    return time.perf_counter() - started
+
+
+def _run_stats(stats, rss_before_mb: float) -> dict:
+    return {
+        **stats.model_dump(include={"rows", "files", "seconds", "rows_per_second"}),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "rss_before_mb": rss_before_mb,
+    }
+
+
+async def run(args) -> dict:
+    exporter = ColumnarExport(tempfile.mkdtemp(prefix="columnar_export_"), rows_per_file=args.rows_per_file)
+    seconds_per_row = args.days * 86_400 / args.rows
+    db = Database() if args.db else None
+    result: dict = {}
+
+    if db is not None:
+        EXPORT_TABLES[TABLE] = EXPORT_TABLES[SOURCE]
+        await db.execute_write(f"DROP TABLE IF EXISTS {TABLE}")
+        await db.execute_write(f"""
+            CREATE TABLE {TABLE} (
+                id BIGINT PRIMARY KEY, timestamp TIMESTAMP, symbol VARCHAR(50), side VARCHAR(10),
+                quantity FLOAT, price FLOAT, amount_usd FLOAT, reason TEXT, is_open BOOLEAN,
+                profit_loss FLOAT, decision_source VARCHAR(10)
+            )
+        """)
+        result["seed_seconds"] = await seed(db, 1, args.rows, seconds_per_row)
+
+    async def export(first: int, rows: int):
+        if db is None:
+            return await exporter.write(SOURCE, synthetic_batches(first, rows, args.batch_rows, seconds_per_row))
+        return await exporter.export(TABLE, db)
+
+    table = TABLE if db is not None else SOURCE
+    try:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        result["full"] = _run_stats(await export(1, args.rows), rss)
+        if db is not None:
+            await seed(db, args.rows + 1, args.increment, seconds_per_row)
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        result["incremental"] = _run_stats(await export(args.rows + 1, args.increment), rss)
+
+        day = (START + datetime.timedelta(days=args.days // 2)).date()
+        timings = {}
+        for label, columns, start, end in (
+            ("all_columns", None, None, None),
+            ("numeric_columns", ["id", "timestamp", "price", "profit_loss"], None, None),
+            ("one_day", None, day, day + datetime.timedelta(days=1)),
+        ):
+            started = time.perf_counter()
+            loaded = exporter.load(table, columns, start, end)
+            timings[label] = {"rows": int(loaded["id"].size), "seconds": time.perf_counter() - started}
+        result["load"] = timings
+
+        if db is not None:
+            started = time.perf_counter()
+            await db.fetch_all(
+                f"SELECT {', '.join(COLUMNS)} FROM {TABLE} WHERE timestamp >= %s AND timestamp < %s",
+                (day, day + datetime.timedelta(days=1)),
+            )
+            result["sql_one_day_seconds"] = time.perf_counter() - started
+    finally:
+        if db is not None:
+            await db.execute_write(f"DROP TABLE IF EXISTS {TABLE}")
+
+    result["disk_bytes"] = sum(p.stat().st_size for p in exporter.root.rglob("*.npz"))
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--increment", type=int, default=20_000, help="rows added before the incremental run")
+    parser.add_argument("--days", type=int, default=365, help="days the rows are spread over")
+    parser.add_argument("--batch-rows", type=int, default=settings.EXPORT_BATCH_ROWS)
+    parser.add_argument("--rows-per-file", type=int, default=settings.EXPORT_ROWS_PER_FILE)
+    parser.add_argument("--db", action="store_true", help="export through Postgres instead of a generator")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = {
+        "config": {
+            "rows": args.rows,
+            "increment": args.increment,
+            "days": args.days,
+            "batch_rows": args.batch_rows,
+            "rows_per_file": args.rows_per_file,
+            "source": "postgres" if args.db else "synthetic",
+            "python": sys.version.split()[0],
+        },
+        **asyncio.run(run(args)),
+    }
+    output = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Replay recorded cycles through the decision cache and report hit rate and LLM
+time saved.
+
+Input is a JSONL file, one cycle per line:
+    {"snapshot": {...MarketSnapshot...}, "side": "hold", "reason": "...", "llm_seconds": 41.2}
+
+Without --input a synthetic DOGE random walk is replayed instead.
+
+    python -m benchmarks.decision_cache_replay --input cycles.jsonl
+    python -m benchmarks.decision_cache_replay --synthetic 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from app.agents.decision_cache import DecisionCache
+from app.schemas.market_snapshot import MarketSnapshot
+
+
+def synthetic_cycles(count: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    price = 0.15
+    closes = list(price * (1 + rng.normal(0, 0.002, 40)).cumprod())
+    sentiments = ["Neutral", "Positive", "Negative", "Mixed"]
+
+    for i in range(count):
+        price *= 1 + rng.normal(0, 0.003)
+        closes.append(price)
+        change = (price / closes[-96] - 1) * 100 if len(closes) > 96 else 0.0
+        diffs = np.diff(closes[-15:])
+        gain, loss = diffs.clip(0).mean(), (-diffs).clip(0).mean()
+        rsi = 100 - 100 / (1 + gain / loss) if loss > 0 else 100.0
+        side = "buy" if rsi < 30 else "sell" if rsi > 70 else "hold"
+
+        yield {
+            "snapshot": MarketSnapshot(
+                symbol="DOGE",
+                captured_at=i * 900.0,
+                price_usd=price,
+                change_24h_pct=change,
+                order_book_signal="balanced",
+                order_book_imbalance=float(rng.normal(0, 0.1)),
+                candle_trend="UpTrend" if change > 1 else "DownTrend" if change < -1 else "Neutral",
+                rsi_14=rsi,
+                news_sentiment=sentiments[int(rng.integers(0, len(sentiments)))],
+                holdings_value_usd=100.0,
+            ),
+            "side": side,
+            "reason": f"synthetic cycle {i}",
+            "llm_seconds": float(rng.normal(40, 8)),
+        }
+
+
+def recorded_cycles(path: str):
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                cycle = json.loads(line)
+                cycle["snapshot"] = MarketSnapshot(**cycle["snapshot"])
+                yield cycle
+
+
+async def replay(cycles, ttl_seconds: float, max_entries: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = DecisionCache(
+            db_path=os.path.join(tmp, "replay.db"),
+            ttl_seconds=ttl_seconds,
+            max_entries=max_entries,
+            enabled=True,
+        )
+
+        lookup_ms: list[float] = []
+        agreements = 0
+
+        for cycle in cycles:
+            started = time.perf_counter()
+            cached = await cache.lookup(cycle["snapshot"])
+            lookup_ms.append((time.perf_counter() - started) * 1000)
+
+            if cached is not None:
+                agreements += cached[0] == cycle["side"]
+                continue
+
+            cache.observe_llm_seconds(cycle["llm_seconds"])
+            await cache.store(cycle["snapshot"], cycle["side"], cycle["reason"])
+
+        stats = await cache.stats()
+        cache.close()
+
+    return {
+        "cycles": len(lookup_ms),
+        **stats.model_dump(),
+        "hit_agreement_rate": agreements / stats.hits if stats.hits else 0.0,
+        "lookup_ms_p50": float(np.percentile(lookup_ms, 50)) if lookup_ms else 0.0,
+        "lookup_ms_p99": float(np.percentile(lookup_ms, 99)) if lookup_ms else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", help="JSONL file of recorded cycles")
+    parser.add_argument("--synthetic", type=int, default=1000, help="number of synthetic cycles when no input is given")
+    parser.add_argument("--ttl", type=float, default=6 * 3600, help="cache TTL in seconds (wall clock)")
+    parser.add_argument("--max-entries", type=int, default=5000)
+    args = parser.parse_args()
+
+    cycles = recorded_cycles(args.input) if args.input else synthetic_cycles(args.synthetic)
+    print(json.dumps(asyncio.run(replay(cycles, args.ttl, args.max_entries)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Time the pre-trade execution cost estimator against recorded or synthetic books.
+
+Each "decision" costs the target size plus a sweep of candidate sizes and
+searches the optimal child split, which is what the agent asks for before a
+BUY/SELL.
+
+    python -m benchmarks.execution_cost                       # synthetic books
+    python -m benchmarks.execution_cost --book book.json ...  # recorded OrderBookResponse JSON
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from app.analysis.execution_cost import estimate_from_book
+from app.schemas.binance_order_book import OrderBookResponse
+from benchmarks.order_book_digest_tokens import synthetic_book
+
+
+def load_books(paths: list[str], limits: list[int]) -> list[OrderBookResponse]:
+    if paths:
+        books = []
+        for path in paths:
+            with open(path) as f:
+                books.append(OrderBookResponse.model_validate(json.load(f)))
+        return books
+    return [synthetic_book("DOGEUSDT", limit, seed=i) for i, limit in enumerate(limits)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--book", nargs="*", default=[], help="OrderBookResponse JSON files")
+    parser.add_argument("--limits", nargs="*", type=int, default=[100, 1000, 5000])
+    parser.add_argument("--candidates", type=int, default=50, help="candidate sizes per decision")
+    parser.add_argument("--decisions", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    for book in load_books(args.book, args.limits):
+        sizes = np.geomspace(50, 250_000, args.candidates).tolist()
+        targets = rng.uniform(100, 50_000, args.decisions)
+        sides = rng.choice(["buy", "sell"], args.decisions)
+
+        start = time.perf_counter()
+        estimates = [
+            estimate_from_book(book, "DOGE", str(side), float(target), sizes)
+            for target, side in zip(targets, sides)
+        ]
+        elapsed = time.perf_counter() - start
+
+        results.append(
+            {
+                "levels": len(book.bids) + len(book.asks),
+                "decisions": args.decisions,
+                "candidates_per_decision": args.candidates,
+                "ms_per_decision": elapsed / args.decisions * 1000,
+                "sizes_per_second": args.decisions * (args.candidates + 1) / elapsed,
+                "split_recommended_pct": sum((e.children or 0) > 1 for e in estimates) / len(estimates) * 100,
+                "median_target_slippage_bps": float(np.median([e.target.slippage_bps for e in estimates])),
+            }
+        )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
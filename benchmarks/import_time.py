@@ -0,0 +1,123 @@
+"""
+Cold-start profile of the entry points, from `python -X importtime`.
+
+Each target is imported in a fresh interpreter, --runs times. A target is a
+module, or `module:function` to also time a zero-argument startup function
+after the import. Reports, as JSON, per target: wall time to import (and to
+run the function), and the modules with the largest cumulative and self
+import times from the median run.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --runs 10 --top 30 --output imports.json
+    python -m benchmarks.import_time app.main --budget 1.0    # exit 1 if the import is slower
+
+Model settings are filled with placeholders when unset so
+app.agents.trading_agent:startup can build its client; nothing is sent.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_TARGETS = ["app.agents.trading_agent", "app.agents.trading_agent:startup", "app.main"]
+
+PROBE = """
+import time
+started = time.perf_counter()
+import importlib
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+if {function!r}:
+    getattr(module, {function!r})()
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def _parse_importtime(stderr: str) -> list[dict]:
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({
+            "module": name.strip(),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    return modules
+
+
+def profile(target: str, runs: int, top: int, env: dict, cwd: str) -> dict:
+    module, _, function = target.partition(":")
+    probe = PROBE.format(module=module, function=function)
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", probe],
+            capture_output=True, text=True, env=env, cwd=cwd,
+        )
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+        import_s, function_s = map(float, proc.stdout.split()[-2:])
+        samples.append((import_s, function_s, _parse_importtime(proc.stderr)))
+
+    samples.sort(key=lambda s: s[0] + s[1])
+    _, _, modules = samples[len(samples) // 2]
+    imports = np.array([s[0] for s in samples]) * 1000
+    functions = np.array([s[1] for s in samples]) * 1000
+    result = {
+        "runs": runs,
+        "import_ms": {"median": float(np.median(imports)), "min": float(imports.min()), "max": float(imports.max())},
+        "modules_loaded": len(modules),
+        "top_cumulative": sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top],
+        "top_self": sorted(modules, key=lambda m: m["self_ms"], reverse=True)[:top],
+    }
+    if function:
+        result[f"{function}_ms"] = {"median": float(np.median(functions)), "min": float(functions.min()), "max": float(functions.max())}
+        result["total_ms"] = float(np.median(imports + functions))
+    else:
+        result["total_ms"] = result["import_ms"]["median"]
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="module or module:function")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="modules listed per ranking")
+    parser.add_argument("--budget", type=float, help="seconds; exit 1 if any target's median import exceeds it")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+    for key, placeholder in (("GEMINI_BASE_URL", "http://127.0.0.1:9/v1"), ("GEMINI_API_KEY", "unset"), ("GEMINI_MODEL", "unset")):
+        env.setdefault(key, placeholder)
+    # startup() opens ./conversations.db; keep the repo's copy untouched
+    cwd = tempfile.mkdtemp(prefix="import_time_")
+
+    result = {
+        "python": sys.version.split()[0],
+        "targets": {target: profile(target, args.runs, args.top, env, cwd) for target in args.targets},
+    }
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+    if args.budget is not None:
+        over = [t for t, r in result["targets"].items() if "error" in r or r["import_ms"]["median"] > args.budget * 1000]
+        if over:
+            print(f"over the {args.budget}s budget: {', '.join(over)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Write and read speed of the columnar kline archive (app/data/kline_archive.py).
+
+Builds --days of synthetic 1-minute candles per symbol, appends them one
+day per call (as a daily sync would), compacts and verifies the checksums,
+then times reads. Reports, as JSON: append throughput, compaction and
+verification time, load() of the whole history (maps only), a pass over
+every close (pages actually read), random one-day range slices, and the
+time to parse the same candles from /klines-shaped JSON for comparison.
+
+    python -m benchmarks.kline_archive
+    python -m benchmarks.kline_archive --days 365 --symbols 4 --output archive.json
+    python -m benchmarks.kline_archive --dir /data/archive   # keep the files
+
+The archive is written to a temporary directory unless --dir is given.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.data.kline_archive import KlineArchive
+from app.data.shared_ring import KLINE
+
+MINUTE_MS = 60_000
+DAY_ROWS = 1440
+
+
+def synthetic_day(day: int, start_ms: int, rng: np.random.Generator, last_close: float) -> np.ndarray:
+    rows = np.zeros(DAY_ROWS, dtype=KLINE)
+    rows["open_time"] = start_ms + (day * DAY_ROWS + np.arange(DAY_ROWS)) * MINUTE_MS
+    rows["close_time"] = rows["open_time"] + MINUTE_MS - 1
+    closes = last_close * np.exp(np.cumsum(rng.normal(0, 0.0008, DAY_ROWS)))
+    opens = np.concatenate(([last_close], closes[:-1]))
+    wiggle = np.abs(rng.normal(0, 0.0004, DAY_ROWS))
+    rows["open"], rows["close"] = opens, closes
+    rows["high"] = np.maximum(opens, closes) * (1 + wiggle)
+    rows["low"] = np.minimum(opens, closes) * (1 - wiggle)
+    rows["volume"] = rng.gamma(2.0, 5e4, DAY_ROWS)
+    rows["quote_volume"] = rows["volume"] * closes
+    rows["trades"] = rng.poisson(300, DAY_ROWS)
+    rows["taker_base_volume"] = rows["volume"] * 0.5
+    rows["taker_quote_volume"] = rows["quote_volume"] * 0.5
+    return rows
+
+
+def _timed(fn, runs: int) -> tuple[float, object]:
+    """Median milliseconds over `runs` calls, and the last result."""
+    samples, result = [], None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return float(np.median(samples)), result
+
+
+def json_parse_ms(rows: np.ndarray) -> float:
+    """Milliseconds to parse `rows` from a /klines body into a float array of closes."""
+    body = json.dumps([
+        [int(r["open_time"]), f"{r['open']:.8f}", f"{r['high']:.8f}", f"{r['low']:.8f}", f"{r['close']:.8f}",
+         f"{r['volume']:.8f}", int(r["close_time"]), f"{r['quote_volume']:.8f}", int(r["trades"]),
+         f"{r['taker_base_volume']:.8f}", f"{r['taker_quote_volume']:.8f}", "0"]
+        for r in rows
+    ])
+    started = time.perf_counter()
+    np.array([float(k[4]) for k in json.loads(body)])
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365, help="days of 1-minute candles per symbol")
+    parser.add_argument("--symbols", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=20, help="repetitions per read measurement")
+    parser.add_argument("--dir", help="archive directory (default: a temporary one)")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    archive = KlineArchive(args.dir or tempfile.mkdtemp(prefix="kline_archive_"))
+    rng = np.random.default_rng(7)
+    start_ms = 1_700_006_400_000 - 1_700_006_400_000 % (DAY_ROWS * MINUTE_MS)
+    symbols = [f"SIM{i}USDT" for i in range(args.symbols)]
+
+    appended, append_seconds = 0, 0.0
+    for symbol in symbols:
+        close = 0.15
+        for day in range(args.days):
+            rows = synthetic_day(day, start_ms, rng, close)
+            close = float(rows["close"][-1])
+            started = time.perf_counter()
+            appended += archive.append(symbol, "1m", rows)
+            append_seconds += time.perf_counter() - started
+
+    symbol = symbols[0]
+    # Re-append a day in the middle, as a gap repair would, so compaction has work to do
+    archive.append(symbol, "1m", synthetic_day(args.days // 2, start_ms, rng, 0.15))
+    compact_ms, info = _timed(lambda: archive.compact(symbol, "1m"), 1)
+    verify_ms, bad = _timed(lambda: archive.verify(symbol, "1m"), 1)
+
+    load_ms, columns = _timed(lambda: archive.load(symbol, "1m"), args.runs)
+    scan_ms, _ = _timed(lambda: float(archive.load(symbol, "1m")["close"].mean()), args.runs)
+    day_starts = rng.integers(0, max(1, args.days - 1), args.runs) * DAY_ROWS * MINUTE_MS + start_ms
+    windows = iter(day_starts)
+    slice_ms, _ = _timed(
+        lambda: float(archive.load(symbol, "1m", (s := int(next(windows))), s + DAY_ROWS * MINUTE_MS)["close"].mean()),
+        args.runs,
+    )
+    month = archive.load(symbol, "1m", start_ms, start_ms + 30 * DAY_ROWS * MINUTE_MS)
+    month_rows = len(month["open_time"])
+    parse_month_ms = json_parse_ms(np.rec.fromarrays([month[name] for name in KLINE.names], dtype=KLINE))
+
+    result = {
+        "config": {"days": args.days, "symbols": args.symbols, "runs": args.runs, "python": sys.version.split()[0]},
+        "archive": {
+            "rows_per_symbol": info.rows,
+            "bytes_per_symbol": info.bytes,
+            "directory": str(archive.root),
+            "disk_bytes": sum(p.stat().st_size for p in Path(archive.root).rglob("*") if p.is_file()),
+        },
+        "append": {"rows": appended, "rows_per_second": appended / append_seconds if append_seconds else 0.0},
+        "compact_ms": compact_ms,
+        "verify_ms": verify_ms,
+        "corrupt_segments": bad,
+        "read_ms": {
+            "load_all": load_ms,
+            "scan_all_closes": scan_ms,
+            "one_day_slice": slice_ms,
+            "rows_loaded": int(columns["open_time"].size),
+        },
+        "json_parse_ms": {
+            "30_days": parse_month_ms,
+            "all_days_estimated": parse_month_ms * info.rows / max(1, month_rows),
+        },
+    }
+    output = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
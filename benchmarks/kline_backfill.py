@@ -0,0 +1,150 @@
+"""
+Throughput and recovery of the historical kline backfill (app/data/binance/backfill.py).
+
+Starts benchmarks.binance_sim with --latency-ms of added response time (a
+stand-in for the round trip to Binance) and backfills --days of 1-minute
+candles into a fresh archive per run:
+
+  * once per --concurrency level, reporting candles per second and requests;
+  * a resume run, cancelled once half of its windows are checkpointed and
+    started again, checking that the second pass only fetches the rest;
+  * a run with --gap-rate of the sim's candles dropped, reporting the gaps
+    found and the ones recorded as unfillable.
+
+Every run checks that the archive ends up with one row per candle the sim
+serves. Reports everything as JSON.
+
+    python -m benchmarks.kline_backfill
+    python -m benchmarks.kline_backfill --days 90 --concurrency 1,4,8,16 --latency-ms 80 --output backfill.json
+
+The sim's weight limit is off; --weight-per-minute is the backfill's own budget.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from app.data.binance.backfill import KlineBackfill
+from app.data.kline_archive import KlineArchive
+
+ROOT = Path(__file__).resolve().parent.parent
+DAY_MS = 86_400_000
+SYMBOL = "DOGEUSDT"
+
+
+async def _wait_ready(url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not start")
+
+
+def _backfill(archive: KlineArchive, start_ms: int, end_ms: int, concurrency: int, args) -> KlineBackfill:
+    return KlineBackfill(
+        SYMBOL, "1m", start_ms, end_ms, sink=archive, concurrency=concurrency,
+        weight_per_minute=args.weight_per_minute, url=f"{args.sim}/api/v3",
+    )
+
+
+def _summary(stats, archive: KlineArchive, expected: int) -> dict:
+    rows = archive.info(SYMBOL, "1m").rows
+    return {
+        **stats.model_dump(exclude={"symbol", "interval", "start_ms", "end_ms", "gaps_unfilled"}),
+        "gaps_unfilled": len(stats.gaps_unfilled),
+        "archive_rows": rows,
+        "complete": rows + sum((end - start) // 60_000 for start, end in stats.gaps_unfilled) == expected,
+    }
+
+
+async def _resume(start_ms: int, end_ms: int, expected: int, args) -> dict:
+    archive = KlineArchive(tempfile.mkdtemp(prefix="kline_backfill_"))
+    first = _backfill(archive, start_ms, end_ms, args.resume_concurrency, args)
+    task = asyncio.create_task(first.run())
+    total = len(range(start_ms, end_ms, 1000 * 60_000))
+    while not task.done():
+        path = first.checkpoint_path
+        if path.exists() and len(json.loads(path.read_text())["done"]) >= total // 2:
+            task.cancel()
+            break
+        await asyncio.sleep(0.01)
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    second = await _backfill(archive, start_ms, end_ms, args.resume_concurrency, args).run()
+    return {"cancelled_after_requests": first.requests, **_summary(second, archive, expected)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=30, help="days of 1-minute candles per run")
+    parser.add_argument("--concurrency", default="1,4,8,16", help="comma-separated concurrency levels")
+    parser.add_argument("--resume-concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="added to every sim response")
+    parser.add_argument("--gap-rate", type=float, default=0.001, help="share of candles the sim drops in the gap run")
+    parser.add_argument("--weight-per-minute", type=int, default=6000)
+    parser.add_argument("--sim-port", type=int, default=8791)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+    args.sim = f"http://127.0.0.1:{args.sim_port}"
+
+    now_ms = int(time.time() * 1000)
+    end_ms = now_ms - now_ms % DAY_MS
+    start_ms = end_ms - args.days * DAY_MS
+    expected = args.days * 1440
+
+    sim = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.binance_sim", "--port", str(args.sim_port), "--symbols", SYMBOL,
+         "--latency-ms", str(args.latency_ms)],
+        cwd=ROOT, stdout=subprocess.DEVNULL,
+    )
+    try:
+        asyncio.run(_wait_ready(f"{args.sim}/api/v3/ping"))
+        runs = []
+        for concurrency in (int(c) for c in args.concurrency.split(",")):
+            archive = KlineArchive(tempfile.mkdtemp(prefix="kline_backfill_"))
+            stats = asyncio.run(_backfill(archive, start_ms, end_ms, concurrency, args).run())
+            runs.append({"concurrency": concurrency, **_summary(stats, archive, expected)})
+
+        resume = asyncio.run(_resume(start_ms, end_ms, expected, args))
+
+        httpx.post(f"{args.sim}/sim", json={"kline_gap_rate": args.gap_rate})
+        archive = KlineArchive(tempfile.mkdtemp(prefix="kline_backfill_"))
+        gaps = _summary(asyncio.run(_backfill(archive, start_ms, end_ms, args.resume_concurrency, args).run()), archive, expected)
+    finally:
+        sim.terminate()
+        sim.wait()
+
+    result = {
+        "config": {
+            "days": args.days,
+            "candles": expected,
+            "latency_ms": args.latency_ms,
+            "weight_per_minute": args.weight_per_minute,
+            "cpus": os.cpu_count(),
+            "python": sys.version.split()[0],
+        },
+        "runs": runs,
+        "resume": resume,
+        "gaps": {"gap_rate": args.gap_rate, **gaps},
+    }
+    output = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
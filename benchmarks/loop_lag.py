@@ -0,0 +1,155 @@
+"""
+Event-loop lag with CPU-heavy analysis inline vs in the analysis process pool.
+
+Runs the same synthetic workload twice: decoding and digesting a deep order
+book, validating a large news payload, formatting 1000 klines and computing
+indicators over a long close series. The first pass runs it on the event
+loop, as before the pool existed; the second runs it through a started
+AnalysisExecutor. A LoopLagMonitor samples the loop throughout. Reports, as
+JSON, per mode: wall time, rounds/s, per-task latency and loop lag.
+
+    python -m benchmarks.loop_lag
+    python -m benchmarks.loop_lag --rounds 50 --levels 5000 --articles 400 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+from app.analysis.executor import AnalysisExecutor, LoopLagMonitor
+from app.analysis.indicators import kline_indicators
+from app.analysis.order_book_digest import digest_depth_payload
+from app.data.binance.market_data import format_klines_payload
+from app.schemas.crypto_news import CryptoNewsResponse
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def build_payloads(levels: int, articles: int, klines: int, closes: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    mid = 0.15
+    depth = {
+        "lastUpdateId": 1,
+        "bids": [[f"{mid - i * 1e-5:.8f}", f"{rng.uniform(10, 50_000):.2f}"] for i in range(1, levels + 1)],
+        "asks": [[f"{mid + i * 1e-5:.8f}", f"{rng.uniform(10, 50_000):.2f}"] for i in range(1, levels + 1)],
+    }
+
+    news = json.loads((FIXTURES / "coindesk_search.json").read_text())["body"]
+    items = news["Data"]
+    news["Data"] = [{**items[i % len(items)], "ID": i, "BODY": items[i % len(items)]["BODY"] * 4} for i in range(articles)]
+
+    start = 1_700_000_000_000
+    rows = []
+    price = mid
+    for i in range(klines):
+        close = price * (1 + rng.gauss(0, 0.002))
+        rows.append([
+            start + i * 900_000, f"{price:.8f}", f"{max(price, close) * 1.001:.8f}", f"{min(price, close) * 0.999:.8f}",
+            f"{close:.8f}", f"{rng.uniform(1e5, 1e6):.2f}", start + (i + 1) * 900_000 - 1, f"{rng.uniform(1e4, 1e5):.2f}",
+            rng.randint(100, 5000), f"{rng.uniform(1e4, 1e5):.2f}", f"{rng.uniform(1e3, 1e4):.2f}", "0",
+        ])
+        price = close
+
+    return {
+        "depth": json.dumps(depth).encode(),
+        "news": json.dumps(news).encode(),
+        "klines": json.dumps(rows).encode(),
+        "closes": np.cumprod(1 + np.random.default_rng(seed).normal(0, 0.002, closes)) * mid,
+    }
+
+
+async def run_mode(executor: AnalysisExecutor, payloads: dict, rounds: int, lag_interval: float) -> dict:
+    monitor = LoopLagMonitor(interval=lag_interval, window=1_000_000)
+    lag_task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(lag_interval * 2)
+    monitor.reset()
+
+    task_seconds: dict[str, list[float]] = defaultdict(list)
+
+    async def timed(name: str, fn, *args):
+        started = time.perf_counter()
+        await executor.run(fn, *args)
+        task_seconds[name].append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await asyncio.gather(
+            timed("order_book_digest", digest_depth_payload, "DOGEUSDT", payloads["depth"]),
+            timed("news_validate", CryptoNewsResponse.model_validate_json, payloads["news"]),
+            timed("format_klines", format_klines_payload, payloads["klines"]),
+            timed("kline_indicators", kline_indicators, payloads["closes"], 20, 0.2),
+        )
+        # Let the loop breathe between rounds, like cycles and tool calls would
+        await asyncio.sleep(lag_interval)
+    wall = time.perf_counter() - started
+
+    lag_task.cancel()
+    return {
+        "wall_seconds": wall,
+        "rounds_per_s": rounds / wall,
+        "tasks_ms": {
+            name: {"mean": float(np.mean(values) * 1000), "p95": float(np.percentile(values, 95) * 1000)}
+            for name, values in task_seconds.items()
+        },
+        "loop_lag": monitor.stats().model_dump(),
+        "executor": executor.stats().model_dump(),
+    }
+
+
+async def run(args) -> dict:
+    payloads = build_payloads(args.levels, args.articles, args.klines, args.closes, args.seed)
+
+    inline = await run_mode(AnalysisExecutor(enabled=False), payloads, args.rounds, args.lag_interval)
+
+    executor = AnalysisExecutor(workers=args.workers, timeout=60)
+    await executor.start()
+    try:
+        pool = await run_mode(executor, payloads, args.rounds, args.lag_interval)
+    finally:
+        await executor.stop()
+
+    return {
+        "config": {
+            "rounds": args.rounds,
+            "levels_per_side": args.levels,
+            "articles": args.articles,
+            "klines": args.klines,
+            "closes": args.closes,
+            "workers": args.workers,
+            "lag_interval_ms": args.lag_interval * 1000,
+            "payload_bytes": {k: len(v) for k, v in payloads.items() if isinstance(v, bytes)},
+            "python": sys.version.split()[0],
+        },
+        "inline": inline,
+        "pool": pool,
+        "lag_p99_reduction": inline["loop_lag"]["p99_ms"] / max(pool["loop_lag"]["p99_ms"], 1e-6),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--levels", type=int, default=5000, help="order book levels per side")
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--klines", type=int, default=1000)
+    parser.add_argument("--closes", type=int, default=20_000, help="closes fed to the indicators")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--lag-interval", type=float, default=0.005, help="loop lag sampling period (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    output = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare prompt size of get_order_book in raw and digest mode.
+
+Token counts use tiktoken (cl100k_base) when it is installed and fall back to
+the usual ~4 characters per token estimate otherwise (or when the encoding
+cannot be downloaded).
+
+    python -m benchmarks.order_book_digest_tokens             # synthetic books
+    python -m benchmarks.order_book_digest_tokens --live DOGEUSDT
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+from app.analysis.order_book_digest import digest_order_book
+from app.data.binance.order_book import fetch_order_book
+from app.schemas.binance_order_book import OrderBookRequest, OrderBookResponse
+
+LIMITS = (20, 100, 500, 1000, 5000)
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    if _encoding is None:
+        return len(text) // 4
+    return len(_encoding.encode(text))
+
+
+def synthetic_book(symbol: str, limit: int, mid: float = 0.15, seed: int = 3) -> OrderBookResponse:
+    rng = np.random.default_rng(seed)
+    tick = 0.00001
+    bids = np.round(mid - tick * np.arange(1, limit + 1), 5)
+    asks = np.round(mid + tick * np.arange(1, limit + 1), 5)
+    bids_qty = np.round(rng.lognormal(8, 1.2, limit), 1)
+    asks_qty = np.round(rng.lognormal(8, 1.2, limit), 1)
+
+    return OrderBookResponse(
+        symbol=symbol,
+        type="depth",
+        best_bid=float(bids[0]),
+        best_ask=float(asks[0]),
+        spread=float(asks[0] - bids[0]),
+        bids=bids.tolist(),
+        bids_qty=bids_qty.tolist(),
+        asks=asks.tolist(),
+        asks_qty=asks_qty.tolist(),
+        limit=limit,
+        last_update_id=1,
+    )
+
+
+async def load_books(live_symbol: str | None) -> list[OrderBookResponse]:
+    if live_symbol is None:
+        return [synthetic_book("DOGEUSDT", limit) for limit in LIMITS]
+    return [await fetch_order_book(OrderBookRequest(symbol=live_symbol, limit=limit)) for limit in LIMITS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", metavar="SYMBOL", help="fetch real books from Binance instead of synthetic ones")
+    args = parser.parse_args()
+
+    results = []
+    for book in asyncio.run(load_books(args.live)):
+        started = time.perf_counter()
+        digest = digest_order_book(book)
+        digest_ms = (time.perf_counter() - started) * 1000
+
+        raw_tokens = count_tokens(book.model_dump_json())
+        digest_tokens = count_tokens(digest.model_dump_json())
+        results.append({
+            "limit": book.limit,
+            "levels": digest.levels,
+            "raw_tokens": raw_tokens,
+            "digest_tokens": digest_tokens,
+            "reduction": round(1 - digest_tokens / raw_tokens, 4) if raw_tokens else 0.0,
+            "digest_ms": round(digest_ms, 3),
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
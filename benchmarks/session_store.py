@@ -0,0 +1,174 @@
+"""
+Append and read latency of agent conversation memory under concurrent sessions.
+
+--sessions conversations run --turns turns each, all at once, against one
+database file. A turn reads the history (as Runner.run does before calling
+the model), then appends the user message, --tool-calls call/output pairs
+and the final answer as separate add_items calls (as the Runner saves them),
+with --think-ms of simulated model time in between. Reports, as JSON, per
+backend:
+
+    append / read   latency of add_items and get_items
+    turns           wall time of a turn minus the think time
+    loop_lag        how late a 10 ms ticker on the event loop woke up
+    store           commits, writes per commit and items archived (store only)
+
+Backends: "store" is app.agents.session_store.SessionStore (writer thread,
+group commit, reader threads); "sqlite" is the agents SDK's SQLiteSession.
+
+    python -m benchmarks.session_store
+    python -m benchmarks.session_store --sessions 50 --turns 40 --max-items 100 --output sessions.json
+    python -m benchmarks.session_store --backend store
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.agents.session_store import SessionStore
+from app.config import settings
+
+TICK = 0.01
+
+
+def _summary(values: list[float]) -> dict:
+    ms = np.asarray(values or [0.0]) * 1000
+    return {
+        "count": len(values),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def turn_items(turn: int, tool_calls: int) -> list[list[dict]]:
+    """The add_items calls of one turn, in order."""
+    calls = [[{"role": "user", "content": f"Turn {turn}: analyse DOGEUSDT and log a decision."}]]
+    for i in range(tool_calls):
+        call_id = f"call_{turn}_{i}"
+        calls.append([
+            {"type": "function_call", "call_id": call_id, "name": "get_klines",
+             "arguments": json.dumps({"symbol": "DOGEUSDT", "interval": "15m", "limit": 20})},
+            {"type": "function_call_output", "call_id": call_id, "output": "x" * 600},
+        ])
+    calls.append([{"role": "assistant", "type": "message",
+                   "content": [{"type": "output_text", "text": "DECISION: HOLD - range-bound, thin book."}]}])
+    return calls
+
+
+async def _loop_lag(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(max(0.0, time.perf_counter() - started - TICK))
+
+
+async def _conversation(session, args, appends: list, reads: list, turns: list) -> None:
+    rng = random.Random(session.session_id)
+    await asyncio.sleep(rng.random() * args.think_ms / 1000)
+    for turn in range(args.turns):
+        started = time.perf_counter()
+        t0 = time.perf_counter()
+        await session.get_items(limit=args.history)
+        reads.append(time.perf_counter() - t0)
+        think = 0.0
+        for items in turn_items(turn, args.tool_calls):
+            t0 = time.perf_counter()
+            await session.add_items(items)
+            appends.append(time.perf_counter() - t0)
+            pause = rng.uniform(0.5, 1.5) * args.think_ms / 1000
+            await asyncio.sleep(pause)
+            think += pause
+        turns.append(time.perf_counter() - started - think)
+
+
+async def run_backend(backend: str, args, root: Path) -> dict:
+    db_path = root / f"{backend}.db"
+    store = None
+    if backend == "store":
+        store = SessionStore(
+            db_path, max_items=args.max_items, linger_ms=args.linger_ms, retention_interval=args.retention_interval
+        )
+        sessions = [store.session(f"session-{i}") for i in range(args.sessions)]
+    else:
+        from agents import SQLiteSession
+
+        sessions = [SQLiteSession(f"session-{i}", db_path=db_path) for i in range(args.sessions)]
+
+    appends: list[float] = []
+    reads: list[float] = []
+    turns: list[float] = []
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_loop_lag(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(_conversation(s, args, appends, reads, turns) for s in sessions))
+    seconds = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    result = {
+        "seconds": seconds,
+        "append": _summary(appends),
+        "read": _summary(reads),
+        "turns": _summary(turns),
+        "loop_lag": _summary(lags),
+    }
+    if store is not None:
+        await asyncio.to_thread(store.close)
+        result["store"] = store.stats().model_dump(exclude={"path", "queued"})
+    else:
+        for session in sessions:
+            session.close()
+    result["disk_bytes"] = sum(p.stat().st_size for p in root.glob(f"{backend}.*"))
+    return result
+
+
+async def run(args) -> dict:
+    root = Path(tempfile.mkdtemp(prefix="session_store_"))
+    backends = ["store", "sqlite"] if args.backend == "both" else [args.backend]
+    return {backend: await run_backend(backend, args, root) for backend in backends}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--tool-calls", type=int, default=6, help="call/output pairs appended per turn")
+    parser.add_argument("--think-ms", type=float, default=20.0, help="simulated model time between appends")
+    parser.add_argument("--history", type=int, default=None, help="items read per turn (default: all)")
+    parser.add_argument("--max-items", type=int, default=settings.SESSION_MAX_ITEMS)
+    parser.add_argument("--linger-ms", type=float, default=settings.SESSION_LINGER_MS)
+    parser.add_argument("--retention-interval", type=float, default=1.0, help="store retention sweep, seconds")
+    parser.add_argument("--backend", choices=["both", "store", "sqlite"], default="both")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = {
+        "config": {
+            "sessions": args.sessions,
+            "turns": args.turns,
+            "tool_calls": args.tool_calls,
+            "think_ms": args.think_ms,
+            "history": args.history,
+            "max_items": args.max_items,
+            "linger_ms": args.linger_ms,
+            "python": sys.version.split()[0],
+        },
+        **asyncio.run(run(args)),
+    }
+    output = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
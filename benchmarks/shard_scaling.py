@@ -0,0 +1,163 @@
+"""
+Scaling of the sharded runner (app/runner) with the number of worker processes.
+
+Starts benchmarks.binance_sim for market data and benchmarks.stubs for every
+other upstream, including the chat model, then runs the supervisor for each
+worker count over the same symbols with no pause between cycles. Reports, as
+JSON, per worker count: decision cycles per minute, errors, restarts, the
+resident memory of the workers and the market-data process, and the rate of
+stream messages written into the shared market table.
+
+Throughput is bounded by the cores available: with fewer cores than workers
+the extra processes only add memory and scheduling overhead. The counts
+include each worker's startup (loading the agents SDK), so use a --duration
+well above it.
+
+    python -m benchmarks.shard_scaling
+    python -m benchmarks.shard_scaling --workers 1,2,4 --symbols 16 --duration 120 --output scaling.json
+
+The decision gate and cache are off and the database is pointed at a closed
+local port, so every cycle takes the LLM path and the decision-logging step
+fails fast (counted under errors) instead of writing anywhere.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.stubs import stub_env
+
+ROOT = Path(__file__).resolve().parent.parent
+CODES = [
+    "DOGE", "BTC", "ETH", "SOL", "XRP", "ADA", "AVAX", "LINK", "DOT", "LTC", "BCH", "SHIB",
+    "UNI", "XLM", "ETC", "AAVE", "COMP", "XTZ", "PEPE", "ARB", "OP", "SUI", "APT", "NEAR",
+]
+
+
+def symbols_for(count: int) -> list[str]:
+    return CODES[:count] + [f"SIM{i}" for i in range(count - len(CODES))]
+
+
+async def _wait_ready(url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not start")
+
+
+def run_supervisor(workers: int, symbols: list[str], args, env: dict, workdir: str) -> dict:
+    stats_path = Path(workdir) / f"stats_{workers}.json"
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [
+            sys.executable, "-m", "app.runner.supervisor", "--symbols", *symbols, "--workers", str(workers),
+            "--interval", "0", "--max-concurrent", str(args.max_concurrent), "--duration", str(args.duration),
+            "--stats", str(stats_path),
+        ],
+        env=env, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    wall = time.perf_counter() - started
+    if not stats_path.exists():
+        return {"workers": workers, "error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+
+    stats = json.loads(stats_path.read_text())
+    minutes = stats["uptime_seconds"] / 60
+    worker_rss = [w["rss_mb"] for w in stats["worker_stats"] if w["rss_mb"] is not None]
+    return {
+        "workers": workers,
+        "uptime_seconds": stats["uptime_seconds"],
+        "wall_seconds": wall,
+        "cycles": stats["cycles"],
+        "cycles_per_minute": stats["cycles"] / minutes if minutes else 0.0,
+        "errors": stats["errors"],
+        "restarts": stats["restarts"],
+        "rebalances": stats["rebalances"],
+        "worker_rss_mb": {"total": sum(worker_rss), "per_worker": sum(worker_rss) / len(worker_rss) if worker_rss else None},
+        "market_rss_mb": stats["market_rss_mb"],
+        "market_updates_per_second": stats["market_updates"] / stats["uptime_seconds"] if stats["uptime_seconds"] else 0.0,
+        "per_worker_cycles": [w["cycles"] for w in stats["worker_stats"]],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4,8,16", help="comma-separated worker counts")
+    parser.add_argument("--symbols", type=int, default=16, help="number of symbols to shard")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds per worker count")
+    parser.add_argument("--max-concurrent", type=int, default=4, help="cycles in flight per worker")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on recorded upstream/LLM latencies")
+    parser.add_argument("--port", type=int, default=8790, help="stub server port")
+    parser.add_argument("--sim-port", type=int, default=8791, help="binance_sim port")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    output_path = Path(args.output).resolve() if args.output else None
+    symbols = symbols_for(args.symbols)
+    base, sim = f"http://127.0.0.1:{args.port}", f"http://127.0.0.1:{args.sim_port}"
+    env = {
+        **os.environ,
+        **stub_env(base, sim),
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+        "DECISION_GATE_ENABLED": "false",
+        "DECISION_CACHE_ENABLED": "false",
+        "DECISION_CACHE_DB_PATH": "decision_cache.db",
+        "POSTGRES_HOST": "127.0.0.1",
+        "POSTGRES_PORT": "1",
+    }
+    # Workers open ./conversations_<symbol>.db; keep the repo's copies untouched
+    workdir = tempfile.mkdtemp(prefix="shard_scaling_")
+
+    servers = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.stubs", "--port", str(args.port), "--latency-scale", str(args.latency_scale)],
+            cwd=ROOT, stdout=subprocess.DEVNULL,
+        ),
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.binance_sim", "--port", str(args.sim_port),
+             "--symbols", ",".join(f"{s}USDT" for s in symbols)],
+            cwd=ROOT, stdout=subprocess.DEVNULL,
+        ),
+    ]
+    try:
+        asyncio.run(_wait_ready(f"{base}/health"))
+        asyncio.run(_wait_ready(f"{sim}/api/v3/ping"))
+        runs = [
+            run_supervisor(workers, symbols, args, env, workdir)
+            for workers in (int(w) for w in args.workers.split(","))
+        ]
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+
+    result = {
+        "config": {
+            "symbols": len(symbols),
+            "duration_seconds": args.duration,
+            "max_concurrent": args.max_concurrent,
+            "latency_scale": args.latency_scale,
+            "cpus": os.cpu_count(),
+            "python": sys.version.split()[0],
+        },
+        "runs": runs,
+    }
+    output = json.dumps(result, indent=2)
+    if output_path is not None:
+        output_path.write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Reader throughput and writer latency of the shared kline ring (app/data/shared_ring.py).
+
+For each reader count a ring is created and filled, reader processes loop
+over zero-copy reads of the last --rows candles (a mean of the closes, then
+the validity check), and this process writes like a kline stream: mostly
+rewrites of the open candle, every --append-every-th write a new candle.
+Reports, as JSON, per reader count: reads per second in total and per
+reader, the share of reads invalidated by a concurrent write, and the
+writer's per-write latency. The baseline is the per-process alternative the
+ring replaces: parsing the same candles from a /klines JSON body per read.
+
+    python -m benchmarks.shared_ring
+    python -m benchmarks.shared_ring --readers 0,1,2,4,8 --rows 200 --duration 10 --output ring.json
+    python -m benchmarks.shared_ring --rate 10    # paced like a real stream instead of flat out
+
+Readers and the writer share the available cores; with fewer cores than
+processes the numbers measure time-slicing as much as contention.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.data.shared_ring import KLINE, SharedRing
+
+MINUTE_MS = 60_000
+
+
+def _candle(i: int, close: float) -> tuple:
+    return (i * MINUTE_MS, close, close + 1, close - 1, close, 10.0, (i + 1) * MINUTE_MS - 1, 10.0 * close, 7, 5.0, 5.0 * close)
+
+
+def _reader(name: str, rows: int, ready, stop, results) -> None:
+    ring = SharedRing.attach(name, KLINE)
+    reads = invalid = 0
+    total = 0.0
+    ready.release()
+    while not stop.is_set():
+        for _ in range(100):
+            view = ring.last(rows)
+            if view is None:
+                invalid += 1
+                continue
+            total += float(view.rows["close"].mean())
+            if not ring.valid(view):
+                invalid += 1
+            reads += 1
+    ring.close()
+    results.put({"reads": reads, "invalid": invalid})
+
+
+def _latency_us(samples_ns: list[int]) -> dict:
+    us = np.asarray(samples_ns or [0], dtype=np.float64) / 1000
+    return {
+        "p50": float(np.percentile(us, 50)),
+        "p99": float(np.percentile(us, 99)),
+        "p999": float(np.percentile(us, 99.9)),
+        "max": float(us.max()),
+    }
+
+
+def run(readers: int, args) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    ring = SharedRing.create(f"rh_ring_bench_{os.getpid()}_{readers}", KLINE, args.capacity)
+    for i in range(args.capacity):
+        ring.append(_candle(i, 100.0 + i % 7))
+
+    ready, stop, results = ctx.Semaphore(0), ctx.Event(), ctx.Queue()
+    processes = [ctx.Process(target=_reader, args=(ring.name, args.rows, ready, stop, results)) for _ in range(readers)]
+    try:
+        for process in processes:
+            process.start()
+        for _ in processes:
+            ready.acquire()
+
+        latencies: list[int] = []
+        candle = args.capacity
+        writes = 0
+        period = 1.0 / args.rate if args.rate else 0.0
+        started = time.perf_counter()
+        deadline = started + args.duration
+        while time.perf_counter() < deadline:
+            writes += 1
+            if writes % args.append_every == 0:
+                candle += 1
+            row = _candle(candle, 100.0 + writes % 13)
+            t0 = time.perf_counter_ns()
+            ring.upsert(row, "open_time")
+            latencies.append(time.perf_counter_ns() - t0)
+            if period:
+                time.sleep(max(0.0, started + writes * period - time.perf_counter()))
+        elapsed = time.perf_counter() - started
+
+        stop.set()
+        counts = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        ring.close()
+
+    reads = sum(c["reads"] for c in counts)
+    invalid = sum(c["invalid"] for c in counts)
+    return {
+        "readers": readers,
+        "seconds": elapsed,
+        "reads_per_second": reads / elapsed,
+        "reads_per_second_per_reader": reads / elapsed / readers if readers else 0.0,
+        "invalid_share": invalid / reads if reads else 0.0,
+        "writes": writes,
+        "writes_per_second": writes / elapsed,
+        "write_latency_us": _latency_us(latencies),
+    }
+
+
+def json_baseline(rows: int, duration: float) -> dict:
+    """Reads per second when each read parses the candles from a /klines body instead."""
+    payload = json.dumps([
+        [k[0], f"{k[1]:.8f}", f"{k[2]:.8f}", f"{k[3]:.8f}", f"{k[4]:.8f}", f"{k[5]:.8f}", k[6],
+         f"{k[7]:.8f}", k[8], f"{k[9]:.8f}", f"{k[10]:.8f}", "0"]
+        for k in (_candle(i, 100.0 + i % 7) for i in range(rows))
+    ]).encode()
+    reads = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < duration:
+        closes = np.array([float(k[4]) for k in json.loads(payload)])
+        closes.mean()
+        reads += 1
+    return {"reads_per_second": reads / (time.perf_counter() - started), "payload_bytes": len(payload)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", default="0,1,2,4", help="comma-separated reader process counts")
+    parser.add_argument("--rows", type=int, default=50, help="candles per read")
+    parser.add_argument("--capacity", type=int, default=500, help="candles in the ring")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per reader count")
+    parser.add_argument("--rate", type=float, default=0.0, help="writes per second (0: as fast as possible)")
+    parser.add_argument("--append-every", type=int, default=10, help="every Nth write starts a new candle")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    result = {
+        "config": {
+            "rows": args.rows,
+            "capacity": args.capacity,
+            "duration_seconds": args.duration,
+            "rate": args.rate,
+            "append_every": args.append_every,
+            "cpus": os.cpu_count(),
+            "python": sys.version.split()[0],
+        },
+        "json_baseline": json_baseline(args.rows, min(args.duration, 2.0)),
+        "runs": [run(int(n), args) for n in args.readers.split(",")],
+    }
+    output = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
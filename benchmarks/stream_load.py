@@ -0,0 +1,190 @@
+"""
+Load-test the live stream with hundreds of local WebSocket clients.
+
+A uvicorn worker is started in a subprocess with a synthetic publisher in
+place of the agent loop and Binance: decisions at --decision-rate and
+bookTicker updates at --ticker-rate per second. A share of the clients is
+deliberately slow so the drop-oldest/conflation policies and the publisher's
+own timing (which must not degrade) can be observed.
+
+    python -m benchmarks.stream_load
+    python -m benchmarks.stream_load --clients 500 --slow-share 0.2 --duration 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+import websockets
+
+from app.config import settings
+
+
+def serve(port: int, decision_rate: float, ticker_rate: float) -> None:
+    import uvicorn
+
+    from app.broker import stream_broker
+    from app.main import app
+
+    publisher = {"ticks": 0, "max_lag_ms": 0.0, "lags_ms": []}
+
+    async def publish_forever():
+        period = 1.0 / ticker_rate
+        every = max(1, int(ticker_rate / decision_rate)) if decision_rate > 0 else 0
+        expected = time.perf_counter()
+        seq = 0
+        while True:
+            expected += period
+            await asyncio.sleep(max(0.0, expected - time.perf_counter()))
+            # How late this tick ran: a stalled loop shows up here first
+            lag_ms = (time.perf_counter() - expected) * 1000
+            publisher["lags_ms"].append(lag_ms)
+            publisher["max_lag_ms"] = max(publisher["max_lag_ms"], lag_ms)
+
+            seq += 1
+            price = 0.15 + 0.001 * np.sin(seq / 50)
+            stream_broker.publish(
+                "book_ticker",
+                {"symbol": "DOGEUSDT", "bid_price": price - 0.00001, "ask_price": price + 0.00001},
+                key="DOGEUSDT",
+            )
+            if every and seq % every == 0:
+                stream_broker.publish(
+                    "decision",
+                    {"id": seq, "symbol": "DOGE", "side": "hold", "price": price, "reason": "benchmark"},
+                    key="DOGE",
+                )
+            publisher["ticks"] += 1
+
+    @app.get("/bench/publisher")
+    async def publisher_stats():
+        lags = np.asarray(publisher["lags_ms"] or [0.0])
+        return {
+            "ticks": publisher["ticks"],
+            "lag_p50_ms": float(np.percentile(lags, 50)),
+            "lag_p99_ms": float(np.percentile(lags, 99)),
+            "lag_max_ms": publisher["max_lag_ms"],
+        }
+
+    async def run():
+        task = asyncio.create_task(publish_forever())
+        try:
+            await uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)).serve()
+        finally:
+            task.cancel()
+
+    asyncio.run(run())
+
+
+async def client(url: str, slow_delay: float, stop_at: float, results: list) -> None:
+    received = 0
+    latencies: list[float] = []
+    last_seq = 0
+    gaps = 0
+    try:
+        async with websockets.connect(url, max_queue=4) as ws:
+            while time.time() < stop_at:
+                try:
+                    message = await asyncio.wait_for(ws.recv(), timeout=max(0.01, stop_at - time.time()))
+                except asyncio.TimeoutError:
+                    break
+                event = json.loads(message)
+                received += 1
+                latencies.append(time.time() - event["published_at"])
+                if last_seq and event["seq"] > last_seq + 1:
+                    gaps += 1
+                last_seq = event["seq"]
+                if slow_delay:
+                    await asyncio.sleep(slow_delay)
+    except Exception as e:
+        results.append({"error": repr(e)})
+        return
+
+    results.append({"slow": bool(slow_delay), "received": received, "latencies": latencies, "gaps": gaps})
+
+
+async def main_async(args) -> dict:
+    base = f"http://127.0.0.1:{args.port}"
+    async with httpx.AsyncClient() as http:
+        for _ in range(75):
+            try:
+                await http.get(f"{base}/health")
+                break
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+
+        ws_url = f"ws://127.0.0.1:{args.port}{settings.API_V1_PREFIX}/stream/ws?topics=decision,book_ticker"
+        stop_at = time.time() + args.duration
+        results: list[dict] = []
+        n_slow = int(args.clients * args.slow_share)
+        await asyncio.gather(
+            *(client(ws_url, args.slow_delay if i < n_slow else 0.0, stop_at, results) for i in range(args.clients))
+        )
+
+        publisher = (await http.get(f"{base}/bench/publisher")).json()
+        broker = (await http.get(f"{base}{settings.API_V1_PREFIX}/stream/stats")).json()
+
+    ok = [r for r in results if "error" not in r]
+
+    def summary(rows: list[dict]) -> dict:
+        if not rows:
+            return {}
+        lat = np.concatenate([np.asarray(r["latencies"]) for r in rows if r["latencies"]] or [np.zeros(1)]) * 1000
+        return {
+            "clients": len(rows),
+            "events_per_client_per_s": float(np.mean([r["received"] for r in rows])) / args.duration,
+            "latency_p50_ms": float(np.percentile(lat, 50)),
+            "latency_p99_ms": float(np.percentile(lat, 99)),
+            "clients_with_gaps": sum(r["gaps"] > 0 for r in rows),
+            "max_gaps": max(r["gaps"] for r in rows),
+        }
+
+    return {
+        "clients": args.clients,
+        "errors": len(results) - len(ok),
+        "fast": summary([r for r in ok if not r["slow"]]),
+        "slow": summary([r for r in ok if r["slow"]]),
+        "publisher": publisher,
+        "broker": {"published": broker["published"], "live_subscribers": len(broker["subscribers"])},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--slow-share", type=float, default=0.1)
+    parser.add_argument("--slow-delay", type=float, default=0.5, help="seconds a slow client sleeps per message")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--decision-rate", type=float, default=1.0)
+    parser.add_argument("--ticker-rate", type=float, default=50.0)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.serve:
+        serve(args.port, args.decision_rate, args.ticker_rate)
+        return
+
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "benchmarks.stream_load", "--serve", "--port", str(args.port),
+            "--decision-rate", str(args.decision_rate), "--ticker-rate", str(args.ticker_rate),
+        ],
+        env={**os.environ, "RUN_AGENT_LOOP": "false", "STREAM_MARKET_ENABLED": "false"},
+    )
+    try:
+        print(json.dumps(asyncio.run(main_async(args)), indent=2))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Local stand-ins for every upstream the agent cycle talks to, served from
+recorded fixtures in benchmarks/fixtures:
+
+    /binance        Binance REST (ticker/24hr, klines, depth, bookTicker) and WS
+    /robinhood      the Robinhood proxy (account, holdings, orders, pairs, best price)
+    /coindesk       coindesk news search
+    /eventregistry  eventregistry getArticles
+    /openai         OpenAI-compatible chat completions, scripted by llm_script.json
+
+Every fixture carries the latency observed when it was recorded; responses
+are delayed by that latency times --latency-scale (0 serves as fast as
+possible). `stub_env(base_url)` returns the settings overrides that point the
+app at a running stub server.
+
+    python -m benchmarks.stubs --port 8790
+    python -m benchmarks.stubs --record   # refresh the public fixtures from the live APIs
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+
+def stub_env(base_url: str, binance_url: str | None = None) -> dict[str, str]:
+    """
+    Settings overrides (environment variables) that route every upstream to the
+    stubs; `binance_url` sends Binance to a running benchmarks.binance_sim instead.
+    """
+    binance_url = binance_url or f"{base_url}/binance"
+    return {
+        "BINANCE_API_URL": binance_url,
+        "BINANCE_WS_URL": binance_url.replace("http://", "ws://", 1),
+        "ROBINHOOD_BASE_URL": f"{base_url}/robinhood",
+        "COINDESK_API_URL": f"{base_url}/coindesk",
+        "EVENTREGISTRY_API_URL": f"{base_url}/eventregistry",
+        "NEWS_AI_API_KEY": "stub",
+        "GEMINI_BASE_URL": f"{base_url}/openai",
+        "GEMINI_API_KEY": "stub",
+        "GEMINI_MODEL": "stub-model",
+    }
+
+
+def load_fixtures(directory: Path = FIXTURES_DIR) -> dict[str, dict]:
+    return {path.stem: json.loads(path.read_text()) for path in sorted(directory.glob("*.json"))}
+
+
+def _script_turn(messages: list[dict]) -> int:
+    """Index of the scripted turn: assistant tool-call turns since the last user message."""
+    turn = 0
+    for message in messages:
+        if message.get("role") == "user":
+            turn = 0
+        elif message.get("role") == "assistant" and message.get("tool_calls"):
+            turn += 1
+    return turn
+
+
+def _chat_message(turn: dict, cycle: str) -> dict:
+    if "tool_calls" in turn:
+        return {
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": f"call_{cycle}_{i}",
+                    "type": "function",
+                    "function": {"name": call["name"], "arguments": json.dumps(call["arguments"])},
+                }
+                for i, call in enumerate(turn["tool_calls"])
+            ],
+        }
+    return {"role": "assistant", "content": turn["content"]}
+
+
+def _sse_chunks(completion_id: str, model: str, message: dict, usage: dict):
+    """One chat.completion.chunk per field, the way a streaming endpoint emits them."""
+    created = int(time.time())
+
+    def chunk(delta: dict, finish_reason: str | None = None, chunk_usage: dict | None = None) -> str:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+        }
+        if chunk_usage is not None:
+            body["usage"] = chunk_usage
+        return f"data: {json.dumps(body)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    if message.get("tool_calls"):
+        for i, call in enumerate(message["tool_calls"]):
+            yield chunk({"tool_calls": [{"index": i, **call}]})
+        yield chunk({}, "tool_calls")
+    else:
+        for start in range(0, len(message["content"]), 32):
+            yield chunk({"content": message["content"][start:start + 32]})
+        yield chunk({}, "stop")
+    yield chunk(None, chunk_usage=usage)
+    yield "data: [DONE]\n\n"
+
+
+def create_app(fixtures: dict[str, dict] | None = None, latency_scale: float = 1.0, ws_rate: float = 10.0) -> FastAPI:
+    fixtures = fixtures if fixtures is not None else load_fixtures()
+    script = fixtures["llm_script"]["turns"]
+    app = FastAPI(title="upstream stubs")
+    app.state.requests = {}
+
+    async def serve(name: str, body=None) -> JSONResponse:
+        fixture = fixtures[name]
+        app.state.requests[name] = app.state.requests.get(name, 0) + 1
+        if latency_scale > 0:
+            await asyncio.sleep(fixture["latency_ms"] * latency_scale / 1000)
+        return JSONResponse(fixture["body"] if body is None else body)
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok", "requests": app.state.requests}
+
+    # ------------------------------------------------------------------
+    # Binance
+    # ------------------------------------------------------------------
+    @app.get("/binance/api/v3/ticker/24hr")
+    async def ticker_24hr(symbol: str):
+        return await serve("binance_ticker_24hr", {**fixtures["binance_ticker_24hr"]["body"], "symbol": symbol.upper()})
+
+    @app.get("/binance/api/v3/klines")
+    async def klines(symbol: str, interval: str = "1h", limit: int = 500):
+        return await serve("binance_klines", fixtures["binance_klines"]["body"][-min(max(limit, 1), 1000):])
+
+    @app.get("/binance/api/v3/depth")
+    async def depth(symbol: str, limit: int = 100):
+        book = fixtures["binance_depth"]["body"]
+        return await serve(
+            "binance_depth", {"lastUpdateId": book["lastUpdateId"], "bids": book["bids"][:limit], "asks": book["asks"][:limit]}
+        )
+
+    @app.get("/binance/api/v3/ticker/bookTicker")
+    async def book_ticker(symbol: str):
+        return await serve("binance_book_ticker", {**fixtures["binance_book_ticker"]["body"], "symbol": symbol.upper()})
+
+    def _walk(seed: int):
+        """Endless synthetic price path around the recorded last price."""
+        rng = np.random.default_rng(seed)
+        price = float(fixtures["binance_ticker_24hr"]["body"]["lastPrice"])
+        while True:
+            price *= 1 + rng.normal(0, 0.0002)
+            yield price
+
+    @app.websocket("/binance/stream")
+    async def combined_stream(websocket: WebSocket, streams: str):
+        await websocket.accept()
+        symbols = [stream.split("@")[0].upper() for stream in streams.split("/") if stream]
+        prices = _walk(len(symbols))
+        try:
+            while True:
+                for symbol in symbols:
+                    price = next(prices)
+                    await websocket.send_text(json.dumps({
+                        "stream": f"{symbol.lower()}@bookTicker",
+                        "data": {"u": 1, "s": symbol, "b": f"{price - 0.00001:.5f}", "B": "50000.0",
+                                 "a": f"{price + 0.00001:.5f}", "A": "50000.0"},
+                    }))
+                await asyncio.sleep(1 / ws_rate)
+        except WebSocketDisconnect:
+            pass
+
+    @app.websocket("/binance/ws/{stream}")
+    async def kline_stream(websocket: WebSocket, stream: str):
+        await websocket.accept()
+        symbol, _, interval = stream.partition("@kline_")
+        symbol = symbol.upper()
+        prices = _walk(1)
+        candle_ms = 60_000
+        try:
+            while True:
+                now = int(time.time() * 1000)
+                start = now - now % candle_ms
+                price = next(prices)
+                await websocket.send_text(json.dumps({
+                    "e": "kline", "E": now, "s": symbol,
+                    "k": {"t": start, "T": start + candle_ms - 1, "s": symbol, "i": interval, "f": 1, "L": 2,
+                          "o": f"{price:.5f}", "c": f"{price:.5f}", "h": f"{price:.5f}", "l": f"{price:.5f}",
+                          "v": "1000.0", "n": 10, "x": False, "q": f"{1000 * price:.4f}", "V": "500.0",
+                          "Q": f"{500 * price:.4f}", "B": "0"},
+                }))
+                await asyncio.sleep(1 / ws_rate)
+        except WebSocketDisconnect:
+            pass
+
+    # ------------------------------------------------------------------
+    # Robinhood proxy
+    # ------------------------------------------------------------------
+    @app.post("/robinhood/get-account")
+    async def account():
+        return await serve("robinhood_account")
+
+    @app.post("/robinhood/getCryptoHoldings")
+    async def holdings():
+        return await serve("robinhood_holdings")
+
+    @app.api_route("/robinhood/getCryptoOrders", methods=["GET", "POST"])
+    async def orders():
+        return await serve("robinhood_orders")
+
+    @app.post("/robinhood/getTradingPairs")
+    async def trading_pairs():
+        return await serve("robinhood_trading_pairs")
+
+    @app.post("/robinhood/getBestPrice")
+    async def best_price():
+        body = fixtures["robinhood_best_price"]["body"]
+        stamp = datetime.now(timezone.utc).isoformat()
+        return await serve("robinhood_best_price", {"results": [{**quote, "timestamp": stamp} for quote in body["results"]]})
+
+    # ------------------------------------------------------------------
+    # News
+    # ------------------------------------------------------------------
+    @app.get("/coindesk/search")
+    async def crypto_news(limit: int = 10):
+        body = fixtures["coindesk_search"]["body"]
+        return await serve("coindesk_search", {**body, "Data": body["Data"][:limit]})
+
+    @app.post("/eventregistry/getArticles")
+    async def global_news():
+        return await serve("eventregistry_articles")
+
+    # ------------------------------------------------------------------
+    # OpenAI-compatible chat completions
+    # ------------------------------------------------------------------
+    @app.post("/openai/chat/completions")
+    async def chat_completions(request: Request):
+        payload = await request.json()
+        turn = script[min(_script_turn(payload.get("messages", [])), len(script) - 1)]
+        app.state.requests["llm"] = app.state.requests.get("llm", 0) + 1
+        if latency_scale > 0:
+            await asyncio.sleep(turn["latency_ms"] * latency_scale / 1000)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = payload.get("model", "stub-model")
+        message = _chat_message(turn, completion_id[-6:])
+        prompt_tokens = len(json.dumps(payload.get("messages", []))) // 4
+        completion_tokens = len(json.dumps(message)) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+
+        if payload.get("stream"):
+            return StreamingResponse(_sse_chunks(completion_id, model, message, usage), media_type="text/event-stream")
+
+        finish_reason = "tool_calls" if message.get("tool_calls") else "stop"
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage,
+        })
+
+    return app
+
+
+async def record(directory: Path = FIXTURES_DIR) -> dict[str, str]:
+    """Re-record the upstream fixtures from the live APIs configured in settings."""
+    import httpx
+
+    from app.config import settings
+
+    calls = {
+        "binance_ticker_24hr": ("GET", f"{settings.BINANCE_API_URL}/api/v3/ticker/24hr", {"params": {"symbol": "DOGEUSDT"}}),
+        "binance_klines": ("GET", f"{settings.BINANCE_API_URL}/api/v3/klines",
+                           {"params": {"symbol": "DOGEUSDT", "interval": "15m", "limit": 1000}}),
+        "binance_depth": ("GET", f"{settings.BINANCE_API_URL}/api/v3/depth", {"params": {"symbol": "DOGEUSDT", "limit": 1000}}),
+        "binance_book_ticker": ("GET", f"{settings.BINANCE_API_URL}/api/v3/ticker/bookTicker", {"params": {"symbol": "DOGEUSDT"}}),
+        "coindesk_search": ("GET", f"{settings.COINDESK_API_URL}/search",
+                            {"params": {"lang": "EN", "source_key": "coindesk", "search_string": "DOGE", "limit": 20}}),
+    }
+    if settings.NEWS_AI_API_KEY:
+        calls["eventregistry_articles"] = ("POST", f"{settings.EVENTREGISTRY_API_URL}/getArticles", {"json": {
+            "action": "getArticles", "keyword": "crypto market", "articlesCount": 10, "resultType": "articles",
+            "apiKey": settings.NEWS_AI_API_KEY,
+        }})
+    if settings.ROBINHOOD_BASE_URL:
+        calls.update({
+            "robinhood_account": ("POST", f"{settings.ROBINHOOD_BASE_URL}/get-account", {}),
+            "robinhood_holdings": ("POST", f"{settings.ROBINHOOD_BASE_URL}/getCryptoHoldings", {}),
+            "robinhood_trading_pairs": ("POST", f"{settings.ROBINHOOD_BASE_URL}/getTradingPairs",
+                                        {"json": {"from_currency": "DOGE", "to_currency": "USD"}}),
+            "robinhood_best_price": ("POST", f"{settings.ROBINHOOD_BASE_URL}/getBestPrice", {"json": {"from": "DOGE", "to": "USD"}}),
+        })
+
+    results = {}
+    async with httpx.AsyncClient(timeout=30) as client:
+        for name, (method, url, kwargs) in calls.items():
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                results[name] = f"kept previous fixture ({e!r})"
+                continue
+            fixture = {
+                "recorded_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "latency_ms": round((time.perf_counter() - started) * 1000),
+                "body": response.json(),
+            }
+            (directory / f"{name}.json").write_text(json.dumps(fixture, separators=(",", ":")))
+            results[name] = f"recorded in {fixture['latency_ms']} ms"
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="multiplier on recorded latencies (0 = none)")
+    parser.add_argument("--ws-rate", type=float, default=10.0, help="WebSocket updates per second per stream")
+    parser.add_argument("--record", action="store_true", help="refresh fixtures from the live upstreams and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        print(json.dumps(asyncio.run(record()), indent=2))
+        return
+
+    import uvicorn
+
+    uvicorn.run(
+        create_app(latency_scale=args.latency_scale, ws_rate=args.ws_rate),
+        host="127.0.0.1", port=args.port, log_level="warning", access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Re-run recorded decision cycles offline from HTTP tapes.
+
+Cycles run with HTTP_TAPE_RECORD=true leave one tape per cycle in
+HTTP_TAPE_DIR (see app/data/tape.py). This script replays them through
+run_cycle() with every upstream request, including the chat model, answered
+from the tape, so a past decision can be reproduced without network access.
+Run it with the same upstream configuration the tapes were recorded with:
+requests are matched by URL. Reports, as JSON, per cycle: wall time against
+the recorded duration, exchanges replayed, tape misses and the final text.
+
+The decision gate and cache are off so every cycle takes the LLM path. The
+database is pointed at a closed local port unless --db is given, so replays
+do not log decisions twice.
+
+    python -m benchmarks.tape_replay --list
+    python -m benchmarks.tape_replay --cycle 20260101T120000-cycle3
+    python -m benchmarks.tape_replay --all --latency --output replay.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+async def run(args) -> dict:
+    # Imported here: settings must see the environment set by main()
+    from agents import SQLiteSession
+
+    from app.agents import trading_agent
+    from app.data.tape import http_tape
+
+    entries = {entry.cycle_id: entry for entry in http_tape.index()}
+    if args.list:
+        return {"directory": str(http_tape.directory), "tapes": [e.model_dump() for e in entries.values()]}
+
+    cycle_ids = list(entries) if args.all else args.cycle
+    unknown = [c for c in cycle_ids if c not in entries]
+    if unknown:
+        raise SystemExit(f"not in {http_tape.directory / 'index.jsonl'}: {', '.join(unknown)}")
+
+    final_texts: list[str] = []
+    run_agent_cycle = trading_agent.run_agent_cycle
+
+    async def capturing_agent_cycle(*args) -> str:
+        final_texts.append(await run_agent_cycle(*args))
+        return final_texts[-1]
+
+    trading_agent.run_agent_cycle = capturing_agent_cycle
+
+    cycles = []
+    for n, cycle_id in enumerate(cycle_ids):
+        # Each replay starts from an empty conversation, as far as the tape allows
+        trading_agent.sql_lit_session = SQLiteSession(f"replay-{n}", db_path="replay_conversations.db")
+        final_texts.clear()
+        replayed, misses = http_tape.replayed, http_tape.misses
+        error, cassette = None, None
+        started = time.perf_counter()
+        try:
+            async with http_tape.replay(cycle_id, latency=args.latency) as cassette:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    source = await trading_agent.run_cycle(n)
+        except Exception as e:
+            source = f"error:{type(e).__name__}"
+            error = str(e).splitlines()[0][:200] if str(e) else None
+        cycles.append({
+            "cycle_id": cycle_id,
+            "source": source,
+            "error": error,
+            "wall_seconds": time.perf_counter() - started,
+            "recorded_seconds": entries[cycle_id].duration_seconds,
+            "exchanges": entries[cycle_id].exchanges,
+            "replayed": http_tape.replayed - replayed,
+            "unused": cassette.unused if cassette else None,
+            "misses": http_tape.misses - misses,
+            "final_text": final_texts[-1] if final_texts else None,
+        })
+
+    return {
+        "config": {
+            "directory": str(http_tape.directory),
+            "latency": args.latency,
+            "db": args.db,
+            "python": sys.version.split()[0],
+        },
+        "cycles": cycles,
+        "misses": sum(c["misses"] for c in cycles),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    which = parser.add_mutually_exclusive_group(required=True)
+    which.add_argument("--list", action="store_true", help="list the recorded tapes")
+    which.add_argument("--cycle", action="append", help="cycle id to replay (repeatable)")
+    which.add_argument("--all", action="store_true", help="replay every recorded tape")
+    parser.add_argument("--dir", help="tape directory (default: HTTP_TAPE_DIR)")
+    parser.add_argument("--latency", action="store_true", help="delay each response by its recorded latency")
+    parser.add_argument("--db", action="store_true", help="let replayed cycles write to the configured Postgres")
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    output_path = Path(args.output).resolve() if args.output else None
+    tape_dir = Path(args.dir or os.environ.get("HTTP_TAPE_DIR", "tapes")).resolve()
+    os.environ.update({
+        "HTTP_TAPE_DIR": str(tape_dir),
+        "HTTP_TAPE_RECORD": "false",
+        "DECISION_GATE_ENABLED": "false",
+        "DECISION_CACHE_ENABLED": "false",
+        "DECISION_CACHE_DB_PATH": "decision_cache.db",
+    })
+    if not args.db:
+        os.environ.update({"POSTGRES_HOST": "127.0.0.1", "POSTGRES_PORT": "1"})
+    # Per-request INFO logs and failed-write errors would flood the output
+    logging.disable(logging.ERROR)
+
+    # The agent module opens ./conversations.db at import; keep the repo's copy untouched
+    os.chdir(tempfile.mkdtemp(prefix="tape_replay_"))
+    result = asyncio.run(run(args))
+
+    output = json.dumps(result, indent=2)
+    if output_path is not None:
+        output_path.write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Tool request latency under injected upstream faults, with and without ResilientTransport.
+
+A fault server (this module with --serve) is started in a subprocess. It
+answers the three request shapes the tools make (Binance klines GET,
+coindesk search GET, eventregistry getArticles POST) after a short
+lognormal delay, and injects faults per scenario:
+
+    tail     --slow-rate of responses take --slow-ms (a slow upstream)
+    errors   --error-rate of responses are 503
+    outage   every request hangs past the timeout for --outage-seconds mid-run
+
+Each scenario issues --calls requests at --rate per second, once through
+InstrumentedTransport ("before") and once through ResilientTransport
+("after"), sharing one async_client per run. Reports, as JSON: p50/p99/max
+latency, failed requests and fallbacks per run, and the per-host
+breaker/retry/hedge counts after the resilient run.
+
+    python -m benchmarks.upstream_faults
+    python -m benchmarks.upstream_faults --calls 1000 --slow-rate 0.02 --output faults.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+KLINE_ROWS = [[1_700_000_000_000 + i * 900_000, "0.15", "0.151", "0.149", "0.1505", "1000"] for i in range(20)]
+ARTICLES = {"articles": {"results": [{"title": f"article {i}", "body": "x" * 400} for i in range(10)]}}
+SCENARIOS = ("tail", "errors", "outage")
+HANG_SECONDS = 60.0  # well past any client timeout
+
+
+def create_app(base_ms: float):
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse
+
+    app = FastAPI()
+    faults = {"slow_rate": 0.0, "slow_ms": 0.0, "error_rate": 0.0, "hang": False}
+    rng = random.Random(0)
+
+    async def answer(body) -> JSONResponse:
+        if faults["hang"]:
+            await asyncio.sleep(HANG_SECONDS)
+        delay = rng.lognormvariate(0, 0.3) * base_ms
+        if rng.random() < faults["slow_rate"]:
+            delay = faults["slow_ms"]
+        await asyncio.sleep(delay / 1000)
+        if rng.random() < faults["error_rate"]:
+            return JSONResponse({"error": "injected"}, status_code=503)
+        return JSONResponse(body)
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"status": "ok"}
+
+    @app.post("/faults")
+    async def set_faults(request: Request) -> dict:
+        faults.update(await request.json())
+        return faults
+
+    @app.get("/binance/api/v3/klines")
+    async def klines():
+        return await answer(KLINE_ROWS)
+
+    @app.get("/coindesk/search")
+    async def crypto_news():
+        return await answer({"Data": []})
+
+    @app.post("/eventregistry/getArticles")
+    async def global_news():
+        return await answer(ARTICLES)
+
+    return app
+
+
+def _summary(values: list[float]) -> dict:
+    ms = np.asarray(values or [0.0]) * 1000
+    return {
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+async def _wait_ready(url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{url}/health")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError("fault server did not start")
+
+
+async def _call(client: httpx.AsyncClient, base: str, i: int) -> tuple[float, bool, bool]:
+    started = time.perf_counter()
+    try:
+        if i % 3 == 0:
+            response = await client.get(
+                f"{base}/binance/api/v3/klines", params={"symbol": "DOGEUSDT", "interval": "15m", "limit": 20}
+            )
+        elif i % 3 == 1:
+            response = await client.get(f"{base}/coindesk/search", params={"search_string": "DOGE", "limit": 10})
+        else:
+            response = await client.post(
+                f"{base}/eventregistry/getArticles", json={"keyword": "dogecoin"}, extensions={"idempotent": True}
+            )
+        response.raise_for_status()
+        ok, fallback = True, "x-upstream-fallback-age" in response.headers
+    except httpx.HTTPError:
+        ok, fallback = False, False
+    return time.perf_counter() - started, ok, fallback
+
+
+async def run_scenario(base: str, scenario: str, resilient: bool, args) -> dict:
+    from app.data.http_client import InstrumentedTransport, ResilientTransport, async_client
+    from app.data.resilience import upstream_resilience
+
+    upstream_resilience.reset()
+    faults = {"slow_rate": 0.0, "slow_ms": args.slow_ms, "error_rate": 0.0, "hang": False}
+    if scenario == "tail":
+        faults["slow_rate"] = args.slow_rate
+    elif scenario == "errors":
+        faults["error_rate"] = args.error_rate
+    transport = ResilientTransport() if resilient else InstrumentedTransport()
+    async with httpx.AsyncClient() as control, async_client(timeout=args.timeout, transport=transport) as client:
+        await control.post(f"{base}/faults", json=faults)
+
+        async def outage() -> None:
+            await asyncio.sleep(args.outage_after)
+            await control.post(f"{base}/faults", json={"hang": True})
+            await asyncio.sleep(args.outage_seconds)
+            await control.post(f"{base}/faults", json={"hang": False})
+
+        outage_task = asyncio.create_task(outage()) if scenario == "outage" else None
+        results = []
+        started = time.perf_counter()
+
+        async def one(i: int) -> None:
+            await asyncio.sleep(max(0.0, started + i / args.rate - time.perf_counter()))
+            results.append(await _call(client, base, i))
+
+        await asyncio.gather(*(one(i) for i in range(args.calls)))
+        seconds = time.perf_counter() - started
+        if outage_task is not None:
+            await outage_task
+
+    result = {
+        **_summary([latency for latency, _, _ in results]),
+        "failed": sum(not ok for _, ok, _ in results),
+        "fallbacks": sum(fallback for _, _, fallback in results),
+        "seconds": seconds,
+    }
+    if resilient:
+        result["hosts"] = [host.model_dump() for host in upstream_resilience.stats().hosts]
+    return result
+
+
+async def run(base: str, args) -> dict:
+    await _wait_ready(base)
+    return {
+        scenario: {
+            "before": await run_scenario(base, scenario, False, args),
+            "after": await run_scenario(base, scenario, True, args),
+        }
+        for scenario in args.scenarios
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8792)
+    parser.add_argument("--serve", action="store_true", help="run the fault server only")
+    parser.add_argument("--base-ms", type=float, default=20.0, help="median upstream latency")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--calls", type=int, default=600)
+    parser.add_argument("--rate", type=float, default=100.0, help="requests started per second")
+    parser.add_argument("--timeout", type=float, default=3.0, help="client timeout (the tools use 10-30 s)")
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=2000.0)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--outage-after", type=float, default=1.0, help="seconds into the outage run")
+    parser.add_argument("--outage-seconds", type=float, default=4.0)
+    parser.add_argument("--breaker-cooldown", type=float, default=2.0)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    args = parser.parse_args()
+
+    if args.serve:
+        import uvicorn
+
+        uvicorn.run(
+            create_app(args.base_ms), host="127.0.0.1", port=args.port, log_level="warning", access_log=False,
+            timeout_graceful_shutdown=1,
+        )
+        return
+
+    # Read by app.config at import, so set before anything from app is imported
+    os.environ["HTTP_BREAKER_COOLDOWN_SECONDS"] = str(args.breaker_cooldown)
+    base = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.upstream_faults", "--serve", "--port", str(args.port),
+         "--base-ms", str(args.base_ms)],
+        # Requests still hanging when the server stops are cancelled, noisily
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        result = {
+            "config": {
+                "calls": args.calls,
+                "rate": args.rate,
+                "timeout": args.timeout,
+                "base_ms": args.base_ms,
+                "slow_rate": args.slow_rate,
+                "slow_ms": args.slow_ms,
+                "error_rate": args.error_rate,
+                "outage_seconds": args.outage_seconds,
+                "breaker_cooldown": args.breaker_cooldown,
+                "python": sys.version.split()[0],
+            },
+            **asyncio.run(run(base, args)),
+        }
+    finally:
+        server.terminate()
+        server.wait()
+
+    output = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()